@@ -1,24 +1,31 @@
 import sys
-import os
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QFrame, QListWidget, QTableWidget, QTableWidgetItem, QHeaderView,
     QDialog, QLineEdit, QMessageBox
 )
-from PyQt5.QtGui import QFont, QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QPixmap, QImage
+from PyQt5.QtCore import Qt, QSize
 
 from database import DatabaseManager
 from add_dorm import AddDormForm
+from background_loader import BackgroundLoader, show_table_placeholder, fill_table
+from prefetch import prefetched
+from images import load_image
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def resolve_image_path(rel_or_abs):
-    if not rel_or_abs:
-        return None
-    if os.path.isabs(rel_or_abs):
-        return rel_or_abs
-    return os.path.join(BASE_DIR, rel_or_abs.replace("/", os.sep))
+THUMB_SIZE = QSize(120, 80)
+
+
+def thumbnail_label(thumb, size=THUMB_SIZE):
+    img_label = QLabel()
+    img_label.setAlignment(Qt.AlignCenter)
+    img_label.setFixedSize(size)
+    if isinstance(thumb, QImage):
+        img_label.setPixmap(QPixmap.fromImage(thumb))
+    else:
+        img_label.setText(thumb)
+    return img_label
 
 class DormDialog(QDialog):
     """UI for Editing a Dorm (Add is handled by AddDormForm)"""
@@ -126,6 +133,10 @@ class TotalDormsDetailWindow(StyledWindowBase):
         self.properties = []
 
         self._build_ui()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     def _build_ui(self):
@@ -187,15 +198,17 @@ class TotalDormsDetailWindow(StyledWindowBase):
         layout.addLayout(actions)
 
     def load_data(self):
-        self.table.setRowCount(0)
-        self.properties = self.db.get_host_properties(self.host_id)
+        self.loader.load()
 
-        for row, prop in enumerate(self.properties):
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(str(prop["property_id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(prop["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(prop["address"]))
-            self.table.setItem(row, 3, QTableWidgetItem(str(prop["room_count"])))
+    def _fetch_data(self):
+        """Runs on a worker thread."""
+        return prefetched(self.db, "get_host_properties", self.host_id)
+
+    def _apply_data(self, properties):
+        self.properties = properties
+        fill_table(self.table, properties, lambda prop: [
+            prop["property_id"], prop["name"], prop["address"], prop["room_count"]
+        ])
 
         # reset preview
         self.preview_label.setText("Select a dorm to preview image")
@@ -211,27 +224,14 @@ class TotalDormsDetailWindow(StyledWindowBase):
         dorm_id = dorm["property_id"]
         rel_path = self.db.get_dorm_main_image(dorm_id)
 
-        if not rel_path:
-            self.preview_label.setText("No image")
-            self.preview_label.setPixmap(QPixmap())
-            return
-
-        abs_path = resolve_image_path(rel_path)
-        if not abs_path or not os.path.exists(abs_path):
-            self.preview_label.setText("Image not found")
-            self.preview_label.setPixmap(QPixmap())
-            return
-
-        pix = QPixmap(abs_path)
-        if pix.isNull():
-            self.preview_label.setText("Invalid image")
+        img = load_image(rel_path, self.preview_label.size())
+        if not isinstance(img, QImage):
+            self.preview_label.setText(img)
             self.preview_label.setPixmap(QPixmap())
             return
 
         self.preview_label.setText("")
-        self.preview_label.setPixmap(
-            pix.scaled(self.preview_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        )
+        self.preview_label.setPixmap(QPixmap.fromImage(img))
 
     def open_add_dorm_form(self):
         self._win_add_dorm = AddDormForm(owner_id=self.host_id)
@@ -239,7 +239,7 @@ class TotalDormsDetailWindow(StyledWindowBase):
 
     def open_edit_dialog(self):
         row = self.table.currentRow()
-        if row < 0:
+        if row < 0 or row >= len(self.properties):
             QMessageBox.warning(self, "No Selection", "Select a dorm to edit.")
             return
 
@@ -250,7 +250,7 @@ class TotalDormsDetailWindow(StyledWindowBase):
 
     def delete_dorm(self):
         row = self.table.currentRow()
-        if row < 0:
+        if row < 0 or row >= len(self.properties):
             QMessageBox.warning(self, "No Selection", "Select a dorm to delete.")
             return
 
@@ -277,6 +277,10 @@ class AvailableRoomsWindow(StyledWindowBase):
     def __init__(self, owner_id):
         super().__init__("Available Rooms", owner_id)
         self._build_ui()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     def _build_ui(self):
@@ -295,38 +299,22 @@ class AvailableRoomsWindow(StyledWindowBase):
         layout.addWidget(btn_refresh)
 
     def load_data(self):
-        self.table.setRowCount(0)
-        rooms = self.db.get_available_rooms_host(self.host_id)
+        self.loader.load()
 
-        for r, room in enumerate(rooms):
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QTableWidgetItem(str(room["room_id"])))
-            self.table.setItem(r, 1, QTableWidgetItem(room["dorm_name"]))
-            self.table.setItem(r, 2, QTableWidgetItem(room["room_name"]))
-            self.table.setItem(r, 3, QTableWidgetItem(room["type"]))
-            self.table.setItem(r, 4, QTableWidgetItem(str(room["capacity"])))
-            self.table.setItem(r, 5, QTableWidgetItem(f"₱{room['price']}"))
-
-            img_label = QLabel()
-            img_label.setAlignment(Qt.AlignCenter)
-            img_label.setFixedSize(120, 80)
-            rel_path = self.db.get_dorm_main_image(room.get("dorm_id"))
-            if rel_path:
-                abs_path = resolve_image_path(rel_path)
-                if abs_path and os.path.exists(abs_path):
-                    pix = QPixmap(abs_path)
-                    if not pix.isNull():
-                        img_label.setPixmap(
-                            pix.scaled(img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        )
-                    else:
-                        img_label.setText("Invalid")
-                else:
-                    img_label.setText("Not found")
-            else:
-                img_label.setText("No image")
-
-            self.table.setCellWidget(r, 6, img_label)
+    def _fetch_data(self):
+        """Runs on a worker thread, thumbnails included."""
+        rooms = self.db.get_available_rooms_host(self.host_id)
+        thumbs = [load_image(self.db.get_dorm_main_image(room.get("dorm_id")), THUMB_SIZE) for room in rooms]
+        return rooms, thumbs
+
+    def _apply_data(self, result):
+        rooms, thumbs = result
+        fill_table(self.table, rooms, lambda room: [
+            room["room_id"], room["dorm_name"], room["room_name"], room["type"],
+            room["capacity"], f"₱{room['price']}"
+        ])
+        for r, thumb in enumerate(thumbs):
+            self.table.setCellWidget(r, 6, thumbnail_label(thumb))
 
 # ---------------------------
 # OCCUPIED ROOMS
@@ -335,6 +323,10 @@ class OccupiedRoomsWindow(StyledWindowBase):
     def __init__(self, owner_id):
         super().__init__("Occupied Rooms", owner_id)
         self._build_ui()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     def _build_ui(self):
@@ -353,38 +345,22 @@ class OccupiedRoomsWindow(StyledWindowBase):
         layout.addWidget(btn_refresh)
 
     def load_data(self):
-        self.table.setRowCount(0)
-        rooms = self.db.get_occupied_rooms_host(self.host_id)
+        self.loader.load()
 
-        for r, room in enumerate(rooms):
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QTableWidgetItem(room["room_name"]))
-            self.table.setItem(r, 1, QTableWidgetItem(room["dorm_name"]))
-            self.table.setItem(r, 2, QTableWidgetItem(room["tenant_name"]))
-            self.table.setItem(r, 3, QTableWidgetItem(str(room["check_in_date"])))
-            self.table.setItem(r, 4, QTableWidgetItem(str(room["check_out_date"])))
-            self.table.setItem(r, 5, QTableWidgetItem("Active"))
-
-            img_label = QLabel()
-            img_label.setAlignment(Qt.AlignCenter)
-            img_label.setFixedSize(120, 80)
-            rel_path = self.db.get_dorm_main_image(room.get("dorm_id"))
-            if rel_path:
-                abs_path = resolve_image_path(rel_path)
-                if abs_path and os.path.exists(abs_path):
-                    pix = QPixmap(abs_path)
-                    if not pix.isNull():
-                        img_label.setPixmap(
-                            pix.scaled(img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        )
-                    else:
-                        img_label.setText("Invalid")
-                else:
-                    img_label.setText("Not found")
-            else:
-                img_label.setText("No image")
+    def _fetch_data(self):
+        """Runs on a worker thread, thumbnails included."""
+        rooms = self.db.get_occupied_rooms_host(self.host_id)
+        thumbs = [load_image(self.db.get_dorm_main_image(room.get("dorm_id")), THUMB_SIZE) for room in rooms]
+        return rooms, thumbs
 
-            self.table.setCellWidget(r, 6, img_label)
+    def _apply_data(self, result):
+        rooms, thumbs = result
+        fill_table(self.table, rooms, lambda room: [
+            room["room_name"], room["dorm_name"], room["tenant_name"],
+            str(room["check_in_date"]), str(room["check_out_date"]), "Active"
+        ])
+        for r, thumb in enumerate(thumbs):
+            self.table.setCellWidget(r, 6, thumbnail_label(thumb))
 
 
 # ---------------------------
@@ -406,6 +382,7 @@ class TotalDormsWindow(QWidget):
         self._fonts()
         self._build_ui()
         self._apply_styles()
+        self.loader = BackgroundLoader(self, self._fetch_summary, self._apply_summary)
         self.load_summary_data()
 
     def _fonts(self):
@@ -420,10 +397,16 @@ class TotalDormsWindow(QWidget):
         self.close()
 
     def load_summary_data(self):
+        self.loader.load()
+
+    def _fetch_summary(self):
+        """Runs on a worker thread."""
         stats = self.db.get_owner_stats(self.host_id)
+        return stats, len(prefetched(self.db, "get_available_rooms_host", self.host_id))
 
+    def _apply_summary(self, result):
+        stats, avail_count = result
         self.lbl_total_count.setText(str(stats["total_dorms"]))
-        avail_count = len(self.db.get_available_rooms_host(self.host_id))
         self.lbl_avail_count.setText(str(avail_count))
         self.lbl_occ_count.setText(str(stats["current_occupants"]))
 
@@ -1,7 +1,6 @@
 # add_dorm.py
 import sys
 import os
-import shutil         
 from functools import partial
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QTextEdit, QPushButton, QComboBox,
@@ -10,7 +9,10 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont, QPalette, QColor
 from PyQt5.QtCore import Qt
-import mysql.connector
+from database import DatabaseManager
+from backends import get_backend, DB_ERRORS
+from amenity_index import amenity_mask, fits_mask, MAX_AMENITY_ID
+from images import ImageIngester
 
 # ---------------------------
 #   Database config (edit)
@@ -25,11 +27,10 @@ DB_CONFIG = {
 }
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_DIR = os.path.join(BASE_DIR, "uploads", "dorm_images")
 
 
 def get_db_conn():
-    return mysql.connector.connect(**DB_CONFIG)
+    return get_backend().connect(DB_CONFIG)
 
 
 class AddDormForm(QWidget):
@@ -39,11 +40,11 @@ class AddDormForm(QWidget):
         """
         super().__init__()
         self.owner_id = owner_id  
+        self.db = DatabaseManager()
         self.amenities_master = [] 
         self.selected_image_paths = []   
         self.room_widgets = []
-
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        self.ingester = ImageIngester(self, self._image_ready, self._image_failed)
 
         self.setWindowTitle("Add New Dorm (Save to DB)")
         self.resize(900, 800)
@@ -175,15 +176,10 @@ class AddDormForm(QWidget):
     # ---------------------------
     def load_amenities_from_db(self):
         """
-        Loads amenities from the amenities table and creates checkboxes.
+        Loads amenities (cached by DatabaseManager) and creates checkboxes.
         """
         try:
-            conn = get_db_conn()
-            cur = conn.cursor()
-            cur.execute("SELECT amenity_id, label FROM amenities ORDER BY amenity_id;")
-            rows = cur.fetchall()
-            cur.close()
-            conn.close()
+            rows = [(r["amenity_id"], r["label"]) for r in self.db.get_amenities()]
         except Exception as e:
             QMessageBox.warning(self, "DB Error", f"Could not load amenities: {e}")
             rows = []
@@ -288,8 +284,9 @@ class AddDormForm(QWidget):
 
     def upload_images(self):
         """
-        Select images, copy them into uploads/dorm_images/, and remember
-        their RELATIVE paths so they can be loaded on any machine.
+        Select images and ingest them in the background (resized, metadata
+        stripped, stored with their renditions). Their RELATIVE paths are
+        remembered as each one finishes, so they load on any machine.
         """
         files, _ = QFileDialog.getOpenFileNames(
             self,
@@ -301,28 +298,17 @@ class AddDormForm(QWidget):
             return
 
         for src_path in files:
-            if not os.path.isfile(src_path):
-                continue
+            if os.path.isfile(src_path):
+                self.ingester.submit(src_path)
 
-            base_name = os.path.basename(src_path)
-            name, ext = os.path.splitext(base_name)
-            dest_path = os.path.join(UPLOAD_DIR, base_name)
-            i = 1
-            while os.path.exists(dest_path):
-                dest_path = os.path.join(UPLOAD_DIR, f"{name}_{i}{ext}")
-                i += 1
+    def _image_ready(self, src_path, rel_path):
+        # the same picture picked twice has the same path
+        if rel_path not in self.selected_image_paths:
+            self.selected_image_paths.append(rel_path)
+            self.images_list.addItem(os.path.basename(src_path))
 
-            try:
-                shutil.copy(src_path, dest_path)
-            except Exception as e:
-                QMessageBox.warning(self, "Image Copy Error", f"Could not copy {src_path}:\n{e}")
-                continue
-
-            rel_path = os.path.relpath(dest_path, BASE_DIR).replace(os.sep, "/")
-
-            if rel_path not in self.selected_image_paths:
-                self.selected_image_paths.append(rel_path)
-                self.images_list.addItem(rel_path)
+    def _image_failed(self, src_path, message):
+        QMessageBox.warning(self, "Image Error", message)
 
     # ---------------------------
     #   Validation
@@ -343,9 +329,17 @@ class AddDormForm(QWidget):
             if rn in seen_room_nos:
                 return False, f"Duplicate room no: {rn}"
             seen_room_nos.add(rn)
+            for cb in r["amenities"]:
+                if cb.isChecked() and getattr(cb, "amen_id", None) is not None and not fits_mask(cb.amen_id):
+                    return False, (f"Room {rn}: amenity \"{cb.text()}\" cannot be saved "
+                                   f"(amenity ids above {MAX_AMENITY_ID} are not supported).")
         return True, None
 
     def save_to_db(self):
+        if self.ingester.busy():
+            QMessageBox.information(self, "Please wait", "Images are still being processed.")
+            return
+
         ok, msg = self.validate()
         if not ok:
             QMessageBox.warning(self, "Validation error", msg)
@@ -399,17 +393,19 @@ class AddDormForm(QWidget):
 
             # Insert rooms (and room_amenities)
             insert_room_q = """
-                INSERT INTO rooms (dorm_id, room_no, room_type, capacity, price_monthly, is_available)
-                VALUES (%s, %s, %s, %s, %s, %s)
+                INSERT INTO rooms (dorm_id, room_no, room_type, capacity, price_monthly, is_available, amenity_mask)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
             """
             insert_room_amen_q = "INSERT INTO room_amenities (room_id, amenity_id) VALUES (%s, %s)"
 
+            room_ids = []
             for rd in rooms_data:
                 cur.execute(insert_room_q, (
                     dorm_id, rd["room_no"], rd["room_type"],
-                    rd["capacity"], rd["price_monthly"], 1
+                    rd["capacity"], rd["price_monthly"], 1, amenity_mask(rd["amenities"])
                 ))
                 room_id = cur.lastrowid
+                room_ids.append(room_id)
                 # insert amenities
                 for aid in rd["amenities"]:
                     cur.execute(insert_room_amen_q, (room_id, aid))
@@ -424,7 +420,12 @@ class AddDormForm(QWidget):
             cur.close()
             conn.close()
 
-        except mysql.connector.Error as e:
+            # drop any cached "no image" / "no amenities" entries for these ids
+            self.db.invalidate_dorm(dorm_id)
+            for room_id in room_ids:
+                self.db.invalidate_room_amenities(room_id)
+
+        except DB_ERRORS as e:
             try:
                 conn.rollback()
             except:
@@ -0,0 +1,88 @@
+# amenity_index.py
+"""
+Amenity bitmasks.
+
+Every room keeps rooms.amenity_mask, with bit (amenity_id - 1) set for each
+of its room_amenities rows, so one BIGINT answers "which amenities does this
+room have" without touching room_amenities.
+
+AmenityIndex holds the masks of a list of room rows as one NumPy uint64
+array; a "WiFi AND Aircon AND Private CR" filter is a single vectorized
+`(masks & wanted) == wanted` over it, so RoomsAvailability can re-filter the
+rows it already has without going back to the database.
+
+Amenity ids above MAX_AMENITY_ID have no bit. amenity_mask() refuses them,
+so nothing can store a wrong mask; the read side (filters, facet counts)
+skips them with a warning instead of failing the whole search.
+"""
+import logging
+
+import numpy as np
+
+MAX_AMENITY_ID = 63     # rooms.amenity_mask is a signed BIGINT
+
+logger = logging.getLogger("staysmart.amenities")
+
+
+def amenity_bit(amenity_id):
+    amenity_id = int(amenity_id)
+    if not 1 <= amenity_id <= MAX_AMENITY_ID:
+        raise ValueError(f"amenity_id {amenity_id} does not fit in the amenity bitmask")
+    return 1 << (amenity_id - 1)
+
+
+def fits_mask(amenity_id):
+    return 1 <= int(amenity_id) <= MAX_AMENITY_ID
+
+
+def mask_ids_only(amenity_ids):
+    """The amenity_ids that have a bit, logging the ones that do not."""
+    kept = [aid for aid in amenity_ids if fits_mask(aid)]
+    if len(kept) < len(amenity_ids):
+        logger.warning("ignoring amenity ids outside the bitmask: %s",
+                       sorted(set(amenity_ids) - set(kept)))
+    return kept
+
+
+def amenity_mask(amenity_ids):
+    mask = 0
+    for amenity_id in amenity_ids:
+        mask |= amenity_bit(amenity_id)
+    return mask
+
+
+def mask_ids(mask):
+    """Amenity ids whose bit is set in mask, ascending."""
+    mask = int(mask or 0)
+    return [i + 1 for i in range(MAX_AMENITY_ID) if mask >> i & 1]
+
+
+def mask_labels(mask, labels_by_id):
+    return sorted(labels_by_id[i] for i in mask_ids(mask) if i in labels_by_id)
+
+
+class AmenityIndex:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.masks = np.fromiter(
+            (int(r.get("amenity_mask") or 0) for r in self.rows),
+            dtype=np.uint64, count=len(self.rows)
+        )
+
+    def matching(self, amenity_ids):
+        """Boolean array: rows that have every amenity in amenity_ids."""
+        wanted = np.uint64(amenity_mask(mask_ids_only(list(amenity_ids))))
+        return (self.masks & wanted) == wanted
+
+    def filter(self, amenity_ids):
+        if not amenity_ids:
+            return list(self.rows)
+        return [self.rows[i] for i in np.flatnonzero(self.matching(amenity_ids))]
+
+    def counts(self, amenity_ids):
+        """{amenity_id: number of rows that have it} for the given ids."""
+        return {aid: int(np.count_nonzero(self.masks & np.uint64(amenity_bit(aid))))
+                for aid in mask_ids_only(list(amenity_ids))}
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,299 @@
+# async_db.py
+"""
+Awaitable data access for the GUI.
+
+AsyncDatabaseManager runs DatabaseManager calls on a shared thread pool and
+returns awaitables, so a window can write
+
+    async def load_async(self):
+        stats, rooms = await self.adb.gather(
+            self.adb.get_dashboard_stats(self.user_id),
+            self.adb.get_recommended_rooms(),
+        )
+        ...
+
+    self.load_task = run_on_qt(self.load_async(), owner=self)
+
+run_on_qt() steps the coroutine on the Qt event loop: only the code between
+awaits runs on the GUI thread, the queries run on workers, so the window
+keeps repainting while it waits. The same awaitables also work under
+asyncio (asyncio.run in scripts and tests).
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
+
+from database import DatabaseManager
+from instrumentation import bind_call_site, logger
+
+DEFAULT_WORKERS = int(os.environ.get("STAYSMART_DB_WORKERS", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool shared by every AsyncDatabaseManager."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS,
+                                           thread_name_prefix="staysmart-db")
+        return _executor
+
+
+def shutdown_executor(wait=False):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+class DBFuture:
+    """Awaitable wrapper around a concurrent.futures.Future."""
+    def __init__(self, future):
+        self.future = future
+
+    def __await__(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # driven by QtTask, which resumes us once the future is done
+            if not self.future.done():
+                yield self.future
+            return self.future.result()
+        return (yield from asyncio.wrap_future(self.future).__await__())
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+def gather(*awaitables, return_exceptions=False):
+    """
+    One awaitable for several DBFutures; resolves to their results in order.
+    With return_exceptions=True a failed call gives its exception instead
+    of failing the whole group.
+    """
+    futures = [a.future for a in awaitables]
+    out = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def finish():
+        results = []
+        for f in futures:
+            error = f.exception()
+            if error is not None and not return_exceptions:
+                out.set_exception(error)
+                return
+            results.append(error if error is not None else f.result())
+        out.set_result(results)
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        finish()
+
+    if not futures:
+        out.set_result([])
+    for f in futures:
+        f.add_done_callback(on_done)
+    return DBFuture(out)
+
+
+class _Deadlines:
+    """One daemon thread that fires every with_timeout() deadline, in order."""
+    def __init__(self):
+        self._heap = []             # (due, seq, callback)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def call_later(self, seconds, callback):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + seconds, next(self._seq), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="staysmart-deadlines", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, callback = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception:
+                logger.exception("Deadline callback failed")
+
+
+_deadlines = _Deadlines()
+
+
+def with_timeout(awaitable, seconds):
+    """
+    Resolves like `awaitable`, or raises TimeoutError after `seconds`.
+    The query itself keeps running on its worker; its late result is dropped.
+    """
+    out = Future()
+
+    def settle(set_outcome, value):
+        try:
+            set_outcome(value)
+        except InvalidStateError:
+            pass    # the other side won the race
+
+    def on_done(f):
+        error = f.exception()
+        if error is not None:
+            settle(out.set_exception, error)
+        else:
+            settle(out.set_result, f.result())
+
+    _deadlines.call_later(seconds, lambda: settle(
+        out.set_exception, TimeoutError(f"no result after {seconds:g}s")))
+    awaitable.future.add_done_callback(on_done)
+    return DBFuture(out)
+
+
+class AsyncDatabaseManager:
+    """
+    Async facade over DatabaseManager.
+
+    fetchall/fetchone/execute/execute_count and every DatabaseManager method
+    (get_owner_stats, get_all_rooms, ...) return a DBFuture instead of the
+    result.
+    """
+    def __init__(self, db=None, executor=None):
+        self.db = db or DatabaseManager()
+        self.executor = executor or get_executor()
+
+    def run(self, fn, *args, **kwargs):
+        return DBFuture(self.executor.submit(bind_call_site(fn), *args, **kwargs))
+
+    def prefetched(self, name, *args, **kwargs):
+        """Like self.<name>(...), but picks up a post-login prefetch if one exists."""
+        from prefetch import prefetched_future
+        return DBFuture(prefetched_future(self.db, self.executor, name, *args, **kwargs))
+
+    def fetchall(self, sql, params=None):
+        return self.run(self.db.fetchall, sql, params)
+
+    def fetchone(self, sql, params=None):
+        return self.run(self.db.fetchone, sql, params)
+
+    def execute(self, sql, params=None):
+        return self.run(self.db.execute, sql, params)
+
+    def execute_count(self, sql, params=None):
+        return self.run(self.db.execute_count, sql, params)
+
+    gather = staticmethod(gather)
+    with_timeout = staticmethod(with_timeout)
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self.run(attr, *args, **kwargs)
+        call.__name__ = name
+        return call
+
+
+# ----- QT EVENT LOOP ADAPTER -----
+
+class _Resumer(QObject):
+    """Lives on the GUI thread; worker threads poke it to resume a task."""
+    resume = pyqtSignal()
+
+    def __init__(self, task):
+        super().__init__()
+        self.task = task
+        self.resume.connect(self.on_resume, Qt.QueuedConnection)
+
+    @pyqtSlot()
+    def on_resume(self):
+        self.task._step()
+
+
+class QtTask:
+    """
+    A coroutine being stepped on the Qt event loop. Use run_on_qt().
+
+    on_done(result) / on_error(exc) are called on the GUI thread. Cancelling
+    (explicitly, or because `owner` was destroyed) closes the coroutine, so
+    results that arrive afterwards are dropped.
+    """
+    def __init__(self, coro, owner=None, on_done=None, on_error=None):
+        self.coro = coro
+        self.on_done = on_done
+        self.on_error = on_error
+        self.finished = False
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self._resumer = _Resumer(self)
+        if owner is not None:
+            owner.destroyed.connect(lambda *_: self.cancel())
+
+    def start(self):
+        self._step()
+        return self
+
+    def cancel(self):
+        if self.finished or self.cancelled:
+            return
+        self.cancelled = True
+        self.coro.close()
+
+    def _step(self):
+        if self.finished or self.cancelled:
+            return
+        try:
+            waiting_on = self.coro.send(None)
+        except StopIteration as stop:
+            self.finished = True
+            self.result = stop.value
+            if self.on_done:
+                self.on_done(stop.value)
+            return
+        except Exception as e:
+            self.finished = True
+            self.error = e
+            if self.on_error:
+                self.on_error(e)
+            else:
+                logger.exception("Background load failed: %s", e)
+            return
+
+        if not isinstance(waiting_on, Future):
+            self.cancel()
+            raise TypeError(f"run_on_qt can only await DB futures, got {waiting_on!r}")
+        waiting_on.add_done_callback(lambda _: self._resumer.resume.emit())
+
+
+def run_on_qt(coro, owner=None, on_done=None, on_error=None):
+    """Starts `coro` on the Qt event loop and returns its QtTask."""
+    return QtTask(coro, owner, on_done, on_error).start()
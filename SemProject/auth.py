@@ -1,18 +1,19 @@
-import mysql.connector
 import bcrypt
+from backends import get_backend, DB_ERRORS
 
 
 class Auth:
-    def __init__(self, host="localhost", user="root", password="", database="staysmartdb"):
+    def __init__(self, host="localhost", user="root", password="", database="staysmartdb", backend=None):
+        self.backend = backend or get_backend()
         try:
-            self.conn = mysql.connector.connect(
+            self.conn = self.backend.connect(dict(
                 host=host,
                 user=user,
                 password=password,
                 database=database,
                 port=3306
-            )
-        except mysql.connector.Error as e:
+            ))
+        except self.backend.errors as e:
             print("Database connection failed:", str(e))
             raise
 
@@ -39,7 +40,7 @@ class Auth:
             self.conn.commit()
             return True, "Signup successful!"
 
-        except mysql.connector.Error as e:
+        except DB_ERRORS as e:
             return False, f"Database Error: {str(e)}"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -71,7 +72,7 @@ class Auth:
             self.conn.commit()
             return True, "Admin signup successful!"
 
-        except mysql.connector.Error as e:
+        except DB_ERRORS as e:
             return False, f"Database Error: {str(e)}"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -0,0 +1,125 @@
+# availability.py
+"""
+Date-range room availability.
+
+OccupancyIndex keeps every bed-holding interval in NumPy arrays:
+
+    ongoing rentals          [start_date, end_date]  (no end_date: open-ended)
+    live holds / approvals   [today, open-ended]
+
+A room has a free bed from `start` to `end` when the largest number of
+its intervals overlapping at any one day in that range is below its
+capacity. free_rooms() answers this for every room at once. It clips the
+overlapping intervals to the range, turns them into +1/-1 events, sorts
+them by (room, day) and takes a running sum. Each room's events sum to
+zero, so one cumulative sum over all rooms gives every room's running
+occupancy, and np.maximum.reduceat gives each room's peak.
+
+The index is process-wide. It is rebuilt from the database when
+DatabaseManager marks it stale after a booking change, or every
+REFRESH_S seconds to pick up changes made by other processes.
+"""
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+REFRESH_S = 60
+
+OPEN_END = np.datetime64("9999-12-31", "D")
+
+INTERVALS_SQL = """
+    SELECT rr.room_id, rr.start_date, rr.end_date
+    FROM rentals rr
+    WHERE rr.status IN ('ACTIVE','EXTENDED','ENDING')
+    UNION ALL
+    SELECT ra.room_id, CURDATE(), NULL
+    FROM rental_applications ra
+    WHERE (ra.action_status = 'WAITING' AND (ra.expires_at IS NULL OR ra.expires_at > NOW()))
+       OR (ra.action_status = 'APPROVED'
+           AND NOT EXISTS (SELECT 1 FROM rentals x WHERE x.application_id = ra.application_id))
+"""
+
+ROOMS_SQL = """
+    SELECT r.room_id, r.capacity
+    FROM rooms r
+    JOIN dorms d ON r.dorm_id=d.dorm_id
+    WHERE d.status='OPEN'
+"""
+
+
+def _days(values):
+    """datetime64[D] array from date/datetime/ISO values; None -> OPEN_END."""
+    return np.array([OPEN_END if v is None else np.datetime64(str(v)[:10], "D") for v in values],
+                    dtype="datetime64[D]")
+
+
+class OccupancyIndex:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.room_ids = np.empty(0, dtype=np.int64)
+        self.capacity = np.empty(0, dtype=np.int64)
+        self.room = np.empty(0, dtype=np.int64)          # index into room_ids, per interval
+        self.start = np.empty(0, dtype="datetime64[D]")
+        self.end = np.empty(0, dtype="datetime64[D]")    # inclusive
+        self.built_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self.built_at = None
+
+    def _ensure_fresh(self, db):
+        if self.built_at is not None and self.clock() - self.built_at <= REFRESH_S:
+            return
+        rooms = db.fetchall(ROOMS_SQL)
+        intervals = db.fetchall(INTERVALS_SQL)
+
+        self.room_ids = np.array([r["room_id"] for r in rooms], dtype=np.int64)
+        self.capacity = np.array([r["capacity"] or 0 for r in rooms], dtype=np.int64)
+        order = np.argsort(self.room_ids)
+        self.room_ids, self.capacity = self.room_ids[order], self.capacity[order]
+
+        ids = np.array([r["room_id"] for r in intervals], dtype=np.int64)
+        pos = np.searchsorted(self.room_ids, ids)
+        known = (pos < len(self.room_ids)) & (self.room_ids[np.minimum(pos, len(self.room_ids) - 1)] == ids)
+        self.room = pos[known]
+        self.start = _days([r["start_date"] for r in intervals])[known]
+        self.end = _days([r["end_date"] for r in intervals])[known]
+        self.built_at = self.clock()
+
+    def peak_occupancy(self, db, start, end):
+        """Per room (aligned with room_ids): most beds held on any day in [start, end]."""
+        with self._lock:
+            self._ensure_fresh(db)
+            start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+            peak = np.zeros(len(self.room_ids), dtype=np.int64)
+
+            hit = (self.start <= end) & (self.end >= start)
+            if not hit.any():
+                return self.room_ids, self.capacity, peak
+
+            rooms = self.room[hit]
+            first = np.maximum(self.start[hit], start)
+            after = np.minimum(self.end[hit], end) + np.timedelta64(1, "D")    # exclusive
+
+            room = np.concatenate([rooms, rooms])
+            day = np.concatenate([first, after]).astype(np.int64)
+            delta = np.concatenate([np.ones(len(rooms), np.int64), -np.ones(len(rooms), np.int64)])
+
+            order = np.lexsort((delta, day, room))       # a bed freed on a day is reusable that day
+            room, running = room[order], np.cumsum(delta[order])
+            groups = np.flatnonzero(np.r_[True, room[1:] != room[:-1]])
+            peak[room[groups]] = np.maximum.reduceat(running, groups)
+            return self.room_ids, self.capacity, peak
+
+    def free_rooms(self, db, start, end):
+        """Sorted room_ids (open dorms) with a free bed on every day from start to end."""
+        if isinstance(start, date) and isinstance(end, date) and end < start:
+            start, end = end, start
+        room_ids, capacity, peak = self.peak_occupancy(db, start, end)
+        return room_ids[peak < capacity]
+
+
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,262 @@
+# backends.py
+"""
+Database backends for DatabaseManager, Auth and the dorm form.
+
+The app is written against mysql.connector. MySQLBackend is that, as before.
+SQLiteBackend runs the same code on an embedded database file: SQL is passed
+through dialect.mysql_to_sqlite and rows come back shaped like the
+mysql.connector ones (dict rows, date/datetime values).
+
+Pick the backend with environment variables:
+
+    STAYSMART_DB_BACKEND=mysql|sqlite     (default: mysql)
+    STAYSMART_SQLITE_PATH=staysmart.db    (sqlite only)
+    STAYSMART_DB_POOL_SIZE=8              (mysql only, 0 disables pooling)
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+import mysql.connector
+
+from dialect import MIN_SQLITE_VERSION, mysql_to_sqlite
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_sqlite.sql")
+DEFAULT_SQLITE_PATH = "staysmart.db"
+DEFAULT_POOL_SIZE = int(os.environ.get("STAYSMART_DB_POOL_SIZE", "8"))
+
+# MySQL error numbers that mean "already there" (table, column, index).
+MYSQL_ALREADY_EXISTS = {1050, 1060, 1061}
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+sqlite3.register_adapter(Decimal, float)
+
+
+def _to_python(value):
+    """ISO text from SQLite date columns -> date/datetime, like mysql.connector."""
+    if isinstance(value, str) and 10 <= len(value) <= 26 and value[4:5] == "-":
+        try:
+            if _DATE_RE.match(value):
+                return date.fromisoformat(value)
+            if _DATETIME_RE.match(value):
+                return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+# ----- MYSQL -----
+
+class _NoPoolError(Exception):
+    pass
+
+
+class MySQLBackend:
+    """
+    With pooled=True connections come from a mysql.connector pool (one per
+    host/user/database); close() hands them back instead of disconnecting.
+    """
+    name = "mysql"
+    errors = (mysql.connector.Error,)
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+
+    def connect(self, config, pooled=False):
+        if not pooled or not self.pool_size:
+            return mysql.connector.connect(**config)
+        try:
+            return mysql.connector.connect(
+                pool_name=self.pool_name(config), pool_size=self.pool_size, **config
+            )
+        except getattr(mysql.connector, "PoolError", _NoPoolError):
+            # every pooled connection is busy: open a one-off rather than wait
+            return mysql.connector.connect(**config)
+
+    @staticmethod
+    def pool_name(config):
+        key = "|".join(f"{k}={config.get(k)}" for k in ("host", "port", "user", "database"))
+        return "staysmart-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    def is_already_exists(self, error):
+        return getattr(error, "errno", None) in MYSQL_ALREADY_EXISTS
+
+
+# ----- SQLITE -----
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over a sqlite3 cursor."""
+    def __init__(self, cur, dictionary=False):
+        self._cur = cur
+        self.dictionary = dictionary
+
+    def execute(self, sql, params=None):
+        self._cur.execute(mysql_to_sqlite(sql), tuple(params) if params else ())
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cur.executemany(mysql_to_sqlite(sql), [tuple(p) for p in seq_of_params])
+        return self
+
+    def _shape(self, row):
+        values = [_to_python(v) for v in row]
+        if not self.dictionary:
+            return tuple(values)
+        names = [d[0] for d in self._cur.description]
+        return dict(zip(names, values))
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return self._shape(row) if row is not None else None
+
+    def fetchall(self):
+        return [self._shape(r) for r in self._cur.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._shape(r) for r in self._cur.fetchmany(size)]
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteConnection:
+    """
+    Wraps the thread's long-lived sqlite3 connection.
+
+    close() only rolls back anything uncommitted; the underlying connection
+    stays open so its prepared-statement cache survives between queries.
+    """
+    def __init__(self, raw):
+        self._raw = raw
+
+    def is_connected(self):
+        return True
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._raw.cursor(), dictionary=dictionary)
+
+    def start_transaction(self):
+        if not self._raw.in_transaction:
+            self._raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        if self._raw.in_transaction:
+            self._raw.rollback()
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    errors = (sqlite3.Error,)
+
+    PRAGMAS = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",      # 64 MB page cache
+        "PRAGMA mmap_size=268435456",    # 256 MB
+        "PRAGMA busy_timeout=5000",
+    ]
+
+    def __init__(self, path=None, schema_file=SCHEMA_FILE):
+        self.path = path or DEFAULT_SQLITE_PATH
+        self.schema_file = schema_file
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _open(self):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required "
+                f"(found {sqlite3.sqlite_version}) for ON CONFLICT DO UPDATE"
+            )
+        raw = sqlite3.connect(self.path, timeout=5.0, cached_statements=512,
+                              check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            raw.execute(pragma)
+        self._ensure_schema(raw)
+        return raw
+
+    def _ensure_schema(self, raw):
+        with self._schema_lock:
+            if self._schema_ready or not self.schema_file:
+                return
+            with open(self.schema_file, encoding="utf-8") as f:
+                raw.executescript(f.read())
+            self._schema_ready = True
+
+    def connect(self, config=None, pooled=False):
+        raw = getattr(self._local, "conn", None)
+        if raw is None:
+            raw = self._local.conn = self._open()
+        return SQLiteConnection(raw)
+
+    def close(self):
+        """Closes this thread's connection (others close when their thread ends)."""
+        raw = getattr(self._local, "conn", None)
+        if raw is not None:
+            raw.close()
+            self._local.conn = None
+
+    def is_already_exists(self, error):
+        msg = str(error).lower()
+        return "already exists" in msg or "duplicate column" in msg
+
+
+# ----- SELECTION -----
+
+DB_ERRORS = MySQLBackend.errors + SQLiteBackend.errors
+
+_default_backend = None
+_default_lock = threading.Lock()
+
+
+def backend_from_env():
+    kind = os.environ.get("STAYSMART_DB_BACKEND", "mysql").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(os.environ.get("STAYSMART_SQLITE_PATH", DEFAULT_SQLITE_PATH))
+    if kind == "mysql":
+        return MySQLBackend()
+    raise ValueError(f"Unknown STAYSMART_DB_BACKEND: {kind}")
+
+
+def get_backend():
+    """Process-wide backend, so every window shares one SQLite connection pool."""
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None:
+            _default_backend = backend_from_env()
+        return _default_backend
+
+
+def set_backend(backend):
+    global _default_backend
+    with _default_lock:
+        _default_backend = backend
@@ -0,0 +1,143 @@
+# background_loader.py
+"""
+Loads a window's data on QThreadPool instead of the GUI thread.
+
+    self.loader = BackgroundLoader(self, self._fetch_data, self._apply_data,
+                                   placeholder=lambda: show_table_placeholder(self.table))
+
+    def load_data(self):
+        self.loader.load(self.txt_search.text().strip())
+
+`fetch(*args)` runs on a worker and must only touch the database (and
+thread-safe things like QImage). `apply(result)` runs on the GUI thread
+with repaints paused, so the whole result lands as one update.
+
+A result is dropped if a newer load() was started in the meantime (fast
+typing in a search box) or if the window was closed before it arrived.
+"""
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QEvent, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QTableWidgetItem
+
+from instrumentation import logger
+
+
+class _LoadSignals(QObject):
+    done = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+
+class _LoadJob(QRunnable):
+    def __init__(self, fetch, args, generation, signals):
+        super().__init__()
+        self.fetch = fetch
+        self.args = args
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fetch(*self.args)
+        except Exception as e:
+            self._emit(self.signals.failed, e)
+            return
+        self._emit(self.signals.done, result)
+
+    def _emit(self, signal, value):
+        try:
+            signal.emit(self.generation, value)
+        except RuntimeError:
+            pass    # loader was deleted with its window
+
+
+class BackgroundLoader(QObject):
+    def __init__(self, owner, fetch, apply, placeholder=None, on_error=None, pool=None):
+        super().__init__(owner)
+        self.owner = owner
+        self.fetch = fetch
+        self.apply = apply
+        self.placeholder = placeholder
+        self.on_error = on_error
+        self.pool = pool or QThreadPool.globalInstance()
+
+        self.generation = 0
+        self.loaded = False
+        self.closed = False
+        self.loading = False
+
+        self.signals = _LoadSignals(self)
+        self.signals.done.connect(self._on_done, Qt.QueuedConnection)
+        self.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+        owner.installEventFilter(self)
+
+    def load(self, *args):
+        """Starts a fetch; the placeholder is only shown before the first result."""
+        self.generation += 1
+        self.loading = True
+        if not self.loaded and self.placeholder:
+            self.placeholder()
+        self.pool.start(_LoadJob(self.fetch, args, self.generation, self.signals))
+
+    def eventFilter(self, obj, event):
+        if obj is self.owner:
+            if event.type() == QEvent.Close:
+                self.closed = True
+            elif event.type() == QEvent.Show:
+                self.closed = False
+        return False
+
+    def _is_stale(self, generation):
+        return generation != self.generation or self.closed
+
+    @pyqtSlot(int, object)
+    def _on_done(self, generation, result):
+        if self._is_stale(generation):
+            return
+        self.loading = False
+        self.owner.setUpdatesEnabled(False)
+        try:
+            self.apply(result)
+        finally:
+            self.owner.setUpdatesEnabled(True)
+        self.loaded = True
+
+    @pyqtSlot(int, object)
+    def _on_failed(self, generation, error):
+        if self._is_stale(generation):
+            return
+        self.loading = False
+        if self.on_error:
+            self.on_error(error)
+        else:
+            logger.error("Loading %s failed: %s", type(self.owner).__name__, error)
+
+
+# ----- TABLE HELPERS -----
+
+def show_table_placeholder(table, text="Loading..."):
+    """One greyed-out row spanning every column."""
+    table.clearSpans()
+    table.setRowCount(1)
+    item = QTableWidgetItem(text)
+    item.setFlags(Qt.NoItemFlags)
+    item.setTextAlignment(Qt.AlignCenter)
+    table.setItem(0, 0, item)
+    if table.columnCount() > 1:
+        table.setSpan(0, 0, 1, table.columnCount())
+
+
+def fill_table(table, rows, cells):
+    """
+    Replaces the table contents in one pass: `cells(row)` returns the
+    values for one row (str-able values or ready QTableWidgetItems).
+    """
+    table.clearSpans()
+    sorting = table.isSortingEnabled()
+    table.setSortingEnabled(False)
+    table.setRowCount(len(rows))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(cells(row)):
+            if value is None:
+                continue
+            item = value if isinstance(value, QTableWidgetItem) else QTableWidgetItem(str(value))
+            table.setItem(r, c, item)
+    table.setSortingEnabled(sorting)
@@ -0,0 +1,71 @@
+# benchmarks/compare.py
+"""
+Compares two benchmark result files by median latency.
+
+    python benchmarks/compare.py base.json new.json [--threshold 10]
+
+Exits with status 1 if any case got slower than the threshold (percent).
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base, new, threshold=10.0):
+    """Returns rows of (name, base_ms, new_ms, change_pct, flag)."""
+    rows = []
+    names = sorted(set(base["results"]) | set(new["results"]))
+    for name in names:
+        b = base["results"].get(name)
+        n = new["results"].get(name)
+        if not b or not n:
+            rows.append((name, b and b["median_ms"], n and n["median_ms"], None,
+                         "added" if n else "removed"))
+            continue
+        b_ms, n_ms = b["median_ms"], n["median_ms"]
+        change = ((n_ms - b_ms) / b_ms * 100) if b_ms else 0.0
+        flag = ""
+        if n.get("error"):
+            flag = "error"
+        elif change > threshold:
+            flag = "slower"
+        elif change < -threshold:
+            flag = "faster"
+        rows.append((name, b_ms, n_ms, change, flag))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change in median that counts as a regression")
+    args = parser.parse_args(argv)
+
+    base, new = load(args.base), load(args.new)
+    for key in ("backend", "scale", "seed", "anchor"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print(f"warning: {key} differs ({base['meta'].get(key)} vs {new['meta'].get(key)})")
+
+    rows = compare(base, new, args.threshold)
+    print(f"{'case':<36} {'base ms':>10} {'new ms':>10} {'change':>9}")
+    for name, b_ms, n_ms, change, flag in rows:
+        b_txt = f"{b_ms:.3f}" if b_ms is not None else "-"
+        n_txt = f"{n_ms:.3f}" if n_ms is not None else "-"
+        c_txt = f"{change:+.1f}%" if change is not None else "-"
+        print(f"{name:<36} {b_txt:>10} {n_txt:>10} {c_txt:>9}  {flag}")
+
+    regressions = [r for r in rows if r[4] in ("slower", "error")]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# benchmarks/datagen.py
+"""
+Deterministic synthetic dataset for benchmarks.
+
+The same (scale, seed, anchor date) always produces the same rows with
+the same ids, so results from different runs can be compared.
+
+    python benchmarks/datagen.py --scale 1k --database staysmart_bench
+    python benchmarks/datagen.py --scale 1k --backend sqlite --sqlite-path bench.db
+
+`scale` is the number of rooms; other tables are sized from it
+(tenants = rooms, applications = rooms / 2, ~6 payments per rental, ...).
+Every user's password is BENCH_PASSWORD.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager  # noqa: E402
+from backends import MySQLBackend, SQLiteBackend  # noqa: E402
+
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+DEFAULT_SEED = 20240601
+DEFAULT_ANCHOR = date(2026, 1, 1)
+BENCH_PASSWORD = "BenchPass123!"
+CHUNK = 5000
+
+AMENITIES = [
+    "WiFi", "Aircon", "Private CR", "Shared CR", "Study Area", "Laundry",
+    "Kitchen", "CCTV", "Parking", "Water Heater", "Refrigerator", "Curfew-free",
+]
+
+# child tables first, so DELETE never trips a foreign key
+TABLES = [
+    "transactions", "payment_requests", "payments", "rentals",
+    "application_details", "rental_applications", "recently_viewed",
+    "dorm_images", "room_amenities", "rooms", "amenities", "dorms",
+    "tenant_profiles", "owner_profiles", "users",
+]
+
+FIRST_NAMES = ["Ana", "Ben", "Carla", "Dino", "Ella", "Franz", "Gia", "Hans",
+               "Iris", "Jomar", "Kyla", "Leo", "Mika", "Nico", "Olga", "Paolo"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza",
+              "Torres", "Flores", "Ramos", "Castro", "Rivera", "Aquino"]
+STREETS = ["Rizal St", "Mabini Ave", "Bonifacio Rd", "Luna St", "Del Pilar",
+           "Quezon Blvd", "Aguinaldo Hwy", "Burgos St"]
+
+# campus-ish centre for generated coordinates
+CENTER_LAT, CENTER_LON = 14.6537, 121.0687
+
+
+def resolve_scale(value):
+    value = str(value).lower()
+    return SCALES[value] if value in SCALES else int(value)
+
+
+def _hash_password():
+    import bcrypt
+    return bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+
+class DatasetGenerator:
+    def __init__(self, rooms=1000, seed=DEFAULT_SEED, anchor=DEFAULT_ANCHOR):
+        self.n_rooms = rooms
+        self.seed = seed
+        self.anchor = anchor
+        self.rng = random.Random(seed)
+
+        self.n_owners = max(1, rooms // 50)
+        self.n_tenants = rooms
+        self.n_dorms = max(1, rooms // 10)
+        self.n_applications = max(1, rooms // 2)
+
+        self.owner_ids = list(range(1, self.n_owners + 1))
+        self.tenant_ids = list(range(self.n_owners + 1, self.n_owners + self.n_tenants + 1))
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _dt(self, days_back_max):
+        d = self.anchor - timedelta(days=self.rng.randint(0, days_back_max))
+        return datetime(d.year, d.month, d.day, self.rng.randint(7, 21), self.rng.randint(0, 59))
+
+    # ---------------- table generators ----------------
+    # Each yields (table, columns, rows) for insertion.
+
+    def users(self, password_hash):
+        rows = []
+        for uid in self.owner_ids:
+            rows.append(("OWNER", self._name(), f"owner{uid}", f"owner{uid}@bench.local",
+                         f"09{uid:09d}", password_hash, 1, uid))
+        for uid in self.tenant_ids:
+            rows.append(("TENANT", self._name(), f"tenant{uid}", f"tenant{uid}@bench.local",
+                         f"09{uid:09d}", password_hash, 1, uid))
+        return ("users",
+                ["role", "fullname", "username", "email", "contact_no",
+                 "password_hash", "is_active", "user_id"],
+                rows)
+
+    def owner_profiles(self):
+        rows = [(uid, f"Owner {uid}", f"m.me/owner{uid}", f"fb.com/owner{uid}")
+                for uid in self.owner_ids]
+        return ("owner_profiles", ["owner_id", "display_name", "messenger_link", "facebook_link"], rows)
+
+    def dorms(self):
+        rows = []
+        self.dorm_owner = {}
+        for dorm_id in range(1, self.n_dorms + 1):
+            owner_id = self.owner_ids[(dorm_id - 1) % len(self.owner_ids)]
+            self.dorm_owner[dorm_id] = owner_id
+            status = self.rng.choices(["OPEN", "FULL", "UNDER_MAINTENANCE"], [85, 10, 5])[0]
+            rows.append((
+                dorm_id, owner_id, f"Dorm {dorm_id}",
+                f"{self.rng.randint(1, 999)} {self.rng.choice(STREETS)}",
+                round(CENTER_LAT + self.rng.uniform(-0.05, 0.05), 7),
+                round(CENTER_LON + self.rng.uniform(-0.05, 0.05), 7),
+                self.rng.choice(["BED_SPACER", "APARTMENT", "MIXED"]),
+                0, status, self._dt(720),
+            ))
+        return ("dorms",
+                ["dorm_id", "owner_id", "dorm_name", "location_text", "latitude",
+                 "longitude", "dorm_type", "no_of_rooms", "status", "created_at"],
+                rows)
+
+    def rooms(self):
+        rows = []
+        self.room_dorm = {}
+        self.room_price = {}
+        for room_id in range(1, self.n_rooms + 1):
+            dorm_id = (room_id - 1) % self.n_dorms + 1
+            capacity = self.rng.choices([1, 2, 3, 4, 6], [20, 35, 20, 20, 5])[0]
+            price = float(self.rng.randrange(1500, 9000, 250))
+            self.room_dorm[room_id] = dorm_id
+            self.room_price[room_id] = price
+            rows.append((room_id, dorm_id, f"R{room_id}",
+                         self.rng.choice(["BED_SPACER", "APARTMENT"]),
+                         capacity, price, 1))
+        return ("rooms",
+                ["room_id", "dorm_id", "room_no", "room_type", "capacity",
+                 "price_monthly", "is_available"],
+                rows)
+
+    def amenities(self):
+        rows = [(i + 1, label) for i, label in enumerate(AMENITIES)]
+        return ("amenities", ["amenity_id", "label"], rows)
+
+    def room_amenities(self):
+        rows = []
+        for room_id in range(1, self.n_rooms + 1):
+            for aid in sorted(self.rng.sample(range(1, len(AMENITIES) + 1), self.rng.randint(1, 5))):
+                rows.append((room_id, aid))
+        return ("room_amenities", ["room_id", "amenity_id"], rows)
+
+    def dorm_images(self):
+        rows = [(dorm_id, "uploads/dorm_images/room1.png") for dorm_id in range(1, self.n_dorms + 1)]
+        return ("dorm_images", ["dorm_id", "file_path"], rows)
+
+    def applications(self):
+        """rental_applications + application_details + rentals."""
+        apps, details, rentals = [], [], []
+        tenants = self.rng.sample(self.tenant_ids, min(self.n_applications, len(self.tenant_ids)))
+        self.rentals = []
+        rental_id = 0
+        for app_id, tenant_id in enumerate(tenants, start=1):
+            room_id = self.rng.randint(1, self.n_rooms)
+            dorm_id = self.room_dorm[room_id]
+            status = self.rng.choices(["APPROVED", "WAITING", "REJECTED", "CANCELLED"], [60, 20, 12, 8])[0]
+            submitted = self._dt(540)
+            reviewed = submitted + timedelta(days=2) if status in ("APPROVED", "REJECTED") else None
+            apps.append((app_id, tenant_id, dorm_id, room_id, status, submitted, reviewed))
+            details.append((app_id, None, f"Tenant {tenant_id}",
+                            f"tenant{tenant_id}@bench.local", f"09{tenant_id:09d}",
+                            self.rng.choice(["Male", "Female"])))
+
+            if status == "APPROVED":
+                rental_id += 1
+                start = (reviewed + timedelta(days=5)).date()
+                r_status = self.rng.choices(["ACTIVE", "EXTENDED", "ENDING", "ENDED"], [65, 10, 10, 15])[0]
+                end = start + timedelta(days=300) if r_status in ("ENDED", "ENDING") else None
+                rentals.append((rental_id, tenant_id, room_id, app_id, start, end, r_status))
+                self.rentals.append((rental_id, tenant_id, room_id, start, r_status))
+
+        return [
+            ("rental_applications",
+             ["application_id", "tenant_id", "dorm_id", "room_id", "action_status",
+              "submitted_at", "reviewed_at"], apps),
+            ("application_details",
+             ["application_id", "additional_notes", "tenant_fullname", "tenant_email",
+              "tenant_phone", "tenant_gender"], details),
+            ("rentals",
+             ["rental_id", "tenant_id", "room_id", "application_id", "start_date",
+              "end_date", "status"], rentals),
+        ]
+
+    def payments(self):
+        """payments + transactions + payment_requests (about 6 payments per rental)."""
+        payments, transactions, requests = [], [], []
+        payment_id = 0
+        for rental_id, tenant_id, room_id, start, r_status in self.rentals:
+            price = self.room_price[room_id]
+            owner_id = self.dorm_owner[self.room_dorm[room_id]]
+            for k in range(1, self.rng.randint(3, 9)):
+                payment_id += 1
+                due = start + timedelta(days=30 * k)
+                if due < self.anchor - timedelta(days=30):
+                    status = self.rng.choices(["PAID", "OVERDUE"], [92, 8])[0]
+                elif due < self.anchor:
+                    status = self.rng.choices(["PAID", "PENDING"], [60, 40])[0]
+                else:
+                    status = "PENDING"
+                paid_at = datetime(due.year, due.month, due.day, 10, 0) if status == "PAID" else None
+                paid = price if status == "PAID" else 0
+                payments.append((payment_id, rental_id, due, price, paid, status, paid_at))
+                if status == "PAID":
+                    transactions.append((owner_id, tenant_id, price, "PAID", paid_at))
+                elif status == "PENDING" and due < self.anchor and self.rng.random() < 0.3:
+                    requests.append((tenant_id, rental_id, price,
+                                     "uploads/payment_proofs/bench.png", "PENDING",
+                                     datetime(due.year, due.month, due.day, 9, 0)))
+        return [
+            ("payments",
+             ["payment_id", "rental_id", "due_date", "amount_due", "amount_paid",
+              "status", "paid_at"], payments),
+            ("transactions",
+             ["owner_id", "tenant_id", "amount", "status", "transaction_date"], transactions),
+            ("payment_requests",
+             ["tenant_id", "rental_id", "amount", "proof_image", "status", "submitted_at"], requests),
+        ]
+
+    def tables(self, password_hash):
+        """Every table in insertion order."""
+        yield self.users(password_hash)
+        yield self.owner_profiles()
+        yield self.dorms()
+        yield self.rooms()
+        yield self.amenities()
+        yield self.room_amenities()
+        yield self.dorm_images()
+        for t in self.applications():
+            yield t
+        for t in self.payments():
+            yield t
+
+
+# ---------------------------
+#   Loading
+# ---------------------------
+def clone_schema(db, source_db):
+    """MySQL only: copies table definitions from `source_db` into db's database."""
+    target = db.config["database"]
+    admin = DatabaseManager()
+    admin.config = dict(db.config, database=source_db)
+    admin.execute(f"CREATE DATABASE IF NOT EXISTS `{target}`")
+    for table in reversed(TABLES):
+        admin.execute(f"CREATE TABLE IF NOT EXISTS `{target}`.`{table}` LIKE `{source_db}`.`{table}`")
+
+
+def make_backend(kind, sqlite_path):
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    return MySQLBackend()
+
+
+def clear_tables(db):
+    for table in TABLES:
+        db.execute(f"DELETE FROM {table}")
+
+
+def load(db, generator, password_hash=None, log=print):
+    """Inserts the generated dataset. Returns {table: row_count}."""
+    password_hash = password_hash or _hash_password()
+    counts = {}
+    for table, columns, rows in generator.tables(password_hash):
+        t0 = time.perf_counter()
+        placeholders = ",".join(["%s"] * len(columns))
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        for i in range(0, len(rows), CHUNK):
+            db.execute_many(sql, rows[i:i + CHUNK])
+        counts[table] = len(rows)
+        log(f"  {table:<22} {len(rows):>9} rows  {time.perf_counter() - t0:6.2f}s")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the StaySmart benchmark dataset")
+    parser.add_argument("--scale", default="1k", help="1k, 100k, 1m or a room count")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--anchor", default=DEFAULT_ANCHOR.isoformat(),
+                        help="date the data is generated around (YYYY-MM-DD)")
+    parser.add_argument("--database", default="staysmart_bench")
+    parser.add_argument("--clone-schema-from", default="staysmartdb",
+                        help="copy table definitions from this database first (MySQL)")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="staysmart_bench.db")
+    args = parser.parse_args(argv)
+
+    backend = make_backend(args.backend, args.sqlite_path)
+    db = DatabaseManager(backend)
+    db.config["database"] = args.database
+    if args.clone_schema_from and backend.name == "mysql":
+        clone_schema(db, args.clone_schema_from)
+
+    gen = DatasetGenerator(resolve_scale(args.scale), args.seed, date.fromisoformat(args.anchor))
+    print(f"Generating scale={args.scale} seed={args.seed} into {args.database}")
+    clear_tables(db)
+    load(db, gen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/load_booking.py
+"""
+Load test for DatabaseManager.reserve_room: many students apply for the
+same few beds at once.
+
+    python benchmarks/load_booking.py --applicants 500 --workers 64 --beds 4
+    python benchmarks/load_booking.py --backend sqlite --sqlite-path load.db
+
+Creates one owner, one dorm with a room of --beds capacity and --applicants
+tenants, then has every tenant call reserve_room concurrently. Exits with
+status 1 unless exactly --beds applications were booked, everyone else got
+ROOM_FULL, and rooms.occupied_beds equals the capacity.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager, BOOKED, ROOM_FULL  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+import datagen  # noqa: E402
+
+
+def setup(db, applicants, beds):
+    """Creates the owner, dorm, room and tenants. Returns (dorm_id, room_id, tenant_ids)."""
+    tag = uuid.uuid4().hex[:8]
+    owner_id = db.create_user("OWNER", "Load Owner", f"load_owner_{tag}", f"owner_{tag}@load.local", "0900", "x")
+    dorm_id = db.add_property(owner_id, f"Load Dorm {tag}", "Load St")
+    room_id = db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,%s,%s,%s)",
+        (dorm_id, "L1", "BED_SPACER", beds, 3000)
+    )
+    tenant_ids = [
+        db.create_user("TENANT", f"Applicant {n}", f"load_{tag}_{n}", f"load_{tag}_{n}@load.local", "0900", "x")
+        for n in range(applicants)
+    ]
+    return dorm_id, room_id, tenant_ids
+
+
+def run(db, dorm_id, room_id, tenant_ids, workers):
+    """Every tenant applies at once. Returns (Counter of statuses, latencies in ms, wall seconds)."""
+    go = threading.Event()
+
+    def apply(tenant_id):
+        go.wait()
+        t0 = time.perf_counter()
+        result = db.reserve_room(tenant_id, dorm_id, room_id)
+        return result["status"], (time.perf_counter() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(apply, tenant_id) for tenant_id in tenant_ids]
+        t0 = time.perf_counter()
+        go.set()
+        outcomes = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    return Counter(status for status, _ in outcomes), [ms for _, ms in outcomes], wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent booking load test")
+    parser.add_argument("--applicants", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--beds", type=int, default=4)
+    parser.add_argument("--database", default="staysmart_bench")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="staysmart_bench.db")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(datagen.make_backend(args.backend, args.sqlite_path))
+    db.config["database"] = args.database
+    apply_migrations(db)
+
+    dorm_id, room_id, tenant_ids = setup(db, args.applicants, args.beds)
+    counts, latencies, wall = run(db, dorm_id, room_id, tenant_ids, args.workers)
+    occupied = db.fetchone("SELECT occupied_beds, is_available FROM rooms WHERE room_id=%s", (room_id,))
+
+    latencies.sort()
+    print(f"{args.applicants} applicants, {args.workers} workers, {args.beds} beds: {wall:.2f}s")
+    print("  results: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    print(f"  latency median {statistics.median(latencies):.1f}ms "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.1f}ms max {latencies[-1]:.1f}ms")
+    print(f"  room: occupied_beds={occupied['occupied_beds']} is_available={occupied['is_available']}")
+
+    ok = (counts[BOOKED] == args.beds
+          and counts[ROOM_FULL] == args.applicants - args.beds
+          and occupied["occupied_beds"] == args.beds)
+    print("  OK" if ok else "  OVERBOOKED OR LOST BOOKINGS")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,514 @@
+# benchmarks/run_benchmarks.py
+"""
+Times every public DatabaseManager method and the Auth flows against the
+synthetic dataset from datagen.py and writes machine-readable results.
+
+    python benchmarks/run_benchmarks.py --scale 1k --iterations 20
+    python benchmarks/run_benchmarks.py --backend sqlite --sqlite-path bench.db
+    python benchmarks/compare.py old.json new.json
+
+Public methods without an entry in CASES are listed under "no_case" in
+the output so new data-access methods don't silently go unmeasured.
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from availability import occupancy_index  # noqa: E402
+import datagen  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# plumbing, not data-access API
+SKIP = {"get_connection", "fetchall", "fetchone", "execute", "execute_count", "execute_many", "transaction"}
+
+
+class Context:
+    """Ids from the generated dataset, handed to every case."""
+    def __init__(self, gen):
+        self.gen = gen
+        self.owners = gen.owner_ids
+        self.tenants = gen.tenant_ids
+        self.rentals = gen.rentals
+        self.n_rooms = gen.n_rooms
+        self.n_dorms = gen.n_dorms
+        self.year = gen.anchor.year
+        self.picked = {}
+
+    def pick(self, db, name, sql, params=()):
+        """Loads the rows write case `name` acts on next (see SETUP)."""
+        self.picked[name] = db.fetchall(sql, params)
+
+    def got(self, name):
+        """The rows picked for `name`; LookupError once the dataset has none left."""
+        rows = self.picked.get(name)
+        if not rows:
+            raise LookupError(f"{name}: no generated row left in the state it acts on")
+        return rows
+
+    def owner(self, i):
+        return self.owners[i % len(self.owners)]
+
+    def tenant(self, i):
+        return self.tenants[i % len(self.tenants)]
+
+    def room(self, i):
+        return i % self.n_rooms + 1
+
+    def dorm(self, i):
+        return i % self.n_dorms + 1
+
+    def rental(self, i):
+        return self.rentals[i % len(self.rentals)][0] if self.rentals else 1
+
+    def unique(self, prefix):
+        return f"{prefix}_{uuid.uuid4().hex[:10]}"
+
+
+# Rows in the state each write case acts on. Picked untimed before every
+# iteration so the case changes a real row instead of timing a no-op.
+WAITING_APP_SQL = """
+    SELECT application_id AS id FROM rental_applications
+    WHERE action_status='WAITING' AND (expires_at IS NULL OR expires_at > NOW())
+    ORDER BY application_id LIMIT 1
+"""
+PENDING_REQUESTS_SQL = """
+    SELECT request_id AS id FROM payment_requests WHERE status='PENDING'
+    ORDER BY request_id LIMIT %s
+"""
+OPEN_RENTAL_SQL = "SELECT rental_id AS id FROM rentals WHERE status <> 'ENDED' ORDER BY rental_id LIMIT 1"
+UNPAID_PAYMENT_SQL = "SELECT payment_id AS id FROM payments WHERE status <> 'PAID' ORDER BY payment_id LIMIT 1"
+FREE_TENANT_SQL = """
+    SELECT u.user_id FROM users u
+    WHERE u.role='TENANT'
+    AND NOT EXISTS (SELECT 1 FROM rentals rr WHERE rr.tenant_id=u.user_id
+                    AND rr.status IN ('ACTIVE','EXTENDED','ENDING'))
+    AND NOT EXISTS (SELECT 1 FROM rental_applications ra WHERE ra.tenant_id=u.user_id
+                    AND ra.action_status='WAITING')
+    AND NOT EXISTS (SELECT 1 FROM room_waitlist w WHERE w.tenant_id=u.user_id AND w.status='WAITING')
+"""
+BOOKABLE_SQL = """
+    SELECT t.user_id AS tenant_id, r.room_id, r.dorm_id
+    FROM (""" + FREE_TENANT_SQL + """ ORDER BY u.user_id LIMIT 1) t
+    CROSS JOIN rooms r
+    JOIN dorms d ON d.dorm_id = r.dorm_id
+    WHERE r.is_available=1 AND d.status='OPEN' AND r.occupied_beds < r.capacity
+    ORDER BY r.room_id LIMIT 1
+"""
+FULL_ROOM_SQL = """
+    SELECT t.user_id AS tenant_id, r.room_id
+    FROM (""" + FREE_TENANT_SQL + """ ORDER BY u.user_id LIMIT 1) t
+    CROSS JOIN rooms r
+    WHERE r.occupied_beds >= r.capacity
+    ORDER BY r.room_id LIMIT 1
+"""
+WAITER_SQL = "SELECT tenant_id, room_id FROM room_waitlist WHERE status='WAITING' ORDER BY waitlist_id LIMIT 1"
+PAYABLE_RENTAL_SQL = """
+    SELECT rr.rental_id, rr.tenant_id FROM rentals rr
+    WHERE rr.status IN ('ACTIVE','EXTENDED','ENDING')
+    AND NOT EXISTS (SELECT 1 FROM payment_requests pr
+                    WHERE pr.rental_id=rr.rental_id AND pr.status='PENDING')
+    ORDER BY rr.rental_id LIMIT %s
+"""
+
+
+# name -> fn(db, ctx, i) ; i is the iteration number
+CASES = {
+    # auth / signup
+    "create_user": lambda db, c, i: db.create_user(
+        "TENANT", "Bench User", c.unique("u"), c.unique("e") + "@bench.local", "0900", "x"),
+    "create_owner_profile": lambda db, c, i: db.create_owner_profile(c.owner(i), "Bench"),
+    "create_tenant_profile": lambda db, c, i: db.create_tenant_profile(
+        c.tenant(i), "Bench", "User", "Female", "Guardian", "0900", "g@bench.local"),
+    "get_user_by_username": lambda db, c, i: db.get_user_by_username(f"tenant{c.tenant(i)}"),
+
+    # owner dashboard
+    "get_owner_stats": lambda db, c, i: db.get_owner_stats(c.owner(i)),
+    "get_owner_dorm_counts": lambda db, c, i: db.get_owner_dorm_counts(c.owner(i)),
+    "get_owner_occupancy_summary": lambda db, c, i: db.get_owner_occupancy_summary(c.owner(i)),
+    "get_owner_pending_count": lambda db, c, i: db.get_owner_pending_count(c.owner(i)),
+    "get_owner_month_earnings": lambda db, c, i: db.get_owner_month_earnings(c.owner(i)),
+    "get_recent_reservations": lambda db, c, i: db.get_recent_reservations(c.owner(i)),
+    "get_host_properties": lambda db, c, i: db.get_host_properties(c.owner(i)),
+    "add_property": lambda db, c, i: db.add_property(c.owner(i), "Bench Dorm", "Bench St"),
+    "update_property": lambda db, c, i: db.update_property(c.dorm(i), f"Dorm {c.dorm(i)}", "Bench St"),
+    "delete_property": lambda db, c, i: db.delete_property(c.got("delete_property")[0]["id"]),
+    "get_available_rooms_host": lambda db, c, i: db.get_available_rooms_host(c.owner(i)),
+    "get_occupied_rooms_host": lambda db, c, i: db.get_occupied_rooms_host(c.owner(i)),
+    "get_pending_requests": lambda db, c, i: db.get_pending_requests(c.owner(i)),
+    "approve_request": lambda db, c, i: db.approve_request(c.got("approve_request")[0]["id"]),
+    "reject_request": lambda db, c, i: db.reject_request(c.got("reject_request")[0]["id"], "Bench"),
+    "get_current_occupants": lambda db, c, i: db.get_current_occupants(c.owner(i)),
+    "get_owner_transaction_years": lambda db, c, i: db.get_owner_transaction_years(c.owner(i)),
+    "get_monthly_earnings_summary": lambda db, c, i: db.get_monthly_earnings_summary(c.owner(i), c.year, 1),
+    "get_monthly_revenue_series": lambda db, c, i: db.get_monthly_revenue_series(c.owner(i), c.year),
+    "get_recent_transactions": lambda db, c, i: db.get_recent_transactions(c.owner(i), c.year),
+    "get_owner_occupancy_weekly": lambda db, c, i: db.get_owner_occupancy_weekly(c.owner(i)),
+    "get_owner_occupancy_monthly": lambda db, c, i: db.get_owner_occupancy_monthly(c.owner(i), c.year),
+    "get_owner_occupancy_yearly": lambda db, c, i: db.get_owner_occupancy_yearly(c.owner(i)),
+    "end_rental_contract": lambda db, c, i: db.end_rental_contract(c.got("end_rental_contract")[0]["id"]),
+    "get_pending_payment_requests": lambda db, c, i: db.get_pending_payment_requests(c.owner(i)),
+    "get_tenant_profile": lambda db, c, i: db.get_tenant_profile(c.tenant(i)),
+    "review_payment_request": lambda db, c, i: db.review_payment_request(
+        c.got("review_payment_request")[0]["id"], approve=True),
+    "post_payment_requests": lambda db, c, i: db.post_payment_requests(
+        [r["id"] for r in c.got("post_payment_requests")]),
+
+    # rooms / search
+    "get_recommended_rooms": lambda db, c, i: db.get_recommended_rooms(),
+    "get_recommended_rooms[tenant]": lambda db, c, i: db.get_recommended_rooms(tenant_id=c.tenant(i)),
+    "get_nearby_rooms": lambda db, c, i: db.get_nearby_rooms(),
+    "get_all_rooms": lambda db, c, i: db.get_all_rooms(),
+    "get_nearest_rooms": lambda db, c, i: db.get_nearest_rooms(
+        datagen.CENTER_LAT, datagen.CENTER_LON, limit=20),
+    "get_nearest_rooms[page]": lambda db, c, i: db.get_nearest_rooms(
+        datagen.CENTER_LAT + 0.02, datagen.CENTER_LON, limit=20, offset=100, capacity_filter="2"),
+    "get_all_rooms[search]": lambda db, c, i: db.get_all_rooms("Dorm 1", "2"),
+    "get_all_rooms[amenities]": lambda db, c, i: db.get_all_rooms(amenity_ids=[1, 2]),
+    "get_rooms_free_between": lambda db, c, i: db.get_rooms_free_between(
+        date(2026, 8, 1), date(2027, 5, 31), "Dorm 1", "2"),
+    "get_rooms_free_between[rebuild]": lambda db, c, i: (
+        occupancy_index.invalidate(), db.get_rooms_free_between(date(2026, 8, 1), date(2026, 8, 31), "Dorm 1"))[1],
+    "get_room_facets": lambda db, c, i: (db.invalidate_room_facets(), db.get_room_facets())[1],
+    "get_room_facets[cached]": lambda db, c, i: db.get_room_facets("Dorm", "2", [1]),
+    "get_host_contacts": lambda db, c, i: db.get_host_contacts(c.owners[:20]),
+    "get_amenities": lambda db, c, i: db.get_amenities(),
+    "get_room_amenities": lambda db, c, i: db.get_room_amenities(c.room(i)),
+    "get_dorm_main_image": lambda db, c, i: db.get_dorm_main_image(c.dorm(i)),
+    "invalidate_host": lambda db, c, i: db.invalidate_host(c.owner(i)),
+    "invalidate_dorm": lambda db, c, i: db.invalidate_dorm(c.dorm(i)),
+    "invalidate_room_amenities": lambda db, c, i: db.invalidate_room_amenities(c.room(i)),
+    "invalidate_amenities": lambda db, c, i: db.invalidate_amenities(),
+    "invalidate_room_facets": lambda db, c, i: db.invalidate_room_facets(),
+    "rebuild_amenity_masks": lambda db, c, i: db.rebuild_amenity_masks(c.room(i)),
+    "set_room_amenities": lambda db, c, i: db.set_room_amenities(c.room(i), [1, 2, 7]),
+    "invalidate_student": lambda db, c, i: db.invalidate_student(c.tenant(i)),
+
+    # student side
+    "get_user_reservations": lambda db, c, i: db.get_user_reservations(c.tenant(i)),
+    "get_user_payments": lambda db, c, i: db.get_user_payments(c.tenant(i)),
+    "get_recently_viewed": lambda db, c, i: db.get_recently_viewed(c.tenant(i)),
+    "record_room_views": lambda db, c, i: db.record_room_views(
+        [(c.tenant(i + n), c.room(i * 7 + n), datetime(2024, 1, 1, 12, 0, n)) for n in range(50)]),
+    "create_rental_application": lambda db, c, i: db.create_rental_application(
+        *_booking(c.got("create_rental_application")[0])),
+    "reserve_room": lambda db, c, i: db.reserve_room(*_booking(c.got("reserve_room")[0])),
+    "recount_occupied_beds": lambda db, c, i: db.recount_occupied_beds(),
+    "expire_holds": lambda db, c, i: db.expire_holds(batch_size=200, max_batches=1),
+    "join_waitlist": lambda db, c, i: db.join_waitlist(
+        c.got("join_waitlist")[0]["tenant_id"], c.got("join_waitlist")[0]["room_id"]),
+    "get_waitlist_position": lambda db, c, i: db.get_waitlist_position(c.tenant(i), c.room(i)),
+    "leave_waitlist": lambda db, c, i: db.leave_waitlist(
+        c.got("leave_waitlist")[0]["tenant_id"], c.got("leave_waitlist")[0]["room_id"]),
+    "user_has_active_reservation": lambda db, c, i: db.user_has_active_reservation(c.tenant(i)),
+    "cancel_reservation": lambda db, c, i: db.cancel_reservation(c.got("cancel_reservation")[0]["id"]),
+    "save_tenant_profile": lambda db, c, i: db.save_tenant_profile(
+        c.tenant(i), "Bench", "User", "Male", "Guardian", "0900", "g@bench.local", None, 1),
+    "get_tenant_due": lambda db, c, i: db.get_tenant_due(c.tenant(i)),
+    "get_dashboard_stats": lambda db, c, i: db.get_dashboard_stats(c.tenant(i)),
+    "get_student_dashboard_snapshot": lambda db, c, i: db.get_student_dashboard_snapshot(c.tenant(i)),
+
+    # payments
+    "create_monthly_payment": lambda db, c, i: db.create_monthly_payment(c.rental(i), date(2030, 1, 1), 1000),
+    "mark_payment_paid": lambda db, c, i: db.mark_payment_paid(c.got("mark_payment_paid")[0]["id"]),
+    "submit_payment_request": lambda db, c, i: db.submit_payment_request(
+        c.got("submit_payment_request")[0]["tenant_id"], c.got("submit_payment_request")[0]["rental_id"],
+        1000, "uploads/payment_proofs/bench.png"),
+    "has_pending_payment_request": lambda db, c, i: db.has_pending_payment_request(c.tenant(i), c.rental(i)),
+    "get_last_payment_rejection": lambda db, c, i: db.get_last_payment_rejection(c.tenant(i), c.rental(i)),
+
+    # jobs
+    "mark_overdue_payments": lambda db, c, i: db.mark_overdue_payments(),
+    "check_overdue": lambda db, c, i: db.check_overdue(),
+    "generate_monthly_payments": lambda db, c, i: db.generate_monthly_payments(),
+    "reconcile_rental_balances": lambda db, c, i: db.reconcile_rental_balances(fix=False),
+    "rebuild_owner_revenue": lambda db, c, i: db.rebuild_owner_revenue(),
+    "rebuild_rental_dues": lambda db, c, i: db.rebuild_rental_dues(),
+    "get_upload_references": lambda db, c, i: db.get_upload_references(),
+    "record_job_run": lambda db, c, i: db.record_job_run(
+        "bench", datetime.now(), datetime.now(), 1, 0, "OK"),
+    "get_recent_job_runs": lambda db, c, i: db.get_recent_job_runs(),
+    "purge_job_runs": lambda db, c, i: db.purge_job_runs(),
+    "acquire_job_lease": lambda db, c, i: db.acquire_job_lease("bench", "bench:1", 60),
+    "release_job_lease": lambda db, c, i: db.release_job_lease("bench", "bench:1"),
+}
+
+
+def _booking(row):
+    return row["tenant_id"], row["dorm_id"], row["room_id"]
+
+
+def _pick_pending_requests(db, c, name, n):
+    # datagen queues only a few requests (none at small scales): top them up
+    # with proofs submitted for generated rentals, as tenants would
+    short = n - len(db.fetchall(PENDING_REQUESTS_SQL, (n,)))
+    if short > 0:
+        for row in db.fetchall(PAYABLE_RENTAL_SQL, (short,)):
+            db.submit_payment_request(row["tenant_id"], row["rental_id"], 1000, "uploads/payment_proofs/bench.png")
+    c.pick(db, name, PENDING_REQUESTS_SQL, (n,))
+
+
+# name -> fn(db, ctx, i), run untimed before each iteration of that case
+SETUP = {
+    # every generated owner already has a profile; drop the one about to be created
+    "create_owner_profile": lambda db, c, i: db.execute(
+        "DELETE FROM owner_profiles WHERE owner_id=%s", (c.owner(i),)),
+    # generated dorms cascade into the rooms every other case uses: delete a
+    # fresh, empty dorm of a generated owner instead
+    "delete_property": lambda db, c, i: c.picked.update(
+        delete_property=[{"id": db.add_property(c.owner(i), "Bench Dorm", "Bench St")}]),
+    "approve_request": lambda db, c, i: c.pick(db, "approve_request", WAITING_APP_SQL),
+    "reject_request": lambda db, c, i: c.pick(db, "reject_request", WAITING_APP_SQL),
+    "cancel_reservation": lambda db, c, i: c.pick(db, "cancel_reservation", WAITING_APP_SQL),
+    "end_rental_contract": lambda db, c, i: c.pick(db, "end_rental_contract", OPEN_RENTAL_SQL),
+    "review_payment_request": lambda db, c, i: _pick_pending_requests(db, c, "review_payment_request", 1),
+    "post_payment_requests": lambda db, c, i: _pick_pending_requests(db, c, "post_payment_requests", 20),
+    "mark_payment_paid": lambda db, c, i: c.pick(db, "mark_payment_paid", UNPAID_PAYMENT_SQL),
+    "create_rental_application": lambda db, c, i: c.pick(db, "create_rental_application", BOOKABLE_SQL),
+    "reserve_room": lambda db, c, i: c.pick(db, "reserve_room", BOOKABLE_SQL),
+    "join_waitlist": lambda db, c, i: c.pick(db, "join_waitlist", FULL_ROOM_SQL),
+    "leave_waitlist": lambda db, c, i: c.pick(db, "leave_waitlist", WAITER_SQL),
+    "submit_payment_request": lambda db, c, i: c.pick(db, "submit_payment_request", PAYABLE_RENTAL_SQL, (1,)),
+}
+
+
+def expect_row(db, sql, params):
+    """Raises unless sql finds a row: the write case changed nothing."""
+    if not db.fetchone(sql, params):
+        raise AssertionError("write changed no row: " + " ".join(sql.split()))
+
+
+def _app_status(status):
+    return lambda db, c, i, name: expect_row(
+        db, "SELECT 1 FROM rental_applications WHERE application_id=%s AND action_status=%s",
+        (c.got(name)[0]["id"], status))
+
+
+def _booked(db, c, i, name):
+    row = c.got(name)[0]
+    expect_row(db, """
+        SELECT 1 FROM rental_applications
+        WHERE tenant_id=%s AND room_id=%s AND action_status='WAITING'
+    """, (row["tenant_id"], row["room_id"]))
+
+
+def _requests_reviewed(db, c, i, name):
+    for row in c.got(name):
+        expect_row(db, "SELECT 1 FROM payment_requests WHERE request_id=%s AND status='APPROVED'", (row["id"],))
+
+
+# name -> fn(db, ctx, i, name), run untimed after each iteration of a write
+# case; it raises if the picked rows did not change
+CHECKS = {
+    "delete_property": lambda db, c, i, name: expect_row(
+        db, "SELECT COUNT(*) AS n FROM dorms WHERE dorm_id=%s HAVING COUNT(*) = 0", (c.got(name)[0]["id"],)),
+    "approve_request": _app_status("APPROVED"),
+    "reject_request": _app_status("REJECTED"),
+    "cancel_reservation": _app_status("CANCELLED"),
+    "end_rental_contract": lambda db, c, i, name: expect_row(
+        db, "SELECT 1 FROM rentals WHERE rental_id=%s AND status='ENDED'", (c.got(name)[0]["id"],)),
+    "review_payment_request": _requests_reviewed,
+    "post_payment_requests": _requests_reviewed,
+    "mark_payment_paid": lambda db, c, i, name: expect_row(
+        db, "SELECT 1 FROM payments WHERE payment_id=%s AND status='PAID'", (c.got(name)[0]["id"],)),
+    "create_rental_application": _booked,
+    "reserve_room": _booked,
+    "join_waitlist": lambda db, c, i, name: expect_row(db, """
+        SELECT 1 FROM room_waitlist WHERE tenant_id=%s AND room_id=%s AND status='WAITING'
+    """, (c.got(name)[0]["tenant_id"], c.got(name)[0]["room_id"])),
+    "leave_waitlist": lambda db, c, i, name: expect_row(db, """
+        SELECT 1 FROM room_waitlist WHERE tenant_id=%s AND room_id=%s AND status='LEFT'
+    """, (c.got(name)[0]["tenant_id"], c.got(name)[0]["room_id"])),
+    "submit_payment_request": lambda db, c, i, name: expect_row(db, """
+        SELECT 1 FROM payment_requests WHERE rental_id=%s AND status='PENDING'
+    """, (c.got(name)[0]["rental_id"],)),
+}
+
+
+def auth_cases(auth, ctx):
+    import datagen as dg
+    return {
+        "Auth.login": lambda i: auth.login(f"tenant{ctx.tenant(i)}", dg.BENCH_PASSWORD),
+        "Auth.login[wrong_password]": lambda i: auth.login(f"tenant{ctx.tenant(i)}", "nope"),
+        "Auth.student_login": lambda i: auth.student_login(f"tenant{ctx.tenant(i)}", dg.BENCH_PASSWORD),
+        "Auth.admin_login": lambda i: auth.admin_login(f"owner{ctx.owner(i)}", dg.BENCH_PASSWORD),
+        "Auth.student_signup": lambda i: auth.student_signup(
+            "Bench", ctx.unique("s"), "0900", ctx.unique("s") + "@bench.local", "Pass123!"),
+        "Auth.admin_signup": lambda i: auth.admin_signup(
+            "Bench", ctx.unique("a"), "0900", ctx.unique("a") + "@bench.local", "Pass123!"),
+        "Auth.get_user": lambda i: auth.get_user(f"owner{ctx.owner(i)}"),
+        "Auth.email_exists": lambda i: auth.email_exists(f"tenant{ctx.tenant(i)}@bench.local"),
+    }
+
+
+def public_methods(cls=DatabaseManager):
+    return sorted(
+        name for name, _ in inspect.getmembers(cls, inspect.isfunction)
+        if not name.startswith("_") and name not in SKIP
+    )
+
+
+def summarize(samples_ms, error=None):
+    ordered = sorted(samples_ms)
+    p95_idx = max(0, int(round(0.95 * len(ordered))) - 1)
+    return {
+        "iterations": len(samples_ms),
+        "first_ms": round(samples_ms[0], 3),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[p95_idx], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+        "error": error,
+    }
+
+
+def time_case(fn, iterations, setup=None, check=None):
+    samples, error = [], None
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        t0 = time.perf_counter()
+        try:
+            fn(i)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        samples.append((time.perf_counter() - t0) * 1000)
+        if check and not error:
+            try:
+                check(i)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        if error:
+            break
+    return summarize(samples, error)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run(db, ctx, iterations, only=None, auth=None, log=print):
+    results = {}
+    for name in sorted(CASES):
+        if only and only not in name:
+            continue
+        setup, check = SETUP.get(name), CHECKS.get(name)
+        results[name] = time_case(lambda i, f=CASES[name]: f(db, ctx, i), iterations,
+                                  setup and (lambda i, s=setup: s(db, ctx, i)),
+                                  check and (lambda i, k=check, n=name: k(db, ctx, i, n)))
+        log(f"  {name:<34} median {results[name]['median_ms']:>9.3f}ms"
+            + (f"  ERROR {results[name]['error']}" if results[name]["error"] else ""))
+
+    if auth is not None:
+        for name, fn in auth_cases(auth, ctx).items():
+            if only and only not in name:
+                continue
+            results[name] = time_case(fn, iterations)
+            log(f"  {name:<34} median {results[name]['median_ms']:>9.3f}ms")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StaySmart data-access benchmarks")
+    parser.add_argument("--scale", default="1k", help="1k, 100k, 1m or a room count")
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument("--anchor", default=datagen.DEFAULT_ANCHOR.isoformat())
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--database", default="staysmart_bench")
+    parser.add_argument("--clone-schema-from", default="staysmartdb")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="staysmart_bench.db")
+    parser.add_argument("--no-load", action="store_true",
+                        help="reuse data already loaded for this scale/seed")
+    parser.add_argument("--no-auth", action="store_true", help="skip the Auth flows")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>.json)")
+    args = parser.parse_args(argv)
+
+    backend = datagen.make_backend(args.backend, args.sqlite_path)
+    db = DatabaseManager(backend)
+    db.config["database"] = args.database
+
+    gen = datagen.DatasetGenerator(
+        datagen.resolve_scale(args.scale), args.seed, date.fromisoformat(args.anchor)
+    )
+    load_counts = None
+    if not args.no_load:
+        if args.clone_schema_from and backend.name == "mysql":
+            datagen.clone_schema(db, args.clone_schema_from)
+        print(f"Loading scale={args.scale} seed={args.seed} ...")
+        apply_migrations(db)
+        datagen.clear_tables(db)
+        load_counts = datagen.load(db, gen)
+        db.rebuild_amenity_masks()
+        db.recount_occupied_beds()
+        # the loader writes payments directly: rebuild the rollups they feed
+        db.rebuild_rental_dues()
+        db.reconcile_rental_balances(batch_size=5000)
+        db.rebuild_owner_revenue()
+    else:
+        # ids are derived from the generator, so replay it without inserting
+        list(gen.tables("x"))
+
+    auth = None
+    if not args.no_auth:
+        from auth import Auth
+        auth = Auth(database=args.database, backend=backend)
+
+    print("Running benchmarks ...")
+    ctx = Context(gen)
+    results = run(db, ctx, args.iterations, args.only, auth)
+
+    covered = {name.split("[")[0] for name in CASES}
+    output = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend.name,
+            "database": args.database if backend.name == "mysql" else args.sqlite_path,
+            "scale": args.scale,
+            "rooms": gen.n_rooms,
+            "seed": args.seed,
+            "anchor": args.anchor,
+            "iterations": args.iterations,
+            "rows_loaded": load_counts,
+        },
+        "results": results,
+        "no_case": [m for m in public_methods() if m not in covered],
+    }
+
+    path = args.output
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{args.scale}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2, default=str)
+    print("Results written to", path)
+    if output["no_case"]:
+        print("No benchmark case for:", ", ".join(output["no_case"]))
+
+
+if __name__ == "__main__":
+    main()
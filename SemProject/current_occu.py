@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from database import DatabaseManager
+from background_loader import BackgroundLoader, show_table_placeholder, fill_table
 
 
 class CurrentOccupantsWindow(QWidget):
@@ -20,6 +21,10 @@ class CurrentOccupantsWindow(QWidget):
         self._fonts()
         self._build_ui()
         self._apply_styles()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     def _fonts(self):
@@ -29,34 +34,34 @@ class CurrentOccupantsWindow(QWidget):
 
     def load_data(self):
         search = self.txt_search.text().strip() if hasattr(self, "txt_search") else ""
+        self.loader.load(search)
+
+    def _fetch_data(self, search):
+        """Runs on a worker thread."""
         occupants = self.db.get_current_occupants(self.owner_id, search)
+        cap_row = self.db.fetchone("""
+            SELECT COALESCE(SUM(capacity),0) AS cap
+            FROM rooms r
+            JOIN dorms d ON r.dorm_id=d.dorm_id
+            WHERE d.owner_id=%s
+        """, (self.owner_id,))
+        return occupants, cap_row
 
-        self.table.setRowCount(0)
-        for r, occ in enumerate(occupants):
-            self.table.insertRow(r)
+    def _apply_data(self, result):
+        occupants, cap_row = result
 
+        def cells(occ):
             id_item = QTableWidgetItem(str(occ["tenant_id"]))
             id_item.setData(Qt.UserRole, occ["rental_id"])
+            return [id_item, occ["tenant_name"], occ["dorm_name"], occ["room_no"],
+                    occ["tenant_phone"], occ["start_date"], occ["status"]]
 
-            self.table.setItem(r, 0, id_item)
-            self.table.setItem(r, 1, QTableWidgetItem(occ["tenant_name"]))
-            self.table.setItem(r, 2, QTableWidgetItem(occ["dorm_name"]))
-            self.table.setItem(r, 3, QTableWidgetItem(str(occ["room_no"])))
-            self.table.setItem(r, 4, QTableWidgetItem(occ["tenant_phone"]))
-            self.table.setItem(r, 5, QTableWidgetItem(str(occ["start_date"])))
-            self.table.setItem(r, 6, QTableWidgetItem(occ["status"]))
-
+        fill_table(self.table, occupants, cells)
 
         total_occupants = len(occupants)
 
         filled_rooms = len({(o["dorm_name"], o["room_no"]) for o in occupants})
 
-        cap_row = self.db.fetchone("""
-            SELECT COALESCE(SUM(capacity),0) AS cap
-            FROM rooms r
-            JOIN dorms d ON r.dorm_id=d.dorm_id
-            WHERE d.owner_id=%s
-        """, (self.owner_id,))
         total_capacity = cap_row["cap"] if cap_row and cap_row["cap"] else 0
         occ_rate = int((total_occupants / total_capacity) * 100) if total_capacity else 0
 
@@ -1,30 +1,374 @@
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from cache import TTLCache
+from instrumentation import query_stats, logger
+from backends import get_backend
+import geo
+from amenity_index import AmenityIndex, amenity_mask, mask_labels, MAX_AMENITY_ID
+from facets import compute_facets
+from recommender import room_features, APPLICATION_WEIGHT, VIEW_WEIGHT, HISTORY_VIEWS
+from holds import HOLD_TTL_HOURS, EXPIRED
+from availability import occupancy_index
+
+# Reference data (amenities, host contact cards, dorm main images) is shared
+# by every DatabaseManager in the process, since each window makes its own.
+reference_cache = TTLCache(maxsize=4096, ttl=600)
+
+# ----- ROOM SEARCH -----
+
+ROOM_COLUMNS_SQL = """
+    SELECT
+      r.room_id,
+      d.dorm_id,
+      d.owner_id AS host_id,
+      d.dorm_name AS property_name,
+      d.location_text AS address,
+      r.room_no AS room_name,
+      r.capacity,
+      r.price_monthly AS price_monthly,
+      r.room_type,
+      r.amenity_mask,
+      d.latitude,
+      d.longitude
+    FROM rooms r
+    JOIN dorms d ON r.dorm_id=d.dorm_id
+"""
+
+ROOM_SEARCH_SQL = ROOM_COLUMNS_SQL + " WHERE r.is_available=1 AND d.status='OPEN'"
+
+# Rooms of open dorms whether or not they have a bed today; the date-range
+# search decides availability from availability.occupancy_index instead.
+ROOM_CALENDAR_SQL = ROOM_COLUMNS_SQL + " WHERE d.status='OPEN'"
+
+ROOM_FACETS_TTL = 30
+
+ROOM_FACET_SQL = """
+    SELECT r.capacity, r.price_monthly, d.dorm_type, r.amenity_mask
+    FROM rooms r
+    JOIN dorms d ON r.dorm_id=d.dorm_id
+    WHERE r.is_available=1 AND d.status='OPEN'
+"""
+
+# facet rows for a date-range search, kept or dropped per room by occupancy_index
+ROOM_CALENDAR_FACET_SQL = """
+    SELECT r.room_id, r.capacity, r.price_monthly, d.dorm_type, r.amenity_mask
+    FROM rooms r
+    JOIN dorms d ON r.dorm_id=d.dorm_id
+    WHERE d.status='OPEN'
+"""
+
+# ----- OWNER STATS -----
+
+# get_owner_stats in independent parts (method -> keys it fills), so the
+# dashboard can run them concurrently and fill each card as it arrives
+OWNER_STAT_PARTS = {
+    "get_owner_dorm_counts": ("total_dorms", "active_dorms", "maintenance_dorms"),
+    "get_owner_occupancy_summary": ("current_occupants", "occupancy_rate"),
+    "get_owner_pending_count": ("pending_requests",),
+    "get_owner_month_earnings": ("monthly_earnings",),
+}
+
+# ----- BOOKING -----
+
+# reserve_room() results
+BOOKED = "BOOKED"
+ROOM_FULL = "FULL"
+ALREADY_RESERVED = "ALREADY_RESERVED"
+BOOKING_FAILED = "FAILED"
+
+# a tenant holds one bed at a time: a current rental or an unexpired request
+ACTIVE_RESERVATION_SQL = """
+    SELECT 1 FROM rentals
+    WHERE tenant_id=%s AND status IN ('ACTIVE','EXTENDED','ENDING')
+    UNION ALL
+    SELECT 1 FROM rental_applications
+    WHERE tenant_id=%s AND action_status='WAITING'
+    AND (expires_at IS NULL OR expires_at > NOW())
+"""
+
+# A bed is held from application until the application is cancelled or
+# rejected, or the rental ends. is_available is assigned before occupied_beds
+# so MySQL (which applies SET left to right) and SQLite see the same old value.
+CLAIM_BED_SQL = """
+    UPDATE rooms
+    SET is_available = CASE WHEN occupied_beds + 1 < capacity THEN 1 ELSE 0 END,
+        occupied_beds = occupied_beds + 1
+    WHERE room_id=%s AND occupied_beds < capacity
+"""
+RELEASE_BEDS_SQL = """
+    UPDATE rooms
+    SET is_available = 1,
+        occupied_beds = GREATEST(occupied_beds - %s, 0)
+    WHERE room_id=%s AND occupied_beds > 0
+"""
+RECOUNT_BEDS_SQL = """
+    UPDATE rooms SET occupied_beds = (
+        SELECT COUNT(*) FROM rentals rr
+        WHERE rr.room_id = rooms.room_id AND rr.status IN ('ACTIVE','EXTENDED','ENDING')
+    ) + (
+        SELECT COUNT(*) FROM rental_applications ra
+        WHERE ra.room_id = rooms.room_id
+        AND (ra.action_status = 'WAITING'
+             OR (ra.action_status = 'APPROVED'
+                 AND NOT EXISTS (SELECT 1 FROM rentals x WHERE x.application_id = ra.application_id)))
+    )
+"""
+
+
+# ----- RENTAL DUES -----
+
+# rentals.balance_due / next_due_date / last_paid_at summarise the rental's
+# payments so dashboards read one rentals row instead of the ledger. Every
+# write to payments refreshes the rental's row in the same transaction;
+# reconcile_rental_balances() checks them against the ledger.
+# Recomputing one rental is three seeks on idx_payments_rental.
+RENTAL_DUES_ALL_SQL = """
+    UPDATE rentals SET
+        balance_due = (
+            SELECT COALESCE(SUM(p.amount_due - p.amount_paid), 0) FROM payments p
+            WHERE p.rental_id = rentals.rental_id AND p.status <> 'PAID'
+        ),
+        next_due_date = (
+            SELECT MIN(p.due_date) FROM payments p
+            WHERE p.rental_id = rentals.rental_id AND p.status <> 'PAID'
+        ),
+        last_paid_at = (
+            SELECT MAX(p.paid_at) FROM payments p
+            WHERE p.rental_id = rentals.rental_id AND p.status = 'PAID'
+        )
+"""
+RENTAL_DUES_SQL = RENTAL_DUES_ALL_SQL + "    WHERE rental_id = %s\n"
+
+RENTAL_LEDGER_SQL = """
+    SELECT rr.rental_id, rr.balance_due, rr.next_due_date, rr.last_paid_at,
+           COALESCE(SUM(CASE WHEN p.status <> 'PAID' THEN p.amount_due - p.amount_paid END), 0)
+               AS ledger_balance,
+           MIN(CASE WHEN p.status <> 'PAID' THEN p.due_date END) AS ledger_next_due,
+           MAX(CASE WHEN p.status = 'PAID' THEN p.paid_at END) AS ledger_last_paid
+    FROM rentals rr
+    LEFT JOIN payments p ON p.rental_id = rr.rental_id
+    WHERE rr.rental_id > %s
+    GROUP BY rr.rental_id, rr.balance_due, rr.next_due_date, rr.last_paid_at
+    ORDER BY rr.rental_id
+    LIMIT %s
+"""
+
+
+# ----- PAYMENT POSTING -----
+
+# owner_revenue_monthly keeps each owner's PAID total per calendar month so
+# the earnings screens read a handful of rows instead of summing transactions.
+REVENUE_UPSERT_SQL = """
+    INSERT INTO owner_revenue_monthly (owner_id, revenue_year, revenue_month, paid_total, payments)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        paid_total = paid_total + VALUES(paid_total),
+        payments = payments + VALUES(payments)
+"""
+
+POST_TRANSACTION_SQL = """
+    INSERT INTO transactions (owner_id, tenant_id, amount, status, transaction_date, request_id, payment_id)
+    VALUES (%s, %s, %s, 'PAID', %s, %s, %s)
+"""
+
+POST_PAYMENT_SQL = """
+    UPDATE payments SET amount_paid=%s, status=%s, paid_at=%s
+    WHERE payment_id=%s
+"""
+
+
+# submit_payment_request() results
+PAYMENT_SUBMITTED = "SUBMITTED"
+PAYMENT_ALREADY_SUBMITTED = "ALREADY_SUBMITTED"
+PAYMENT_NO_RENTAL = "NO_RENTAL"
+
+# payment_requests.pending is 1 while a request waits for the owner and NULL
+# once reviewed. The unique (tenant_id, rental_id, period, pending) index
+# ignores NULLs, so it allows one pending request per billing period.
+SUBMIT_PAYMENT_SQL = """
+    INSERT IGNORE INTO payment_requests (tenant_id, rental_id, amount, proof_image, period, pending)
+    VALUES (%s, %s, %s, %s, %s, 1)
+"""
+
+
+def _allocate(amount, unpaid, paid_at):
+    """
+    Applies `amount` to `unpaid` payments (oldest due first), updating
+    them in place. Returns the payments it touched; a fully covered one
+    becomes PAID.
+    """
+    touched = []
+    left = round(float(amount or 0), 2)
+    for p in unpaid:
+        if left <= 0:
+            break
+        owed = round(float(p["amount_due"]) - float(p["amount_paid"]), 2)
+        if owed <= 0:
+            continue
+        pay = min(owed, left)
+        left = round(left - pay, 2)
+        p["amount_paid"] = round(float(p["amount_paid"]) + pay, 2)
+        if pay == owed:
+            p["status"], p["paid_at"] = "PAID", paid_at
+        touched.append(p)
+    return touched
+
+
+def _dues_match(row):
+    return (abs(float(row["balance_due"] or 0) - float(row["ledger_balance"] or 0)) < 0.005
+            and str(row["next_due_date"] or "") == str(row["ledger_next_due"] or "")
+            and str(row["last_paid_at"] or "") == str(row["ledger_last_paid"] or ""))
+
+
+class _TrackedCursor:
+    """Cursor for DatabaseManager.transaction() that records each statement in query_stats."""
+    def __init__(self, cur, stats):
+        self._cur = cur
+        self._stats = stats
+
+    def execute(self, sql, params=None):
+        with self._stats.track(sql) as q:
+            self._cur.execute(sql, params or {})
+            q.rows = max(self._cur.rowcount, 0)
+
+    def executemany(self, sql, seq_of_params):
+        with self._stats.track(sql) as q:
+            self._cur.executemany(sql, seq_of_params)
+            q.rows = max(self._cur.rowcount, 0)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+
+# ----- WAITLIST -----
+
+# join_waitlist() results
+WAITLISTED = "WAITLISTED"
+ALREADY_WAITLISTED = "ALREADY_WAITLISTED"
+ROOM_HAS_BEDS = "ROOM_HAS_BEDS"
+
+# room_waitlist.status: WAITING, PROMOTED (got a bed, see application_id),
+# SKIPPED (already had a reservation when their turn came) or LEFT
+
+# The head of a room's queue is one (room_id, status, waitlist_id) index seek.
+WAITLIST_HEAD_SQL = """
+    SELECT w.waitlist_id, w.tenant_id, r.dorm_id
+    FROM room_waitlist w
+    JOIN rooms r ON r.room_id = w.room_id
+    WHERE w.room_id=%s AND w.status='WAITING'
+    ORDER BY w.waitlist_id
+    LIMIT 1
+    FOR UPDATE
+"""
+
+# ----- STUDENT DASHBOARD SNAPSHOT -----
+
+STUDENT_SNAPSHOT_TTL = 30
+RECENT_VIEWS_SHOWN = 5
+
+# Every branch returns the same columns:
+# panel, id, property_name, room_name, address, room_type, status, capacity, amount, due_date, at_time,
+# latitude, longitude, room_id
+SNAPSHOT_ACTIVE_SQL = """
+    SELECT 'active' AS panel, NULL AS id, NULL AS property_name, NULL AS room_name,
+           NULL AS address, NULL AS room_type, NULL AS status, NULL AS capacity,
+           COUNT(*) AS amount, NULL AS due_date, NULL AS at_time,
+           NULL AS latitude, NULL AS longitude, NULL AS room_id
+    FROM rentals
+    WHERE tenant_id=%s AND status IN ('ACTIVE','EXTENDED','ENDING')
+"""
+SNAPSHOT_NEXT_DUE_SQL = """
+    SELECT 'next_due', NULL, NULL, NULL, NULL, NULL, NULL, NULL, nd.balance_due, nd.next_due_date, NULL,
+           NULL, NULL, NULL
+    FROM (
+        SELECT balance_due, next_due_date
+        FROM rentals
+        WHERE tenant_id = %s AND balance_due > 0
+        ORDER BY next_due_date ASC
+        LIMIT 1
+    ) nd
+"""
+SNAPSHOT_RECOMMENDED_SQL = """
+    SELECT 'recommended', rec.room_id, rec.dorm_name, rec.room_no, rec.location_text,
+           rec.room_type, NULL, rec.capacity, rec.price_monthly, NULL, NULL,
+           rec.latitude, rec.longitude, rec.room_id
+    FROM (
+        SELECT r.room_id, d.dorm_name, r.room_no, d.location_text, r.room_type,
+               r.capacity, r.price_monthly, d.latitude, d.longitude
+        FROM rooms r
+        JOIN dorms d ON r.dorm_id=d.dorm_id
+        WHERE r.is_available=1 AND d.status='OPEN'
+        ORDER BY RAND()
+        LIMIT %s
+    ) rec
+"""
+SNAPSHOT_RESERVATIONS_SQL = """
+    SELECT 'reservation', ra.application_id, d.dorm_name, r.room_no, NULL,
+           NULL, ra.action_status, NULL, NULL, NULL, ra.submitted_at,
+           NULL, NULL, ra.room_id
+    FROM rental_applications ra
+    JOIN dorms d ON ra.dorm_id=d.dorm_id
+    JOIN rooms r ON ra.room_id=r.room_id
+    WHERE ra.tenant_id=%s
+"""
+SNAPSHOT_RECENT_SQL = """
+    SELECT 'recent', recent.room_id, recent.dorm_name, recent.room_no, NULL,
+           NULL, NULL, NULL, NULL, NULL, recent.viewed_at,
+           NULL, NULL, recent.room_id
+    FROM (
+        SELECT rv.room_id, rv.viewed_at, r.room_no, d.dorm_name
+        FROM recently_viewed rv
+        JOIN rooms r ON rv.room_id=r.room_id
+        JOIN dorms d ON r.dorm_id=d.dorm_id
+        WHERE rv.user_id=%s
+        ORDER BY rv.viewed_at DESC LIMIT %s
+    ) recent
+"""
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
         self.config = {
             "host": "localhost",
             "user": "root",
             "password": "",
             "database": "staysmartdb"
         }
+        self.cache = reference_cache
+        self.stats = query_stats
 
     def get_connection(self):
+        t0 = time.perf_counter()
         try:
-            return mysql.connector.connect(**self.config)
-        except Error as e:
-            print("DB Connection Error:", e)
+            conn = self.backend.connect(self.config, pooled=True)
+        except self.backend.errors as e:
+            self.stats.record_connect((time.perf_counter() - t0) * 1000, ok=False)
+            logger.error("DB Connection Error: %s", e)
             return None
+        self.stats.record_connect((time.perf_counter() - t0) * 1000)
+        return conn
 
     def fetchall(self, sql, params=None):
         conn = self.get_connection()
         if not conn or not conn.is_connected():
             return []
         cur = conn.cursor(dictionary=True)
-        cur.execute(sql, params or {})
-        rows = cur.fetchall()
+        with self.stats.track(sql) as q:
+            cur.execute(sql, params or {})
+            rows = cur.fetchall()
+            q.rows = len(rows)
         conn.close()
         return rows
 
@@ -33,8 +377,10 @@ class DatabaseManager:
         if not conn or not conn.is_connected():
             return None
         cur = conn.cursor(dictionary=True)
-        cur.execute(sql, params or {})
-        row = cur.fetchone()
+        with self.stats.track(sql) as q:
+            cur.execute(sql, params or {})
+            row = cur.fetchone()
+            q.rows = 1 if row else 0
         conn.close()
         return row
 
@@ -43,14 +389,69 @@ class DatabaseManager:
         if not conn or not conn.is_connected():
             return None
         cur = conn.cursor()
-        cur.execute(sql, params or {})
-        conn.commit()
+        with self.stats.track(sql) as q:
+            cur.execute(sql, params or {})
+            conn.commit()
+            q.rows = max(cur.rowcount, 0)
         last_id = cur.lastrowid
         conn.close()
         return last_id
 
-     =========================================================
-     AUTH / SIGNUP / LOGIN
+    def execute_count(self, sql, params=None):
+        """Like execute(), but returns the number of affected rows."""
+        conn = self.get_connection()
+        if not conn or not conn.is_connected():
+            return 0
+        cur = conn.cursor()
+        with self.stats.track(sql) as q:
+            cur.execute(sql, params or {})
+            conn.commit()
+            count = q.rows = cur.rowcount
+        conn.close()
+        return count
+
+    def execute_many(self, sql, seq_of_params):
+        """Runs one statement for every params tuple in a single commit."""
+        seq_of_params = list(seq_of_params)
+        if not seq_of_params:
+            return 0
+        conn = self.get_connection()
+        if not conn or not conn.is_connected():
+            return 0
+        cur = conn.cursor()
+        with self.stats.track(sql) as q:
+            cur.executemany(sql, seq_of_params)
+            conn.commit()
+            count = q.rows = cur.rowcount
+        conn.close()
+        return count
+
+    @contextmanager
+    def transaction(self):
+        """
+        One connection and one transaction for several statements:
+
+            with db.transaction() as cur:
+                cur.execute(...)
+
+        Commits when the block ends, rolls back if it raises. The cursor
+        returns dict rows. Raises ConnectionError if no connection is available.
+        """
+        conn = self.get_connection()
+        if not conn or not conn.is_connected():
+            raise ConnectionError("database unavailable")
+        try:
+            conn.start_transaction()
+            yield _TrackedCursor(conn.cursor(dictionary=True), self.stats)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # =========================================================
+    # AUTH / SIGNUP / LOGIN
     # =========================================================
 
     def create_user(self, role, fullname, username, email, contact_no, password_hash):
@@ -66,6 +467,7 @@ class DatabaseManager:
             VALUES (%s,%s,%s,%s)
         """
         self.execute(sql, (owner_id, display_name, messenger_link, facebook_link))
+        self.invalidate_host(owner_id)
 
     def create_tenant_profile(self, tenant_id, first_name, last_name, gender,
                               guardian_fullname, guardian_contact, guardian_email,
@@ -93,23 +495,33 @@ class DatabaseManager:
     # =========================================================
 
     def get_owner_stats(self, owner_id):
-        stats = {
-            "total_dorms": 0,
-            "current_occupants": 0,
-            "pending_requests": 0,
-            "monthly_earnings": 0,
-            "active_dorms": 0,
-            "maintenance_dorms": 0,
-            "occupancy_rate": 0
-        }
+        """Every OWNER_STAT_PARTS part, one after another, in one dict."""
+        stats = {}
+        for part in OWNER_STAT_PARTS:
+            stats.update(getattr(self, part)(owner_id))
+        return stats
 
-        # total dorms
+    def get_owner_dorm_counts(self, owner_id):
+        stats = {"total_dorms": 0, "active_dorms": 0, "maintenance_dorms": 0}
         row = self.fetchone(
             "SELECT COUNT(*) AS cnt FROM dorms WHERE owner_id=%s",
             (owner_id,)
         )
         stats["total_dorms"] = row["cnt"] if row else 0
 
+        row = self.fetchone("""
+            SELECT
+              SUM(CASE WHEN status='OPEN' THEN 1 ELSE 0 END) AS active_cnt,
+              SUM(CASE WHEN status='UNDER_MAINTENANCE' THEN 1 ELSE 0 END) AS maint_cnt
+            FROM dorms
+            WHERE owner_id=%s
+        """, (owner_id,))
+        if row:
+            stats["active_dorms"] = row["active_cnt"] or 0
+            stats["maintenance_dorms"] = row["maint_cnt"] or 0
+        return stats
+
+    def get_owner_occupancy_summary(self, owner_id):
         # active occupants (rentals)
         row = self.fetchone("""
             SELECT COUNT(*) AS cnt
@@ -119,47 +531,36 @@ class DatabaseManager:
             WHERE d.owner_id=%s
               AND rr.status IN ('ACTIVE','EXTENDED','ENDING')
         """, (owner_id,))
-        stats["current_occupants"] = row["cnt"] if row else 0
+        occupants = row["cnt"] if row else 0
+
+        cap_row = self.fetchone("""
+            SELECT COALESCE(SUM(capacity),0) AS cap
+            FROM rooms r JOIN dorms d ON r.dorm_id=d.dorm_id
+            WHERE d.owner_id=%s
+        """, (owner_id,))
+        total_capacity = cap_row["cap"] if cap_row and cap_row["cap"] else 1
+        return {
+            "current_occupants": occupants,
+            "occupancy_rate": int((occupants / total_capacity) * 100),
+        }
 
+    def get_owner_pending_count(self, owner_id):
         row = self.fetchone("""
             SELECT COUNT(*) AS cnt
             FROM rental_applications ra
             JOIN dorms d ON ra.dorm_id=d.dorm_id
             WHERE d.owner_id=%s AND ra.action_status='WAITING'
         """, (owner_id,))
-        stats["pending_requests"] = row["cnt"] if row else 0
+        return {"pending_requests": row["cnt"] if row else 0}
 
+    def get_owner_month_earnings(self, owner_id):
         now = datetime.now()
         row = self.fetchone("""
-            SELECT COALESCE(SUM(amount),0) AS total
-            FROM transactions
-            WHERE owner_id=%s AND status='PAID'
-              AND MONTH(transaction_date)=%s
-              AND YEAR(transaction_date)=%s
-        """, (owner_id, now.month, now.year))
-        stats["monthly_earnings"] = float(row["total"]) if row else 0
-
-        row = self.fetchone("""
-            SELECT
-              SUM(CASE WHEN status='OPEN' THEN 1 ELSE 0 END) AS active_cnt,
-              SUM(CASE WHEN status='UNDER_MAINTENANCE' THEN 1 ELSE 0 END) AS maint_cnt
-            FROM dorms
-            WHERE owner_id=%s
-        """, (owner_id,))
-        if row:
-            stats["active_dorms"] = row["active_cnt"] or 0
-            stats["maintenance_dorms"] = row["maint_cnt"] or 0
-
-        cap_row = self.fetchone("""
-            SELECT COALESCE(SUM(capacity),0) AS cap
-            FROM rooms r JOIN dorms d ON r.dorm_id=d.dorm_id
-            WHERE d.owner_id=%s
-        """, (owner_id,))
-        total_capacity = cap_row["cap"] if cap_row and cap_row["cap"] else 1
-        if total_capacity > 0:
-            stats["occupancy_rate"] = int((stats["current_occupants"] / total_capacity) * 100)
-
-        return stats
+            SELECT paid_total AS total
+            FROM owner_revenue_monthly
+            WHERE owner_id=%s AND revenue_year=%s AND revenue_month=%s
+        """, (owner_id, now.year, now.month))
+        return {"monthly_earnings": float(row["total"]) if row else 0}
 
     def get_recent_reservations(self, owner_id, limit=5):
         sql = """
@@ -204,10 +605,12 @@ class DatabaseManager:
             WHERE dorm_id=%s
         """
         self.execute(sql, (name, address, dorm_type, status, dorm_id))
+        self.invalidate_dorm(dorm_id)
         return True
 
     def delete_property(self, dorm_id):
         self.execute("DELETE FROM dorms WHERE dorm_id=%s", (dorm_id,))
+        self.invalidate_dorm(dorm_id)
         return True
 
     def get_available_rooms_host(self, owner_id):
@@ -235,9 +638,7 @@ class DatabaseManager:
             rr.start_date AS check_in_date,
             rr.end_date AS check_out_date,
             d.dorm_name AS dorm_name,
-            d.dorm_id AS dorm_id             
-        ...
-
+            d.dorm_id AS dorm_id
             FROM rentals rr
             JOIN rooms r ON rr.room_id=r.room_id
             JOIN dorms d ON r.dorm_id=d.dorm_id
@@ -266,6 +667,7 @@ class DatabaseManager:
                 r.room_no AS room_name,
                 r.room_type,
                 ra.submitted_at,
+                ra.expires_at,
                 ra.action_status AS status
             FROM rental_applications ra
             JOIN users u ON ra.tenant_id=u.user_id
@@ -280,11 +682,24 @@ class DatabaseManager:
 
 
     def approve_request(self, application_id):
-        self.execute("""
-            UPDATE rental_applications
-            SET action_status='APPROVED', reviewed_at=NOW()
-            WHERE application_id=%s
-        """, (application_id,))
+        """
+        Approves a WAITING application while its hold lasts. Returns False
+        if it was already reviewed or its hold expired (expire_holds gives
+        that bed back, so approving it could overbook the room).
+        """
+        with self.transaction() as cur:
+            cur.execute("""
+                UPDATE rental_applications
+                SET action_status='APPROVED', reviewed_at=NOW()
+                WHERE application_id=%s
+                AND action_status='WAITING'
+                AND (expires_at IS NULL OR expires_at > NOW())
+            """, (application_id,))
+            approved = cur.rowcount == 1
+        if not approved:
+            return False
+        self.invalidate_student()
+        occupancy_index.invalidate()
 
         row = self.fetchone("""
             SELECT
@@ -318,69 +733,202 @@ class DatabaseManager:
 
         return True
 
+    def reject_request(self, application_id, note=None):
+        """
+        Rejects a WAITING application and gives its bed back, to the room's
+        first waiter if there is one. Returns False if it was no longer WAITING.
+        """
+        promoted, room_ids = [], []
+        with self.transaction() as cur:
+            cur.execute("""
+                UPDATE rental_applications
+                SET action_status='REJECTED', reviewed_at=NOW(), review_note=%s
+                WHERE application_id=%s AND action_status='WAITING'
+            """, (note or None, application_id))
+            if cur.rowcount == 1:
+                cur.execute("SELECT room_id FROM rental_applications WHERE application_id=%s",
+                            (application_id,))
+                room_ids = [cur.fetchone()["room_id"]]
+                promoted = self._release_beds(cur, room_ids[0], 1)
+        if not room_ids:
+            return False
+        self._after_release(room_ids, promoted)
+        self.invalidate_student()
+        return True
+
 
 
-    def get_recommended_rooms(self, limit=5):
+    def get_recommended_rooms(self, limit=5, tenant_id=None):
+        """
+        Available rooms to suggest. With a tenant_id, the rooms most similar
+        to the ones the tenant applied for and recently viewed, best first
+        (see recommender.py); random rooms otherwise, or when the tenant has
+        no history yet.
+        """
+        if tenant_id is not None:
+            rooms = self._recommend_from_history(self._tenant_history(tenant_id), limit)
+            if rooms:
+                return rooms
+
         sql = """
             SELECT r.room_id, d.dorm_name AS property_name, d.location_text AS address,
-                r.room_no AS room_name, r.capacity, r.price_monthly, r.room_type
+                r.room_no AS room_name, r.capacity, r.price_monthly, r.room_type,
+                d.latitude, d.longitude
             FROM rooms r
             JOIN dorms d ON r.dorm_id=d.dorm_id
             WHERE r.is_available=1 AND d.status='OPEN'
             ORDER BY RAND()
             LIMIT %s
         """
-        rooms = self.fetchall(sql, (limit,))
+        rooms = geo.attach_distances(self.fetchall(sql, (limit,)), key="distance_meters")
 
         for room in rooms:
-            room["distance_meters"] = room.get("distance_meters") or room.get("distance") or None
             room["price"] = room.get("price_monthly")
             room["name"] = f"{room['property_name']} - {room['room_name']}"
 
-        return rooms  
+        return rooms
 
-    def get_nearby_rooms(self, limit=5):
-        sql = """
-            SELECT r.room_id, d.dorm_name AS property_name, d.location_text AS address,
-                r.room_no AS room_name, r.capacity, r.price_monthly, r.room_type
-            FROM rooms r
-            JOIN dorms d ON r.dorm_id=d.dorm_id
-            WHERE r.is_available=1 AND d.status='OPEN'
-            ORDER BY d.created_at DESC
-            LIMIT %s
+    def _tenant_history(self, tenant_id):
+        """[(room_id, weight)] of the tenant's applications and recent views."""
+        applications = "SELECT room_id, %s AS weight FROM rental_applications WHERE tenant_id=%s"
+        views = """
+            SELECT room_id, %s AS weight FROM (
+                SELECT room_id FROM recently_viewed WHERE user_id=%s
+                ORDER BY viewed_at DESC LIMIT %s
+            ) v
         """
-        rooms = self.fetchall(sql, (limit,))
+        rows = self.fetchall(applications + " UNION ALL " + views,
+                             (APPLICATION_WEIGHT, tenant_id, VIEW_WEIGHT, tenant_id, HISTORY_VIEWS))
+        return [(r["room_id"], float(r["weight"])) for r in rows]
 
+    def _recommend_from_history(self, history, limit):
+        if not history or limit <= 0:
+            return []
+        found, scores = room_features.recommend(self, history, limit)
+        rooms = []
+        for (room_id, dorm_name, address, room_no, capacity, price, room_type, distance), score in zip(found, scores):
+            rooms.append({
+                "room_id": room_id,
+                "property_name": dorm_name,
+                "address": address,
+                "room_name": room_no,
+                "capacity": capacity,
+                "price_monthly": price,
+                "room_type": room_type,
+                "distance_meters": distance,
+                "price": price,
+                "name": f"{dorm_name} - {room_no}",
+                "score": score,
+            })
+        return rooms
+
+    def get_nearby_rooms(self, limit=5):
+        """The `limit` available rooms nearest to campus."""
+        rooms = self.get_nearest_rooms(limit=limit)
         for room in rooms:
-            room["distance_meters"] = room.get("distance_meters") or room.get("distance") or None
-            room["price"] = room.get("price_monthly")
-            room["name"] = f"{room['property_name']} - {room['room_name']}"
+            room["distance_meters"] = room["distance"]
+        return rooms
 
-        return rooms 
+    def get_nearest_rooms(self, lat=None, lon=None, limit=20, offset=0, search_text="",
+                          capacity_filter="Any", amenity_ids=(), max_radius_m=geo.MAX_RADIUS_M):
+        """
+        Available rooms nearest to (lat, lon) -- the campus by default --
+        nearest first, each with "distance" in metres. Page with offset.
 
-    def get_all_rooms(self, search_text="", capacity_filter="Any"):
-        sql = """
-            SELECT
-              r.room_id,
-              d.dorm_id,                 
-              d.owner_id AS host_id,    
-              d.dorm_name AS property_name,
-              d.location_text AS address,
-              r.room_no AS room_name,
-              r.capacity,
-              r.price_monthly AS price_monthly,
-              r.room_type,
-              u.fullname AS host_name,
-              u.contact_no AS phone,
-              u.email,
-              op.facebook_link,
-              op.messenger_link
-            FROM rooms r
-            JOIN dorms d ON r.dorm_id=d.dorm_id
-            JOIN users u ON d.owner_id=u.user_id
-            LEFT JOIN owner_profiles op ON op.owner_id=u.user_id
-            WHERE r.is_available=1 AND d.status='OPEN'
+        Candidates come from a bounding-box query on idx_dorms_lat_lon that
+        widens until offset+limit rooms lie inside the search radius, so
+        the page is the true nearest one; distances are exact (haversine).
+        Rooms of dorms without coordinates are never returned.
+        """
+        lat = geo.CAMPUS_LAT if lat is None else lat
+        lon = geo.CAMPUS_LON if lon is None else lon
+        filters, filter_params = self._room_filters(search_text, capacity_filter)
+        wanted = offset + limit
+
+        radius = geo.START_RADIUS_M
+        while True:
+            min_lat, max_lat, min_lon, max_lon = geo.bounding_box(lat, lon, radius)
+            rows = self.fetchall(ROOM_SEARCH_SQL + """
+                AND d.latitude BETWEEN %s AND %s
+                AND d.longitude BETWEEN %s AND %s
+            """ + filters, (min_lat, max_lat, min_lon, max_lon) + filter_params)
+            rows = AmenityIndex(rows).filter(amenity_ids)
+            dist = geo.haversine_m(lat, lon, [r["latitude"] for r in rows], [r["longitude"] for r in rows])
+            inside = dist <= radius
+            if inside.sum() >= wanted or radius >= max_radius_m:
+                break
+            radius = min(radius * 4, max_radius_m)
+
+        rows = [r for r, keep in zip(rows, inside) if keep]
+        dist = dist[inside]
+        order = geo.nearest_order(dist, wanted)[offset:]
+
+        rooms = []
+        for i in order:
+            room = rows[i]
+            room["distance"] = int(round(dist[i]))
+            rooms.append(room)
+        return self._finish_room_rows(rooms)
+
+    def get_all_rooms(self, search_text="", capacity_filter="Any", amenity_ids=()):
+        """
+        Available rooms matching the search box, capacity and (all of)
+        amenity_ids. Each row carries "amenities" labels and "distance".
+        """
+        filters, params = self._room_filters(search_text, capacity_filter)
+        rooms = AmenityIndex(self.fetchall(ROOM_SEARCH_SQL + filters, params)).filter(amenity_ids)
+        return self._finish_room_rows(geo.attach_distances(rooms))
+
+    def get_rooms_free_between(self, date_from, date_to, search_text="", capacity_filter="Any", amenity_ids=()):
         """
+        Like get_all_rooms, but for a stay: rooms with a bed free on every
+        day from date_from to date_to (inclusive), counting ongoing rentals
+        and live holds (see availability.py). A room full today can still
+        match if its tenants move out before date_from.
+        """
+        free = occupancy_index.free_rooms(self, date_from, date_to)
+        if not len(free):
+            return []
+        filters, params = self._room_filters(search_text, capacity_filter)
+        rows = self.fetchall(ROOM_CALENDAR_SQL + filters, params)
+        keep = set(free.tolist())
+        rooms = AmenityIndex([r for r in rows if r["room_id"] in keep]).filter(amenity_ids)
+        return self._finish_room_rows(geo.attach_distances(rooms))
+
+    def get_room_facets(self, search_text="", capacity_filter="Any", amenity_ids=(),
+                        date_from=None, date_to=None):
+        """
+        Counts per capacity bucket, price band, dorm type and amenity for the
+        rooms get_all_rooms would consider (see facets.compute_facets), or
+        with date_from/date_to, the rooms get_rooms_free_between would.
+
+        The matching rows are fetched once per search text (and stay); changing
+        the capacity or amenity filters only recounts them in memory. Both are
+        cached for ROOM_FACETS_TTL seconds.
+        """
+        amenity_ids = tuple(sorted(set(amenity_ids)))
+        stay = (date_from, date_to) if date_from is not None else ()
+
+        def load_rows():
+            filters, params = self._room_filters(search_text)
+            if not stay:
+                return self.fetchall(ROOM_FACET_SQL + filters, params)
+            free = set(occupancy_index.free_rooms(self, date_from, date_to).tolist())
+            return [r for r in self.fetchall(ROOM_CALENDAR_FACET_SQL + filters, params) if r["room_id"] in free]
+
+        def load():
+            rows = self.cache.get_or_load(("room_facet_rows", search_text, *stay), load_rows, ttl=ROOM_FACETS_TTL)
+            all_ids = [a["amenity_id"] for a in self.get_amenities()]
+            return compute_facets(rows, capacity_filter, amenity_ids, all_ids)
+
+        facets = self.cache.get_or_load(
+            ("room_facets", search_text, capacity_filter, amenity_ids, *stay), load, ttl=ROOM_FACETS_TTL
+        )
+        return {k: (dict(v) if isinstance(v, dict) else v) for k, v in facets.items()}
+
+    def _room_filters(self, search_text="", capacity_filter="Any"):
+        """SQL (starting with AND) and params for the room search box filters."""
+        sql = ""
         params = []
 
         if search_text:
@@ -395,15 +943,121 @@ class DatabaseManager:
                 sql += " AND r.capacity = %s"
                 params.append(int(capacity_filter))
 
-        rooms = self.fetchall(sql, tuple(params))
+        return sql, tuple(params)
 
+    def _finish_room_rows(self, rooms):
+        contacts = self.get_host_contacts({room["host_id"] for room in rooms})
+        labels = {}
+        if any(room.get("amenity_mask") for room in rooms):
+            labels = {a["amenity_id"]: a["label"] for a in self.get_amenities()}
         for room in rooms:
+            room["amenities"] = mask_labels(room.get("amenity_mask"), labels)
             room["name"] = f"{room['property_name']} - {room['room_name']}"
-            room["distance"] = None  
             room["price"] = room["price_monthly"]
+            room.update(contacts.get(room["host_id"]) or {})
 
         return rooms
 
+    # ---------------- Cached reference data ----------------
+
+    def get_host_contacts(self, owner_ids):
+        """
+        Host contact cards keyed by owner_id. Cached cards are served from
+        memory; the rest are loaded in one query and cached.
+        """
+        contacts = {}
+        missing = []
+        for owner_id in owner_ids:
+            card = self.cache.get(("host_contact", owner_id))
+            if card is None:
+                missing.append(owner_id)
+            else:
+                contacts[owner_id] = card
+
+        if missing:
+            placeholders = ",".join(["%s"] * len(missing))
+            rows = self.fetchall(f"""
+                SELECT u.user_id AS host_id,
+                       u.fullname AS host_name,
+                       u.contact_no AS phone,
+                       u.email,
+                       op.facebook_link,
+                       op.messenger_link
+                FROM users u
+                LEFT JOIN owner_profiles op ON op.owner_id=u.user_id
+                WHERE u.user_id IN ({placeholders})
+            """, tuple(missing))
+            for row in rows:
+                host_id = row.pop("host_id")
+                self.cache.set(("host_contact", host_id), row)
+                contacts[host_id] = row
+
+        return {k: dict(v) for k, v in contacts.items()}
+
+    def get_amenities(self):
+        """All amenities as [{amenity_id, label}], ordered by amenity_id."""
+        rows = self.cache.get_or_load(("amenities",), lambda: self.fetchall(
+            "SELECT amenity_id, label FROM amenities ORDER BY amenity_id"
+        ))
+        return [dict(r) for r in rows]
+
+    def invalidate_host(self, owner_id):
+        self.cache.invalidate(("host_contact", owner_id))
+
+    def invalidate_dorm(self, dorm_id):
+        self.cache.invalidate(("dorm_main_image", dorm_id))
+        room_features.mark_dorm_dirty(dorm_id)
+        occupancy_index.invalidate()
+
+    def invalidate_room_facets(self):
+        self.cache.invalidate_prefix("room_facets")
+        self.cache.invalidate_prefix("room_facet_rows")
+
+    def invalidate_room_amenities(self, room_id=None):
+        self.invalidate_room_facets()
+        if room_id is None:
+            self.cache.invalidate_prefix("room_amenities")
+            room_features.invalidate()
+        else:
+            self.cache.invalidate(("room_amenities", room_id))
+            room_features.mark_rooms_dirty([room_id])
+
+    def rebuild_amenity_masks(self, room_id=None):
+        """Recomputes rooms.amenity_mask from room_amenities (one room or all)."""
+        sql = """
+            UPDATE rooms SET amenity_mask = (
+                SELECT COALESCE(SUM(1 << (ra.amenity_id - 1)), 0)
+                FROM room_amenities ra
+                WHERE ra.room_id = rooms.room_id AND ra.amenity_id BETWEEN 1 AND %s
+            )
+        """
+        if room_id is None:
+            count = self.execute_count(sql, (MAX_AMENITY_ID,))
+        else:
+            count = self.execute_count(sql + " WHERE room_id = %s", (MAX_AMENITY_ID, room_id))
+        self.invalidate_room_amenities(room_id)
+        return count
+
+    def set_room_amenities(self, room_id, amenity_ids):
+        """
+        Replaces a room's amenities, keeping amenity_mask in step. Raises
+        ValueError, before changing anything, for an id past MAX_AMENITY_ID.
+        """
+        amenity_ids = sorted(set(amenity_ids))
+        mask = amenity_mask(amenity_ids)
+        self.execute("DELETE FROM room_amenities WHERE room_id=%s", (room_id,))
+        if amenity_ids:
+            self.execute_many(
+                "INSERT INTO room_amenities (room_id, amenity_id) VALUES (%s, %s)",
+                [(room_id, aid) for aid in amenity_ids]
+            )
+        self.execute("UPDATE rooms SET amenity_mask=%s WHERE room_id=%s", (mask, room_id))
+        self.invalidate_room_amenities(room_id)
+
+    def invalidate_amenities(self):
+        self.cache.invalidate(("amenities",))
+        self.invalidate_room_amenities()
+
     # ---------------- Reservations Window ----------------
 
     def get_user_reservations(self, tenant_id):
@@ -451,10 +1105,6 @@ class DatabaseManager:
         return self.fetchall(sql, (tenant_id,))
 
     def get_recently_viewed(self, tenant_id):
-        """
-        Safe recently viewed:
-        - If table doesn't exist yet, return empty list instead of crashing.
-        """
         sql = """
             SELECT rv.room_id, rv.viewed_at,
                 r.room_no AS room_name, d.dorm_name AS property_name
@@ -462,15 +1112,40 @@ class DatabaseManager:
             JOIN rooms r ON rv.room_id=r.room_id
             JOIN dorms d ON r.dorm_id=d.dorm_id
             WHERE rv.user_id=%s
-            ORDER BY rv.viewed_at DESC LIMIT 5
+            ORDER BY rv.viewed_at DESC LIMIT %s
         """
-        try:
-            return self.fetchall(sql, (tenant_id,))
-        except Exception as e:
-            # Table doesn't exist yet -> return no items instead of error
-            if "recently_viewed" in str(e):
-                return []
-            raise
+        return self.fetchall(sql, (tenant_id, RECENT_VIEWS_SHOWN))
+
+    def record_room_views(self, views, keep=20):
+        """
+        Upserts (user_id, room_id, viewed_at) views into recently_viewed in
+        one batch, then drops all but each user's `keep` newest views.
+        Called by view_tracker's flusher, not from the GUI.
+        """
+        views = list(views)
+        if not views:
+            return 0
+        count = self.execute_many("""
+            INSERT INTO recently_viewed(user_id, room_id, viewed_at) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE viewed_at=VALUES(viewed_at)
+        """, views)
+
+        users = sorted({user_id for user_id, _, _ in views})
+        self.execute_many("""
+            DELETE FROM recently_viewed
+            WHERE user_id=%s AND room_id NOT IN (
+                SELECT room_id FROM (
+                    SELECT room_id FROM recently_viewed
+                    WHERE user_id=%s
+                    ORDER BY viewed_at DESC, room_id DESC
+                    LIMIT %s
+                ) newest
+            )
+        """, [(user_id, user_id, keep) for user_id in users])
+
+        for user_id in users:
+            self.invalidate_student(user_id)
+        return count
 
 
     # =========================================================
@@ -487,12 +1162,66 @@ class DatabaseManager:
         tenant_phone=None,
         tenant_gender=None
     ):
-        app_id = self.execute("""
-            INSERT INTO rental_applications(tenant_id, dorm_id, room_id)
-            VALUES (%s,%s,%s)
-        """, (tenant_id, dorm_id, room_id))
+        """reserve_room() that returns only the application_id (None if not booked)."""
+        result = self.reserve_room(
+            tenant_id, dorm_id, room_id, notes,
+            tenant_fullname, tenant_email, tenant_phone, tenant_gender
+        )
+        return result["application_id"]
 
-        self.execute("""
+    def reserve_room(
+        self,
+        tenant_id,
+        dorm_id,
+        room_id,
+        notes=None,
+        tenant_fullname=None,
+        tenant_email=None,
+        tenant_phone=None,
+        tenant_gender=None
+    ):
+        """
+        Applies for a bed in a room, in one transaction:
+        - locks the tenant's users row, so their own submits run one at a time
+        - refuses if they already have an ongoing rental or waiting application
+        - claims a bed with a conditional UPDATE on rooms.occupied_beds
+        - inserts the application (held for HOLD_TTL_HOURS) and its details
+
+        Returns {"status": BOOKED | ROOM_FULL | ALREADY_RESERVED | BOOKING_FAILED,
+        "application_id": id or None}. Two applicants can never get the last bed.
+        """
+        details = (notes, tenant_fullname, tenant_email, tenant_phone, tenant_gender)
+        try:
+            with self.transaction() as cur:
+                cur.execute("SELECT user_id FROM users WHERE user_id=%s FOR UPDATE", (tenant_id,))
+                cur.fetchall()
+                status, app_id = self._book(cur, tenant_id, dorm_id, room_id, details)
+        except (ConnectionError, *self.backend.errors) as e:
+            logger.error("Booking room %s for tenant %s failed: %s", room_id, tenant_id, e)
+            return {"status": BOOKING_FAILED, "application_id": None}
+
+        if status == BOOKED:
+            self.invalidate_student(tenant_id)
+            self._room_beds_changed(room_id)
+        return {"status": status, "application_id": app_id}
+
+    def _book(self, cur, tenant_id, dorm_id, room_id, details=(None,) * 5):
+        """reserve_room() inside an open transaction. Returns (status, application_id)."""
+        cur.execute(ACTIVE_RESERVATION_SQL, (tenant_id, tenant_id))
+        if cur.fetchall():
+            return ALREADY_RESERVED, None
+
+        cur.execute(CLAIM_BED_SQL, (room_id,))
+        if cur.rowcount != 1:
+            return ROOM_FULL, None
+
+        cur.execute("""
+            INSERT INTO rental_applications(tenant_id, dorm_id, room_id, expires_at)
+            VALUES (%s,%s,%s, DATE_ADD(NOW(), INTERVAL %s HOUR))
+        """, (tenant_id, dorm_id, room_id, HOLD_TTL_HOURS))
+        app_id = cur.lastrowid
+
+        cur.execute("""
             INSERT INTO application_details(
                 application_id,
                 additional_notes,
@@ -502,16 +1231,172 @@ class DatabaseManager:
                 tenant_gender
             )
             VALUES (%s,%s,%s,%s,%s,%s)
-        """, (
-            app_id,
-            notes,
-            tenant_fullname,
-            tenant_email,
-            tenant_phone,
-            tenant_gender
-        ))
+        """, (app_id, *details))
+        return BOOKED, app_id
+
+    def _release_beds(self, cur, room_id, beds):
+        """
+        Gives back beds claimed by reserve_room() and hands them to the
+        room's first waiters. Only call it in the same transaction as the
+        status change (cancel, reject, expiry) that frees the bed.
+        """
+        cur.execute(RELEASE_BEDS_SQL, (beds, room_id))
+        return self._promote_waiters(cur, room_id, beds)
 
-        return app_id
+    def _after_release(self, room_ids, promoted):
+        for tenant_id, _ in promoted:
+            self.invalidate_student(tenant_id)
+        if room_ids:
+            room_features.mark_rooms_dirty(room_ids)
+            occupancy_index.invalidate()
+            self.invalidate_room_facets()
+
+    # ----- WAITLIST -----
+
+    def join_waitlist(self, tenant_id, room_id):
+        """
+        Queues the tenant for a full room. Returns {"status": WAITLISTED |
+        ALREADY_WAITLISTED | ALREADY_RESERVED | ROOM_HAS_BEDS | BOOKING_FAILED,
+        "position": n or None}; like reserve_room(), a tenant who already holds
+        a bed gets ALREADY_RESERVED.
+        """
+        try:
+            with self.transaction() as cur:
+                cur.execute("SELECT user_id FROM users WHERE user_id=%s FOR UPDATE", (tenant_id,))
+                cur.fetchall()
+                cur.execute(ACTIVE_RESERVATION_SQL, (tenant_id, tenant_id))
+                if cur.fetchall():
+                    return {"status": ALREADY_RESERVED, "position": None}
+                cur.execute("SELECT 1 FROM rooms WHERE room_id=%s AND occupied_beds < capacity", (room_id,))
+                if cur.fetchall():
+                    return {"status": ROOM_HAS_BEDS, "position": None}
+                cur.execute("""
+                    SELECT waitlist_id FROM room_waitlist
+                    WHERE room_id=%s AND tenant_id=%s AND status='WAITING'
+                """, (room_id, tenant_id))
+                mine = cur.fetchone()
+                status = ALREADY_WAITLISTED
+                if not mine:
+                    cur.execute("""
+                        INSERT INTO room_waitlist(room_id, tenant_id, status, joined_at)
+                        VALUES (%s, %s, 'WAITING', NOW())
+                    """, (room_id, tenant_id))
+                    status = WAITLISTED
+        except (ConnectionError, *self.backend.errors) as e:
+            logger.error("Waitlisting tenant %s for room %s failed: %s", tenant_id, room_id, e)
+            return {"status": BOOKING_FAILED, "position": None}
+        return {"status": status, "position": self.get_waitlist_position(tenant_id, room_id)}
+
+    def leave_waitlist(self, tenant_id, room_id):
+        return self.execute_count("""
+            UPDATE room_waitlist SET status='LEFT'
+            WHERE room_id=%s AND tenant_id=%s AND status='WAITING'
+        """, (room_id, tenant_id))
+
+    def get_waitlist_position(self, tenant_id, room_id):
+        """1 for the next waiter to be promoted, None if not waiting."""
+        row = self.fetchone("""
+            SELECT COUNT(*) AS position
+            FROM room_waitlist w
+            JOIN room_waitlist mine
+              ON mine.room_id = w.room_id AND mine.tenant_id=%s AND mine.status='WAITING'
+            WHERE w.room_id=%s AND w.status='WAITING' AND w.waitlist_id <= mine.waitlist_id
+        """, (tenant_id, room_id))
+        return row["position"] if row and row["position"] else None
+
+    def _promote_waiters(self, cur, room_id, beds):
+        """
+        Books freed beds for the room's first waiters, oldest first, inside
+        the caller's transaction. The head row is locked, so concurrent
+        releases promote different waiters. Returns [(tenant_id, application_id)].
+        """
+        promoted = []
+        while len(promoted) < beds:
+            cur.execute(WAITLIST_HEAD_SQL, (room_id,))
+            head = cur.fetchone()
+            if not head:
+                break
+            status, app_id = self._book(cur, head["tenant_id"], head["dorm_id"], room_id)
+            if status == ROOM_FULL:
+                break
+            if status == ALREADY_RESERVED:
+                cur.execute("UPDATE room_waitlist SET status='SKIPPED' WHERE waitlist_id=%s",
+                            (head["waitlist_id"],))
+                continue
+            cur.execute("""
+                UPDATE room_waitlist
+                SET status='PROMOTED', promoted_at=NOW(), application_id=%s
+                WHERE waitlist_id=%s
+            """, (app_id, head["waitlist_id"]))
+            # one bed at a time: drop their places in other queues
+            cur.execute("""
+                UPDATE room_waitlist SET status='LEFT'
+                WHERE tenant_id=%s AND status='WAITING'
+            """, (head["tenant_id"],))
+            promoted.append((head["tenant_id"], app_id))
+        return promoted
+
+    def recount_occupied_beds(self):
+        """
+        Recomputes rooms.occupied_beds from ongoing rentals plus waiting (or
+        approved, not yet rented) applications.
+        """
+        count = self.execute_count(RECOUNT_BEDS_SQL)
+        self.execute("UPDATE rooms SET is_available=0 WHERE occupied_beds >= capacity")
+        room_features.invalidate()
+        occupancy_index.invalidate()
+        self.invalidate_room_facets()
+        return count
+
+    def expire_holds(self, batch_size=200, max_batches=None):
+        """
+        Marks WAITING applications past expires_at as EXPIRED and gives
+        their beds back (to waiters first). Each batch is one short transaction that skips rows
+        another sweeper has locked. Returns (rows_expired, batches_run).
+        """
+        total = 0
+        batches = 0
+        tenants, rooms = set(), set()
+        promoted = []
+        while max_batches is None or batches < max_batches:
+            with self.transaction() as cur:
+                cur.execute("""
+                    SELECT application_id, tenant_id, room_id
+                    FROM rental_applications
+                    WHERE action_status='WAITING' AND expires_at <= NOW()
+                    ORDER BY expires_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                """, (batch_size,))
+                rows = cur.fetchall()
+                if rows:
+                    marks = ",".join(["%s"] * len(rows))
+                    cur.execute(
+                        f"UPDATE rental_applications SET action_status=%s "
+                        f"WHERE application_id IN ({marks}) AND action_status='WAITING'",
+                        (EXPIRED, *[r["application_id"] for r in rows])
+                    )
+                    freed = {}
+                    for r in rows:
+                        freed[r["room_id"]] = freed.get(r["room_id"], 0) + 1
+                    for room_id, beds in freed.items():
+                        promoted += self._release_beds(cur, room_id, beds)
+            batches += 1
+            total += len(rows)
+            tenants.update(r["tenant_id"] for r in rows)
+            rooms.update(r["room_id"] for r in rows)
+            if len(rows) < batch_size:
+                break
+
+        for tenant_id in tenants:
+            self.invalidate_student(tenant_id)
+        self._after_release(sorted(rooms), promoted)
+        return total, batches
+
+    def _room_beds_changed(self, room_id):
+        room_features.mark_rooms_dirty([room_id])
+        occupancy_index.invalidate()
+        self.invalidate_room_facets()
 
 
     # =========================================================
@@ -523,38 +1408,223 @@ class DatabaseManager:
             INSERT INTO payments (rental_id, due_date, amount_due, amount_paid, status)
             VALUES (%s, %s, %s, 0, 'PENDING')
         """
-        return self.execute(sql, (rental_id, due_date, amount_due))
-
-
+        with self.transaction() as cur:
+            cur.execute(sql, (rental_id, due_date, amount_due))
+            payment_id = cur.lastrowid
+            cur.execute(RENTAL_DUES_SQL, (rental_id,))
+        self.invalidate_student()
+        return payment_id
 
     def mark_payment_paid(self, payment_id, amount_paid=None):
-        if amount_paid is None:
-            row = self.fetchone(
-                "SELECT amount_due FROM payments WHERE payment_id=%s",
+        with self.transaction() as cur:
+            cur.execute(
+                "SELECT rental_id, amount_due FROM payments WHERE payment_id=%s FOR UPDATE",
                 (payment_id,)
             )
-            amount_paid = row["amount_due"] if row else 0
-
-        self.execute("""
-            UPDATE payments
-            SET amount_paid=%s,
-                status='PAID',
-                paid_at=NOW()
-            WHERE payment_id=%s
-        """, (amount_paid, payment_id))
-
+            row = cur.fetchone()
+            if not row:
+                return True
+            if amount_paid is None:
+                amount_paid = row["amount_due"]
+
+            cur.execute("""
+                UPDATE payments
+                SET amount_paid=%s,
+                    status='PAID',
+                    paid_at=NOW()
+                WHERE payment_id=%s
+            """, (amount_paid, payment_id))
+            cur.execute(RENTAL_DUES_SQL, (row["rental_id"],))
+        self.invalidate_student()
         return True
 
-    
-    def mark_overdue_payments(self):
+    def mark_overdue_payments(self, batch_size=500, max_batches=None):
+        """
+        Flags unpaid payments past their due date as OVERDUE.
+        Runs in LIMIT-sized batches (one short commit each) over the
+        (status, due_date) index so no single UPDATE holds locks for long.
+        The rentals dues rollup needs no update: an OVERDUE payment is
+        still unpaid, and a rental is overdue when next_due_date < today.
+        Returns (rows_updated, batches_run).
+        """
         sql = """
             UPDATE payments
             SET status = 'OVERDUE'
-            WHERE due_date < CURDATE()
-            AND status = 'DUE'
+            WHERE status IN ('PENDING','DUE')
+            AND due_date < CURDATE()
+            ORDER BY due_date
+            LIMIT %s
+        """
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.execute_count(sql, (batch_size,))
+            batches += 1
+            total += max(count, 0)
+            if count < batch_size:
+                break
+        return total, batches
+
+    def generate_monthly_payments(self, lead_days=7, batch_size=200):
+        """
+        Billing run: for every ongoing rental whose latest payment falls due
+        within `lead_days`, creates the next monthly payment (+30 days).
+        Walks rentals by rental_id in batches. Returns (rows_created, batches_run).
+        """
+        sql = """
+            SELECT rr.rental_id, rr.end_date, r.price_monthly,
+                   MAX(p.due_date) AS last_due
+            FROM rentals rr
+            JOIN rooms r ON rr.room_id = r.room_id
+            JOIN payments p ON p.rental_id = rr.rental_id
+            WHERE rr.status IN ('ACTIVE','EXTENDED')
+              AND rr.rental_id > %s
+            GROUP BY rr.rental_id, rr.end_date, r.price_monthly
+            HAVING MAX(p.due_date) <= DATE_ADD(CURDATE(), INTERVAL %s DAY)
+            ORDER BY rr.rental_id
+            LIMIT %s
+        """
+        insert_sql = """
+            INSERT INTO payments (rental_id, due_date, amount_due, amount_paid, status)
+            VALUES (%s, %s, %s, 0, 'PENDING')
+        """
+        total = 0
+        batches = 0
+        last_id = 0
+        while True:
+            rows = self.fetchall(sql, (last_id, lead_days, batch_size))
+            if not rows:
+                break
+            batches += 1
+            last_id = rows[-1]["rental_id"]
+
+            new_payments = []
+            for row in rows:
+                next_due = row["last_due"] + timedelta(days=30)
+                if row["end_date"] and next_due > row["end_date"]:
+                    continue
+                new_payments.append((row["rental_id"], next_due, row["price_monthly"]))
+
+            total += len(new_payments)
+            if new_payments:
+                with self.transaction() as cur:
+                    cur.executemany(insert_sql, new_payments)
+                    cur.executemany(RENTAL_DUES_SQL, [(p[0],) for p in new_payments])
+
+            if len(rows) < batch_size:
+                break
+        if total:
+            self.invalidate_student()
+        return total, batches
+
+    def reconcile_rental_balances(self, batch_size=500, fix=True):
+        """
+        Checks rentals.balance_due / next_due_date / last_paid_at against
+        the payments ledger, walking rentals by rental_id in batches, and
+        (with fix) recomputes the rows that drifted. Drift means a write
+        bypassed DatabaseManager, so each one is logged.
+        Returns (rentals_mismatched, batches_run).
+        """
+        mismatched = 0
+        batches = 0
+        last_id = 0
+        while True:
+            rows = self.fetchall(RENTAL_LEDGER_SQL, (last_id, batch_size))
+            if not rows:
+                break
+            batches += 1
+            last_id = rows[-1]["rental_id"]
+
+            bad = [r for r in rows if not _dues_match(r)]
+            for r in bad:
+                logger.warning(
+                    "Rental %s dues drifted: balance %s/%s, next due %s/%s, last paid %s/%s (stored/ledger)",
+                    r["rental_id"], r["balance_due"], r["ledger_balance"], r["next_due_date"],
+                    r["ledger_next_due"], r["last_paid_at"], r["ledger_last_paid"])
+            if bad and fix:
+                self.execute_many(RENTAL_DUES_SQL, [(r["rental_id"],) for r in bad])
+            mismatched += len(bad)
+
+            if len(rows) < batch_size:
+                break
+        if mismatched and fix:
+            self.invalidate_student()
+        return mismatched, batches
+
+    def rebuild_rental_dues(self):
         """
-        self.execute(sql)
-  
+        Recomputes every rental's dues columns from payments in one
+        statement, for bulk loads that write the ledger directly.
+        """
+        count = self.execute_count(RENTAL_DUES_ALL_SQL)
+        self.invalidate_student()
+        return count
+
+    # ---------------- Job runs ----------------
+
+    def record_job_run(self, job_name, started_at, finished_at, batches,
+                       rows_affected, status, error_message=None):
+        duration_ms = int((finished_at - started_at).total_seconds() * 1000)
+        sql = """
+            INSERT INTO job_runs(job_name, started_at, finished_at, duration_ms,
+                                 batches, rows_affected, status, error_message)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+        """
+        return self.execute(sql, (
+            job_name, started_at, finished_at, duration_ms,
+            batches, rows_affected, status, error_message
+        ))
+
+    def acquire_job_lease(self, job_name, holder, seconds):
+        """
+        Claims `job_name` for `holder` for the next `seconds`. Returns False
+        while another holder's lease is still running, so a job scheduled
+        by every client runs on one of them per interval.
+        """
+        self.execute(
+            "INSERT IGNORE INTO job_leases(job_name, holder, lease_until) VALUES (%s, NULL, '1970-01-01')",
+            (job_name,)
+        )
+        return self.execute_count("""
+            UPDATE job_leases
+            SET holder = %s, lease_until = DATE_ADD(NOW(), INTERVAL %s SECOND)
+            WHERE job_name = %s AND (lease_until <= NOW() OR holder = %s)
+        """, (holder, seconds, job_name, holder)) == 1
+
+    def release_job_lease(self, job_name, holder):
+        """Gives the lease up early (a failed run), so another client may retry."""
+        self.execute(
+            "UPDATE job_leases SET lease_until = NOW() WHERE job_name = %s AND holder = %s",
+            (job_name, holder)
+        )
+
+    def get_recent_job_runs(self, limit=20):
+        return self.fetchall("""
+            SELECT job_name, started_at, finished_at, duration_ms,
+                   batches, rows_affected, status, error_message
+            FROM job_runs
+            ORDER BY started_at DESC
+            LIMIT %s
+        """, (limit,))
+
+    def purge_job_runs(self, keep_days=30, batch_size=1000):
+        """Deletes old job_runs rows in batches. Returns (rows_deleted, batches_run)."""
+        sql = """
+            DELETE FROM job_runs
+            WHERE started_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+            ORDER BY started_at
+            LIMIT %s
+        """
+        total = 0
+        batches = 0
+        while True:
+            count = self.execute_count(sql, (keep_days, batch_size))
+            batches += 1
+            total += max(count, 0)
+            if count < batch_size:
+                break
+        return total, batches
+
     def get_current_occupants(self, owner_id, search_text=""):
         sql = """
             SELECT
@@ -593,10 +1663,10 @@ class DatabaseManager:
 
 
     def get_owner_transaction_years(self, owner_id):
-        """Distinct years with transactions for this owner."""
+        """Distinct years with paid transactions for this owner."""
         rows = self.fetchall("""
-            SELECT DISTINCT YEAR(transaction_date) AS yr
-            FROM transactions
+            SELECT DISTINCT revenue_year AS yr
+            FROM owner_revenue_monthly
             WHERE owner_id=%s
             ORDER BY yr DESC
         """, (owner_id,))
@@ -609,13 +1679,11 @@ class DatabaseManager:
           pending (sum of unpaid dues this month),
           collection_rate (paid/(paid+pending)).
         """
-        # paid from transactions
+        # paid from the monthly revenue rollup
         paid_row = self.fetchone("""
-            SELECT COALESCE(SUM(amount),0) AS total
-            FROM transactions
-            WHERE owner_id=%s AND status='PAID'
-              AND YEAR(transaction_date)=%s
-              AND MONTH(transaction_date)=%s
+            SELECT paid_total AS total
+            FROM owner_revenue_monthly
+            WHERE owner_id=%s AND revenue_year=%s AND revenue_month=%s
         """, (owner_id, year, month))
         paid = float(paid_row["total"]) if paid_row else 0.0
 
@@ -641,12 +1709,9 @@ class DatabaseManager:
     def get_monthly_revenue_series(self, owner_id, year):
         """Map month -> sum(amount) for PAID transactions in that year."""
         rows = self.fetchall("""
-            SELECT MONTH(transaction_date) AS m,
-                   COALESCE(SUM(amount),0) AS total
-            FROM transactions
-            WHERE owner_id=%s AND status='PAID'
-              AND YEAR(transaction_date)=%s
-            GROUP BY MONTH(transaction_date)
+            SELECT revenue_month AS m, paid_total AS total
+            FROM owner_revenue_monthly
+            WHERE owner_id=%s AND revenue_year=%s
             ORDER BY m
         """, (owner_id, year))
         return {r["m"]: float(r["total"]) for r in rows}
@@ -661,10 +1726,10 @@ class DatabaseManager:
             FROM transactions t
             JOIN users u ON t.tenant_id=u.user_id
             WHERE t.owner_id=%s
-              AND YEAR(t.transaction_date)=%s
+              AND t.transaction_date >= %s AND t.transaction_date < %s
             ORDER BY t.transaction_date DESC
             LIMIT %s
-        """, (owner_id, year, limit))
+        """, (owner_id, datetime(year, 1, 1), datetime(year + 1, 1, 1), limit))
 
     # ---------------- Occupancy Chart ----------------
 
@@ -736,7 +1801,9 @@ class DatabaseManager:
         Ends a rental contract:
         - set rentals.status = 'ENDED'
         - set rentals.end_date = today if not already set
-        - set rooms.is_available = 1
+        - give the bed back (rooms.occupied_beds - 1, is_available = 1)
+        - promote the room's first waiter into it
+        all in one transaction.
         """
         # get rental + room info
         rental = self.fetchone("""
@@ -750,18 +1817,17 @@ class DatabaseManager:
 
         room_id = rental["room_id"]
 
-        self.execute("""
-            UPDATE rentals
-            SET status='ENDED',
-                end_date = COALESCE(end_date, CURDATE())
-            WHERE rental_id=%s
-        """, (rental_id,))
-
-        self.execute("""
-            UPDATE rooms
-            SET is_available=1
-            WHERE room_id=%s
-        """, (room_id,))
+        promoted = []
+        with self.transaction() as cur:
+            cur.execute("""
+                UPDATE rentals
+                SET status='ENDED',
+                    end_date = COALESCE(end_date, CURDATE())
+                WHERE rental_id=%s AND status <> 'ENDED'
+            """, (rental_id,))
+            if cur.rowcount == 1:
+                promoted = self._release_beds(cur, room_id, 1)
+        self._after_release([room_id], promoted)
 
         return True
 
@@ -770,19 +1836,46 @@ class DatabaseManager:
         Returns the first image file_path for a dorm, or None if none.
         file_path is stored as a relative path like 'uploads/dorm_images/xxx.jpg'.
         """
-        row = self.fetchone(
-            "SELECT file_path FROM dorm_images WHERE dorm_id=%s LIMIT 1",
-            (dorm_id,)
-        )
-        return row["file_path"] if row else None
+        def load():
+            row = self.fetchone(
+                "SELECT file_path FROM dorm_images WHERE dorm_id=%s LIMIT 1",
+                (dorm_id,)
+            )
+            return row["file_path"] if row else None
+
+        return self.cache.get_or_load(("dorm_main_image", dorm_id), load)
     
-    def submit_payment_request(self, tenant_id, rental_id, amount, proof_path):
-        q = """
-            INSERT INTO payment_requests (tenant_id, rental_id, amount, proof_image)
-            VALUES (%s, %s, %s, %s)
+    def submit_payment_request(self, tenant_id, rental_id, amount, proof_path, period=None):
         """
-        self.execute(q, (tenant_id, rental_id, amount, proof_path))
-        return True
+        Sends a payment proof to the owner for the rental's current billing
+        period (its next_due_date unless `period` is given). Submitting again
+        while that period's request is still pending is a no-op, so a
+        double-click or retry never queues a second request.
+        Returns {"status": PAYMENT_SUBMITTED | PAYMENT_ALREADY_SUBMITTED |
+        PAYMENT_NO_RENTAL, "request_id": id or None}.
+        """
+        with self.transaction() as cur:
+            cur.execute("SELECT next_due_date FROM rentals WHERE rental_id=%s AND tenant_id=%s",
+                        (rental_id, tenant_id))
+            rental = cur.fetchone()
+            if not rental:
+                return {"status": PAYMENT_NO_RENTAL, "request_id": None}
+            period = period or rental["next_due_date"] or date.today().replace(day=1)
+
+            cur.execute(SUBMIT_PAYMENT_SQL, (tenant_id, rental_id, amount, proof_path, period))
+            if cur.rowcount == 1:
+                status, request_id = PAYMENT_SUBMITTED, cur.lastrowid
+            else:
+                cur.execute("""
+                    SELECT request_id FROM payment_requests
+                    WHERE tenant_id=%s AND rental_id=%s AND period=%s AND pending=1
+                """, (tenant_id, rental_id, period))
+                existing = cur.fetchone()
+                status, request_id = PAYMENT_ALREADY_SUBMITTED, existing and existing["request_id"]
+
+        if status == PAYMENT_SUBMITTED:
+            self.invalidate_student(tenant_id)
+        return {"status": status, "request_id": request_id}
 
     def get_pending_payment_requests(self, owner_id):
         q = """
@@ -803,11 +1896,138 @@ class DatabaseManager:
         """
         return self.fetchall(q, (owner_id,))
 
+    # ---------------- Payment posting ----------------
+
+    def review_payment_request(self, request_id, approve=True, remarks=None):
+        """
+        Owner decision on a payment proof. Approving posts it (see
+        post_payment_requests); rejecting keeps the remarks the tenant sees
+        on the Payments window. Returns False if it was no longer pending.
+        """
+        if approve:
+            return self.post_payment_requests([request_id]) == 1
+
+        with self.transaction() as cur:
+            cur.execute("""
+                UPDATE payment_requests
+                SET status='REJECTED', reviewed_at=NOW(), remarks=%s, pending=NULL
+                WHERE request_id=%s AND status='PENDING'
+            """, (remarks, request_id))
+            rejected = cur.rowcount == 1
+        if rejected:
+            self.invalidate_student()
+        return rejected
+
+    def post_payment_requests(self, request_ids):
+        """
+        Approves pending payment requests in one transaction. For each:
+        - its amount pays the rental's unpaid payments, oldest due first
+        - a PAID transactions row is written under the dorm's owner
+        - the owner's month in owner_revenue_monthly goes up by the amount
+        - the rental's dues rollup is recomputed
+        Writes are batched across all the requests. Ids that are not
+        PENDING (already reviewed, or posted by someone else) are skipped.
+        Returns how many requests were posted.
+        """
+        request_ids = sorted(set(request_ids))
+        if not request_ids:
+            return 0
+        now = datetime.now().replace(microsecond=0)
+
+        with self.transaction() as cur:
+            marks = ",".join(["%s"] * len(request_ids))
+            cur.execute(f"""
+                SELECT request_id FROM payment_requests
+                WHERE request_id IN ({marks}) AND status='PENDING'
+                FOR UPDATE
+            """, tuple(request_ids))
+            locked = [r["request_id"] for r in cur.fetchall()]
+            if not locked:
+                return 0
+
+            marks = ",".join(["%s"] * len(locked))
+            cur.execute(f"""
+                SELECT pr.request_id, pr.tenant_id, pr.rental_id, pr.amount, d.owner_id
+                FROM payment_requests pr
+                JOIN rentals rr ON rr.rental_id = pr.rental_id
+                JOIN rooms r ON r.room_id = rr.room_id
+                JOIN dorms d ON d.dorm_id = r.dorm_id
+                WHERE pr.request_id IN ({marks})
+                ORDER BY pr.request_id
+            """, tuple(locked))
+            requests = cur.fetchall()
+
+            rental_ids = sorted({r["rental_id"] for r in requests})
+            marks = ",".join(["%s"] * len(rental_ids))
+            cur.execute(f"""
+                SELECT payment_id, rental_id, amount_due, amount_paid, status, paid_at
+                FROM payments
+                WHERE rental_id IN ({marks}) AND status <> 'PAID'
+                ORDER BY rental_id, due_date, payment_id
+                FOR UPDATE
+            """, tuple(rental_ids))
+            unpaid = {}
+            for p in cur.fetchall():
+                unpaid.setdefault(p["rental_id"], []).append(p)
+
+            payments, transactions, revenue = {}, [], {}
+            for req in requests:
+                touched = _allocate(req["amount"], unpaid.get(req["rental_id"], []), now)
+                for p in touched:
+                    payments[p["payment_id"]] = p
+                transactions.append((req["owner_id"], req["tenant_id"], req["amount"], now,
+                                     req["request_id"], touched[0]["payment_id"] if touched else None))
+                key = (req["owner_id"], now.year, now.month)
+                total, count = revenue.get(key, (0.0, 0))
+                revenue[key] = (round(total + float(req["amount"] or 0), 2), count + 1)
+
+            cur.executemany(POST_PAYMENT_SQL, [
+                (p["amount_paid"], p["status"], p["paid_at"], p["payment_id"]) for p in payments.values()
+            ])
+            cur.executemany(POST_TRANSACTION_SQL, transactions)
+            cur.executemany(REVENUE_UPSERT_SQL, [key + value for key, value in revenue.items()])
+            cur.executemany(RENTAL_DUES_SQL, [(rental_id,) for rental_id in rental_ids])
+            marks = ",".join(["%s"] * len(requests))
+            cur.execute(
+                f"UPDATE payment_requests SET status='APPROVED', reviewed_at=NOW(), pending=NULL "
+                f"WHERE request_id IN ({marks})",
+                tuple(r["request_id"] for r in requests)
+            )
+
+        for tenant_id in {r["tenant_id"] for r in requests}:
+            self.invalidate_student(tenant_id)
+        return len(requests)
+
+    def get_upload_references(self, prefix="uploads/store/"):
+        """Every stored upload path under `prefix` that a row still points to."""
+        like = prefix + "%"
+        rows = self.fetchall("""
+            SELECT file_path AS path FROM dorm_images WHERE file_path LIKE %s
+            UNION
+            SELECT proof_image FROM payment_requests WHERE proof_image LIKE %s
+            UNION
+            SELECT profile_picture_url FROM tenant_profiles WHERE profile_picture_url LIKE %s
+        """, (like, like, like))
+        return {r["path"] for r in rows}
+
+    def rebuild_owner_revenue(self):
+        """Recomputes owner_revenue_monthly from the PAID transactions."""
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM owner_revenue_monthly")
+            cur.execute("""
+                INSERT INTO owner_revenue_monthly (owner_id, revenue_year, revenue_month, paid_total, payments)
+                SELECT owner_id, YEAR(transaction_date), MONTH(transaction_date), SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE status='PAID'
+                GROUP BY owner_id, YEAR(transaction_date), MONTH(transaction_date)
+            """)
+            return max(cur.rowcount, 0)
+
     def user_has_active_reservation(self, user_id):
         """
         Returns True if tenant already has:
         - an ACTIVE rental, OR
-        - a WAITING rental application
+        - a WAITING rental application whose hold has not expired
         """
 
         q1 = """
@@ -825,6 +2045,7 @@ class DatabaseManager:
             FROM rental_applications
             WHERE tenant_id = %s
             AND action_status = 'WAITING'
+            AND (expires_at IS NULL OR expires_at > NOW())
             LIMIT 1
         """
         if self.fetchone(q2, (user_id,)):
@@ -851,40 +2072,9 @@ class DatabaseManager:
         return self.fetchone(sql, (tenant_id,))
 
 
-    def review_payment(self, request_id, approve=True):
-        status = "APPROVED" if approve else "REJECTED"
-        q = """
-            UPDATE payment_requests
-            SET status=%s, reviewed_at=NOW()
-            WHERE request_id=%s
-        """
-        self.execute(q, (status, request_id))
-        return True
-
-
-
-    def update_due_date(self, rental_id):
-        q = "SELECT due_date FROM payments WHERE rental_id=%s"
-        row = self.fetchone(q, (rental_id,))
-        due = row["due_date"]
-
-        next_month = due + timedelta(days=30)
-
-        q2 = """
-            UPDATE payments
-            SET due_date=%s, status='PAID', is_overdue=0
-            WHERE rental_id=%s
-        """
-        self.execute(q2, (next_month, rental_id))
-
     def check_overdue(self):
-        sql = """
-            UPDATE payments
-            SET status = 'OVERDUE'
-            WHERE due_date < CURDATE()
-            AND status = 'DUE'
-        """
-        self.execute(sql)
+        """Kept for older callers; same job as mark_overdue_payments()."""
+        return self.mark_overdue_payments()
 
 
     def has_pending_payment_request(self, tenant_id, rental_id):
@@ -922,7 +2112,16 @@ class DatabaseManager:
             WHERE application_id = %s
             AND action_status IN ('PENDING', 'WAITING')
         """
-        self.execute(q, (reservation_id,))
+        promoted, room_ids = [], []
+        with self.transaction() as cur:
+            cur.execute(q, (reservation_id,))
+            if cur.rowcount == 1:
+                cur.execute("SELECT room_id FROM rental_applications WHERE application_id=%s",
+                            (reservation_id,))
+                room_ids = [cur.fetchone()["room_id"]]
+                promoted = self._release_beds(cur, room_ids[0], 1)
+        self._after_release(room_ids, promoted)
+        self.invalidate_student()
     
     def save_tenant_profile(
         self,
@@ -978,18 +2177,31 @@ class DatabaseManager:
             WHERE ra.room_id = %s
             ORDER BY a.label
         """
-        rows = self.fetchall(sql, (room_id,))
-        return [r["label"] for r in rows]
+        labels = self.cache.get_or_load(
+            ("room_amenities", room_id),
+            lambda: [r["label"] for r in self.fetchall(sql, (room_id,))]
+        )
+        return list(labels)
 
     def get_tenant_due(self, tenant_id):
+        """
+        The tenant's rental that falls due first (or their latest one if
+        nothing is owed): {"rental_id", "amount", "due_date", "last_paid_at",
+        "last_paid_amount"} from the rentals dues rollup, or None without a
+        rental. last_paid_amount is read from the rental's latest PAID payment.
+        """
         sql = """
-            SELECT
-                r.price AS amount,
-                DATE_ADD(rr.start_date, INTERVAL TIMESTAMPDIFF(MONTH, rr.start_date, CURDATE()) MONTH) AS due_date
-            FROM rentals rr
-            JOIN rooms r ON rr.room_id = r.room_id
-            WHERE rr.tenant_id = %s
-            AND rr.status = 'ACTIVE'
+            SELECT rental_id, balance_due AS amount, next_due_date AS due_date, last_paid_at,
+                   (
+                       SELECT COALESCE(NULLIF(p.amount_paid, 0), p.amount_due) FROM payments p
+                       WHERE p.rental_id = rentals.rental_id AND p.status = 'PAID'
+                       ORDER BY p.paid_at DESC, p.payment_id DESC
+                       LIMIT 1
+                   ) AS last_paid_amount
+            FROM rentals
+            WHERE tenant_id = %s
+            ORDER BY CASE WHEN balance_due > 0 THEN 0 ELSE 1 END, next_due_date, rental_id DESC
+            LIMIT 1
         """
         return self.fetchone(sql, (tenant_id,))
 
@@ -997,7 +2209,8 @@ class DatabaseManager:
         """
         Returns summary data for Student Dashboard:
         - active reservations
-        - next unpaid payment (amount + due date)
+        - next unpaid payment (amount owed + due date)
+        Both come from the tenant's rentals rows.
         """
 
         stats = {
@@ -1006,31 +2219,127 @@ class DatabaseManager:
             "total_dorms": "0 rooms"
         }
 
-        # 1️⃣ Active reservations
-        row = self.fetchone("""
-            SELECT COUNT(*) AS cnt
+        rentals = self.fetchall("""
+            SELECT status, balance_due, next_due_date
             FROM rentals
             WHERE tenant_id=%s
-            AND status IN ('ACTIVE','EXTENDED','ENDING')
         """, (tenant_id,))
-        stats["active_res"] = row["cnt"] if row else 0
+        stats["active_res"] = sum(1 for r in rentals if r["status"] in ("ACTIVE", "EXTENDED", "ENDING"))
 
-        # 2️⃣ Next unpaid payment (based on OWNER-SET PRICE)
-        row = self.fetchone("""
-            SELECT
-                (p.amount_due - p.amount_paid) AS due_amount,
-                p.due_date
-            FROM payments p
-            JOIN rentals rr ON p.rental_id = rr.rental_id
-            WHERE rr.tenant_id = %s
-            AND p.status IN ('DUE','OVERDUE')
-            ORDER BY p.due_date ASC
-            LIMIT 1
-        """, (tenant_id,))
-
-        if row:
-            amount = f"₱{row['due_amount']:,.2f}"
-            due_date = row["due_date"].strftime("%B %d, %Y")
-            stats["next_payment"] = f"{amount} — Due {due_date}"
+        owing = [r for r in rentals if (r["balance_due"] or 0) > 0]
+        if owing:
+            row = min(owing, key=lambda r: r["next_due_date"])
+            stats["next_payment"] = self._format_next_payment(
+                {"due_amount": row["balance_due"], "due_date": row["next_due_date"]})
 
         return stats
+
+    @staticmethod
+    def _format_next_payment(row):
+        amount = f"₱{row['due_amount']:,.2f}"
+        due_date = row["due_date"].strftime("%B %d, %Y")
+        return f"{amount} — Due {due_date}"
+
+    def get_student_dashboard_snapshot(self, tenant_id, recommended_limit=5):
+        """
+        Everything the Student Dashboard shows, in one round trip:
+        {"stats", "recommended", "recently_viewed", "reservations"} shaped
+        like get_dashboard_stats / get_recommended_rooms / get_recently_viewed
+        / get_user_reservations.
+
+        The panels are one UNION ALL query; recommendations for a tenant
+        with history are re-ranked from the in-memory room feature matrix
+        (recommender.py) using the same HISTORY_VIEWS newest views as
+        get_recommended_rooms. While the matrix is cold (first call, or
+        FULL_REFRESH_S after the last build) that re-rank costs a second
+        round trip reading every room; the tenant prefetch plan loads the
+        snapshot off the GUI thread, so the dashboard does not wait on it.
+        The result is cached per tenant
+        for STUDENT_SNAPSHOT_TTL seconds and dropped when the tenant applies,
+        cancels, is approved, submits a payment or has room views flushed.
+        """
+        def load():
+            return self._shape_snapshot(self._fetch_snapshot(tenant_id, recommended_limit))
+
+        snap = self.cache.get_or_load(("student_snapshot", tenant_id), load, ttl=STUDENT_SNAPSHOT_TTL)
+        return {k: (list(v) if isinstance(v, list) else dict(v)) for k, v in snap.items()}
+
+    def _fetch_snapshot(self, tenant_id, recommended_limit):
+        parts = [
+            (SNAPSHOT_ACTIVE_SQL, (tenant_id,)),
+            (SNAPSHOT_NEXT_DUE_SQL, (tenant_id,)),
+            (SNAPSHOT_RECOMMENDED_SQL, (recommended_limit,)),
+            (SNAPSHOT_RESERVATIONS_SQL, (tenant_id,)),
+            (SNAPSHOT_RECENT_SQL, (tenant_id, HISTORY_VIEWS)),
+        ]
+        sql = "\nUNION ALL\n".join(part for part, _ in parts)
+        params = tuple(p for _, part_params in parts for p in part_params)
+        return self.fetchall(sql, params)
+
+    def _shape_snapshot(self, rows):
+        snap = {
+            "stats": {"active_res": 0, "next_payment": "No due", "total_dorms": "0 rooms"},
+            "recommended": [],
+            "recently_viewed": [],
+            "reservations": [],
+        }
+        history = []
+        for row in rows:
+            panel = row["panel"]
+            if panel == "active":
+                snap["stats"]["active_res"] = int(row["amount"] or 0)
+            elif panel == "next_due":
+                snap["stats"]["next_payment"] = self._format_next_payment(
+                    {"due_amount": row["amount"], "due_date": row["due_date"]})
+            elif panel == "recommended":
+                room = {
+                    "room_id": row["id"],
+                    "property_name": row["property_name"],
+                    "address": row["address"],
+                    "room_name": row["room_name"],
+                    "capacity": row["capacity"],
+                    "price_monthly": row["amount"],
+                    "room_type": row["room_type"],
+                    "latitude": row["latitude"],
+                    "longitude": row["longitude"],
+                    "price": row["amount"],
+                }
+                room["name"] = f"{room['property_name']} - {room['room_name']}"
+                snap["recommended"].append(room)
+            elif panel == "recent":
+                history.append((row["room_id"], VIEW_WEIGHT))
+                snap["recently_viewed"].append({
+                    "room_id": row["id"],
+                    "viewed_at": row["at_time"],
+                    "room_name": row["room_name"],
+                    "property_name": row["property_name"],
+                })
+            elif panel == "reservation":
+                history.append((row["room_id"], APPLICATION_WEIGHT))
+                snap["reservations"].append({
+                    "application_id": row["id"],
+                    "property_name": row["property_name"],
+                    "room_name": row["room_name"],
+                    "status": row["status"],
+                    "created_at": row["at_time"],
+                })
+
+        geo.attach_distances(snap["recommended"], key="distance_meters")
+
+        # tenants with applications or views get content-based picks instead
+        personal = self._recommend_from_history(history, len(snap["recommended"]))
+        if personal:
+            snap["recommended"] = personal
+
+        # UNION ALL does not keep each branch's ORDER BY
+        for key, field in (("recently_viewed", "viewed_at"), ("reservations", "created_at")):
+            snap[key].sort(key=lambda r: str(r[field] or ""), reverse=True)
+        # the recent branch reads HISTORY_VIEWS rows for the history; the panel shows fewer
+        del snap["recently_viewed"][RECENT_VIEWS_SHOWN:]
+        return snap
+
+    def invalidate_student(self, tenant_id=None):
+        if tenant_id is None:
+            self.cache.invalidate_prefix("student_snapshot")
+        else:
+            self.cache.invalidate(("student_snapshot", tenant_id))
@@ -0,0 +1,169 @@
+# diagnostics.py
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
+    QFrame, QTableWidget, QTableWidgetItem, QHeaderView, QListWidget,
+    QFileDialog, QMessageBox, QShortcut
+)
+from PyQt5.QtGui import QFont, QKeySequence
+from PyQt5.QtCore import Qt, QTimer
+
+from instrumentation import query_stats
+
+
+def install_diagnostics_shortcut(window):
+    """Ctrl+Shift+D on `window` opens the DB diagnostics panel."""
+    shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), window)
+
+    def open_panel():
+        window.diagnostics_window = DiagnosticsWindow()
+        window.diagnostics_window.show()
+
+    shortcut.activated.connect(open_panel)
+    return shortcut
+
+
+class DiagnosticsWindow(QWidget):
+    """Live view of query_stats: per-query latency, call sites, slow queries."""
+    def __init__(self, stats=None, refresh_ms=2000):
+        super().__init__()
+        self.stats = stats or query_stats
+        self.setWindowTitle("Database Diagnostics - StaySmart")
+        self.resize(1100, 700)
+
+        self._build_ui()
+        self._apply_styles()
+        self.refresh()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(refresh_ms)
+
+    def _build_ui(self):
+        root = QVBoxLayout(self)
+        root.setContentsMargins(18, 18, 18, 18)
+        root.setSpacing(12)
+
+        header = QHBoxLayout()
+        title = QLabel("Database Diagnostics")
+        title.setFont(QFont("Segoe UI", 18, QFont.Bold))
+        header.addWidget(title)
+        header.addStretch()
+
+        btn_reset = QPushButton("Reset")
+        btn_reset.clicked.connect(self.reset)
+        btn_export = QPushButton("Export JSON")
+        btn_export.clicked.connect(self.export_json)
+        header.addWidget(btn_reset)
+        header.addWidget(btn_export)
+        root.addLayout(header)
+
+        self.lbl_summary = QLabel()
+        self.lbl_summary.setObjectName("summary")
+        root.addWidget(self.lbl_summary)
+
+        card = QFrame()
+        card.setObjectName("card")
+        card_layout = QVBoxLayout(card)
+        card_layout.addWidget(QLabel("Queries (by total time)"))
+        self.tbl_queries = QTableWidget(0, 7)
+        self.tbl_queries.setHorizontalHeaderLabels(
+            ["SQL", "Calls", "Avg ms", "p95 ms", "Max ms", "Rows", "Top call site"]
+        )
+        self.tbl_queries.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.tbl_queries.horizontalHeader().setStretchLastSection(True)
+        self.tbl_queries.setColumnWidth(0, 420)
+        self.tbl_queries.verticalHeader().setVisible(False)
+        card_layout.addWidget(self.tbl_queries)
+        root.addWidget(card, 3)
+
+        bottom = QHBoxLayout()
+
+        sites_card = QFrame()
+        sites_card.setObjectName("card")
+        sites_layout = QVBoxLayout(sites_card)
+        sites_layout.addWidget(QLabel("Call sites (by total time)"))
+        self.lst_sites = QListWidget()
+        sites_layout.addWidget(self.lst_sites)
+        bottom.addWidget(sites_card)
+
+        slow_card = QFrame()
+        slow_card.setObjectName("card")
+        slow_layout = QVBoxLayout(slow_card)
+        self.lbl_slow = QLabel("Slow queries")
+        slow_layout.addWidget(self.lbl_slow)
+        self.lst_slow = QListWidget()
+        slow_layout.addWidget(self.lst_slow)
+        bottom.addWidget(slow_card)
+
+        root.addLayout(bottom, 2)
+
+    def refresh(self):
+        snap = self.stats.snapshot()
+        conn = snap["connections"]
+
+        self.lbl_summary.setText(
+            f"Since {snap['since']}  •  Connections: {conn['count']} "
+            f"(avg {conn['avg_ms']}ms, p95 {conn['p95_ms']}ms, failed {conn['failures']})  •  "
+            f"Distinct queries: {len(snap['queries'])}"
+        )
+
+        self.tbl_queries.setRowCount(len(snap["queries"]))
+        for r, q in enumerate(snap["queries"]):
+            top_site = next(iter(q["call_sites"]), "")
+            values = [q["sql"], q["count"], q["avg_ms"], q["p95_ms"],
+                      q["max_ms"], q["rows"], top_site]
+            for c, v in enumerate(values):
+                item = QTableWidgetItem(str(v))
+                if c == 0:
+                    item.setToolTip(q["sql"])
+                self.tbl_queries.setItem(r, c, item)
+
+        self.lst_sites.clear()
+        for site in snap["call_sites"]:
+            self.lst_sites.addItem(
+                f"{site['total_ms']:.1f}ms  •  {site['queries']} queries  •  {site['call_site']}"
+            )
+
+        self.lbl_slow.setText(f"Slow queries (≥ {snap['slow_threshold_ms']:g}ms)")
+        self.lst_slow.clear()
+        for entry in reversed(snap["slow_queries"]):
+            self.lst_slow.addItem(
+                f"[{entry['at']}] {entry['ms']}ms  {entry['call_site']}\n{entry['sql']}"
+            )
+
+    def reset(self):
+        self.stats.reset()
+        self.refresh()
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Diagnostics", "db_diagnostics.json", "JSON (*.json)"
+        )
+        if not path:
+            return
+        self.stats.dump_json(path)
+        QMessageBox.information(self, "Exported", f"Saved to:\n{path}")
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
+
+    def _apply_styles(self):
+        self.setStyleSheet("""
+            QWidget { background: #f2f5f3; color: #1d1d1d; font-family: 'Segoe UI'; }
+            QFrame#card { background: white; border-radius: 12px; border: 1px solid #c7d9cd; }
+            QLabel#summary { color: #0c5d30; font-weight: bold; }
+            QTableWidget, QListWidget { background: white; border: 1px solid #d6e4db; }
+            QPushButton {
+                background: #0f7a3a; color: white; padding: 6px 14px; border-radius: 8px;
+            }
+            QPushButton:hover { background: #0c5d30; }
+        """)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    w = DiagnosticsWindow()
+    w.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,191 @@
+# dialect.py
+"""
+Rewrites the MySQL SQL used across the app into SQLite SQL.
+
+Only the constructs the app actually uses are handled:
+%s params, CURDATE(), NOW(), DATE_ADD/DATE_SUB ... INTERVAL, TIMESTAMPDIFF,
+DAYNAME, DAYOFWEEK, MONTH, YEAR, CONCAT, RAND(), ON DUPLICATE KEY UPDATE,
+INSERT IGNORE, UPDATE/DELETE ... LIMIT, SELECT ... FOR UPDATE and
+AUTO_INCREMENT in DDL.
+
+Results are memoised, so each distinct statement is translated once and
+SQLite's statement cache can reuse the prepared statement.
+
+ON DUPLICATE KEY UPDATE becomes a target-less ON CONFLICT DO UPDATE, which
+needs SQLite 3.35 (MIN_SQLITE_VERSION, checked by SQLiteBackend).
+"""
+import re
+from functools import lru_cache
+
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+_DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+_FUNC_RE = re.compile(
+    r"\b(DATE_ADD|DATE_SUB|TIMESTAMPDIFF|DAYNAME|DAYOFWEEK|MONTH|YEAR|CONCAT|GREATEST|LEAST)\s*\(",
+    re.IGNORECASE,
+)
+_INTERVAL_RE = re.compile(r"^\s*INTERVAL\s+(.+?)\s+(SECOND|MINUTE|HOUR|DAY|WEEK|MONTH|YEAR)\s*$",
+                          re.IGNORECASE | re.DOTALL)
+_LIMITED_WRITE_RE = re.compile(
+    r"^\s*(?P<head>UPDATE\s+(?P<utable>\w+)\s+SET\s+.+?|DELETE\s+FROM\s+(?P<dtable>\w+))"
+    r"\s+WHERE\s+(?P<where>.+?)"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>.+?))?"
+    r"\s+LIMIT\s+(?P<limit>\S+)\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ON_DUP_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_COLUMN_RE = re.compile(r"^[A-Za-z_][\w.]*$")
+_VALUES_FN_RE = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+
+
+def _split_args(body):
+    """Splits a function argument list on top-level commas."""
+    args, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(body):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(body[start:i].strip())
+            start = i + 1
+    args.append(body[start:].strip())
+    return args
+
+
+def _find_close(sql, open_idx):
+    """Index of the ')' matching the '(' at open_idx."""
+    depth, quote = 0, None
+    for i in range(open_idx, len(sql)):
+        ch = sql[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"unbalanced parentheses in: {sql}")
+
+
+def _interval(base, interval, sign):
+    m = _INTERVAL_RE.match(interval)
+    if not m:
+        raise ValueError(f"unsupported INTERVAL: {interval}")
+    amount, unit = m.group(1), m.group(2).lower()
+    if unit == "week":
+        amount, unit = f"({amount}) * 7", "day"
+    modifier = f"'{sign}' || ({amount}) || ' {unit}'"
+
+    # MySQL keeps the time part of a DATETIME, and adding hours to a DATE
+    # gives a DATETIME; date() would truncate both to the day
+    start = base.lstrip().lower()
+    if unit in ("second", "minute", "hour") or start.startswith("datetime("):
+        return f"datetime({base}, {modifier})"
+    if _COLUMN_RE.match(base.strip()):
+        # a column may be DATE ('YYYY-MM-DD') or DATETIME: shift the day, keep any time after it
+        return f"(date({base}, {modifier}) || substr({base}, 11))"
+    return f"date({base}, {modifier})"
+
+
+def _month_diff(a, b):
+    return (
+        f"((CAST(strftime('%Y', {b}) AS INTEGER) - CAST(strftime('%Y', {a}) AS INTEGER)) * 12"
+        f" + (CAST(strftime('%m', {b}) AS INTEGER) - CAST(strftime('%m', {a}) AS INTEGER))"
+        f" - (CAST(strftime('%d', {b}) AS INTEGER) < CAST(strftime('%d', {a}) AS INTEGER)))"
+    )
+
+
+def _rewrite_function(name, args):
+    name = name.upper()
+    if name == "DATE_ADD":
+        return _interval(args[0], args[1], "+")
+    if name == "DATE_SUB":
+        return _interval(args[0], args[1], "-")
+    if name == "TIMESTAMPDIFF":
+        unit, a, b = args[0].upper(), args[1], args[2]
+        if unit == "MONTH":
+            return _month_diff(a, b)
+        if unit == "YEAR":
+            return f"(({_month_diff(a, b)}) / 12)"
+        scale = {"DAY": 1, "HOUR": 24, "MINUTE": 1440, "SECOND": 86400}[unit]
+        return f"CAST((julianday({b}) - julianday({a})) * {scale} AS INTEGER)"
+    if name == "DAYNAME":
+        whens = " ".join(f"WHEN {i} THEN '{d}'" for i, d in enumerate(_DAY_NAMES))
+        return f"(CASE CAST(strftime('%w', {args[0]}) AS INTEGER) {whens} END)"
+    if name == "DAYOFWEEK":
+        return f"(CAST(strftime('%w', {args[0]}) AS INTEGER) + 1)"
+    if name == "MONTH":
+        return f"CAST(strftime('%m', {args[0]}) AS INTEGER)"
+    if name == "YEAR":
+        return f"CAST(strftime('%Y', {args[0]}) AS INTEGER)"
+    if name == "CONCAT":
+        return "(" + " || ".join(args) + ")"
+    if name == "GREATEST":
+        return f"MAX({', '.join(args)})"
+    if name == "LEAST":
+        return f"MIN({', '.join(args)})"
+    raise ValueError(name)
+
+
+def _rewrite_functions(sql):
+    """Rewrites the innermost-first MySQL function calls."""
+    while True:
+        matches = list(_FUNC_RE.finditer(sql))
+        if not matches:
+            return sql
+        # last match first: its arguments cannot contain another match
+        # that starts after it, so nested calls are handled inside-out
+        m = matches[-1]
+        open_idx = m.end() - 1
+        close_idx = _find_close(sql, open_idx)
+        args = _split_args(sql[open_idx + 1:close_idx])
+        sql = sql[:m.start()] + _rewrite_function(m.group(1), args) + sql[close_idx + 1:]
+
+
+def _rewrite_limited_write(sql):
+    """UPDATE/DELETE ... [ORDER BY] LIMIT n  ->  ... WHERE rowid IN (SELECT ... LIMIT n)."""
+    m = _LIMITED_WRITE_RE.match(sql)
+    if not m:
+        return sql
+    table = m.group("utable") or m.group("dtable")
+    order = f" ORDER BY {m.group('order')}" if m.group("order") else ""
+    return (
+        f"{m.group('head')} WHERE rowid IN ("
+        f"SELECT rowid FROM {table} WHERE {m.group('where')}{order} LIMIT {m.group('limit')})"
+    )
+
+
+def _rewrite_upsert(sql):
+    m = _ON_DUP_RE.search(sql)
+    if not m:
+        return sql
+    head, tail = sql[:m.start()], sql[m.end():]
+    tail = _VALUES_FN_RE.sub(r"excluded.\1", tail)
+    return f"{head}ON CONFLICT DO UPDATE SET{tail}"
+
+
+@lru_cache(maxsize=2048)
+def mysql_to_sqlite(sql):
+    out = sql.replace("%s", "?")
+    out = re.sub(r"\bCURDATE\(\)", "date('now','localtime')", out, flags=re.IGNORECASE)
+    out = re.sub(r"\b(NOW|CURRENT_TIMESTAMP)\(\)", "datetime('now','localtime')", out, flags=re.IGNORECASE)
+    out = re.sub(r"\bRAND\(\)", "RANDOM()", out, flags=re.IGNORECASE)
+    out = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", out, flags=re.IGNORECASE)
+    out = re.sub(r"\s+FOR\s+UPDATE(\s+SKIP\s+LOCKED)?\s*;?\s*$", "", out, flags=re.IGNORECASE)
+    out = re.sub(r"\bINT(EGER)?\s+(NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY",
+                 "INTEGER PRIMARY KEY AUTOINCREMENT", out, flags=re.IGNORECASE)
+    out = _rewrite_functions(out)
+    out = _rewrite_upsert(out)
+    out = _rewrite_limited_write(out)
+    return out
@@ -0,0 +1,78 @@
+# facets.py
+"""
+Result counts for the room search filters.
+
+compute_facets() takes the rooms matching the search text (capacity,
+price_monthly, dorm_type, amenity_mask per row) and counts them per
+capacity bucket, price band, dorm type and amenity with NumPy.
+
+Each facet is counted with every *other* active filter applied, so the
+capacity counts say how many rooms each capacity option would show given
+the checked amenities, and the amenity counts say how many of the current
+results have that amenity.
+"""
+import numpy as np
+
+from amenity_index import AmenityIndex, amenity_bit, mask_ids_only
+
+CAPACITY_BUCKETS = ["1", "2", "3", "4+"]
+DORM_TYPES = ["BED_SPACER", "APARTMENT", "MIXED"]
+
+# (label, low, high): low <= price_monthly < high
+PRICE_BANDS = [
+    ("Under ₱3,000", 0, 3000),
+    ("₱3,000–4,999", 3000, 5000),
+    ("₱5,000–7,999", 5000, 8000),
+    ("₱8,000+", 8000, float("inf")),
+]
+
+
+def capacity_matches(capacities, capacity_filter):
+    """Boolean array: rows kept by the capacity combo value."""
+    if capacity_filter in (None, "", "Any"):
+        return np.ones(len(capacities), dtype=bool)
+    if capacity_filter == "4+":
+        return capacities >= 4
+    return capacities == int(capacity_filter)
+
+
+def compute_facets(rows, capacity_filter="Any", amenity_ids=(), amenity_ids_all=()):
+    """
+    {"total", "capacity", "price", "dorm_type", "amenities"} counts for rows.
+    amenity_ids are the checked amenities, amenity_ids_all every amenity to
+    report a count for. Ids without a mask bit are left out of the counts
+    and the filter.
+    """
+    index = AmenityIndex(rows)
+    capacities = np.fromiter((int(r.get("capacity") or 0) for r in rows), dtype=np.int64, count=len(rows))
+    prices = np.fromiter((float(r.get("price_monthly") or 0) for r in rows), dtype=float, count=len(rows))
+    dorm_types = np.array([r.get("dorm_type") or "" for r in rows], dtype=object)
+
+    cap_ok = capacity_matches(capacities, capacity_filter)
+    amen_ok = index.matching(amenity_ids) if amenity_ids else np.ones(len(rows), dtype=bool)
+    current = cap_ok & amen_ok
+
+    capacity = {"Any": int(np.count_nonzero(amen_ok))}
+    for bucket in CAPACITY_BUCKETS:
+        capacity[bucket] = int(np.count_nonzero(amen_ok & capacity_matches(capacities, bucket)))
+
+    price = {}
+    for label, low, high in PRICE_BANDS:
+        price[label] = int(np.count_nonzero(current & (prices >= low) & (prices < high)))
+
+    dorm_type = {t: 0 for t in DORM_TYPES}
+    found, counts = np.unique(dorm_types[current].astype(str), return_counts=True)
+    dorm_type.update({t: int(n) for t, n in zip(found, counts)})
+
+    current_masks = index.masks[current]
+    amenities = {}
+    for aid in mask_ids_only(list(amenity_ids_all)):
+        amenities[aid] = int(np.count_nonzero(current_masks & np.uint64(amenity_bit(aid))))
+
+    return {
+        "total": int(np.count_nonzero(current)),
+        "capacity": capacity,
+        "price": price,
+        "dorm_type": dorm_type,
+        "amenities": amenities,
+    }
@@ -0,0 +1,89 @@
+# geo.py
+"""
+Distance helpers for the room search.
+
+Distances are great-circle (haversine) metres, computed with NumPy over a
+whole candidate set at once. DatabaseManager.get_nearest_rooms narrows the
+candidates with a latitude/longitude bounding box first, so only dorms near
+the point ever leave the database.
+
+The default point is the campus; override it with
+
+    STAYSMART_CAMPUS=14.6537,121.0687
+"""
+import math
+import os
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+START_RADIUS_M = 250
+MAX_RADIUS_M = 50000
+
+
+def _campus_from_env():
+    raw = os.environ.get("STAYSMART_CAMPUS", "14.6537,121.0687")
+    lat, lon = (float(part) for part in raw.split(","))
+    return lat, lon
+
+
+CAMPUS_LAT, CAMPUS_LON = _campus_from_env()
+
+
+def bounding_box(lat, lon, radius_m):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle around (lat, lon)."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    coslat = math.cos(math.radians(lat))
+    if coslat < 1e-6 or lat + dlat >= 90 or lat - dlat <= -90:
+        return lat - dlat, lat + dlat, -180.0, 180.0
+    dlon = min(math.degrees(radius_m / (EARTH_RADIUS_M * coslat)), 180.0)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def haversine_m(lat, lon, lats, lons):
+    """Metres from (lat, lon) to every point in the lats/lons arrays."""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=float) - lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_order(distances, k):
+    """Indices of the k smallest distances, nearest first."""
+    distances = np.asarray(distances)
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    if k < len(distances):
+        part = np.argpartition(distances, k - 1)[:k]
+    else:
+        part = np.arange(len(distances))
+    return part[np.argsort(distances[part], kind="stable")]
+
+
+def attach_distances(rows, lat=None, lon=None, key="distance"):
+    """
+    Sets row[key] to whole metres from the point (campus by default) for
+    rows with latitude/longitude, None for the rest. Returns the rows.
+    """
+    lat = CAMPUS_LAT if lat is None else lat
+    lon = CAMPUS_LON if lon is None else lon
+    located = [r for r in rows if r.get("latitude") is not None and r.get("longitude") is not None]
+    for r in rows:
+        r[key] = None
+    if located:
+        dist = haversine_m(lat, lon, [r["latitude"] for r in located], [r["longitude"] for r in located])
+        for r, d in zip(located, dist):
+            r[key] = int(round(d))
+    return rows
+
+
+def format_distance(metres):
+    if metres is None:
+        return "—"
+    if metres < 1000:
+        return f"{int(metres)} m"
+    return f"{metres / 1000:.1f} km"
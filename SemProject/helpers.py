@@ -20,6 +20,10 @@ class FakeCursor:
     def execute(self, sql: str, params: Any = None) -> None:
         self.executed.append((sql, params))
 
+    def executemany(self, sql: str, seq_of_params: Any) -> None:
+        for params in seq_of_params:
+            self.executed.append((sql, params))
+
     def fetchone(self) -> Any:
         return self._fetchone_queue.pop(0) if self._fetchone_queue else None
 
@@ -31,6 +35,7 @@ class FakeCursor:
 class FakeConnection:
     cursor_obj: FakeCursor
     committed: bool = False
+    rolled_back: bool = False
     closed: bool = False
     connected: bool = True
 
@@ -41,8 +46,14 @@ class FakeConnection:
         self.cursor_obj.dictionary = dictionary
         return self.cursor_obj
 
+    def start_transaction(self) -> None:
+        pass
+
     def commit(self) -> None:
         self.committed = True
 
+    def rollback(self) -> None:
+        self.rolled_back = True
+
     def close(self) -> None:
         self.closed = True
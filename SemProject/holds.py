@@ -0,0 +1,41 @@
+# holds.py
+"""
+Reservation holds.
+
+A WAITING application holds a bed for HOLD_TTL_HOURS. Its
+rental_applications.expires_at is set when reserve_room() books it. Once
+that time passes, the hold no longer blocks the student
+(user_has_active_reservation). The expire_holds job in scheduler.py then
+marks it EXPIRED and gives the bed back.
+
+    STAYSMART_HOLD_TTL_HOURS=72
+"""
+import os
+from datetime import datetime
+
+HOLD_TTL_HOURS = int(os.environ.get("STAYSMART_HOLD_TTL_HOURS", "72"))
+
+EXPIRED = "EXPIRED"
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def format_hold_left(expires_at, now=None):
+    """'2d 4h left', '35m left', 'Expired' or '—' (no expiry) for the owner's table."""
+    expires_at = _as_datetime(expires_at)
+    if expires_at is None:
+        return "—"
+    seconds = int((expires_at - (now or datetime.now())).total_seconds())
+    if seconds <= 0:
+        return "Expired"
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    if days:
+        return f"{days}d {hours}h left"
+    if hours:
+        return f"{hours}h {rest // 60}m left"
+    return f"{max(rest // 60, 1)}m left"
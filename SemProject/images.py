@@ -0,0 +1,327 @@
+# images.py
+"""
+Image ingest at upload time and cheap decodes at display time.
+
+ingest(src_path) turns an uploaded photo into what the app keeps:
+
+    - only PNG and JPEG of at most MAX_PIXELS are accepted
+    - the EXIF orientation is applied, then all metadata (EXIF, GPS,
+      comments, PNG text) is dropped
+    - the image is decoded straight to at most MAX_SIDE px on its long
+      side (QImageReader.setScaledSize), so a 12 MP camera photo is never
+      held at full size
+    - it is re-encoded (JPEG, or PNG when it has transparency) into
+      upload_store, and every RENDITIONS size is stored next to it
+
+load_image(rel_path, size) is the display side. It reads the smallest
+rendition that covers `size` and decodes it at that size. Files uploaded
+before ingest existed have no renditions; they are decoded at display
+size straight from the original.
+
+Both are worker-thread safe (QImage only). ImageIngester runs ingest() on
+QThreadPool so forms stay responsive while a photo is processed.
+ImageLoader runs load_image() on its own small pool and keeps the decoded
+images in a memory budget, so a viewer can prefetch what comes next.
+
+    STAYSMART_IMAGE_CACHE_MB=64
+"""
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import (
+    QBuffer, QByteArray, QIODevice, QObject, QRunnable, QSize, QThreadPool, Qt,
+    pyqtSignal, pyqtSlot
+)
+from PyQt5.QtGui import QImage, QImageIOHandler, QImageReader, QImageWriter
+
+from instrumentation import logger
+from upload_store import upload_store
+
+MAX_SIDE = 1600
+MAX_PIXELS = 50_000_000
+JPEG_QUALITY = 85
+FORMATS = (b"jpeg", b"png")
+
+DECODE_BUDGET_BYTES = int(float(os.environ.get("STAYSMART_IMAGE_CACHE_MB", "64")) * 1024 * 1024)
+DECODE_THREADS = 2
+
+# smallest first; covers table thumbnails and room cards, then previews and banners
+RENDITIONS = {
+    "thumb": QSize(240, 180),
+    "preview": QSize(960, 720),
+}
+
+
+# ----- INGEST -----
+
+def _strip(img):
+    """Same pixels, no metadata: QImage keeps comments/text chunks and would write them back."""
+    img = img.convertToFormat(QImage.Format_ARGB32 if img.hasAlphaChannel() else QImage.Format_RGB32)
+    return QImage(img.constBits(), img.width(), img.height(), img.bytesPerLine(), img.format()).copy()
+
+
+def _encode(img, fmt):
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    writer = QImageWriter(buf, fmt)
+    if fmt == b"jpeg":
+        writer.setQuality(JPEG_QUALITY)
+        writer.setOptimizedWrite(True)
+    if not writer.write(img):
+        raise ValueError(f"Could not encode image: {writer.errorString()}")
+    return bytes(data)
+
+
+def ingest(src_path, store=upload_store):
+    """Validates, normalizes and stores an image. Returns its relative path."""
+    name = os.path.basename(src_path)
+    reader = QImageReader(src_path)
+    reader.setAutoTransform(True)
+    if reader.format() not in FORMATS:
+        raise ValueError(f"{name} is not a PNG or JPEG image.")
+
+    size = reader.size()
+    if not size.isValid() or size.width() * size.height() > MAX_PIXELS:
+        raise ValueError(f"{name} is too large ({size.width()}x{size.height()}).")
+    if max(size.width(), size.height()) > MAX_SIDE:
+        reader.setScaledSize(size.scaled(MAX_SIDE, MAX_SIDE, Qt.KeepAspectRatio))
+
+    img = reader.read()
+    if img.isNull():
+        raise ValueError(f"{name} could not be read: {reader.errorString()}")
+    img = _strip(img)
+
+    fmt, ext = (b"png", ".png") if img.hasAlphaChannel() else (b"jpeg", ".jpg")
+    rel_path = store.put_bytes(_encode(img, fmt), ext)
+
+    # largest first, each scaled from the previous one
+    for rendition, box in reversed(list(RENDITIONS.items())):
+        if img.width() > box.width() or img.height() > box.height():
+            img = img.scaled(box, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        store.put_rendition(rel_path, rendition, _encode(img, fmt))
+    return rel_path
+
+
+# ----- DISPLAY -----
+
+def read_scaled(abs_path, size):
+    """Decodes abs_path at no more than `size` (aspect kept, EXIF orientation applied)."""
+    reader = QImageReader(abs_path)
+    reader.setAutoTransform(True)
+    full = reader.size()
+    if reader.transformation() & QImageIOHandler.TransformationRotate90:
+        size = size.transposed()        # the reader scales before it rotates
+    if full.isValid() and (full.width() > size.width() or full.height() > size.height()):
+        reader.setScaledSize(full.scaled(size, Qt.KeepAspectRatio))
+    return reader.read()
+
+
+def display_path(rel_path, size, store=upload_store):
+    """Absolute path of the smallest rendition covering `size`, else of the original."""
+    if size is None:
+        return store.resolve(rel_path)
+    for rendition, box in RENDITIONS.items():
+        if box.width() >= size.width() and box.height() >= size.height():
+            path = store.resolve(store.rendition_path(rel_path, rendition))
+            if os.path.exists(path):
+                return path
+    return store.resolve(rel_path)
+
+
+def load_image(rel_path, size, store=upload_store):
+    """
+    Worker-thread safe: returns a QImage fitting `size` (size=None: the
+    original at full resolution), or the text to show instead.
+    """
+    if not rel_path:
+        return "No image"
+    abs_path = display_path(rel_path, size, store)
+    if not os.path.exists(abs_path):
+        return "Not found"
+    if size is None:
+        reader = QImageReader(abs_path)
+        reader.setAutoTransform(True)
+        img = reader.read()
+    else:
+        img = read_scaled(abs_path, size)
+    if img.isNull():
+        return "Invalid"
+    return img
+
+
+# ----- BACKGROUND INGEST -----
+
+class _IngestSignals(QObject):
+    done = pyqtSignal(str, str)
+    failed = pyqtSignal(str, str)
+
+
+class _IngestJob(QRunnable):
+    def __init__(self, src_path, store, signals):
+        super().__init__()
+        self.src_path = src_path
+        self.store = store
+        self.signals = signals
+
+    def run(self):
+        try:
+            rel_path = ingest(self.src_path, self.store)
+        except (OSError, ValueError) as e:
+            self._emit(self.signals.failed, str(e))
+            return
+        except Exception as e:
+            logger.error("Ingesting %s failed: %s", self.src_path, e)
+            self._emit(self.signals.failed, f"Could not process {os.path.basename(self.src_path)}.")
+            return
+        self._emit(self.signals.done, rel_path)
+
+    def _emit(self, signal, value):
+        try:
+            signal.emit(self.src_path, value)
+        except RuntimeError:
+            pass    # ingester was deleted with its window
+
+
+class ImageIngester(QObject):
+    """
+    Runs ingest() on QThreadPool for a form:
+
+        self.ingester = ImageIngester(self, self._photo_ready, self._photo_failed)
+        self.ingester.submit(file)
+
+    on_done(src_path, rel_path) and on_error(src_path, message) run on the
+    GUI thread. busy() is True while any submitted file is unfinished.
+    """
+    def __init__(self, owner, on_done, on_error=None, pool=None, store=upload_store):
+        super().__init__(owner)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.pool = pool or QThreadPool.globalInstance()
+        self.store = store
+        self.pending = 0
+
+        self.signals = _IngestSignals(self)
+        self.signals.done.connect(self._on_done, Qt.QueuedConnection)
+        self.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+
+    def submit(self, src_path):
+        self.pending += 1
+        self.pool.start(_IngestJob(src_path, self.store, self.signals))
+
+    def busy(self):
+        return self.pending > 0
+
+    @pyqtSlot(str, str)
+    def _on_done(self, src_path, rel_path):
+        self.pending -= 1
+        self.on_done(src_path, rel_path)
+
+    @pyqtSlot(str, str)
+    def _on_failed(self, src_path, message):
+        self.pending -= 1
+        if self.on_error:
+            self.on_error(src_path, message)
+        else:
+            logger.warning("Ingesting %s failed: %s", src_path, message)
+
+
+# ----- BACKGROUND DECODE -----
+
+class _DecodeSignals(QObject):
+    done = pyqtSignal(object, object)
+
+
+class _DecodeJob(QRunnable):
+    def __init__(self, key, store, signals):
+        super().__init__()
+        self.key = key
+        self.store = store
+        self.signals = signals
+
+    def run(self):
+        rel_path, size = self.key
+        try:
+            result = load_image(rel_path, None if size is None else QSize(*size), self.store)
+        except Exception as e:
+            logger.error("Decoding %s failed: %s", rel_path, e)
+            result = "Invalid"
+        try:
+            self.signals.done.emit(self.key, result)
+        except RuntimeError:
+            pass    # loader was deleted with its window
+
+
+class ImageLoader(QObject):
+    """
+    Decodes images on a worker pool and caches them within budget_bytes
+    (least recently used dropped first):
+
+        img = self.images.request(path, label.size())    # None until decoded
+        self.images.loaded.connect(self._image_loaded)    # (rel_path, size), result
+        self.images.prefetch(next_paths, label.size())
+
+    request() jobs run before prefetch() jobs, and a path+size already
+    being decoded is not queued again. size=None decodes full resolution.
+    Results are QImages, or the text load_image() returns instead.
+    """
+    loaded = pyqtSignal(object, object)
+
+    def __init__(self, parent=None, budget_bytes=DECODE_BUDGET_BYTES, pool=None, store=upload_store):
+        super().__init__(parent)
+        self.budget_bytes = budget_bytes
+        self.store = store
+        if pool is None:
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(DECODE_THREADS)
+        self.pool = pool
+
+        self.used_bytes = 0
+        self._cache = OrderedDict()     # key -> (result, size in bytes)
+        self._pending = set()
+
+        self.signals = _DecodeSignals(self)
+        self.signals.done.connect(self._on_done, Qt.QueuedConnection)
+
+    @staticmethod
+    def key(rel_path, size=None):
+        return rel_path, None if size is None else (size.width(), size.height())
+
+    def get(self, rel_path, size=None):
+        """The cached result, or None."""
+        key = self.key(rel_path, size)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        return entry[0]
+
+    def request(self, rel_path, size=None, priority=1):
+        """The cached result, or None after queueing the decode."""
+        result = self.get(rel_path, size)
+        if result is not None:
+            return result
+        key = self.key(rel_path, size)
+        if key not in self._pending:
+            self._pending.add(key)
+            self.pool.start(_DecodeJob(key, self.store, self.signals), priority)
+        return None
+
+    def prefetch(self, rel_paths, size=None):
+        for rel_path in rel_paths:
+            if rel_path:
+                self.request(rel_path, size, priority=0)
+
+    @pyqtSlot(object, object)
+    def _on_done(self, key, result):
+        self._pending.discard(key)
+        nbytes = result.sizeInBytes() if isinstance(result, QImage) else 0
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old[1]
+        self._cache[key] = (result, nbytes)
+        self.used_bytes += nbytes
+        while self.used_bytes > self.budget_bytes and len(self._cache) > 1:
+            _, (_, dropped) = self._cache.popitem(last=False)
+            self.used_bytes -= dropped
+        self.loaded.emit(key, result)
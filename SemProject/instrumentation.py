@@ -0,0 +1,269 @@
+# instrumentation.py
+"""
+Query instrumentation for DatabaseManager.
+
+Every query is timed and grouped by its SQL text. For each group we keep
+a latency histogram, row counts and the call sites (file:line in the
+screens) that issued it. Connection setup time is tracked separately.
+Queries slower than `slow_threshold_ms` go to the "staysmart.db.slow"
+logger and to an in-memory slow-query log.
+
+    from instrumentation import query_stats
+    query_stats.snapshot()        # dict for the diagnostics panel
+    query_stats.dump_json(path)   # same, written to a file
+
+Env vars: STAYSMART_SLOW_QUERY_MS (default 200),
+          STAYSMART_SLOW_QUERY_LOG (optional log file path).
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("staysmart.db")
+slow_logger = logging.getLogger("staysmart.db.slow")
+
+# upper bounds (ms) of the latency histogram buckets; the last one is open
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# frames from these files are skipped when looking for the caller
+_INTERNAL_FILES = {"database.py", "backends.py", "dialect.py", "instrumentation.py",
+                   "cache.py", "contextlib.py", "async_db.py", "prefetch.py",
+                   "thread.py", "threading.py"}
+
+# call site a pool worker is running a submitted call for (see bind_call_site)
+_submitted = threading.local()
+
+
+def normalize_sql(sql):
+    return " ".join(str(sql).split())
+
+
+def _bucket_labels():
+    labels = [f"<={b}ms" for b in BUCKETS_MS]
+    labels.append(f">{BUCKETS_MS[-1]}ms")
+    return labels
+
+
+def find_call_site():
+    """
+    file:line (function) of the first caller outside the data layer. On a
+    worker running a bind_call_site() call, the site that submitted it.
+    """
+    site = getattr(_submitted, "call_site", None)
+    if site:
+        return site
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES:
+            return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "unknown"
+
+
+def bind_call_site(fn):
+    """
+    Wraps `fn` for a thread pool: the queries it runs on the worker are
+    credited to the screen submitting it now, not to the pool's run loop.
+    """
+    site = find_call_site()
+
+    def run(*args, **kwargs):
+        outer = getattr(_submitted, "call_site", None)
+        _submitted.call_site = site
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _submitted.call_site = outer
+    return run
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.n = 0
+
+    def add(self, ms):
+        self.n += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, p):
+        """Upper bucket bound that covers p% of samples (histogram estimate)."""
+        if not self.n:
+            return 0.0
+        target = self.n * p / 100.0
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.n,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.n, 3) if self.n else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": dict(zip(_bucket_labels(), self.counts)),
+        }
+
+
+class _QueryRecord:
+    def __init__(self, sql):
+        self.sql = sql
+        self.latency = _Histogram()
+        self.rows = 0
+        self.errors = 0
+        self.call_sites = {}
+
+    def to_dict(self):
+        d = {"sql": self.sql, "rows": self.rows, "errors": self.errors}
+        d.update(self.latency.to_dict())
+        d["call_sites"] = dict(sorted(self.call_sites.items(), key=lambda kv: -kv[1]))
+        return d
+
+
+class _Tracker:
+    """Filled in by the caller inside query_stats.track()."""
+    def __init__(self):
+        self.rows = 0
+
+
+class QueryStats:
+    def __init__(self, slow_threshold_ms=None, slow_log_size=200):
+        if slow_threshold_ms is None:
+            slow_threshold_ms = float(os.environ.get("STAYSMART_SLOW_QUERY_MS", 200))
+        self.slow_threshold_ms = slow_threshold_ms
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._connect = _Histogram()
+        self._connect_failures = 0
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.started_at = datetime.now()
+
+    # ---------------- recording ----------------
+
+    @contextmanager
+    def track(self, sql):
+        """Times the wrapped block as one execution of `sql`."""
+        tracker = _Tracker()
+        if not self.enabled:
+            yield tracker
+            return
+
+        t0 = time.perf_counter()
+        failed = False
+        try:
+            yield tracker
+        except Exception:
+            failed = True
+            raise
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.record_query(sql, ms, tracker.rows, failed)
+
+    def record_query(self, sql, ms, rows=0, failed=False, call_site=None):
+        key = normalize_sql(sql)
+        call_site = call_site or find_call_site()
+        with self._lock:
+            rec = self._queries.get(key)
+            if rec is None:
+                rec = self._queries[key] = _QueryRecord(key)
+            rec.latency.add(ms)
+            rec.rows += rows or 0
+            if failed:
+                rec.errors += 1
+            rec.call_sites[call_site] = rec.call_sites.get(call_site, 0) + 1
+
+        if ms >= self.slow_threshold_ms:
+            entry = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "ms": round(ms, 3),
+                "rows": rows,
+                "call_site": call_site,
+                "sql": key,
+            }
+            self.slow_log.append(entry)
+            slow_logger.warning("%.1fms rows=%s at %s: %s", ms, rows, call_site, key)
+
+    def record_connect(self, ms, ok=True):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._connect.add(ms)
+            if not ok:
+                self._connect_failures += 1
+
+    # ---------------- reporting ----------------
+
+    def snapshot(self):
+        with self._lock:
+            queries = [rec.to_dict() for rec in self._queries.values()]
+            connect = self._connect.to_dict()
+            connect["failures"] = self._connect_failures
+
+        queries.sort(key=lambda q: -q["total_ms"])
+
+        call_sites = {}
+        for q in queries:
+            for site, n in q["call_sites"].items():
+                agg = call_sites.setdefault(site, {"queries": 0, "total_ms": 0.0})
+                agg["queries"] += n
+                agg["total_ms"] += q["avg_ms"] * n
+        by_site = sorted(
+            ({"call_site": k, "queries": v["queries"], "total_ms": round(v["total_ms"], 3)}
+             for k, v in call_sites.items()),
+            key=lambda s: -s["total_ms"]
+        )
+
+        return {
+            "since": self.started_at.isoformat(timespec="seconds"),
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "connections": connect,
+            "queries": queries,
+            "call_sites": by_site,
+            "slow_queries": list(self.slow_log),
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, default=str)
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._connect = _Histogram()
+            self._connect_failures = 0
+            self.slow_log.clear()
+            self.started_at = datetime.now()
+
+
+query_stats = QueryStats()
+
+_slow_log_path = os.environ.get("STAYSMART_SLOW_QUERY_LOG")
+if _slow_log_path:
+    _handler = logging.FileHandler(_slow_log_path, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_logger.addHandler(_handler)
@@ -2,6 +2,8 @@ import sys
 from auth import Auth
 from student_dashboard import StudentDashboardWindow
 from owner_dashboard import OwnerDashboardWindow
+from prefetch import start_prefetch
+from scheduler import start_gui_scheduler
 
 from PyQt5.QtCore import (
     Qt, QPropertyAnimation, QEasingCurve, QTimer, QRect, QRectF, pyqtSlot, QPropertyAnimation, QEasingCurve, QSize, QParallelAnimationGroup, pyqtProperty
@@ -256,6 +258,9 @@ class LoginWindow(QWidget):
                 QMessageBox.warning(self, "Login Failed", msg or "Invalid username or password.")
                 return
 
+            # dashboard queries run while the welcome dialog is on screen
+            start_prefetch(user_id, role)
+
             if role == "OWNER":
                 QMessageBox.information(self, "Login Successful",
                                         f"Welcome back, Admin {username}!")
@@ -281,6 +286,7 @@ class LoginWindow(QWidget):
         if is_admin:
             user = getattr(self.auth, "get_user", lambda u: None)(username)
             user_id = user["user_id"] if user and "user_id" in user else 1
+            start_prefetch(user_id, "OWNER")
             QMessageBox.information(self, "Login Successful", f"Welcome back, Admin {username}!")
             self.dashboard = OwnerDashboardWindow(owner_id=user_id)
             self.dashboard.show()
@@ -292,6 +298,7 @@ class LoginWindow(QWidget):
         if is_student:
             user = getattr(self.auth, "get_user", lambda u: None)(username)
             user_id = user["user_id"] if user and "user_id" in user else 1 
+            start_prefetch(user_id, "TENANT")
             QMessageBox.information(self, "Login Successful", f"Welcome, {username}!")
             self.student_dash = StudentDashboardWindow(tenant_id=user_id)
             self.student_dash.show()
@@ -725,6 +732,7 @@ class LoginWindow(QWidget):
 def LoginMain():
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    app.scheduler = start_gui_scheduler()  # kept alive with the app; see main.py
     w = LoginWindow()
     w.showNormal()
     sys.exit(app.exec_())
@@ -1,10 +1,16 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from login import LoginWindow
+from scheduler import start_gui_scheduler
+from view_tracker import view_tracker
 
 def main():
     app = QApplication(sys.argv)
     app.setStyle("Fusion")  # optional but good
+    # migrations, then overdue / billing / cleanup / expired holds; the
+    # driver owns the timer and worker, so it lives as long as the app
+    app.scheduler = start_gui_scheduler()
+    app.aboutToQuit.connect(view_tracker.stop)  # flush buffered room views
     window = LoginWindow()   # ENTRY POINT
     window.show()
 
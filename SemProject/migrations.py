@@ -0,0 +1,217 @@
+# migrations.py
+"""
+Schema changes that sit on top of the base staysmartdb tables.
+
+Each migration is (name, [statements]) and is applied once, in order.
+Applied names are recorded in schema_migrations so running this again
+is a no-op.
+"""
+MIGRATIONS = [
+    ("001_payments_status_due_index", [
+        "CREATE INDEX idx_payments_status_due ON payments(status, due_date)",
+    ]),
+    ("002_job_runs", [
+        """
+        CREATE TABLE job_runs (
+            run_id INT AUTO_INCREMENT PRIMARY KEY,
+            job_name VARCHAR(64) NOT NULL,
+            started_at DATETIME NOT NULL,
+            finished_at DATETIME NOT NULL,
+            duration_ms INT NOT NULL DEFAULT 0,
+            batches INT NOT NULL DEFAULT 0,
+            rows_affected INT NOT NULL DEFAULT 0,
+            status VARCHAR(16) NOT NULL,
+            error_message TEXT NULL
+        )
+        """,
+        "CREATE INDEX idx_job_runs_name_started ON job_runs(job_name, started_at)",
+    ]),
+    ("003_dorms_lat_lon_index", [
+        "CREATE INDEX idx_dorms_lat_lon ON dorms(latitude, longitude)",
+    ]),
+    ("004_rooms_amenity_mask", [
+        "ALTER TABLE rooms ADD COLUMN amenity_mask BIGINT NOT NULL DEFAULT 0",
+        """
+        UPDATE rooms SET amenity_mask = (
+            SELECT COALESCE(SUM(1 << (ra.amenity_id - 1)), 0)
+            FROM room_amenities ra
+            -- ids past 63 have no bit; shifting them overflows the BIGINT
+            WHERE ra.room_id = rooms.room_id AND ra.amenity_id BETWEEN 1 AND 63
+        )
+        """,
+    ]),
+    ("005_recently_viewed", [
+        """
+        CREATE TABLE IF NOT EXISTS recently_viewed (
+            user_id INT NOT NULL,
+            room_id INT NOT NULL,
+            viewed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, room_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX idx_recently_viewed_user_time ON recently_viewed(user_id, viewed_at)",
+    ]),
+    ("006_rooms_occupied_beds", [
+        "ALTER TABLE rooms ADD COLUMN occupied_beds INT NOT NULL DEFAULT 0",
+        """
+        UPDATE rooms SET occupied_beds = (
+            SELECT COUNT(*) FROM rentals rr
+            WHERE rr.room_id = rooms.room_id AND rr.status IN ('ACTIVE','EXTENDED','ENDING')
+        ) + (
+            SELECT COUNT(*) FROM rental_applications ra
+            WHERE ra.room_id = rooms.room_id
+        AND (ra.action_status = 'WAITING'
+             OR (ra.action_status = 'APPROVED'
+                 AND NOT EXISTS (SELECT 1 FROM rentals x WHERE x.application_id = ra.application_id)))
+        )
+        """,
+        "UPDATE rooms SET is_available=0 WHERE occupied_beds >= capacity",
+    ]),
+    ("007_application_holds", [
+        "ALTER TABLE rental_applications ADD COLUMN expires_at DATETIME NULL",
+        "CREATE INDEX idx_applications_status_expires ON rental_applications(action_status, expires_at)",
+        # existing waiting applications get the default 72 hour hold from when they were sent
+        """
+        UPDATE rental_applications
+        SET expires_at = DATE_ADD(submitted_at, INTERVAL 72 HOUR)
+        WHERE action_status = 'WAITING'
+        """,
+    ]),
+    ("008_room_waitlist", [
+        """
+        CREATE TABLE room_waitlist (
+            waitlist_id INT AUTO_INCREMENT PRIMARY KEY,
+            room_id INT NOT NULL,
+            tenant_id INT NOT NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'WAITING',
+            joined_at DATETIME NOT NULL,
+            promoted_at DATETIME NULL,
+            application_id INT NULL,
+            FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE,
+            FOREIGN KEY (tenant_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX idx_waitlist_room_queue ON room_waitlist(room_id, status, waitlist_id)",
+        "CREATE INDEX idx_waitlist_tenant ON room_waitlist(tenant_id, status)",
+    ]),
+    # MySQL indexes these foreign keys by itself; SQLite does not, and the
+    # bed recount and availability index probe them per room / application
+    ("009_booking_lookup_indexes", [
+        "CREATE INDEX idx_rentals_application ON rentals(application_id)",
+        "CREATE INDEX idx_applications_room ON rental_applications(room_id, action_status)",
+    ]),
+    ("010_rental_dues", [
+        "ALTER TABLE rentals ADD COLUMN balance_due DECIMAL(10,2) NOT NULL DEFAULT 0",
+        "ALTER TABLE rentals ADD COLUMN next_due_date DATE NULL",
+        "ALTER TABLE rentals ADD COLUMN last_paid_at DATETIME NULL",
+        """
+        UPDATE rentals SET
+            balance_due = (
+                SELECT COALESCE(SUM(p.amount_due - p.amount_paid), 0) FROM payments p
+                WHERE p.rental_id = rentals.rental_id AND p.status <> 'PAID'
+            ),
+            next_due_date = (
+                SELECT MIN(p.due_date) FROM payments p
+                WHERE p.rental_id = rentals.rental_id AND p.status <> 'PAID'
+            ),
+            last_paid_at = (
+                SELECT MAX(p.paid_at) FROM payments p
+                WHERE p.rental_id = rentals.rental_id AND p.status = 'PAID'
+            )
+        """,
+    ]),
+    ("011_payment_posting", [
+        "ALTER TABLE transactions ADD COLUMN request_id INT NULL",
+        "ALTER TABLE transactions ADD COLUMN payment_id INT NULL",
+        # one transaction per approved request, even if two owners click Approve at once
+        "CREATE UNIQUE INDEX idx_transactions_request ON transactions(request_id)",
+        """
+        CREATE TABLE owner_revenue_monthly (
+            owner_id INT NOT NULL,
+            revenue_year INT NOT NULL,
+            revenue_month INT NOT NULL,
+            paid_total DECIMAL(12,2) NOT NULL DEFAULT 0,
+            payments INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (owner_id, revenue_year, revenue_month),
+            FOREIGN KEY (owner_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        INSERT INTO owner_revenue_monthly (owner_id, revenue_year, revenue_month, paid_total, payments)
+        SELECT owner_id, YEAR(transaction_date), MONTH(transaction_date), SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE status='PAID'
+        GROUP BY owner_id, YEAR(transaction_date), MONTH(transaction_date)
+        """,
+    ]),
+    ("012_payment_request_periods", [
+        "ALTER TABLE payment_requests ADD COLUMN period DATE NULL",
+        "ALTER TABLE payment_requests ADD COLUMN pending TINYINT NULL",
+        # older requests keep pending NULL: duplicates already queued stay reviewable
+        "UPDATE payment_requests SET period = DATE(submitted_at)",
+        "CREATE UNIQUE INDEX idx_payment_requests_period ON payment_requests(tenant_id, rental_id, period, pending)",
+    ]),
+    ("013_job_leases", [
+        # every client runs the scheduler; a job runs on whichever one holds its lease
+        """
+        CREATE TABLE job_leases (
+            job_name VARCHAR(64) PRIMARY KEY,
+            holder VARCHAR(128) NULL,
+            lease_until DATETIME NOT NULL
+        )
+        """,
+    ]),
+    ("014_application_review_note", [
+        # the owner's reason when rejecting a reservation request
+        "ALTER TABLE rental_applications ADD COLUMN review_note VARCHAR(255) NULL",
+    ]),
+]
+
+
+def _ensure_migrations_table(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+
+
+def applied_migrations(db):
+    rows = db.fetchall("SELECT name FROM schema_migrations")
+    return {r["name"] for r in rows}
+
+
+def apply_migrations(db, migrations=None):
+    """
+    Applies every pending migration and returns the names that ran.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+
+    _ensure_migrations_table(db)
+    done = applied_migrations(db)
+
+    ran = []
+    for name, statements in migrations:
+        if name in done:
+            continue
+        for sql in statements:
+            try:
+                db.execute(sql)
+            except db.backend.errors as e:
+                if not db.backend.is_already_exists(e):
+                    raise
+        db.execute(
+            "INSERT INTO schema_migrations(name, applied_at) VALUES (%s, NOW())",
+            (name,)
+        )
+        ran.append(name)
+    return ran
+
+
+if __name__ == "__main__":
+    from database import DatabaseManager
+    for name in apply_migrations(DatabaseManager()):
+        print("Applied:", name)
@@ -13,6 +13,7 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 from database import DatabaseManager
+from background_loader import BackgroundLoader, show_table_placeholder, fill_table
 
 
 class MonthlyEarningsWindow(QWidget):
@@ -29,7 +30,10 @@ class MonthlyEarningsWindow(QWidget):
 
         self._build_ui()
         self._apply_styles()
-        self._init_years()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     # -----------------------------------------------------
@@ -44,40 +48,55 @@ class MonthlyEarningsWindow(QWidget):
     # -----------------------------------------------------
     # LOAD + REFRESH UI FROM DB
     # -----------------------------------------------------
-    def _init_years(self):
-        """Fill year combo from DB (fallback to current year)."""
-        years = self.db.get_owner_transaction_years(self.owner_id)
-        if not years:
-            years = [datetime.now().year]
-        self.combo_year.clear()
-        self.combo_year.addItems([str(y) for y in years])
-
     def load_data(self):
-        year = int(self.combo_year.currentText())
-        now = datetime.now()
+        text = self.combo_year.currentText()
+        self.loader.load(int(text) if text else None)
+
+    def _fetch_data(self, year):
+        """
+        Runs on a worker thread. On the first load (no year picked yet) it
+        also fills the year combo from DB (fallback to current year).
+        """
+        years = None
+        if year is None:
+            years = self.db.get_owner_transaction_years(self.owner_id) or [datetime.now().year]
+            year = years[0]
+
+        return {
+            "years": years,
+            "year": year,
+            "summary": self.db.get_monthly_earnings_summary(
+                self.owner_id, year=year, month=datetime.now().month
+            ),
+            "series": self.db.get_monthly_revenue_series(self.owner_id, year=year),
+            "tx": self.db.get_recent_transactions(self.owner_id, year=year, limit=15),
+        }
+
+    def _apply_data(self, data):
+        year = data["year"]
+        if data["years"]:
+            self.combo_year.blockSignals(True)
+            self.combo_year.clear()
+            self.combo_year.addItems([str(y) for y in data["years"]])
+            self.combo_year.setCurrentText(str(year))
+            self.combo_year.blockSignals(False)
 
         # ---- STAT CARDS ----
-        summary = self.db.get_monthly_earnings_summary(
-            self.owner_id, year=year, month=now.month
-        )
+        summary = data["summary"]
         self.lbl_total_val.setText(f"₱ {summary['paid']:,.0f}")
         self.lbl_pending_val.setText(f"₱ {summary['pending']:,.0f}")
         self.lbl_rate_val.setText(f"{summary['collection_rate']}%")
 
         # ---- CHART ----
-        series = self.db.get_monthly_revenue_series(self.owner_id, year=year)
-        self._plot_chart(series, year)
+        self._plot_chart(data["series"], year)
 
         # ---- TABLE ----
-        tx = self.db.get_recent_transactions(self.owner_id, year=year, limit=15)
-        self.table.setRowCount(0)
-
-        for row, t in enumerate(tx):
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(str(t["transaction_date"].date())))
-            self.table.setItem(row, 1, QTableWidgetItem(t["tenant_name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(f"₱ {float(t['amount']):,.0f}"))
-            self.table.setItem(row, 3, QTableWidgetItem(t["status"]))
+        fill_table(self.table, data["tx"], lambda t: [
+            t["transaction_date"].date(),
+            t["tenant_name"],
+            f"₱ {float(t['amount']):,.0f}",
+            t["status"],
+        ])
 
     # -----------------------------------------------------
     # EXPORT REPORT (CSV)
@@ -7,7 +7,11 @@ from paymentrequest import PaymentRequestsWindow
 
 
 # --- IMPORT DATABASE ---
-from database import DatabaseManager 
+from database import OWNER_STAT_PARTS, DatabaseManager
+from async_db import AsyncDatabaseManager, run_on_qt, with_timeout
+from diagnostics import install_diagnostics_shortcut
+from prefetch import cancel_prefetch
+from instrumentation import logger
 
 # --- IMPORT SUB-WINDOWS ---
 from TotalDorms import TotalDormsWindow
@@ -27,9 +31,31 @@ from matplotlib.figure import Figure
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# a panel still waiting after this many seconds shows "unavailable" instead
+PANEL_TIMEOUT_S = 5.0
+
 windows_registry = []
 
 
+def load_panel(owner, name, awaitable, apply, on_timeout, timeout=PANEL_TIMEOUT_S):
+    """
+    Awaits one dashboard panel's query on the DB pool and applies it on the
+    GUI thread. Panels load independently, so a slow one only delays itself.
+    """
+    async def load():
+        try:
+            result = await with_timeout(awaitable, timeout)
+        except TimeoutError:
+            logger.warning("Dashboard panel %s timed out after %gs", name, timeout)
+            on_timeout()
+            return
+        apply(result)
+
+    return run_on_qt(load(), owner=owner, on_error=lambda e: (
+        logger.error("Dashboard panel %s failed: %s", name, e), on_timeout()
+    ))
+
+
 def load_total_dorms():
     file_path = "TotalDorms.py"
     if not os.path.exists(file_path):
@@ -59,10 +85,18 @@ class ClickableCard(QFrame):
 
 
 class OccupancyChart(QWidget):
-    def __init__(self, owner_id, db, parent=None):
+    MODES = ("weekly", "monthly", "yearly")
+
+    def __init__(self, owner_id, db, parent=None, adb=None):
         super().__init__(parent)
         self.owner_id = owner_id
         self.db = db
+        self.adb = adb or AsyncDatabaseManager(db)
+
+        # mode -> chart data, and mode -> "loading"/"unavailable" while missing
+        self.series = {}
+        self.pending = {}
+        self.tasks = {}
 
         self.view_mode = "yearly"
         self.auto_timer = QTimer(self)
@@ -109,18 +143,62 @@ class OccupancyChart(QWidget):
         self.btn_year.setChecked(self.view_mode == "yearly")
 
     def set_mode(self, mode):
-        if mode not in ("weekly", "monthly", "yearly"): return
+        if mode not in self.MODES: return
         self.view_mode = mode
         self._update_mode_buttons()
+        if mode not in self.series and self.pending.get(mode) != "loading":
+            self.load_mode(mode)    # retry a mode that timed out earlier
         self.draw_chart()
 
+    def load_all(self):
+        """Fetches every mode at once, so switching modes never waits on the DB."""
+        for mode in self.MODES:
+            self.load_mode(mode)
+
+    def load_mode(self, mode):
+        if mode == "weekly":
+            awaitable = self.adb.prefetched("get_owner_occupancy_weekly", self.owner_id)
+        elif mode == "monthly":
+            awaitable = self.adb.prefetched("get_owner_occupancy_monthly", self.owner_id,
+                                             datetime.now().year)
+        else:
+            awaitable = self.adb.prefetched("get_owner_occupancy_yearly", self.owner_id, years_back=4)
+
+        self.pending[mode] = "loading"
+
+        def apply(data):
+            self.series[mode] = data
+            self.pending.pop(mode, None)
+            if mode == self.view_mode:
+                self.draw_chart()
+
+        def unavailable():
+            self.pending[mode] = "unavailable"
+            if mode == self.view_mode:
+                self.draw_chart()
+
+        self.tasks[mode] = load_panel(self, f"chart:{mode}", awaitable, apply, unavailable)
+
+    def _draw_message(self, ax, text):
+        ax.text(0.5, 0.5, text, ha="center", va="center", transform=ax.transAxes, color="#666")
+        ax.set_xticks([])
+        ax.set_yticks([])
+        self.canvas.draw_idle()
+
     def draw_chart(self):
         self.fig.clf()
         ax = self.fig.add_subplot(111)
 
+        if self.view_mode not in self.series:
+            if self.pending.get(self.view_mode) == "unavailable":
+                self._draw_message(ax, "Occupancy data unavailable - click the mode again to retry")
+            else:
+                self._draw_message(ax, "Loading occupancy...")
+            return
+
         if self.view_mode == "weekly":
             labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-            values = self.db.get_owner_occupancy_weekly(self.owner_id)
+            values = self.series["weekly"]
             bars = ax.bar(range(len(values)), values)
             for rect, val in zip(bars, values):
                 ax.text(rect.get_x() + rect.get_width()/2.0,
@@ -129,12 +207,11 @@ class OccupancyChart(QWidget):
 
         elif self.view_mode == "monthly":
             labels = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-            year = datetime.now().year
-            values = self.db.get_owner_occupancy_monthly(self.owner_id, year)
+            values = self.series["monthly"]
             ax.plot(range(len(values)), values, linewidth=3, marker='o')
 
         else:  # yearly
-            labels, values = self.db.get_owner_occupancy_yearly(self.owner_id, years_back=4)
+            labels, values = self.series["yearly"]
             if not labels:
                 labels = [str(datetime.now().year)]
                 values = [0]
@@ -186,16 +263,19 @@ class OwnerDashboardWindow(QWidget):
         self.setMinimumSize(1180, 760)
 
         self.db = DatabaseManager()
+        self.adb = AsyncDatabaseManager(self.db)
         self.host_id = owner_id if owner_id is not None else 1
 
         self._fonts()
         self._build_ui()
         self._start_clock()   
         self._apply_styles()
+        install_diagnostics_shortcut(self)
         self.load_dashboard_data()
 
     def logout(self):
         from login import LoginWindow 
+        cancel_prefetch()
         self.win_logout = LoginWindow()
         self.win_logout.show()
         self.close()
@@ -207,18 +287,51 @@ class OwnerDashboardWindow(QWidget):
         self.font_normal = QFont("Segoe UI", 10)
 
     def load_dashboard_data(self):
-        """Fetches real data from database and updates UI."""
-        stats = self.db.get_owner_stats(self.host_id)
-
-        self.lbl_total_val.setText(str(stats["total_dorms"]))
-        self.lbl_occ_val.setText(str(stats["current_occupants"]))
-        self.lbl_pending_val.setText(str(stats["pending_requests"]))
-        self.lbl_earn_val.setText(f"₱{stats['monthly_earnings']:,.0f}")
-
-        self.lbl_active_dorms.setText(f"Active Dorms: {stats['active_dorms']}")
-        self.lbl_maint_dorms.setText(f"Dorms Under Maintenance: {stats['maintenance_dorms']}")
-        self.lbl_occupancy_rate.setText(f"Occupancy: {stats['occupancy_rate']}%")
-        recent_res = self.db.get_recent_reservations(self.host_id)
+        """
+        Fans out each stat query, recent reservations and every chart mode
+        concurrently; each panel fills in (or times out) on its own, so the
+        cards wait for the slowest of their queries, not for all of them.
+        """
+        self.panel_tasks = {
+            part: load_panel(self, part, self.adb.prefetched(part, self.host_id),
+                             self._apply_stats, lambda keys=keys: self._stats_unavailable(keys))
+            for part, keys in OWNER_STAT_PARTS.items()
+        }
+        self.panel_tasks["recent"] = load_panel(
+            self, "recent", self.adb.prefetched("get_recent_reservations", self.host_id),
+            self._apply_recent, self._recent_unavailable)
+        self.chart.load_all()
+
+    def _stat_labels(self):
+        return {
+            "total_dorms": (self.lbl_total_val, str),
+            "current_occupants": (self.lbl_occ_val, str),
+            "pending_requests": (self.lbl_pending_val, str),
+            "monthly_earnings": (self.lbl_earn_val, lambda v: f"₱{v:,.0f}"),
+            "active_dorms": (self.lbl_active_dorms, lambda v: f"Active Dorms: {v}"),
+            "maintenance_dorms": (self.lbl_maint_dorms, lambda v: f"Dorms Under Maintenance: {v}"),
+            "occupancy_rate": (self.lbl_occupancy_rate, lambda v: f"Occupancy: {v}%"),
+        }
+
+    def _apply_stats(self, stats):
+        """Fills in the labels of whichever OWNER_STAT_PARTS part arrived."""
+        labels = self._stat_labels()
+        for key, value in stats.items():
+            lbl, fmt = labels[key]
+            lbl.setText(fmt(value))
+
+    def _stats_unavailable(self, keys):
+        cards = (self.lbl_total_val, self.lbl_occ_val, self.lbl_pending_val, self.lbl_earn_val)
+        labels = self._stat_labels()
+        for key in keys:
+            if labels[key][0] in cards:
+                labels[key][0].setText("—")
+
+    def _recent_unavailable(self):
+        self.lst_recent.clear()
+        self.lst_recent.addItem("Could not load recent reservations.")
+
+    def _apply_recent(self, recent_res):
         self.lst_recent.clear()
         
         if not recent_res:
@@ -322,7 +435,7 @@ class OwnerDashboardWindow(QWidget):
         occ_title_row.addWidget(lbl)
         occ_title_row.addStretch()
 
-        self.chart = OccupancyChart(owner_id=self.host_id, db=self.db, parent=self)
+        self.chart = OccupancyChart(owner_id=self.host_id, db=self.db, parent=self, adb=self.adb)
 
         occ_layout.addWidget(self.chart)
         root.addWidget(occ_frame)
@@ -3,14 +3,12 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QLineEdit, QFrame, QHeaderView, QMessageBox
 )
 from PyQt5.QtCore import Qt
-import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
 
 from database import DatabaseManager
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+from proof_viewer import ProofViewer, PREFETCH_AHEAD
 
 
 class PaymentRequestsWindow(QWidget):
@@ -19,6 +17,7 @@ class PaymentRequestsWindow(QWidget):
         self.owner_id = owner_id
         self.parent_window = parent_window
         self.db = DatabaseManager()
+        self.requests = []
 
         self.setWindowTitle("Pending Requests — StaySmart")
         self.setMinimumSize(1100, 700)
@@ -95,9 +94,9 @@ class PaymentRequestsWindow(QWidget):
         card_layout.addWidget(card_title)
 
         # ---------- TABLE ----------
-        self.table = QTableWidget(0, 4)
+        self.table = QTableWidget(0, 5)
         self.table.setHorizontalHeaderLabels([
-            "Tenant", "Amount", "Proof", "Status"
+            "Tenant", "Amount", "Proof", "Approve", "Reject"
         ])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
@@ -125,7 +124,16 @@ class PaymentRequestsWindow(QWidget):
             }
         """)
 
-        card_layout.addWidget(self.table)
+        self.table.currentCellChanged.connect(self._row_changed)
+
+        # ---------- PROOF PANEL ----------
+        self.viewer = ProofViewer()
+
+        body = QHBoxLayout()
+        body.setSpacing(16)
+        body.addWidget(self.table, 3)
+        body.addWidget(self.viewer, 2)
+        card_layout.addLayout(body)
         root.addWidget(card, 1)
 
         # ---------- ACTION BUTTONS ----------
@@ -171,19 +179,6 @@ class PaymentRequestsWindow(QWidget):
             }}
         """
 
-    # ---------------- DATA ----------------
-    def load_requests(self):
-        self.table.setRowCount(0)
-
-        requests = self.db.get_pending_payment_requests(self.owner_id)
-
-        for row, req in enumerate(requests):
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(req["tenant_name"]))
-            self.table.setItem(row, 1, QTableWidgetItem(f"₱{req['amount']:,}"))
-            self.table.setItem(row, 2, QTableWidgetItem("View"))
-            self.table.setItem(row, 3, QTableWidgetItem("Pending"))
-
     # ---------------- ACTIONS ----------------
     def selected_row(self):
         row = self.table.currentRow()
@@ -193,22 +188,19 @@ class PaymentRequestsWindow(QWidget):
         row = self.selected_row()
         if row is None:
             return
-        tenant = self.table.item(row, 0).text()
-        print("Approved:", tenant)
+        self.approve(self.requests[row])
 
     def reject_selected(self):
         row = self.selected_row()
         if row is None:
             return
-        tenant = self.table.item(row, 0).text()
-        print("Rejected:", tenant)
+        self.reject(self.requests[row])
 
     def view_proof(self):
         row = self.selected_row()
         if row is None:
             return
-        tenant = self.table.item(row, 0).text()
-        print("View proof for:", tenant)
+        self.viewer.show_proof(self.requests[row]["proof_image"] or "", zoomed=True)
 
     def filter_table(self, text):
         for row in range(self.table.rowCount()):
@@ -220,10 +212,28 @@ class PaymentRequestsWindow(QWidget):
                     break
             self.table.setRowHidden(row, not match)
 
+        current = self.table.currentRow()
+        if current >= 0 and self.table.isRowHidden(current):
+            self._select_nearest_visible(current)
+
+    def _select_nearest_visible(self, row):
+        """Selects row, or the closest one the search still shows (the next one on a tie)."""
+        visible = [r for r in range(self.table.rowCount()) if not self.table.isRowHidden(r)]
+        if not visible:
+            self.table.clearSelection()
+            self.table.setCurrentCell(-1, -1)
+            self.viewer.clear()
+            return
+        self.table.selectRow(min(visible, key=lambda r: (abs(r - row), r < row)))
+
 
 
+    # ---------------- DATA ----------------
     def load_requests(self):
+        current = self.selected_row()
         requests = self.db.get_pending_payment_requests(self.owner_id)
+        self.requests = requests
+        self.table.blockSignals(True)
         self.table.setRowCount(0)
 
         for row, req in enumerate(requests):
@@ -233,7 +243,7 @@ class PaymentRequestsWindow(QWidget):
 
             # Proof button
             btn_proof = QPushButton("View")
-            btn_proof.clicked.connect(lambda _, p=req["proof_image"]: self.show_proof(p))
+            btn_proof.clicked.connect(lambda _, row=row: self.show_proof(row))
             self.table.setCellWidget(row, 2, btn_proof)
 
             # Approve button
@@ -246,19 +256,51 @@ class PaymentRequestsWindow(QWidget):
             btn_rej.clicked.connect(lambda _, r=req: self.reject(r))
             self.table.setCellWidget(row, 4, btn_rej)
 
-    def show_proof(self, path):
-        abs_path = os.path.join(BASE_DIR, path)
-        QMessageBox.information(self, "Payment Proof", f"Image located at:\n{abs_path}")
+        self.table.blockSignals(False)
+        self.filter_table(self.search.text())
+
+        # after a review the next request in the queue takes the reviewed one's place
+        if requests:
+            self._select_nearest_visible(min(current or 0, len(requests) - 1))
+        else:
+            self.viewer.clear()
+
+    def show_proof(self, row):
+        self.table.selectRow(row)
+
+    def _row_changed(self, row, *_):
+        if row < 0 or row >= len(self.requests):
+            self.viewer.clear()
+            return
+        self.viewer.show_proof(self.requests[row]["proof_image"] or "")
+
+        # decode the next few proofs while this one is being looked at
+        upcoming = [r for r in range(row + 1, len(self.requests)) if not self.table.isRowHidden(r)]
+        self.viewer.prefetch([self.requests[r]["proof_image"] for r in upcoming[:PREFETCH_AHEAD]])
 
     def approve(self, req):
-        self.db.review_payment_request(req["request_id"], approve=True)
-        self.db.update_payment_due_date(req["rental_id"])
+        try:
+            posted = self.db.review_payment_request(req["request_id"], approve=True)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not approve the payment:\n{e}")
+            return
+        if not posted:
+            QMessageBox.information(self, "Already Reviewed",
+                "This payment request was already reviewed.")
         self.load_requests()
 
     def reject(self, req):
-        self.db.review_payment_request(req["request_id"], approve=False)
-        QMessageBox.warning(self, "Rejected", 
-            "Payment declined. Tenant will be notified.")
+        try:
+            rejected = self.db.review_payment_request(req["request_id"], approve=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not reject the payment:\n{e}")
+            return
+        if rejected:
+            QMessageBox.warning(self, "Rejected",
+                "Payment declined. Tenant will be notified.")
+        else:
+            QMessageBox.information(self, "Already Reviewed",
+                "This payment request was already reviewed.")
         self.load_requests()
 
 def main():
@@ -5,10 +5,12 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont, QCursor
 from PyQt5.QtCore import Qt
-from database import DatabaseManager
-from datetime import datetime
+from database import DatabaseManager, PAYMENT_SUBMITTED, PAYMENT_ALREADY_SUBMITTED
+from background_loader import BackgroundLoader, show_table_placeholder, fill_table
+from prefetch import prefetched
+from images import ImageIngester
+from datetime import date, datetime
 import os
-import shutil
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -19,10 +21,18 @@ class PaymentsWindow(QWidget):
         self.setWindowTitle("Payments")
         self.resize(1000, 650)
         self.db = DatabaseManager()
-        self.user_id = user_id 
-        
+        self.user_id = user_id
+        self.rental_id = None
+        self.amount_due = 0
+        self.ingester = ImageIngester(self, self._proof_ready, self._proof_failed)
+
         self._build_ui()
         self._apply_styles()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.tbl)
+        )
+        self.loader.load()
 
     def go_back(self):
         from student_dashboard import StudentDashboardWindow
@@ -35,66 +45,6 @@ class PaymentsWindow(QWidget):
         root.setContentsMargins(20, 20, 20, 20)
         root.setSpacing(14)
 
-        payments = self.db.get_user_payments(self.user_id)
-
-        # ----------------------------
-        # Determine active payment
-        # ----------------------------
-        active_payment = next(
-            (p for p in payments if p['status'] in ('Due', 'Overdue')),
-            None
-        )
-
-        if active_payment:
-            self.rental_id = active_payment['rental_id']
-            self.amount_due = active_payment['amount_due']
-        else:
-            self.rental_id = None
-            self.amount_due = 0
-
-        due_items = [
-            p for p in payments
-            if p['status'] in ('Due', 'Overdue')
-        ]
-
-        outstanding = sum(
-            p['amount_due'] for p in due_items
-        )
-
-        if self.rental_id:
-            remark = self.db.get_last_payment_rejection(
-                self.user_id,
-                self.rental_id
-            )
-
-            if remark:
-                QMessageBox.warning(
-                    self,
-                    "Payment Rejected",
-                    f"Your last payment was rejected.\n\nReason:\n{remark}"
-                )
-
-        due_items.sort(key=lambda x: x['due_date'])
-        next_due_str = "No Dues"
-
-        if due_items:
-            d = due_items[0]['due_date']
-            next_due_str = f"{d.strftime('%B %d, %Y')}"
-
-        paid_items = [p for p in payments if p['status'] == 'Paid']
-        paid_items.sort(key=lambda x: x.get('payment_date') or x['due_date'], reverse=True)
-        last_pay_str = "No history"
-        if paid_items:
-            p = paid_items[0]
-            d = p.get('payment_date') or p['due_date']
-            last_pay_str = f"₱{p['amount_due']:,.0f} — {d}"
-
-        status_str = "Up to Date"
-        if any(p['status'] == 'Overdue' for p in payments):
-            status_str = "Overdue!"
-        elif outstanding > 0:
-            status_str = "Pending"
-
         # ----------------------------
         # HEADER
         # ----------------------------
@@ -126,19 +76,20 @@ class PaymentsWindow(QWidget):
         root.addLayout(header)
 
         # ----------------------------
-        # TOP SUMMARY CARDS (Dynamic)
+        # TOP SUMMARY CARDS (filled by _apply_data)
         # ----------------------------
         top = QHBoxLayout()
         top.setSpacing(12)
 
-        top.addWidget(self._summary_card("Next Due", next_due_str))
-        top.addWidget(self._summary_card(
-            "Due Amount",
-            f"₱{outstanding:,.2f}",
-            show_pay_button=True
-        ))
-        top.addWidget(self._summary_card("Last Payment", last_pay_str))
-        top.addWidget(self._summary_card("Status", status_str))
+        card, self.lbl_next_due = self._summary_card("Next Due", "…")
+        top.addWidget(card)
+        card, self.lbl_due_amount = self._summary_card("Due Amount", "…", show_pay_button=True)
+        top.addWidget(card)
+        card, self.lbl_last_payment = self._summary_card("Last Payment", "…")
+        top.addWidget(card)
+        card, self.lbl_status = self._summary_card("Status", "…")
+        top.addWidget(card)
+        self.btn_pay_now.setDisabled(True)
 
         root.addLayout(top)
 
@@ -170,21 +121,10 @@ class PaymentsWindow(QWidget):
         lbl.setFont(QFont("Segoe UI", 14, QFont.DemiBold))
         table_layout.addWidget(lbl)
 
-        self.tbl = QTableWidget(len(payments), 4)
+        self.tbl = QTableWidget(0, 4)
         self.tbl.setHorizontalHeaderLabels(["Date", "Amount", "Status", "Room"])
         self.tbl.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-        for r, p in enumerate(payments):
-            date_val = str(p['due_date'])
-            amt_val = f"₱{p['amount_due']:,.2f}"
-            status_val = p['status']
-            room_val = p.get('room_name', 'Unknown')
-
-            self.tbl.setItem(r, 0, QTableWidgetItem(date_val))
-            self.tbl.setItem(r, 1, QTableWidgetItem(amt_val))
-            self.tbl.setItem(r, 2, QTableWidgetItem(status_val))
-            self.tbl.setItem(r, 3, QTableWidgetItem(room_val))
-
         table_layout.addWidget(self.tbl)
         root.addWidget(table_frame)
 
@@ -197,39 +137,111 @@ class PaymentsWindow(QWidget):
         b_layout.setContentsMargins(16, 16, 16, 16)
 
         b_layout.addWidget(QLabel("Payment Breakdown (Outstanding)"))
-        br_list = QListWidget()
+        self.br_list = QListWidget()
+        b_layout.addWidget(self.br_list)
+        bottom.addWidget(breakdown)
+
+        recent = QFrame()
+        recent.setObjectName("card")
+        r_layout = QVBoxLayout(recent)
+        r_layout.setContentsMargins(16, 16, 16, 16)
+
+        r_layout.addWidget(QLabel("Recent Payment Activity"))
 
+        self.act_list = QListWidget()
+        QListWidgetItem("Loading...", self.act_list)
+        r_layout.addWidget(self.act_list)
+        bottom.addWidget(recent)
+
+
+        root.addLayout(bottom)
+        root.addStretch()
+
+    # ----------------------------
+    # DATA
+    # ----------------------------
+    def _fetch_data(self):
+        """Runs on a worker thread."""
+        payments = prefetched(self.db, "get_user_payments", self.user_id)
+        dues = self.db.get_tenant_due(self.user_id)
+
+        active_payment = next(
+            (p for p in payments if p['status'] in ('Due', 'Overdue')),
+            None
+        )
+        remark = None
+        if active_payment:
+            remark = self.db.get_last_payment_rejection(
+                self.user_id,
+                active_payment['rental_id']
+            )
+        return payments, dues, active_payment, remark
+
+    def _apply_data(self, result):
+        payments, dues, active_payment, remark = result
+
+        # ----------------------------
+        # Determine active payment
+        # ----------------------------
+        if active_payment:
+            self.rental_id = active_payment['rental_id']
+            self.amount_due = active_payment['amount_due']
+        else:
+            self.rental_id = None
+            self.amount_due = 0
+
+        due_items = [
+            p for p in payments
+            if p['status'] in ('Due', 'Overdue')
+        ]
+
+        # summary cards come from the rental's maintained dues, not the list
+        outstanding = float(dues['amount'] or 0) if dues else 0
+        next_due_str = "No Dues"
+        if dues and dues['due_date']:
+            next_due_str = f"{dues['due_date'].strftime('%B %d, %Y')}"
+
+        last_pay_str = "No history"
+        if dues and dues['last_paid_at']:
+            last_amount = float(dues['last_paid_amount'] or 0)
+            last_pay_str = f"₱{last_amount:,.0f} — {dues['last_paid_at'].strftime('%B %d, %Y')}"
+
+        status_str = "Up to Date"
+        if dues and dues['due_date'] and dues['due_date'] < date.today():
+            status_str = "Overdue!"
+        elif outstanding > 0:
+            status_str = "Pending"
+
+        self.lbl_next_due.setText(next_due_str)
+        self.lbl_due_amount.setText(f"₱{outstanding:,.2f}")
+        self.lbl_last_payment.setText(last_pay_str)
+        self.lbl_status.setText(status_str)
+
+        fill_table(self.tbl, payments, lambda p: [
+            str(p['due_date']),
+            f"₱{p['amount_due']:,.2f}",
+            p['status'],
+            p.get('room_name', 'Unknown'),
+        ])
+
+        self.br_list.clear()
         rent_due = sum(p['amount_due'] for p in due_items if p.get('payment_type') == 'Rent')
         util_due = sum(p['amount_due'] for p in due_items if p.get('payment_type') == 'Utility')
         other_due = sum(p['amount_due'] for p in due_items if p.get('payment_type') not in ['Rent', 'Utility'])
 
         if rent_due > 0:
-            QListWidgetItem(f"₱{rent_due:,.2f} — Rent", br_list)
+            QListWidgetItem(f"₱{rent_due:,.2f} — Rent", self.br_list)
         if util_due > 0:
-            QListWidgetItem(f"₱{util_due:,.2f} — Utilities", br_list)
+            QListWidgetItem(f"₱{util_due:,.2f} — Utilities", self.br_list)
         if other_due > 0:
-            QListWidgetItem(f"₱{other_due:,.2f} — Others", br_list)
-        
+            QListWidgetItem(f"₱{other_due:,.2f} — Others", self.br_list)
+
         if outstanding <= 0 or status_str == "Up to Date":
-            if hasattr(self, "btn_pay_now"):
-                self.btn_pay_now.setDisabled(True)
+            self.btn_pay_now.setDisabled(True)
         else:
-            if hasattr(self, "btn_pay_now"):
-                self.btn_pay_now.setEnabled(True)
-
-
-        b_layout.addWidget(br_list)
-        bottom.addWidget(breakdown)
-
-        recent = QFrame()
-        recent.setObjectName("card")
-        r_layout = QVBoxLayout(recent)
-        r_layout.setContentsMargins(16, 16, 16, 16)
-
-        r_layout.addWidget(QLabel("Recent Payment Activity"))
-
-        act_list = QListWidget()
+            self.btn_pay_now.setEnabled(True)
 
+        self.act_list.clear()
         sorted_recent = sorted(payments, key=lambda x: x['due_date'], reverse=True)[:5]
 
         for p in sorted_recent:
@@ -240,30 +252,20 @@ class PaymentsWindow(QWidget):
             else:
                 msg = f"{p['status']}: ₱{p['amount_due']:,.0f}"
 
-            QListWidgetItem(msg, act_list)
+            QListWidgetItem(msg, self.act_list)
 
-        r_layout.addWidget(act_list)
-        bottom.addWidget(recent)
-
-
-        root.addLayout(bottom)
-        root.addStretch()
+        if remark:
+            QMessageBox.warning(
+                self,
+                "Payment Rejected",
+                f"Your last payment was rejected.\n\nReason:\n{remark}"
+            )
 
     def upload_payment_proof(self):
         file, _ = QFileDialog.getOpenFileName(self, "Upload Payment Proof", "", "Images (*.png *.jpg *.jpeg)")
         if not file:
             return
 
-        # Copy proof into uploads/payment_proofs/
-        folder = os.path.join(BASE_DIR, "uploads", "payment_proofs")
-        os.makedirs(folder, exist_ok=True)
-
-        filename = os.path.basename(file)
-        final_path = os.path.join(folder, filename)
-        shutil.copy(file, final_path)
-
-        rel_path = os.path.relpath(final_path, BASE_DIR).replace("\\", "/")
-
         confirm = QMessageBox.question(
             self,
             "Confirm Payment",
@@ -274,20 +276,32 @@ class PaymentsWindow(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        self.db.submit_payment_request(self.user_id, self.rental_id, self.amount_due, rel_path)
-
-
-        QMessageBox.information(self, "Payment Submitted", 
-            "Your payment has been sent to the owner for verification.")
-        
-        has_pending = self.db.has_pending_payment_request(
-            self.user_id,
-            self.rental_id
-        )
+        # no second click while this one is on its way
+        self.btn_pay_now.setDisabled(True)
+        self.btn_pay_now.setText("Uploading...")
+        self.ingester.submit(file)
+
+    def _proof_failed(self, src_path, message):
+        QMessageBox.warning(self, "Payment Not Sent", f"Could not use the proof:\n{message}")
+        self.btn_pay_now.setText("Pay Now")
+        self.btn_pay_now.setEnabled(True)
+
+    def _proof_ready(self, src_path, rel_path):
+        result = self.db.submit_payment_request(self.user_id, self.rental_id, self.amount_due, rel_path)
+
+        if result["status"] == PAYMENT_SUBMITTED:
+            QMessageBox.information(self, "Payment Submitted",
+                "Your payment has been sent to the owner for verification.")
+        elif result["status"] == PAYMENT_ALREADY_SUBMITTED:
+            QMessageBox.information(self, "Already Submitted",
+                "Your payment for this period is already waiting for the owner's approval.")
+        else:
+            QMessageBox.warning(self, "Payment Not Sent", "No rental found for this payment.")
+            self.btn_pay_now.setText("Pay Now")
+            self.btn_pay_now.setEnabled(True)
+            return
 
-        if has_pending:
-            self.btn_pay_now.setText("Pending Approval")
-            self.btn_pay_now.setDisabled(True)
+        self.btn_pay_now.setText("Pending Approval")
 
     def _summary_card(self, title, subtitle, show_pay_button=False):
         card = QFrame()
@@ -331,7 +345,7 @@ class PaymentsWindow(QWidget):
             row.addWidget(self.btn_pay_now)
 
         layout.addLayout(row)
-        return card
+        return card, s
 
     def _apply_styles(self):
         self.setStyleSheet("""
@@ -8,6 +8,9 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 from database import DatabaseManager
+from background_loader import BackgroundLoader, show_table_placeholder, fill_table
+from prefetch import prefetched
+from holds import format_hold_left
 
 
 class PendingRequestsWindow(QWidget):
@@ -23,6 +26,10 @@ class PendingRequestsWindow(QWidget):
         self._fonts()
         self._apply_styles()
         self._build_ui()
+        self.loader = BackgroundLoader(
+            self, self._fetch_data, self._apply_data,
+            placeholder=lambda: show_table_placeholder(self.table)
+        )
         self.load_data()
 
     def _fonts(self):
@@ -44,7 +51,14 @@ class PendingRequestsWindow(QWidget):
     # -------------------------
     def load_data(self):
         search = self.txt_search.text().strip() if hasattr(self, "txt_search") else ""
-        all_requests = self.db.get_pending_requests(self.owner_id)
+        self.loader.load(search)
+
+    def _fetch_data(self, search):
+        """Runs on a worker thread."""
+        return search, prefetched(self.db, "get_pending_requests", self.owner_id)
+
+    def _apply_data(self, result):
+        search, all_requests = result
 
         if search:
             s = search.lower()
@@ -57,24 +71,17 @@ class PendingRequestsWindow(QWidget):
         else:
             self.requests = all_requests
 
-        self.table.setRowCount(0)
-
-        for row, req in enumerate(self.requests):
-            self.table.insertRow(row)
+        def cells(req):
             id_item = QTableWidgetItem(str(req["request_id"]))
             id_item.setData(Qt.UserRole, req["request_id"])
+            return [id_item, req["applicant"], req["dorm"], req["room_type"],
+                    req["submitted_at"], req["status"], format_hold_left(req.get("expires_at"))]
 
-            self.table.setItem(row, 0, id_item)
-            self.table.setItem(row, 1, QTableWidgetItem(req["applicant"]))
-            self.table.setItem(row, 2, QTableWidgetItem(req["dorm"]))
-            self.table.setItem(row, 3, QTableWidgetItem(req["room_type"]))
-            self.table.setItem(row, 4, QTableWidgetItem(str(req["submitted_at"])))
-            self.table.setItem(row, 5, QTableWidgetItem(req["status"]))
-            self.table.setItem(row, 6, QTableWidgetItem("WAITING"))
+        fill_table(self.table, self.requests, cells)
 
     def get_selected_request(self):
         row = self.table.currentRow()
-        if row < 0:
+        if row < 0 or row >= len(self.requests):
             return None
 
         req = self.requests[row]
@@ -97,9 +104,12 @@ class PendingRequestsWindow(QWidget):
 
         if self.db.approve_request(req["request_id"]):
             QMessageBox.information(self, "Approved", "Request approved successfully.")
-            self.load_data()
         else:
-            QMessageBox.critical(self, "Error", "Failed to approve request.")
+            QMessageBox.warning(
+                self, "Request Expired",
+                "This request expired or was already handled, so it can no longer be approved."
+            )
+        self.load_data()
 
     def reject_selected(self):
         req = self.get_selected_request()
@@ -124,11 +134,11 @@ class PendingRequestsWindow(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        if self.db.reject_request(req["request_id"], note):
+        if self.db.reject_request(req["request_id"], note.strip()):
             QMessageBox.information(self, "Rejected", "Request rejected successfully.")
-            self.load_data()
         else:
-            QMessageBox.critical(self, "Error", "Failed to reject request.")
+            QMessageBox.warning(self, "Already Handled", "This request is no longer waiting for review.")
+        self.load_data()
 
     def view_details(self):
         req = self.get_selected_request()
@@ -244,7 +254,7 @@ Status: {req['status']}
         self.table = QTableWidget(0, 7)
         self.table.setHorizontalHeaderLabels([
             "Request ID", "Applicant", "Dorm", "Room Type",
-            "Submitted On", "Status", "Action"
+            "Submitted On", "Status", "Hold Expires"
         ])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
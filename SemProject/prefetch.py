@@ -0,0 +1,252 @@
+# prefetch.py
+"""
+Post-login prefetch.
+
+As soon as a login succeeds the user's dashboard queries are started on the
+DB pool, while the "Login Successful" dialog is still open, followed by the
+queries of the screens they most likely open next. Windows pick the results
+up with `prefetched(db, name, *args)` (never waits: a call still running is
+issued again directly) or `AsyncDatabaseManager.prefetched(name, *args)`
+(awaitable, joins a call that is still running).
+
+Results are taken, not shared: the first window to read a key removes it, so
+a later refresh always goes to the database. Finished results are kept within
+a memory budget (least recently stored dropped first) and for at most `ttl`
+seconds.
+
+    STAYSMART_PREFETCH_BUDGET_MB=16    (0 disables prefetching)
+
+Logging out calls cancel_prefetch(), which cancels the queued calls and drops
+everything fetched for that user.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+
+from async_db import get_executor
+from database import OWNER_STAT_PARTS, DatabaseManager
+from instrumentation import bind_call_site, logger
+
+DEFAULT_BUDGET_BYTES = int(float(os.environ.get("STAYSMART_PREFETCH_BUDGET_MB", "16")) * 1024 * 1024)
+DEFAULT_TTL = 120
+
+
+def call_key(name, args=(), kwargs=None):
+    return (name, tuple(args), tuple(sorted((kwargs or {}).items())))
+
+
+def estimate_size(value):
+    """Rough deep size in bytes of query results (dicts, lists, scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+# ----- CACHE -----
+
+class PrefetchCache:
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.budget_bytes = budget_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}              # key -> running Future
+        self._done = OrderedDict()      # key -> (expires_at, size, Future)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def add(self, key, future):
+        """Tracks a submitted call; its result is stored when it finishes."""
+        with self._lock:
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._finished(key, f))
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is not future:
+                return                      # taken or cleared meanwhile
+            del self._pending[key]
+            if future.cancelled() or future.exception() is not None:
+                return
+            size = estimate_size(future.result())
+            if size > self.budget_bytes:
+                self.evicted += 1
+                return
+            while self._done and self.used_bytes + size > self.budget_bytes:
+                self._drop_oldest()
+            self._done[key] = (self.clock() + self.ttl, size, future)
+            self.used_bytes += size
+
+    def _drop_oldest(self):
+        _, (_, size, _) = self._done.popitem(last=False)
+        self.used_bytes -= size
+        self.evicted += 1
+
+    def take(self, key):
+        """Removes and returns the Future for `key` (running or finished), or None."""
+        with self._lock:
+            future = self._pending.pop(key, None)
+            if future is None and key in self._done:
+                expires_at, size, future = self._done.pop(key)
+                self.used_bytes -= size
+                if expires_at <= self.clock():
+                    future = None
+            if future is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return future
+
+    def clear(self):
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._done.clear()
+            self.used_bytes = 0
+        for future in pending:
+            future.cancel()
+
+    def __len__(self):
+        return len(self._pending) + len(self._done)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "stored": len(self._done),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+prefetch_cache = PrefetchCache()
+
+
+# ----- PLANS -----
+
+def owner_plan(owner_id):
+    """(dashboard calls, likely next-screen calls) for an owner."""
+    dashboard = [(part, (owner_id,), {}) for part in OWNER_STAT_PARTS] + [
+        ("get_recent_reservations", (owner_id,), {}),
+        ("get_owner_occupancy_yearly", (owner_id,), {"years_back": 4}),
+        ("get_owner_occupancy_weekly", (owner_id,), {}),
+        ("get_owner_occupancy_monthly", (owner_id, datetime.now().year), {}),
+    ]
+    next_screens = [
+        ("get_available_rooms_host", (owner_id,), {}),  # TotalDormsWindow
+        ("get_host_properties", (owner_id,), {}),       # TotalDormsDetailWindow
+        ("get_pending_requests", (owner_id,), {}),      # PendingRequestsWindow
+    ]
+    return dashboard, next_screens
+
+
+def tenant_plan(tenant_id):
+    dashboard = [
+        ("get_student_dashboard_snapshot", (tenant_id,), {}),
+    ]
+    next_screens = [
+        ("get_all_rooms", ("", "Any"), {}),             # RoomsAvailability
+        ("get_user_payments", (tenant_id,), {}),        # PaymentsWindow
+    ]
+    return dashboard, next_screens
+
+
+PLANS = {"OWNER": owner_plan, "TENANT": tenant_plan}
+
+
+# ----- PREFETCHER -----
+
+class Prefetcher:
+    def __init__(self, db, user_id, role, cache=None, executor=None):
+        self.db = db
+        self.user_id = user_id
+        self.role = role
+        self.cache = cache if cache is not None else prefetch_cache
+        self.executor = executor or get_executor()
+        self.cancelled = False
+
+    def start(self):
+        """Queues the dashboard calls, then the next-screen ones behind them."""
+        plan = PLANS.get(self.role)
+        if plan is None or not self.cache.budget_bytes:
+            return self
+        dashboard, next_screens = plan(self.user_id)
+        for name, args, kwargs in dashboard + next_screens:
+            if self.cancelled:
+                break
+            future = self.executor.submit(bind_call_site(getattr(self.db, name)), *args, **kwargs)
+            self.cache.add(call_key(name, args, kwargs), future)
+        logger.info("Prefetching %d calls for %s %s", len(dashboard) + len(next_screens),
+                    self.role, self.user_id)
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+        self.cache.clear()
+
+
+_current = None
+
+
+def start_prefetch(user_id, role, db=None):
+    """Starts the prefetch for a fresh login, replacing any previous session's."""
+    global _current
+    cancel_prefetch()
+    _current = Prefetcher(db or DatabaseManager(), user_id, role).start()
+    return _current
+
+
+def cancel_prefetch():
+    global _current
+    if _current is not None:
+        _current.cancel()
+        _current = None
+    else:
+        prefetch_cache.clear()
+
+
+def prefetched(db, name, *args, **kwargs):
+    """
+    Result of `db.<name>(*args)`, from the prefetch if it has finished.
+    Never waits on a prefetch still running (it may be queued behind others
+    on the DB pool); the query is then issued directly.
+    """
+    future = prefetch_cache.take(call_key(name, args, kwargs))
+    if future is not None and future.done():
+        try:
+            return future.result(timeout=0)
+        except Exception:
+            pass    # cancelled or failed prefetch: just query again
+    return getattr(db, name)(*args, **kwargs)
+
+
+def prefetched_future(db, executor, name, *args, **kwargs):
+    """Non-blocking prefetched(): a Future for the result, never tying up a worker."""
+    fetch = bind_call_site(getattr(db, name))     # the window asking, also for a retry
+    taken = prefetch_cache.take(call_key(name, args, kwargs))
+    if taken is None:
+        return executor.submit(fetch, *args, **kwargs)
+
+    out = Future()
+
+    def relay(f):
+        if not f.cancelled() and f.exception() is None:
+            out.set_result(f.result())
+            return
+        retry = executor.submit(fetch, *args, **kwargs)
+        retry.add_done_callback(lambda r: out.set_exception(r.exception()) if r.exception()
+                                else out.set_result(r.result()))
+
+    taken.add_done_callback(relay)
+    return out
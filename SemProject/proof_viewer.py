@@ -0,0 +1,133 @@
+# proof_viewer.py
+"""
+Payment proof review panel for PaymentRequestsWindow.
+
+    self.viewer = ProofViewer()
+    self.viewer.show_proof(req["proof_image"])
+    self.viewer.prefetch([r["proof_image"] for r in next_requests])
+
+Proofs are decoded on ImageLoader's workers at the size of the panel
+(QImageReader.setScaledSize), never on the GUI thread. The proofs of the
+next requests in the queue are decoded while the owner reads the current
+one, so stepping through the queue shows each proof as soon as it is
+selected. "Zoom" loads the full-resolution original only when asked for,
+and shows it in a scroll area.
+"""
+from PyQt5.QtCore import QEvent, QSize, Qt
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QHBoxLayout, QLabel, QPushButton, QScrollArea, QVBoxLayout, QWidget
+
+from images import ImageLoader
+
+# how many of the following requests get their proof decoded ahead of time
+PREFETCH_AHEAD = 3
+FIT_STEP = 32
+
+
+class ProofViewer(QWidget):
+    def __init__(self, parent=None, loader=None):
+        super().__init__(parent)
+        self.loader = loader or ImageLoader(self)
+        self.loader.loaded.connect(self._image_loaded)
+        self.rel_path = None
+        self.shown_path = None      # proof currently on screen, possibly at another size
+        self.zoomed = False
+        self._build_ui()
+
+    # ---------------- UI ----------------
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(8)
+
+        bar = QHBoxLayout()
+        self.lbl_status = QLabel("Select a request to review its proof")
+        self.lbl_status.setStyleSheet("color:#555;")
+        self.btn_zoom = QPushButton("Zoom")
+        self.btn_zoom.setCheckable(True)
+        self.btn_zoom.setEnabled(False)
+        self.btn_zoom.setCursor(Qt.PointingHandCursor)
+        self.btn_zoom.toggled.connect(self.set_zoomed)
+        bar.addWidget(self.lbl_status, 1)
+        bar.addWidget(self.btn_zoom)
+        layout.addLayout(bar)
+
+        self.image = QLabel()
+        self.image.setAlignment(Qt.AlignCenter)
+
+        self.scroll = QScrollArea()
+        self.scroll.setAlignment(Qt.AlignCenter)
+        self.scroll.setWidget(self.image)
+        self.scroll.viewport().installEventFilter(self)
+        self.scroll.setStyleSheet("QScrollArea { background:#f4f4f4; border:1px solid #cce5d6; border-radius:10px; }")
+        layout.addWidget(self.scroll, 1)
+
+    # ---------------- VIEWING ----------------
+    def fit_size(self):
+        """Viewport size in FIT_STEP steps, so resizing and prefetching share decodes."""
+        size = self.scroll.viewport().size()
+        return QSize(max((size.width() - 8) // FIT_STEP, 1) * FIT_STEP,
+                     max((size.height() - 8) // FIT_STEP, 1) * FIT_STEP)
+
+    def show_proof(self, rel_path, zoomed=False):
+        self.rel_path = rel_path
+        self.btn_zoom.setEnabled(bool(rel_path))
+        self.btn_zoom.blockSignals(True)
+        self.btn_zoom.setChecked(zoomed)
+        self.btn_zoom.blockSignals(False)
+        self.zoomed = zoomed
+        self._render()
+
+    def set_zoomed(self, zoomed):
+        if zoomed != self.zoomed:
+            self.zoomed = zoomed
+            self._render()
+
+    def prefetch(self, rel_paths):
+        self.loader.prefetch(rel_paths, self.fit_size())
+
+    def clear(self):
+        self.show_proof(None)
+        self.lbl_status.setText("Select a request to review its proof")
+
+    def _render(self):
+        if not self.rel_path:
+            self._show_text("No proof uploaded" if self.rel_path == "" else "")
+            return
+
+        size = None if self.zoomed else self.fit_size()
+        result = self.loader.request(self.rel_path, size)
+        if result is None:
+            if self.shown_path == self.rel_path:
+                # keep the picture we have until the new size arrives
+                self.lbl_status.setText("Loading full resolution..." if self.zoomed else "Loading...")
+            else:
+                self._show_text("Loading...")
+            return
+        if not isinstance(result, QImage):
+            self._show_text(f"Proof image {result.lower()}")
+            return
+
+        self.shown_path = self.rel_path
+        self.image.setText("")
+        self.image.setPixmap(QPixmap.fromImage(result))
+        self.image.adjustSize()
+        self.lbl_status.setText(
+            f"Full resolution ({result.width()}x{result.height()})" if self.zoomed else "Fitted to panel"
+        )
+
+    def _show_text(self, text):
+        self.shown_path = None
+        self.image.setPixmap(QPixmap())
+        self.image.setText(text)
+        self.image.resize(self.fit_size())
+        self.lbl_status.setText(text)
+
+    def _image_loaded(self, key, result):
+        if self.rel_path and key[0] == self.rel_path:
+            self._render()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and self.rel_path and not self.zoomed:
+            self._render()
+        return False
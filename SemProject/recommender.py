@@ -0,0 +1,233 @@
+# recommender.py
+"""
+Content-based room recommendations.
+
+RoomFeatures keeps one row per room in a NumPy float32 matrix:
+
+    log price, capacity, room_type, dorm_type, amenities, distance to campus
+
+Rows are L2-normalised once, so recommending is one matrix-vector product
+against the tenant's profile (the weighted mean of the rooms they applied
+for and recently viewed) followed by argpartition for the top k. Only rooms
+that are available in an open dorm can be recommended, but every room has a
+row so an occupied room still describes the tenant's taste.
+
+The display fields of each room are kept next to its row, so a
+recommendation needs no further query. The matrix is process-wide and
+refreshed incrementally: DatabaseManager marks rooms or dorms dirty when it
+changes them and only those rows are re-read on the next call. A full
+rebuild happens every FULL_REFRESH_S seconds to pick up changes made by
+other processes.
+"""
+import math
+import threading
+import time
+
+import numpy as np
+
+import geo
+from amenity_index import MAX_AMENITY_ID
+
+FULL_REFRESH_S = 600
+
+ROOM_TYPES = ["BED_SPACER", "APARTMENT"]
+DORM_TYPES = ["BED_SPACER", "APARTMENT", "MIXED"]
+
+# how much each feature group counts in the similarity
+WEIGHTS = {
+    "price": 2.0,
+    "capacity": 1.0,
+    "room_type": 1.0,
+    "dorm_type": 0.5,
+    "amenities": 1.5,
+    "distance": 1.5,
+}
+
+APPLICATION_WEIGHT = 3.0
+VIEW_WEIGHT = 1.0
+
+# how many of a tenant's newest room views shape their recommendations
+HISTORY_VIEWS = 20
+
+FEATURE_SQL = """
+    SELECT r.room_id, r.dorm_id, r.room_no, r.price_monthly, r.capacity, r.room_type,
+           r.amenity_mask, d.dorm_name, d.location_text, d.dorm_type, d.latitude, d.longitude,
+           CASE WHEN r.is_available=1 AND d.status='OPEN' THEN 1 ELSE 0 END AS available
+    FROM rooms r
+    JOIN dorms d ON r.dorm_id=d.dorm_id
+"""
+
+N_FEATURES = 1 + 1 + (len(ROOM_TYPES) + 1) + (len(DORM_TYPES) + 1) + MAX_AMENITY_ID + 1
+
+
+def feature_rows(rows):
+    """
+    (n, N_FEATURES) float32 matrix for room rows, each row L2-normalised.
+    Also sets row["distance"] (metres to campus) on every row.
+    """
+    n = len(rows)
+    X = np.zeros((n, N_FEATURES), dtype=np.float32)
+    if not n:
+        return X
+
+    price = np.array([float(r.get("price_monthly") or 0) for r in rows])
+    X[:, 0] = np.log1p(price) / math.log1p(20000) * WEIGHTS["price"]
+    X[:, 1] = np.minimum([int(r.get("capacity") or 0) for r in rows], 6) / 6.0 * WEIGHTS["capacity"]
+
+    col = 2
+    for types, field in ((ROOM_TYPES, "room_type"), (DORM_TYPES, "dorm_type")):
+        idx = np.array([types.index(r.get(field)) if r.get(field) in types else len(types) for r in rows])
+        X[np.arange(n), col + idx] = WEIGHTS[field]
+        col += len(types) + 1
+
+    masks = np.array([int(r.get("amenity_mask") or 0) for r in rows], dtype=np.uint64)
+    bits = (masks[:, None] >> np.arange(MAX_AMENITY_ID, dtype=np.uint64)) & np.uint64(1)
+    X[:, col:col + MAX_AMENITY_ID] = bits * (WEIGHTS["amenities"] / math.sqrt(3))
+    col += MAX_AMENITY_ID
+
+    dist = np.array([r["distance"] if r["distance"] is not None else geo.MAX_RADIUS_M
+                     for r in geo.attach_distances(rows)], dtype=float)
+    X[:, col] = np.exp(-dist / 3000.0) * WEIGHTS["distance"]
+
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1, norms)
+    return X
+
+
+def display_row(row):
+    """The get_recommended_rooms fields of a row that went through feature_rows()."""
+    return (row["room_id"], row["dorm_name"], row["location_text"], row["room_no"],
+            row["capacity"], row["price_monthly"], row["room_type"], row["distance"])
+
+
+class RoomFeatures:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.room_ids = np.empty(0, dtype=np.int64)
+        self.dorm_ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.available = np.zeros(0, dtype=bool)
+        self.info = []
+        self.row_of = {}
+        self.built_at = None
+        self.dirty_rooms = set()
+        self.dirty_dorms = set()
+
+    # ----- change tracking -----
+
+    def mark_rooms_dirty(self, room_ids):
+        with self._lock:
+            self.dirty_rooms.update(int(r) for r in room_ids)
+
+    def mark_dorm_dirty(self, dorm_id):
+        with self._lock:
+            self.dirty_dorms.add(int(dorm_id))
+
+    def invalidate(self):
+        with self._lock:
+            self.built_at = None
+
+    # ----- building -----
+
+    def _ensure_fresh(self, db):
+        if self.built_at is None or self.clock() - self.built_at > FULL_REFRESH_S:
+            self._rebuild(db)
+        elif self.dirty_rooms or self.dirty_dorms:
+            self._refresh(db)
+
+    def _rebuild(self, db):
+        rows = [dict(r) for r in db.fetchall(FEATURE_SQL)]
+        self.room_ids = np.array([r["room_id"] for r in rows], dtype=np.int64)
+        self.dorm_ids = np.array([r["dorm_id"] for r in rows], dtype=np.int64)
+        self.matrix = feature_rows(rows)
+        self.available = np.array([bool(r["available"]) for r in rows], dtype=bool)
+        self.info = [display_row(r) for r in rows]
+        self.row_of = {int(rid): i for i, rid in enumerate(self.room_ids)}
+        self.built_at = self.clock()
+        self.dirty_rooms.clear()
+        self.dirty_dorms.clear()
+
+    def _refresh(self, db):
+        """Re-reads only the dirty rooms/dorms and patches their rows."""
+        room_ids = set(self.dirty_rooms)
+        dorm_ids = set(self.dirty_dorms)
+        for dorm_id in dorm_ids:
+            room_ids.update(int(r) for r in self.room_ids[self.dorm_ids == dorm_id])
+
+        rows = []
+        if room_ids:
+            marks = ",".join(["%s"] * len(room_ids))
+            rows += db.fetchall(FEATURE_SQL + f" WHERE r.room_id IN ({marks})", tuple(room_ids))
+        if dorm_ids:
+            marks = ",".join(["%s"] * len(dorm_ids))
+            rows += db.fetchall(FEATURE_SQL + f" WHERE r.dorm_id IN ({marks})", tuple(dorm_ids))
+
+        fresh = {r["room_id"]: dict(r) for r in rows}
+        for room_id in room_ids - set(fresh):
+            i = self.row_of.get(room_id)
+            if i is not None:
+                self.available[i] = False       # deleted
+
+        fresh_rows = list(fresh.values())
+        new = []
+        for row, vec in zip(fresh_rows, feature_rows(fresh_rows)):
+            i = self.row_of.get(int(row["room_id"]))
+            if i is None:
+                new.append((row, vec))
+                continue
+            self.matrix[i] = vec
+            self.available[i] = bool(row["available"])
+            self.info[i] = display_row(row)
+        if new:
+            start = len(self.room_ids)
+            self.room_ids = np.concatenate([self.room_ids, [r["room_id"] for r, _ in new]]).astype(np.int64)
+            self.dorm_ids = np.concatenate([self.dorm_ids, [r["dorm_id"] for r, _ in new]]).astype(np.int64)
+            self.matrix = np.vstack([self.matrix, np.array([v for _, v in new])])
+            self.available = np.concatenate([self.available, [bool(r["available"]) for r, _ in new]])
+            for offset, (row, _) in enumerate(new):
+                self.row_of[int(row["room_id"])] = start + offset
+                self.info.append(display_row(row))
+
+        self.dirty_rooms.clear()
+        self.dirty_dorms.clear()
+
+    # ----- scoring -----
+
+    def recommend(self, db, history, k):
+        """
+        Up to k available rooms most similar to history, a list of
+        (room_id, weight). Returns (room info tuples, scores); empty when
+        none of the history rooms is known.
+        """
+        with self._lock:
+            self._ensure_fresh(db)
+
+            rows, weights = [], []
+            for room_id, weight in history:
+                i = self.row_of.get(int(room_id))
+                if i is not None:
+                    rows.append(i)
+                    weights.append(weight)
+            if not rows:
+                return [], []
+
+            w = np.asarray(weights, dtype=np.float32)
+            profile = (self.matrix[rows] * w[:, None]).sum(axis=0) / w.sum()
+
+            scores = self.matrix @ profile
+            scores[~self.available] = -np.inf
+            scores[rows] = -np.inf                  # nothing they have already seen
+
+            k = min(k, int(np.count_nonzero(np.isfinite(scores))))
+            if k <= 0:
+                return [], []
+            part = np.argpartition(-scores, k - 1)[:k]
+            order = part[np.argsort(-scores[part], kind="stable")]
+            return [self.info[i] for i in order], [float(scores[i]) for i in order]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.available))
+
+
+room_features = RoomFeatures()
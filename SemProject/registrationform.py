@@ -3,10 +3,10 @@ from PyQt5.QtWidgets import (
     QPushButton, QFileDialog, QMessageBox, QComboBox, QCheckBox,
     QTextEdit
 )
-from PyQt5.QtGui import QPixmap, QFont, QCursor
+from PyQt5.QtGui import QPixmap, QFont, QCursor, QImage
 from PyQt5.QtCore import Qt
 from database import DatabaseManager
-import os
+from images import ImageIngester, load_image
 
 class TenantRegistrationForm(QWidget):
     def __init__(self, tenant_id):
@@ -18,6 +18,8 @@ class TenantRegistrationForm(QWidget):
         self.db = DatabaseManager()
 
         self.photo_path = None
+        self.photo_source = None    # file being ingested; a newer pick or Remove supersedes it
+        self.ingester = ImageIngester(self, self._photo_ready, self._photo_failed)
         self._build_ui()
         self._apply_styles()
 
@@ -159,22 +161,32 @@ class TenantRegistrationForm(QWidget):
     def upload_photo(self):
         file, _ = QFileDialog.getOpenFileName(self, "Upload Photo", "", "Images (*.png *.jpg *.jpeg)")
         if file:
-            pix = QPixmap(file).scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.photo.setPixmap(pix)
-            uploads = os.path.join("uploads", "tenant_profiles")
-            os.makedirs(uploads, exist_ok=True)
-
-            filename = f"tenant_{self.tenant_id}.png"
-            dest = os.path.join(uploads, filename)
-
-            QPixmap(file).save(dest)
-            self.photo_path = dest.replace("\\", "/")
+            self.photo_source = file
+            self.photo_path = None
+            self.photo.setPixmap(QPixmap())
+            self.photo.setText("Processing...")
+            self.ingester.submit(file)
+
+    def _photo_ready(self, src_path, rel_path):
+        if src_path != self.photo_source:
+            return
+        self.photo_path = rel_path
+        img = load_image(rel_path, self.photo.size())
+        if isinstance(img, QImage):
+            self.photo.setPixmap(QPixmap.fromImage(img))
+
+    def _photo_failed(self, src_path, message):
+        if src_path != self.photo_source:
+            return
+        self.remove_photo()
+        QMessageBox.warning(self, "Error", message)
 
 
     def remove_photo(self):
         self.photo.setPixmap(QPixmap())
         self.photo.setText("No Photo")
         self.photo_path = None
+        self.photo_source = None
 
 
     def submit_form(self):
@@ -190,6 +202,8 @@ class TenantRegistrationForm(QWidget):
             return QMessageBox.warning(self, "Error", "Select a gender")
         if not self.chk_agree.isChecked():
             return QMessageBox.warning(self, "Error", "You must agree to the terms")
+        if self.photo_source and not self.photo_path:
+            return QMessageBox.information(self, "Please wait", "Your photo is still being processed.")
 
         self.db.save_tenant_profile(
             tenant_id=self.tenant_id,
@@ -6,7 +6,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, pyqtSignal
 
-from database import DatabaseManager
+from database import (
+    DatabaseManager, ROOM_FULL, ALREADY_RESERVED, WAITLISTED, ALREADY_WAITLISTED, ROOM_HAS_BEDS
+)
 from registrationform import TenantRegistrationForm
 
 
@@ -140,7 +142,7 @@ class ReserveForm(QWidget):
         phone = self.inp_phone.text().strip()
         gender = self.inp_gender.currentText()
 
-        app_id = self.db.create_rental_application(
+        result = self.db.reserve_room(
             tenant_id=self.tenant_id,
             dorm_id=self.dorm_id,
             room_id=self.room_id,
@@ -150,6 +152,14 @@ class ReserveForm(QWidget):
             tenant_phone=phone,
             tenant_gender=gender
         )
+        app_id = result["application_id"]
+
+        if result["status"] == ROOM_FULL:
+            self._offer_waitlist()
+            return
+        if result["status"] == ALREADY_RESERVED:
+            self._warn_already_reserved()
+            return
 
         if app_id:
             QMessageBox.information(
@@ -167,6 +177,39 @@ class ReserveForm(QWidget):
             self.submitted.emit(app_id)
 
             self.close()
+        else:
+            QMessageBox.critical(self, "Error", "Could not submit your reservation. Please try again.")
+
+    def _offer_waitlist(self):
+        answer = QMessageBox.question(
+            self, "Room Full",
+            "Sorry, the last bed in this room was just taken.\n\n"
+            "Join the waitlist? You will get the next free bed automatically.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if answer != QMessageBox.Yes:
+            return
+
+        result = self.db.join_waitlist(self.tenant_id, self.room_id)
+        if result["status"] in (WAITLISTED, ALREADY_WAITLISTED):
+            QMessageBox.information(
+                self, "Waitlisted",
+                f"You are #{result['position']} on the waitlist for this room."
+            )
+            self.close()
+        elif result["status"] == ALREADY_RESERVED:
+            self._warn_already_reserved()
+        elif result["status"] == ROOM_HAS_BEDS:
+            QMessageBox.information(self, "Bed Available", "A bed just opened up. Please submit again.")
+        else:
+            QMessageBox.critical(self, "Error", "Could not join the waitlist. Please try again.")
+
+    def _warn_already_reserved(self):
+        QMessageBox.warning(
+            self, "Reservation Not Allowed",
+            "You already have an active dorm reservation.\n\n"
+            "You can only reserve one dorm at a time."
+        )
 
     def _apply_styles(self):
         self.setStyleSheet("""
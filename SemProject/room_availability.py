@@ -1,29 +1,33 @@
 import sys
-from PyQt5.QtCore import Qt, QSize, QTimer, QEasingCurve
-from PyQt5.QtGui import QFont, QPixmap, QCursor
+from PyQt5.QtCore import Qt, QSize, QTimer, QEasingCurve, QDate
+from PyQt5.QtGui import QFont, QPixmap, QCursor, QImage
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QScrollArea,
     QFrame, QDialog, QGraphicsOpacityEffect, QGraphicsDropShadowEffect, QMessageBox, 
-    QLineEdit, QComboBox, QApplication
+    QLineEdit, QComboBox, QApplication, QDateEdit
 )
 from PyQt5.QtGui import QFont, QColor, QPainter
 from PyQt5.QtGui import QCursor
 from PyQt5.QtCore import Qt
 from database import DatabaseManager
+from prefetch import prefetched
+from geo import format_distance
+from amenity_index import AmenityIndex
+from view_tracker import view_tracker
 from reserve_form import ReserveForm
 from registrationform import TenantRegistrationForm
+from images import load_image
 
-import os
 
+# rooms shown when sorting by "Nearest"
+NEAREST_PAGE_SIZE = 50
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def resolve_image_path(rel_or_abs):
-    if not rel_or_abs:
-        return None
-    if os.path.isabs(rel_or_abs):
-        return rel_or_abs
-    return os.path.join(BASE_DIR, rel_or_abs.replace("/", os.sep))
+def default_stay(today=None):
+    """Next school year: Aug 1 to May 31 of the year after."""
+    today = today or QDate.currentDate()
+    year = today.year() if today.month() < 8 else today.year() + 1
+    return QDate(year, 8, 1), QDate(year + 1, 5, 31)
 
 
 class DimOverlay(QWidget):
@@ -188,6 +192,7 @@ class RoomDetailsDialog(QDialog):
         self.tenant_id = tenant_id
         self.room = room_data
         self.reserve_form = None  # keep ref
+        view_tracker.record(tenant_id, room_data.get("room_id"))
 
         self._fonts()
         self._build_ui()
@@ -316,17 +321,11 @@ class RoomDetailsDialog(QDialog):
             rel_path = db.get_dorm_main_image(self.room["dorm_id"])
 
         if rel_path:
-            abs_path = resolve_image_path(rel_path)
-            if abs_path and os.path.exists(abs_path):
-                pix = QPixmap(abs_path)
-                if not pix.isNull():
-                    banner.setPixmap(
-                        pix.scaled(banner.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    )
-                else:
-                    banner.setText("Invalid image")
+            pix = load_image(rel_path, banner.size())
+            if isinstance(pix, QImage):
+                banner.setPixmap(QPixmap.fromImage(pix))
             else:
-                banner.setText("Image not found")
+                banner.setText(pix)
         else:
             banner.setText("Room Image")
 
@@ -336,7 +335,7 @@ class RoomDetailsDialog(QDialog):
         title.setFont(self.font_title)
         main.addWidget(title)
 
-        dist = self.room.get("distance") or "—m"
+        dist = format_distance(self.room.get("distance"))
         sub = QLabel(f"{self.room.get('address','')}  •  {dist}")
         sub.setFont(self.font_normal)
         sub.setStyleSheet("color:#666;")
@@ -349,7 +348,10 @@ class RoomDetailsDialog(QDialog):
 
         if dorm_id:
             room_id = self.room.get("room_id")
-            amenities = self.db.get_room_amenities(room_id) if room_id else []
+            if "amenities" in self.room:
+                amenities = self.room["amenities"]      # decoded from amenity_mask
+            else:
+                amenities = self.db.get_room_amenities(room_id) if room_id else []
 
         if not amenities:
             lbl = QLabel("No amenities listed for this dorm.")
@@ -589,6 +591,7 @@ class RoomsAvailability(QWidget):
             "price_high": False,
             "capacity": False
         }
+        self.room_index = None
 
         self._fonts()
         self._build_ui()
@@ -647,12 +650,32 @@ class RoomsAvailability(QWidget):
         self.search.textChanged.connect(self.update_room_list)
 
         self.capacity = QComboBox()
-        self.capacity.addItems(["Any", "1", "2", "3", "4+"])
+        for value in ["Any", "1", "2", "3", "4+"]:
+            self.capacity.addItem(value, value)     # text gets a count, data keeps the value
         self.capacity.setFixedHeight(36)
         self.capacity.currentIndexChanged.connect(self.update_room_list)  # update when changed
 
+        # stay dates: only rooms with a bed free for the whole stay
+        self.dates_btn = QPushButton("Move-in dates")
+        self.dates_btn.setCheckable(True)
+        self.dates_btn.setObjectName("pill")
+        self.dates_btn.toggled.connect(self.update_room_list)
+
+        move_in, move_out = default_stay()
+        self.date_from = QDateEdit(move_in)
+        self.date_to = QDateEdit(move_out)
+        for edit in (self.date_from, self.date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("MMM d, yyyy")
+            edit.setFixedHeight(36)
+            edit.dateChanged.connect(self._dates_changed)
+
         controls.addWidget(self.search)
         controls.addWidget(self.capacity)
+        controls.addWidget(self.dates_btn)
+        controls.addWidget(self.date_from)
+        controls.addWidget(QLabel("to"))
+        controls.addWidget(self.date_to)
         root.addLayout(controls)
 
         # sort pills row
@@ -674,6 +697,25 @@ class RoomsAvailability(QWidget):
         self.sort_row.addStretch()
         root.addLayout(self.sort_row)
 
+        # amenity pills: rooms must have every checked amenity
+        self.amenity_row = QHBoxLayout()
+        self.amenity_buttons = {}
+        self.amenity_labels = {}
+        try:
+            amenities = self.db.get_amenities()
+        except Exception:
+            amenities = []
+        for amenity in amenities:
+            btn = QPushButton(amenity["label"])
+            btn.setCheckable(True)
+            btn.setObjectName("pill")
+            btn.toggled.connect(self.apply_amenity_filter)
+            self.amenity_row.addWidget(btn)
+            self.amenity_buttons[amenity["amenity_id"]] = btn
+            self.amenity_labels[amenity["amenity_id"]] = amenity["label"]
+        self.amenity_row.addStretch()
+        root.addLayout(self.amenity_row)
+
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         container = QWidget()
@@ -724,19 +766,77 @@ class RoomsAvailability(QWidget):
         root.addWidget(scroll)
         self.update_room_list()
 
+    def selected_amenities(self):
+        return [aid for aid, btn in self.amenity_buttons.items() if btn.isChecked()]
+
     def update_room_list(self):
+        search_text = self.search.text().strip()
+        cap_text = self.capacity.currentData() or "Any"
+
+        if self.dates_btn.isChecked():
+            fetched_rooms = self.db.get_rooms_free_between(
+                self.date_from.date().toPyDate(), self.date_to.date().toPyDate(),
+                search_text=search_text, capacity_filter=cap_text)
+            if self.sort_states.get("nearest"):
+                fetched_rooms.sort(key=lambda r: (r.get("distance") is None, r.get("distance") or 0))
+        elif self.sort_states.get("nearest"):
+            # true nearest rooms to campus, already sorted by distance; the
+            # amenity filter has to run before the page is cut
+            fetched_rooms = self.db.get_nearest_rooms(
+                limit=NEAREST_PAGE_SIZE, search_text=search_text, capacity_filter=cap_text,
+                amenity_ids=self.selected_amenities())
+        else:
+            fetched_rooms = prefetched(self.db, "get_all_rooms", search_text, cap_text)
+
+        self.room_index = AmenityIndex(fetched_rooms)
+        self._show_rooms()
+        self._update_facets()
+
+    def _dates_changed(self):
+        if self.dates_btn.isChecked():
+            self.update_room_list()
+
+    def apply_amenity_filter(self):
+        """Re-filters the rooms already loaded; only Nearest needs a new query."""
+        if (self.sort_states.get("nearest") and not self.dates_btn.isChecked()) or self.room_index is None:
+            self.update_room_list()
+        else:
+            self._show_rooms()
+            self._update_facets()
+
+    def _update_facets(self):
+        """Shows result counts on the filters and disables the empty ones."""
+        stay = {}
+        if self.dates_btn.isChecked():
+            # count the rooms free for the stay, as the list shows
+            stay = {"date_from": self.date_from.date().toPyDate(), "date_to": self.date_to.date().toPyDate()}
+        try:
+            facets = self.db.get_room_facets(
+                self.search.text().strip(), self.capacity.currentData() or "Any",
+                self.selected_amenities(), **stay)
+        except Exception:
+            return
+
+        model = self.capacity.model()
+        for i in range(self.capacity.count()):
+            value = self.capacity.itemData(i)
+            count = facets["capacity"].get(value, 0)
+            self.capacity.setItemText(i, f"{value} ({count})")
+            model.item(i).setEnabled(count > 0 or i == self.capacity.currentIndex())
+
+        for aid, btn in self.amenity_buttons.items():
+            count = facets["amenities"].get(aid, 0)
+            btn.setText(f"{self.amenity_labels[aid]} ({count})")
+            btn.setEnabled(count > 0 or btn.isChecked())
+
+    def _show_rooms(self):
         while self.rooms_layout.count():
             w = self.rooms_layout.takeAt(0)
             if w.widget():
                 w.widget().deleteLater()
 
-        search_text = self.search.text().strip()
-        cap_text = self.capacity.currentText()
-
-        fetched_rooms = self.db.get_all_rooms(search_text, cap_text)
+        fetched_rooms = self.room_index.filter(self.selected_amenities())
 
-        if self.sort_states.get("nearest"):
-            fetched_rooms.sort(key=lambda r: r.get("distance", 0))
         if self.sort_states.get("price_low"):
             fetched_rooms.sort(key=lambda r: r.get("price", 0))
 
@@ -779,20 +879,11 @@ class RoomsAvailability(QWidget):
         dorm_id = room.get("dorm_id")
         rel_path = self.db.get_dorm_main_image(dorm_id) if dorm_id else None
 
-        if rel_path:
-            abs_path = resolve_image_path(rel_path)
-            if abs_path and os.path.exists(abs_path):
-                pix = QPixmap(abs_path)
-                if not pix.isNull():
-                    img.setPixmap(
-                        pix.scaled(img.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    )
-                else:
-                    img.setText("Invalid")
-            else:
-                img.setText("Not found")
+        pix = load_image(rel_path, img.size())
+        if isinstance(pix, QImage):
+            img.setPixmap(QPixmap.fromImage(pix))
         else:
-            img.setText("No Image")
+            img.setText(pix)
 
         info = QVBoxLayout()
 
@@ -802,9 +893,16 @@ class RoomsAvailability(QWidget):
         addr = QLabel(room.get("address", ""))
         addr.setStyleSheet("color:#555;")
 
-        dist = QLabel(f"{room.get('distance', 0)}m away")
+        dist = QLabel(f"{format_distance(room.get('distance'))} away")
         dist.setStyleSheet("color:#0f7a3a; font-weight:bold;")
 
+        amenity_names = room.get("amenities") or []
+        amen_text = " • ".join(amenity_names[:4])
+        if len(amenity_names) > 4:
+            amen_text += f" +{len(amenity_names) - 4}"
+        amen = QLabel(amen_text or "No amenities listed")
+        amen.setStyleSheet("color:#666;")
+
         bottom = QHBoxLayout()
         price = QLabel(f"₱{room.get('price',0):,} / month")
         price.setFont(QFont("Segoe UI", 11, QFont.Bold))
@@ -835,6 +933,7 @@ class RoomsAvailability(QWidget):
         info.addWidget(title)
         info.addWidget(addr)
         info.addWidget(dist)
+        info.addWidget(amen)
         info.addStretch()
         info.addLayout(bottom)
 
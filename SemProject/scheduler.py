@@ -0,0 +1,294 @@
+# scheduler.py
+"""
+In-process job scheduler for periodic database maintenance
+(overdue marking, monthly billing, cleanup, expiring reservation holds,
+checking rental balances against the payments ledger, deleting unused
+uploads).
+
+GUI:     QtSchedulerDriver(scheduler).start()  - a QTimer queues each tick
+                                                on a worker thread
+Server:  python scheduler.py [--once] [--job NAME]
+
+Every GUI client and the CLI run the same jobs against one database, so a
+scheduled run first takes the job's lease (job_leases) for one interval.
+Whichever process gets it runs the job; the others skip it until their
+next interval. --job NAME runs the job regardless.
+"""
+import argparse
+import os
+import socket
+import time
+from datetime import datetime
+
+from database import DatabaseManager
+from instrumentation import logger
+from upload_store import upload_store
+
+
+# ---------------------------
+#   Job functions
+# ---------------------------
+# Each job takes the DatabaseManager and returns (rows_affected, batches).
+
+def overdue_job(db):
+    return db.mark_overdue_payments(batch_size=500)
+
+
+def billing_job(db):
+    return db.generate_monthly_payments(lead_days=7, batch_size=200)
+
+
+def cleanup_job(db):
+    return db.purge_job_runs(keep_days=30, batch_size=1000)
+
+
+def expire_holds_job(db):
+    return db.expire_holds(batch_size=200)
+
+
+def reconcile_dues_job(db):
+    return db.reconcile_rental_balances(batch_size=500)
+
+
+def upload_gc_job(db):
+    removed, _ = upload_store.gc(db.get_upload_references())
+    return removed, 1
+
+
+DEFAULT_JOBS = [
+    # (name, function, interval in seconds)
+    ("mark_overdue", overdue_job, 15 * 60),
+    ("billing", billing_job, 60 * 60),
+    ("cleanup", cleanup_job, 24 * 60 * 60),
+    ("expire_holds", expire_holds_job, 5 * 60),
+    ("reconcile_dues", reconcile_dues_job, 24 * 60 * 60),
+    ("upload_gc", upload_gc_job, 24 * 60 * 60),
+]
+
+
+class Job:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = 0.0
+
+        # run metrics (in-memory; every run is also written to job_runs)
+        self.runs = 0
+        self.failures = 0
+        self.last_status = None
+        self.last_rows = 0
+        self.last_batches = 0
+        self.last_duration_ms = 0
+        self.last_error = None
+        self.last_finished_at = None
+
+    def metrics(self):
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_status": self.last_status,
+            "last_rows": self.last_rows,
+            "last_batches": self.last_batches,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "last_finished_at": self.last_finished_at,
+        }
+
+
+class JobScheduler:
+    def __init__(self, db=None, clock=time.monotonic, record_runs=True, use_leases=True, holder=None):
+        self.db = db or DatabaseManager()
+        self.clock = clock
+        self.record_runs = record_runs
+        self.use_leases = use_leases
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self.jobs = {}
+
+    def add_job(self, name, func, interval):
+        self.jobs[name] = Job(name, func, interval)
+        return self.jobs[name]
+
+    def run_pending(self):
+        """Runs every job whose interval has elapsed. Returns the names that ran."""
+        now = self.clock()
+        ran = []
+        for job in list(self.jobs.values()):
+            if now < job.next_run:
+                continue
+            if not self.claim(job):
+                job.next_run = now + job.interval   # another client has this interval
+                continue
+            self.run_job(job.name)
+            ran.append(job.name)
+        return ran
+
+    def run_all(self):
+        """Runs every job whose lease is free. Returns their metrics."""
+        return [self.run_job(job.name) for job in list(self.jobs.values()) if self.claim(job)]
+
+    def claim(self, job):
+        """Takes the job's lease for one interval; False while another client holds it."""
+        if not self.use_leases:
+            return True
+        try:
+            return self.db.acquire_job_lease(job.name, self.holder, job.interval)
+        except Exception as e:
+            logger.error("Could not take job lease: %s", e)
+            return False
+
+    def run_job(self, name):
+        """Runs one job now, records its metrics and schedules the next run."""
+        job = self.jobs[name]
+        started_at = datetime.now()
+        t0 = self.clock()
+
+        rows, batches, error = 0, 0, None
+        try:
+            result = job.func(self.db)
+            if result:
+                rows, batches = result
+        except Exception as e:
+            error = str(e)
+
+        job.runs += 1
+        job.last_duration_ms = int((self.clock() - t0) * 1000)
+        job.last_rows = rows
+        job.last_batches = batches
+        job.last_error = error
+        job.last_status = "FAILED" if error else "OK"
+        job.last_finished_at = datetime.now()
+        if error:
+            job.failures += 1
+            self._release(job)
+        job.next_run = self.clock() + job.interval
+
+        if self.record_runs:
+            try:
+                self.db.record_job_run(
+                    job.name, started_at, job.last_finished_at,
+                    batches, rows, job.last_status, error
+                )
+            except Exception as e:
+                logger.error("Could not record job run: %s", e)
+
+        return job.metrics()
+
+    def _release(self, job):
+        # a failed run gives its interval back, so another client may retry sooner
+        if not self.use_leases:
+            return
+        try:
+            self.db.release_job_lease(job.name, self.holder)
+        except Exception as e:
+            logger.error("Could not release job lease: %s", e)
+
+    def metrics(self):
+        return [job.metrics() for job in self.jobs.values()]
+
+
+def default_scheduler(db=None):
+    scheduler = JobScheduler(db=db)
+    for name, func, interval in DEFAULT_JOBS:
+        scheduler.add_job(name, func, interval)
+    return scheduler
+
+
+# ---------------------------
+#   GUI driver
+# ---------------------------
+class QtSchedulerDriver:
+    """
+    Ticks a JobScheduler from the Qt event loop. The QTimer only queues the
+    tick; run_pending() runs on a single worker thread, so billing never
+    blocks the GUI. A tick that fires while the previous one is still
+    running is skipped.
+    """
+    def __init__(self, scheduler, tick_ms=30000):
+        from PyQt5.QtCore import QThreadPool, QTimer
+
+        self.scheduler = scheduler
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.timer = QTimer()
+        self.timer.setInterval(tick_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.timer.start()
+        self.tick()
+
+    def stop(self):
+        self.timer.stop()
+        self.pool.clear()
+
+    def tick(self):
+        """Queues one scheduler pass on the worker. False if one is still running."""
+        from PyQt5.QtCore import QRunnable
+
+        if self.pool.activeThreadCount():
+            return False
+        self.pool.start(QRunnable.create(self._run))
+        return True
+
+    def _run(self):
+        try:
+            self.scheduler.run_pending()
+        except Exception as e:
+            logger.error("Scheduler tick failed: %s", e)
+
+
+def start_gui_scheduler(tick_ms=30000):
+    """
+    Applies pending migrations, then starts the default jobs on a QTimer.
+    Call it before the first window is shown: the windows read columns
+    and tables the migrations add. The returned driver must be kept alive.
+    """
+    from migrations import apply_migrations
+
+    scheduler = default_scheduler()
+    apply_migrations(scheduler.db)
+    driver = QtSchedulerDriver(scheduler, tick_ms=tick_ms)
+    driver.start()
+    return driver
+
+
+# ---------------------------
+#   CLI runner
+# ---------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StaySmart background jobs")
+    parser.add_argument("--once", action="store_true",
+                        help="run every job once and exit")
+    parser.add_argument("--job", choices=[name for name, _, _ in DEFAULT_JOBS],
+                        help="run only this job once and exit")
+    parser.add_argument("--tick", type=int, default=30,
+                        help="seconds between checks in loop mode")
+    args = parser.parse_args(argv)
+
+    from migrations import apply_migrations
+
+    scheduler = default_scheduler()
+    apply_migrations(scheduler.db)
+
+    if args.job:
+        print(scheduler.run_job(args.job))
+        return
+    if args.once:
+        for m in scheduler.run_all():
+            print(m)
+        return
+
+    try:
+        while True:
+            for name in scheduler.run_pending():
+                print(scheduler.jobs[name].metrics())
+            time.sleep(args.tick)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+-- schema_sqlite.sql
+-- Base StaySmart tables for the embedded SQLite backend.
+-- Mirrors the staysmartdb MySQL tables; later changes live in migrations.py.
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    role VARCHAR(16) NOT NULL,
+    fullname VARCHAR(150) NOT NULL,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    email VARCHAR(120) NOT NULL UNIQUE,
+    contact_no VARCHAR(30),
+    password_hash VARCHAR(255) NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS owner_profiles (
+    owner_id INTEGER PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    display_name VARCHAR(150),
+    messenger_link VARCHAR(255),
+    facebook_link VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS tenant_profiles (
+    tenant_id INTEGER PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    first_name VARCHAR(80),
+    last_name VARCHAR(80),
+    gender VARCHAR(16),
+    guardian_fullname VARCHAR(150),
+    guardian_contact VARCHAR(30),
+    guardian_email VARCHAR(120),
+    profile_picture_url VARCHAR(255),
+    agreed_terms INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dorms (
+    dorm_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    dorm_name VARCHAR(150) NOT NULL,
+    location_text VARCHAR(255),
+    latitude DECIMAL(10, 7),
+    longitude DECIMAL(10, 7),
+    dorm_type VARCHAR(16) NOT NULL DEFAULT 'MIXED',
+    no_of_rooms INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(24) NOT NULL DEFAULT 'OPEN',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_dorms_owner ON dorms(owner_id);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dorm_id INTEGER NOT NULL REFERENCES dorms(dorm_id) ON DELETE CASCADE,
+    room_no VARCHAR(20) NOT NULL,
+    room_type VARCHAR(16),
+    capacity INTEGER NOT NULL DEFAULT 1,
+    price_monthly DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    is_available INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_rooms_dorm ON rooms(dorm_id);
+
+CREATE TABLE IF NOT EXISTS amenities (
+    amenity_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label VARCHAR(80) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS room_amenities (
+    room_id INTEGER NOT NULL REFERENCES rooms(room_id) ON DELETE CASCADE,
+    amenity_id INTEGER NOT NULL REFERENCES amenities(amenity_id) ON DELETE CASCADE,
+    PRIMARY KEY (room_id, amenity_id)
+);
+
+CREATE TABLE IF NOT EXISTS dorm_images (
+    image_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dorm_id INTEGER NOT NULL REFERENCES dorms(dorm_id) ON DELETE CASCADE,
+    file_path VARCHAR(255) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dorm_images_dorm ON dorm_images(dorm_id);
+
+CREATE TABLE IF NOT EXISTS rental_applications (
+    application_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    dorm_id INTEGER NOT NULL REFERENCES dorms(dorm_id) ON DELETE CASCADE,
+    room_id INTEGER NOT NULL REFERENCES rooms(room_id) ON DELETE CASCADE,
+    action_status VARCHAR(16) NOT NULL DEFAULT 'WAITING',
+    submitted_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    reviewed_at DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_applications_tenant ON rental_applications(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_applications_dorm ON rental_applications(dorm_id, action_status);
+
+CREATE TABLE IF NOT EXISTS application_details (
+    application_id INTEGER PRIMARY KEY REFERENCES rental_applications(application_id) ON DELETE CASCADE,
+    additional_notes TEXT,
+    tenant_fullname VARCHAR(150),
+    tenant_email VARCHAR(120),
+    tenant_phone VARCHAR(30),
+    tenant_gender VARCHAR(16)
+);
+
+CREATE TABLE IF NOT EXISTS rentals (
+    rental_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    room_id INTEGER NOT NULL REFERENCES rooms(room_id) ON DELETE CASCADE,
+    application_id INTEGER REFERENCES rental_applications(application_id) ON DELETE SET NULL,
+    start_date DATE NOT NULL,
+    end_date DATE,
+    status VARCHAR(16) NOT NULL DEFAULT 'ACTIVE'
+);
+CREATE INDEX IF NOT EXISTS idx_rentals_tenant ON rentals(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_rentals_room ON rentals(room_id, status);
+
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rental_id INTEGER NOT NULL REFERENCES rentals(rental_id) ON DELETE CASCADE,
+    due_date DATE NOT NULL,
+    amount_due DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    amount_paid DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    status VARCHAR(16) NOT NULL DEFAULT 'PENDING',
+    paid_at DATETIME,
+    is_overdue INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_payments_rental ON payments(rental_id, due_date);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    tenant_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    amount DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    status VARCHAR(16) NOT NULL DEFAULT 'COMPLETED',
+    transaction_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_owner_date ON transactions(owner_id, transaction_date);
+
+CREATE TABLE IF NOT EXISTS payment_requests (
+    request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    rental_id INTEGER NOT NULL REFERENCES rentals(rental_id) ON DELETE CASCADE,
+    amount DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    proof_image VARCHAR(255),
+    status VARCHAR(16) NOT NULL DEFAULT 'PENDING',
+    submitted_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    reviewed_at DATETIME,
+    remarks TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_rental ON payment_requests(tenant_id, rental_id, status);
+
+CREATE TABLE IF NOT EXISTS recently_viewed (
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    room_id INTEGER NOT NULL REFERENCES rooms(room_id) ON DELETE CASCADE,
+    viewed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, room_id)
+);
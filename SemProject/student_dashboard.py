@@ -1,8 +1,6 @@
 import sys
 import os
 import importlib
-import database
-print("USING DATABASE FILE:", database.__file__)
 from my_reservations import MyReservationsWindow
 from payments import PaymentsWindow
 from PyQt5.QtWidgets import (
@@ -14,6 +12,10 @@ from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QCursor
 
 from database import DatabaseManager
+from async_db import AsyncDatabaseManager, run_on_qt
+from diagnostics import install_diagnostics_shortcut
+from prefetch import cancel_prefetch
+from geo import format_distance
 
 RoomsAvailability = None
 try:
@@ -113,6 +115,7 @@ class StudentDashboardWindow(QWidget):
         self.setMinimumSize(1100, 720)
 
         self.db = DatabaseManager()
+        self.adb = AsyncDatabaseManager(self.db)
 
         if user_id is not None:
             self.user_id = user_id
@@ -124,14 +127,22 @@ class StudentDashboardWindow(QWidget):
         self._fonts()
         self._build_ui()
         self.setStyleSheet(SharedStyle)
+        install_diagnostics_shortcut(self)
         self.load_live_data()
 
 
     def load_live_data(self):
-        print("Fetching live data from database...")
+        """Fetches the dashboard snapshot on the DB pool; the window paints meanwhile."""
+        self.load_task = run_on_qt(self._load_live_data_async(), owner=self)
 
-        stats = self.db.get_dashboard_stats(self.user_id)
+    async def _load_live_data_async(self):
+        snap = await self.adb.prefetched("get_student_dashboard_snapshot", self.user_id)
+        self._fill_stats(snap["stats"])
+        self._fill_recommended(snap["recommended"])
+        self._fill_recent(snap["recently_viewed"])
+        self._fill_reservations(snap["reservations"])
 
+    def _fill_stats(self, stats):
         lbl_dorms = self.findChild(QLabel, "lbl_total_dorms")
         if lbl_dorms:
             lbl_dorms.setText(str(stats.get("total_dorms", "0 rooms")))
@@ -145,7 +156,38 @@ class StudentDashboardWindow(QWidget):
         if lbl_pay:
             lbl_pay.setText(str(stats.get("next_payment", "No due")))
 
-        self.db.get_recommended_rooms()
+    def _fill_recommended(self, recommended):
+        layout = self.recommended_layout
+        while layout.count():
+            item = layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+        if not recommended:
+            layout.addWidget(QLabel("No recommended rooms"))
+
+        for r in recommended:
+            layout.addWidget(self._mini_room_card(r))
+
+        layout.addStretch()
+
+    def _fill_recent(self, recent_data):
+        self.recent_list.clear()
+        if not recent_data:
+            QListWidgetItem("No recently viewed dorms", self.recent_list)
+        else:
+            for view in recent_data:
+                label_text = f"{view['property_name']} - {view['room_name']}"
+                QListWidgetItem(label_text, self.recent_list)
+
+    def _fill_reservations(self, reservations_bottom):
+        self.active_list.clear()
+        if not reservations_bottom:
+            QListWidgetItem("No active reservations", self.active_list)
+        else:
+            for r in reservations_bottom:
+                text = f"{r['property_name']} - {r['room_name']} — {r['status']}"
+                QListWidgetItem(text, self.active_list)
 
     def _fonts(self):
         self.font_title = QFont("Segoe UI", 20, QFont.Bold)
@@ -154,6 +196,7 @@ class StudentDashboardWindow(QWidget):
     
     def logout(self):
         from login import LoginWindow 
+        cancel_prefetch()
         self.login = LoginWindow()
         self.login.show()
         self.close()
@@ -247,17 +290,9 @@ class StudentDashboardWindow(QWidget):
         sc_cont = QWidget()
         sc_layout = QHBoxLayout(sc_cont)
         sc_layout.setSpacing(12)
-
-        recommended = self.db.get_recommended_rooms()
-
-        if not recommended:
-            sc_layout.addWidget(QLabel("No recommended rooms"))
-
-
-        for r in recommended:
-            sc_layout.addWidget(self._mini_room_card(r))
-
+        sc_layout.addWidget(QLabel("Loading recommendations..."))
         sc_layout.addStretch()
+        self.recommended_layout = sc_layout
         scroll.setWidget(sc_cont)
         left_layout.addWidget(scroll)
 
@@ -304,15 +339,8 @@ class StudentDashboardWindow(QWidget):
 
         rlist = QListWidget()
         rlist.setFixedHeight(150)
-        
-        recent_data = self.db.get_recently_viewed(self.user_id)
-        
-        if not recent_data:
-            QListWidgetItem("No recently viewed dorms", rlist)
-        else:
-            for view in recent_data:
-                label_text = f"{view['property_name']} - {view['room_name']}"
-                QListWidgetItem(label_text, rlist)
+        QListWidgetItem("Loading...", rlist)
+        self.recent_list = rlist
 
         re_layout.addWidget(rlist)
         bottom.addWidget(recent, 2)
@@ -328,15 +356,8 @@ class StudentDashboardWindow(QWidget):
 
         alist = QListWidget()
         alist.setFixedHeight(150)
-
-        reservations_bottom = self.db.get_user_reservations(self.user_id)
-
-        if not reservations_bottom:
-            QListWidgetItem("No active reservations", alist)
-        else:
-            for r in reservations_bottom:
-                text = f"{r['property_name']} - {r['room_name']} — {r['status']}"
-                QListWidgetItem(text, alist)
+        QListWidgetItem("Loading...", alist)
+        self.active_list = alist
 
         active_layout.addWidget(alist)
         bottom.addWidget(active, 2)
@@ -394,8 +415,7 @@ class StudentDashboardWindow(QWidget):
         capacity = room.get("capacity")
         cap_text = f"{capacity}p" if capacity is not None else "—p"
 
-        distance = room.get("distance")
-        dist_text = f"{distance}m" if distance is not None else "—m"
+        dist_text = format_distance(room.get("distance", room.get("distance_meters")))
 
         details = QLabel(f"{price_text} • {cap_text} • {dist_text}")
         details.setStyleSheet("color:#666;")
@@ -1,10 +1,10 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QFrame, QPushButton
 )
-from PyQt5.QtGui import QFont, QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QPixmap, QImage
+from PyQt5.QtCore import Qt, QSize
 from database import DatabaseManager
-import os
+from images import load_image
 
 class TenantDetailsWindow(QWidget):
     def __init__(self, tenant_id):
@@ -86,16 +86,11 @@ class TenantDetailsWindow(QWidget):
             f"📱 Guardian Contact: {profile['guardian_contact']}"
         )
 
-        photo_path = profile.get("photo_path")
-        if photo_path:
-            abs_path = os.path.abspath(photo_path)
-            if os.path.exists(abs_path):
-                pix = QPixmap(abs_path).scaled(
-                    120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-                self.lbl_photo.setPixmap(pix)
-            else:
-                self.lbl_photo.setText("No Photo")
+        photo = load_image(profile.get("photo_path"), QSize(120, 120))
+        if isinstance(photo, QImage):
+            self.lbl_photo.setPixmap(QPixmap.fromImage(photo))
+        else:
+            self.lbl_photo.setText("No Photo")
 
     def _apply_styles(self):
         self.setStyleSheet("""
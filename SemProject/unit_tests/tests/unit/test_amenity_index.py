@@ -0,0 +1,36 @@
+import pytest
+
+from amenity_index import AmenityIndex, amenity_mask, mask_ids, mask_labels
+
+
+def test_masks_round_trip_and_reject_ids_outside_the_bigint():
+    assert amenity_mask([1, 3, 63]) == 0b101 | (1 << 62)
+    assert mask_ids(amenity_mask([2, 5])) == [2, 5]
+    assert mask_labels(amenity_mask([1, 2]), {1: "WiFi", 2: "Aircon"}) == ["Aircon", "WiFi"]
+    with pytest.raises(ValueError):
+        amenity_mask([64])
+
+
+def test_index_keeps_rows_with_every_wanted_amenity():
+    rows = [
+        {"room_id": 1, "amenity_mask": amenity_mask([1, 2, 3])},
+        {"room_id": 2, "amenity_mask": amenity_mask([1, 3])},
+        {"room_id": 3, "amenity_mask": None},
+        {"room_id": 4, "amenity_mask": amenity_mask([1, 2, 3, 63])},
+    ]
+    index = AmenityIndex(rows)
+
+    assert [r["room_id"] for r in index.filter([1, 3])] == [1, 2, 4]
+    assert [r["room_id"] for r in index.filter([2, 63])] == [4]
+    assert len(index.filter([])) == 4
+    assert index.counts([1, 2, 63]) == {1: 3, 2: 2, 63: 1}
+
+
+def test_ids_without_a_bit_are_skipped_when_reading(caplog):
+    rows = [{"room_id": 1, "amenity_mask": amenity_mask([1, 2])}, {"room_id": 2, "amenity_mask": 0}]
+    index = AmenityIndex(rows)
+
+    with caplog.at_level("WARNING", logger="staysmart.amenities"):
+        assert [r["room_id"] for r in index.filter([1, 64])] == [1]
+        assert index.counts([1, 64]) == {1: 1}
+    assert "[64]" in caplog.text
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+
+class SlowDB:
+    """Stands in for DatabaseManager; records which thread ran each call."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.threads = []
+
+    def get_owner_stats(self, owner_id):
+        time.sleep(self.delay)
+        self.threads.append(threading.current_thread())
+        return {"owner_id": owner_id}
+
+    def fetchall(self, sql, params=None):
+        time.sleep(self.delay)
+        self.threads.append(threading.current_thread())
+        return [{"sql": sql}]
+
+    def broken(self):
+        raise RuntimeError("boom")
+
+
+@pytest.fixture
+def qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def _wait_for(app, task, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not (task.finished or task.cancelled) and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def test_async_manager_runs_calls_on_worker_threads_under_asyncio():
+    from async_db import AsyncDatabaseManager
+
+    db = SlowDB()
+    adb = AsyncDatabaseManager(db)
+
+    async def load():
+        return await adb.gather(adb.get_owner_stats(7), adb.fetchall("SELECT 1"))
+
+    stats, rows = asyncio.run(load())
+
+    assert stats == {"owner_id": 7}
+    assert rows == [{"sql": "SELECT 1"}]
+    assert threading.main_thread() not in db.threads
+
+
+def test_gather_can_return_exceptions_per_call():
+    from async_db import AsyncDatabaseManager
+
+    adb = AsyncDatabaseManager(SlowDB())
+
+    async def load():
+        return await adb.gather(adb.broken(), adb.get_owner_stats(1), return_exceptions=True)
+
+    error, stats = asyncio.run(load())
+
+    assert isinstance(error, RuntimeError)
+    assert stats == {"owner_id": 1}
+
+
+def test_run_on_qt_resumes_coroutine_on_gui_thread(qt_app):
+    from async_db import AsyncDatabaseManager, run_on_qt
+
+    adb = AsyncDatabaseManager(SlowDB(delay=0.01))
+    seen = {}
+
+    async def load():
+        stats = await adb.get_owner_stats(3)
+        seen["thread"] = threading.current_thread()
+        rows = await adb.fetchall("SELECT 2")
+        return stats, rows
+
+    task = run_on_qt(load(), on_done=lambda result: seen.setdefault("result", result))
+    assert not task.finished          # returned before the query finished
+
+    _wait_for(qt_app, task)
+
+    assert task.finished
+    assert seen["thread"] is threading.main_thread()
+    assert seen["result"] == ({"owner_id": 3}, [{"sql": "SELECT 2"}])
+
+
+def test_cancelled_task_drops_late_results(qt_app):
+    from async_db import AsyncDatabaseManager, run_on_qt
+
+    adb = AsyncDatabaseManager(SlowDB(delay=0.05))
+    applied = []
+
+    async def load():
+        applied.append(await adb.get_owner_stats(1))
+
+    task = run_on_qt(load())
+    task.cancel()
+    time.sleep(0.1)
+    qt_app.processEvents()
+
+    assert task.cancelled
+    assert applied == []
+
+
+def test_with_timeout_raises_for_slow_call_and_passes_fast_one():
+    from async_db import AsyncDatabaseManager, with_timeout
+
+    adb = AsyncDatabaseManager(SlowDB(delay=0.2))
+
+    async def slow():
+        return await with_timeout(adb.get_owner_stats(1), 0.02)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(slow())
+
+    fast = AsyncDatabaseManager(SlowDB())
+
+    async def quick():
+        return await with_timeout(fast.get_owner_stats(2), 1.0)
+
+    assert asyncio.run(quick()) == {"owner_id": 2}
+
+
+def test_timeouts_share_one_timer_thread():
+    from concurrent.futures import ThreadPoolExecutor
+    from async_db import AsyncDatabaseManager, with_timeout
+
+    with ThreadPoolExecutor(1) as pool:
+        adb = AsyncDatabaseManager(SlowDB(delay=0.05), executor=pool)
+        with_timeout(adb.get_owner_stats(0), 0.01).future.exception(5)   # timer thread is up
+        before = threading.active_count()
+        guarded = [with_timeout(adb.get_owner_stats(i), 0.01) for i in range(20)]
+
+        assert threading.active_count() <= before
+        assert all(isinstance(g.future.exception(5), TimeoutError) for g in guarded)
@@ -0,0 +1,78 @@
+from datetime import date
+
+
+class FakeDB:
+    """Answers availability.ROOMS_SQL and INTERVALS_SQL from lists."""
+
+    def __init__(self, rooms, intervals):
+        self.rooms = rooms
+        self.intervals = intervals
+        self.queries = 0
+
+    def fetchall(self, sql, params=None):
+        self.queries += 1
+        if "capacity" in sql:
+            return [{"room_id": r, "capacity": c} for r, c in self.rooms]
+        return [{"room_id": r, "start_date": s, "end_date": e} for r, s, e in self.intervals]
+
+
+def _index():
+    from availability import OccupancyIndex
+    return OccupancyIndex(clock=lambda: 0)
+
+
+def test_room_is_free_only_if_every_day_has_a_bed():
+    rooms = [(1, 1), (2, 2), (3, 2), (4, 1)]
+    intervals = [
+        (1, date(2026, 6, 1), date(2026, 7, 31)),       # single room, moves out before August
+        (2, date(2026, 8, 1), date(2026, 8, 15)),
+        (2, date(2026, 8, 10), date(2026, 8, 20)),      # overlaps: both beds gone Aug 10-15
+        (3, date(2026, 8, 1), date(2026, 8, 9)),
+        (3, date(2026, 8, 10), date(2026, 8, 20)),      # back to back: never more than one
+        (4, date(2026, 1, 1), None),                    # open-ended
+        (99, date(2026, 8, 1), None),                   # room of a closed dorm
+    ]
+    index = _index()
+    db = FakeDB(rooms, intervals)
+
+    assert index.free_rooms(db, date(2026, 8, 1), date(2026, 8, 31)).tolist() == [1, 3]
+    assert index.free_rooms(db, date(2026, 8, 16), date(2026, 8, 31)).tolist() == [1, 2, 3]
+    assert index.free_rooms(db, date(2026, 7, 1), date(2026, 7, 1)).tolist() == [2, 3]
+    assert index.free_rooms(db, date(2026, 8, 31), date(2026, 8, 1)).tolist() == [1, 3]
+
+
+def test_peak_matches_a_day_by_day_count():
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    rooms = [(r, int(rng.integers(1, 4))) for r in range(1, 41)]
+    intervals = []
+    for _ in range(300):
+        start = date.fromordinal(date(2026, 1, 1).toordinal() + int(rng.integers(0, 300)))
+        end = None if rng.random() < 0.1 else date.fromordinal(start.toordinal() + int(rng.integers(0, 90)))
+        intervals.append((int(rng.integers(1, 41)), start, end))
+
+    index = _index()
+    lo, hi = date(2026, 5, 1), date(2026, 6, 30)
+    room_ids, capacity, peak = index.peak_occupancy(FakeDB(rooms, intervals), lo, hi)
+
+    for room_id, p in zip(room_ids.tolist(), peak.tolist()):
+        expected = max(
+            sum(1 for r, s, e in intervals
+                if r == room_id and s.toordinal() <= day and (e is None or e.toordinal() >= day))
+            for day in range(lo.toordinal(), hi.toordinal() + 1)
+        )
+        assert p == expected
+
+
+def test_index_is_reused_until_invalidated():
+    index = _index()
+    db = FakeDB([(1, 1)], [])
+    index.free_rooms(db, date(2026, 8, 1), date(2026, 8, 2))
+    index.free_rooms(db, date(2026, 9, 1), date(2026, 9, 2))
+    assert db.queries == 2
+
+    db.intervals.append((1, date(2026, 8, 1), None))
+    index.invalidate()
+    assert index.free_rooms(db, date(2026, 8, 1), date(2026, 8, 2)).tolist() == []
+    assert db.queries == 4
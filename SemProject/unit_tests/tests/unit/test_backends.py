@@ -0,0 +1,45 @@
+import mysql.connector
+import pytest
+
+from backends import MySQLBackend
+
+
+CONFIG = {"host": "db", "user": "app", "password": "pw", "database": "staysmart"}
+
+
+def test_pooled_connect_passes_a_stable_pool_name(monkeypatch):
+    calls = []
+    monkeypatch.setattr(mysql.connector, "connect", lambda **kwargs: calls.append(kwargs) or object())
+
+    backend = MySQLBackend(pool_size=4)
+    backend.connect(CONFIG, pooled=True)
+    backend.connect(CONFIG)
+
+    assert calls[0]["pool_size"] == 4
+    assert calls[0]["pool_name"] == MySQLBackend.pool_name(dict(CONFIG))
+    assert "pool_name" not in calls[1]
+
+
+@pytest.mark.skipif(not hasattr(mysql.connector, "PoolError"), reason="needs mysql-connector pooling")
+def test_exhausted_pool_falls_back_to_a_plain_connection(monkeypatch):
+    calls = []
+
+    def connect(**kwargs):
+        calls.append(kwargs)
+        if "pool_name" in kwargs:
+            raise mysql.connector.PoolError("pool exhausted")
+        return "plain"
+
+    monkeypatch.setattr(mysql.connector, "connect", connect)
+
+    assert MySQLBackend(pool_size=2).connect(CONFIG, pooled=True) == "plain"
+    assert len(calls) == 2
+
+
+def test_sqlite_older_than_upsert_support_is_refused(monkeypatch, tmp_path):
+    import sqlite3
+    from backends import SQLiteBackend
+
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 31, 1))
+    with pytest.raises(RuntimeError, match="3.35"):
+        SQLiteBackend(str(tmp_path / "old.db")).connect()
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def _drain(app, loader, timeout=5.0):
+    from PyQt5.QtCore import QThreadPool
+    QThreadPool.globalInstance().waitForDone(int(timeout * 1000))
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        app.processEvents()
+
+
+def test_loader_fetches_on_worker_and_applies_on_gui_thread(qt_app):
+    from PyQt5.QtWidgets import QWidget, QTableWidget
+    from background_loader import BackgroundLoader, show_table_placeholder, fill_table
+
+    w = QWidget()
+    table = QTableWidget(0, 2, w)
+    threads = {}
+
+    def fetch(search):
+        threads["fetch"] = threading.current_thread()
+        return [{"id": 1, "name": search}, {"id": 2, "name": search}]
+
+    def apply(rows):
+        threads["apply"] = threading.current_thread()
+        fill_table(table, rows, lambda r: [r["id"], r["name"]])
+
+    loader = BackgroundLoader(w, fetch, apply, placeholder=lambda: show_table_placeholder(table))
+    w.show()
+    loader.load("abc")
+
+    assert table.item(0, 0).text() == "Loading..."      # placeholder shows at once
+    _drain(qt_app, loader)
+
+    assert loader.loaded
+    assert table.rowCount() == 2
+    assert table.item(1, 1).text() == "abc"
+    assert threads["fetch"] is not threading.main_thread()
+    assert threads["apply"] is threading.main_thread()
+
+
+def test_loader_drops_stale_and_closed_results(qt_app):
+    from PyQt5.QtWidgets import QWidget
+    from background_loader import BackgroundLoader
+
+    w = QWidget()
+    applied = []
+
+    def fetch(value, delay):
+        time.sleep(delay)
+        return value
+
+    loader = BackgroundLoader(w, fetch, applied.append)
+    w.show()
+    loader.load("old", 0.1)
+    loader.load("new", 0.0)
+    _drain(qt_app, loader)
+
+    assert applied == ["new"]
+
+    loader.load("late", 0.05)
+    w.close()
+    _drain(qt_app, loader)
+
+    assert applied == ["new"]
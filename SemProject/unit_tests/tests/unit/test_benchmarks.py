@@ -0,0 +1,44 @@
+from datetime import date
+
+
+def test_datagen_is_deterministic():
+    from benchmarks.datagen import DatasetGenerator
+
+    a = list(DatasetGenerator(rooms=200, seed=7, anchor=date(2026, 1, 1)).tables("h"))
+    b = list(DatasetGenerator(rooms=200, seed=7, anchor=date(2026, 1, 1)).tables("h"))
+    c = list(DatasetGenerator(rooms=200, seed=8, anchor=date(2026, 1, 1)).tables("h"))
+
+    assert a == b
+    assert a != c
+
+
+def test_datagen_sizes_follow_scale():
+    from benchmarks.datagen import DatasetGenerator, resolve_scale
+
+    tables = {t: rows for t, _, rows in DatasetGenerator(rooms=500).tables("h")}
+
+    assert resolve_scale("100k") == 100000
+    assert len(tables["rooms"]) == 500
+    assert len(tables["rental_applications"]) == 250
+    assert len(tables["amenities"]) == 12
+    assert tables["payments"]
+
+
+def test_every_public_database_method_has_a_benchmark_case():
+    from benchmarks.run_benchmarks import CASES, public_methods
+
+    covered = {name.split("[")[0] for name in CASES}
+    assert [m for m in public_methods() if m not in covered] == []
+
+
+def test_a_write_case_that_changes_nothing_is_an_error():
+    from benchmarks.run_benchmarks import time_case
+
+    calls = []
+
+    def check(i):
+        if not calls:
+            raise AssertionError("write changed no row")
+
+    assert time_case(lambda i: None, 3, check=check)["error"] == "AssertionError: write changed no row"
+    assert time_case(lambda i: calls.append(i), 3, check=check)["error"] is None
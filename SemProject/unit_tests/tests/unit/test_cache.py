@@ -0,0 +1,96 @@
+def test_ttl_cache_expires_entries():
+    from cache import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(maxsize=10, ttl=5, clock=lambda: now[0])
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    now[0] = 6.0
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    from cache import TTLCache
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # "b" is now the LRU entry
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_ttl_cache_caches_none_results_and_invalidates_prefix():
+    from cache import TTLCache
+
+    cache = TTLCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_load(("img", 1), loader) is None
+    assert cache.get_or_load(("img", 1), loader) is None
+    assert len(calls) == 1
+
+    cache.set(("img", 2), "x.png")
+    cache.set(("other", 1), "keep")
+    cache.invalidate_prefix("img")
+
+    assert ("img", 2) not in cache
+    assert cache.get(("other", 1)) == "keep"
+
+
+def test_room_amenities_served_from_cache_until_invalidated():
+    from database import DatabaseManager
+    db = DatabaseManager()
+    db.cache.clear()
+
+    calls = []
+
+    def fake_fetchall(sql, params=None):
+        calls.append(params)
+        return [{"label": "WiFi"}]
+
+    db.fetchall = fake_fetchall
+
+    assert db.get_room_amenities(7) == ["WiFi"]
+    assert db.get_room_amenities(7) == ["WiFi"]
+    assert len(calls) == 1
+
+    db.invalidate_room_amenities(7)
+    db.get_room_amenities(7)
+    assert len(calls) == 2
+
+
+def test_get_all_rooms_loads_host_contacts_once():
+    from database import DatabaseManager
+    db = DatabaseManager()
+    db.cache.clear()
+
+    host_queries = []
+
+    def fake_fetchall(sql, params=None):
+        if "FROM users" in sql:
+            host_queries.append(params)
+            return [{"host_id": 5, "host_name": "Owner", "phone": "0917",
+                     "email": "o@x.com", "facebook_link": None,
+                     "messenger_link": None}]
+        return [{"room_id": 1, "dorm_id": 2, "host_id": 5,
+                 "property_name": "Dorm", "address": "St",
+                 "room_name": "101", "capacity": 2,
+                 "price_monthly": 3000, "room_type": "BED_SPACER"}]
+
+    db.fetchall = fake_fetchall
+
+    rooms = db.get_all_rooms()
+    db.get_all_rooms()
+
+    assert rooms[0]["host_name"] == "Owner"
+    assert rooms[0]["phone"] == "0917"
+    assert host_queries == [(5,)]
@@ -50,26 +50,24 @@ def test_execute_commits_and_returns_last_id(monkeypatch):
     assert conn.committed is True
     assert conn.closed is True
 
-def test_mark_payment_paid_defaults_to_amount_due():
-    # Avoid real DB by overriding fetchone/execute on the instance.
-    from database import DatabaseManager
-    db = DatabaseManager()
-
-    calls = []
-    db.fetchone = lambda sql, params=None: {"amount_due": 2500}
+def test_mark_payment_paid_defaults_to_amount_due(monkeypatch):
+    cur = FakeCursor()
+    cur.queue_fetchone({"rental_id": 7, "amount_due": 2500})
+    conn = FakeConnection(cur)
 
-    def fake_execute(sql, params=None):
-        calls.append((sql, params))
-        return None
+    _patch_mysql_connect(monkeypatch, conn)
 
-    db.execute = fake_execute
+    from database import DatabaseManager, RENTAL_DUES_SQL
+    db = DatabaseManager()
 
     ok = db.mark_payment_paid(payment_id=10, amount_paid=None)
 
     assert ok is True
-    update_call = [c for c in calls if "UPDATE payments" in c[0]][0]
+    update_call = [c for c in cur.executed if "UPDATE payments" in c[0]][0]
     assert update_call[1][0] == 2500  # amount_paid
     assert update_call[1][1] == 10    # payment_id
+    assert (RENTAL_DUES_SQL, (7,)) in cur.executed   # rental dues refreshed in the same transaction
+    assert conn.committed is True
 
 def test_get_owner_stats_occupancy_rate_calculation():
     from database import DatabaseManager
@@ -85,7 +83,7 @@ def test_get_owner_stats_occupancy_rate_calculation():
             return {"cnt": 6}
         if "FROM RENTAL_APPLICATIONS" in sql_norm and "WAITING" in sql_norm:
             return {"cnt": 2}
-        if "FROM TRANSACTIONS" in sql_norm and "COALESCE(SUM(AMOUNT),0)" in sql_norm:
+        if "FROM OWNER_REVENUE_MONTHLY" in sql_norm:
             return {"total": 10000}
         if "SUM(CASE WHEN STATUS='OPEN'" in sql_norm:
             return {"active_cnt": 3, "maint_cnt": 1}
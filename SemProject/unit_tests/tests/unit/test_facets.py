@@ -0,0 +1,37 @@
+from amenity_index import amenity_mask
+from facets import compute_facets
+
+
+ROWS = [
+    {"capacity": 1, "price_monthly": 2500, "dorm_type": "BED_SPACER", "amenity_mask": amenity_mask([1])},
+    {"capacity": 2, "price_monthly": 4000, "dorm_type": "MIXED", "amenity_mask": amenity_mask([1, 2])},
+    {"capacity": 2, "price_monthly": 6000, "dorm_type": "MIXED", "amenity_mask": amenity_mask([2])},
+    {"capacity": 5, "price_monthly": 9000, "dorm_type": "APARTMENT", "amenity_mask": 0},
+]
+
+
+def test_facets_without_filters_count_every_row():
+    facets = compute_facets(ROWS, amenity_ids_all=[1, 2, 3])
+
+    assert facets["total"] == 4
+    assert facets["capacity"] == {"Any": 4, "1": 1, "2": 2, "3": 0, "4+": 1}
+    assert list(facets["price"].values()) == [1, 1, 1, 1]
+    assert facets["dorm_type"] == {"BED_SPACER": 1, "APARTMENT": 1, "MIXED": 2}
+    assert facets["amenities"] == {1: 2, 2: 2, 3: 0}
+
+
+def test_each_facet_applies_the_other_filters():
+    facets = compute_facets(ROWS, capacity_filter="2", amenity_ids=[2], amenity_ids_all=[1, 2])
+
+    assert facets["total"] == 2
+    # capacity options ignore the capacity filter but keep the amenity one
+    assert facets["capacity"] == {"Any": 2, "1": 0, "2": 2, "3": 0, "4+": 0}
+    assert facets["amenities"] == {1: 1, 2: 2}
+    assert facets["dorm_type"]["MIXED"] == 2
+
+
+def test_amenity_ids_without_a_bit_are_left_out():
+    facets = compute_facets(ROWS, amenity_ids=[2, 64], amenity_ids_all=[1, 2, 64])
+
+    assert facets["total"] == 2
+    assert facets["amenities"] == {1: 1, 2: 2}
@@ -0,0 +1,167 @@
+import os
+import struct
+import time
+
+import pytest
+
+
+@pytest.fixture
+def qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def _store(tmp_path):
+    from upload_store import UploadStore
+    return UploadStore(base_dir=str(tmp_path))
+
+
+def _camera_jpeg(tmp_path, width, height):
+    """A JPEG with a comment and an EXIF block saying 'rotate 90 degrees'."""
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+    from PyQt5.QtGui import QImage
+
+    img = QImage(width, height, QImage.Format_RGB32)
+    img.fill(Qt.darkGreen)
+    img.setText("Description", "taken at 14.5995N 120.9842E")
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    img.save(buf, "JPG")
+
+    tiff = b"MM\x00\x2a\x00\x00\x00\x08" + b"\x00\x01" + b"\x01\x12\x00\x03\x00\x00\x00\x01\x00\x06\x00\x00" + b"\x00" * 4
+    exif = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\x00\x00" + tiff
+    path = tmp_path / "IMG_0001.JPG"
+    path.write_bytes(bytes(data)[:2] + exif + bytes(data)[2:])
+    return str(path)
+
+
+def test_ingest_downscales_rotates_and_strips_metadata(qt_app, tmp_path):
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QImageReader
+    import images
+
+    store = _store(tmp_path)
+    src = _camera_jpeg(tmp_path, 4000, 3000)
+
+    rel_path = images.ingest(src, store)
+    assert images.ingest(src, store) == rel_path          # same photo, same blob
+
+    stored = store.resolve(rel_path)
+    raw = open(stored, "rb").read()
+    assert rel_path.endswith(".jpg") and b"Exif" not in raw and b"14.5995N" not in raw
+    reader = QImageReader(stored)
+    assert reader.size() == QSize(1200, 1600)               # portrait after rotation, long side MAX_SIDE
+    assert os.path.getsize(stored) < os.path.getsize(src)
+
+    thumb = store.resolve(store.rendition_path(rel_path, "thumb"))
+    preview = store.resolve(store.rendition_path(rel_path, "preview"))
+    assert QImageReader(thumb).size() == QSize(135, 180)
+    assert QImageReader(preview).size() == QSize(540, 720)
+
+    assert images.display_path(rel_path, QSize(200, 150), store) == thumb
+    assert images.display_path(rel_path, QSize(800, 300), store) == preview
+    assert images.display_path(rel_path, QSize(2000, 2000), store) == stored
+    assert images.load_image(rel_path, QSize(120, 80), store).size() == QSize(60, 80)
+
+
+def test_ingest_rejects_files_that_are_not_images(qt_app, tmp_path):
+    import images
+
+    src = tmp_path / "receipt.jpg"
+    src.write_bytes(b"%PDF-1.4 not really a picture")
+    with pytest.raises(ValueError):
+        images.ingest(str(src), _store(tmp_path))
+
+
+def test_load_image_decodes_legacy_uploads_at_display_size(qt_app, tmp_path):
+    from PyQt5.QtCore import QSize, Qt
+    from PyQt5.QtGui import QImage
+    import images
+
+    store = _store(tmp_path)
+    legacy = tmp_path / "uploads" / "dorm_images" / "front.png"
+    legacy.parent.mkdir(parents=True)
+    img = QImage(800, 400, QImage.Format_RGB32)
+    img.fill(Qt.blue)
+    img.save(str(legacy))
+
+    assert images.load_image("uploads/dorm_images/front.png", QSize(120, 80), store).size() == QSize(120, 60)
+    assert images.load_image("uploads/dorm_images/gone.png", QSize(120, 80), store) == "Not found"
+    assert images.load_image(None, QSize(120, 80), store) == "No image"
+
+
+def test_ingester_reports_back_on_gui_thread(qt_app, tmp_path):
+    import threading
+    from PyQt5.QtCore import QThreadPool
+    from PyQt5.QtWidgets import QWidget
+    from images import ImageIngester
+
+    bad = tmp_path / "notes.png"
+    bad.write_bytes(b"hello")
+    results = []
+    w = QWidget()
+    ingester = ImageIngester(
+        w,
+        lambda src, rel: results.append(("done", os.path.basename(src), threading.current_thread())),
+        lambda src, msg: results.append(("failed", os.path.basename(src), threading.current_thread())),
+        store=_store(tmp_path),
+    )
+
+    ingester.submit(_camera_jpeg(tmp_path, 64, 48))
+    ingester.submit(str(bad))
+    assert ingester.busy()
+
+    QThreadPool.globalInstance().waitForDone(5000)
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        qt_app.processEvents()
+
+    assert sorted(r[:2] for r in results) == [("done", "IMG_0001.JPG"), ("failed", "notes.png")]
+    assert all(r[2] is threading.main_thread() for r in results)
+    assert not ingester.busy()
+
+
+def _drain(app, timeout=5.0):
+    from PyQt5.QtCore import QThreadPool
+    QThreadPool.globalInstance().waitForDone(int(timeout * 1000))
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        app.processEvents()
+
+
+def _png(tmp_path, name, width, height):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    img = QImage(width, height, QImage.Format_RGB32)
+    img.fill(Qt.white)
+    path = tmp_path / name
+    img.save(str(path))
+    return str(path)
+
+
+def test_loader_decodes_once_and_keeps_within_budget(qt_app, tmp_path):
+    from PyQt5.QtCore import QSize, QThreadPool
+    from images import ImageLoader
+
+    paths = [_png(tmp_path, f"proof{i}.png", 1000, 2000) for i in range(3)]
+    box = QSize(100, 100)
+    loader = ImageLoader(budget_bytes=2 * 50 * 100 * 4, pool=QThreadPool.globalInstance(), store=_store(tmp_path))
+    loaded = []
+    loader.loaded.connect(lambda key, result: loaded.append(key))
+
+    assert loader.request(paths[0], box) is None
+    assert loader.request(paths[0], box) is None        # already queued, not decoded twice
+    loader.prefetch(paths[1:], box)
+    _drain(qt_app)
+
+    assert sorted(loaded) == sorted(loader.key(p, box) for p in paths)
+    assert loader.get(paths[0], box) is None            # oldest dropped: two 50x100 images fit
+    assert loader.get(paths[2], box).size() == QSize(50, 100)
+    assert loader.used_bytes == 2 * 50 * 100 * 4
+
+    assert loader.request(paths[1], None) is None       # full resolution is its own entry
+    _drain(qt_app)
+    assert loader.get(paths[1], None).size() == QSize(1000, 2000)
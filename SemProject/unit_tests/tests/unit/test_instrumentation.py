@@ -0,0 +1,86 @@
+import json
+
+from helpers import FakeCursor, FakeConnection
+
+
+def test_query_stats_histogram_and_slow_log():
+    from instrumentation import QueryStats
+
+    stats = QueryStats(slow_threshold_ms=100)
+    stats.record_query("SELECT  1\n FROM x", 3.0, rows=2, call_site="a.py:1 (f)")
+    stats.record_query("SELECT 1 FROM x", 150.0, rows=1, call_site="b.py:9 (g)")
+
+    snap = stats.snapshot()
+    q = snap["queries"][0]
+
+    assert len(snap["queries"]) == 1
+    assert q["sql"] == "SELECT 1 FROM x"
+    assert q["count"] == 2
+    assert q["rows"] == 3
+    assert q["buckets"]["<=5ms"] == 1
+    assert q["buckets"]["<=250ms"] == 1
+    assert q["call_sites"] == {"a.py:1 (f)": 1, "b.py:9 (g)": 1}
+    assert len(snap["slow_queries"]) == 1
+    assert snap["slow_queries"][0]["call_site"] == "b.py:9 (g)"
+    assert json.loads(stats.to_json())["slow_threshold_ms"] == 100
+
+
+def test_fetchall_is_tracked_with_call_site(monkeypatch):
+    cur = FakeCursor()
+    cur.queue_fetchall([{"a": 1}, {"a": 2}])
+    conn = FakeConnection(cur)
+
+    import mysql.connector
+    monkeypatch.setattr(mysql.connector, "connect", lambda **kwargs: conn)
+
+    from database import DatabaseManager
+    from instrumentation import QueryStats
+
+    db = DatabaseManager()
+    db.stats = QueryStats(slow_threshold_ms=10000)
+
+    db.fetchall("SELECT a FROM t")
+
+    snap = db.stats.snapshot()
+    q = snap["queries"][0]
+    assert q["rows"] == 2
+    assert snap["connections"]["count"] == 1
+    assert any("test_instrumentation.py" in site for site in q["call_sites"])
+
+
+def test_async_queries_are_credited_to_the_submitting_screen(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from async_db import AsyncDatabaseManager
+    from backends import SQLiteBackend
+    from database import DatabaseManager
+    from instrumentation import QueryStats
+
+    backend = SQLiteBackend(str(tmp_path / "calls.db"))
+    db = DatabaseManager(backend)
+    db.stats = QueryStats(slow_threshold_ms=10000)
+
+    with ThreadPoolExecutor(2) as pool:
+        adb = AsyncDatabaseManager(db, executor=pool)
+        assert adb.fetchone("SELECT 1 AS one").result(5) == {"one": 1}
+    backend.close()
+
+    sites = db.stats.snapshot()["queries"][0]["call_sites"]
+    assert list(sites) and all("test_instrumentation.py" in site for site in sites)
+
+
+def test_connection_failure_is_counted(monkeypatch):
+    import mysql.connector
+
+    def boom(**kwargs):
+        raise mysql.connector.Error("no db")
+
+    monkeypatch.setattr(mysql.connector, "connect", boom)
+
+    from database import DatabaseManager
+    from instrumentation import QueryStats
+
+    db = DatabaseManager()
+    db.stats = QueryStats()
+
+    assert db.fetchone("SELECT 1") is None
+    assert db.stats.snapshot()["connections"]["failures"] == 1
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+class FakeDB:
+    def __init__(self, requests):
+        self.requests = requests
+        self.fail = None
+
+    def get_pending_payment_requests(self, owner_id):
+        return list(self.requests)
+
+    def review_payment_request(self, request_id, approve=True, remarks=None):
+        if self.fail:
+            raise self.fail
+        self.requests = [r for r in self.requests if r["request_id"] != request_id]
+        return True
+
+
+def _window(monkeypatch, requests):
+    import paymentrequest
+
+    db = FakeDB(requests)
+    monkeypatch.setattr(paymentrequest, "DatabaseManager", lambda: db)
+    return paymentrequest.PaymentRequestsWindow(owner_id=1), db
+
+
+def _request(request_id, name):
+    return {"request_id": request_id, "tenant_name": name, "amount": 1000, "proof_image": ""}
+
+
+def test_reviewing_moves_to_the_nearest_request_the_search_still_shows(qt_app, monkeypatch):
+    from PyQt5.QtWidgets import QMessageBox
+
+    monkeypatch.setattr(QMessageBox, "warning", lambda *a: None)
+    window, db = _window(monkeypatch, [_request(1, "Ana"), _request(2, "Ben"), _request(3, "Ana B")])
+    window.search.setText("Ana")
+    assert window.table.isRowHidden(1)
+
+    window.table.selectRow(0)
+    window.reject(window.requests[0])      # Ben slides into row 0's place but is filtered out
+    assert window.requests[window.table.currentRow()]["tenant_name"] == "Ana B"
+
+    window.search.setText("nobody")
+    assert window.table.currentRow() == -1
+
+
+def test_a_failed_reject_reports_the_error(qt_app, monkeypatch):
+    from PyQt5.QtWidgets import QMessageBox
+
+    shown = []
+    monkeypatch.setattr(QMessageBox, "critical", lambda parent, title, text: shown.append(text))
+    window, db = _window(monkeypatch, [_request(1, "Ana")])
+    db.fail = ConnectionError("database is gone")
+
+    window.reject(window.requests[0])
+
+    assert shown == ["Could not reject the payment:\ndatabase is gone"]
+    assert len(window.requests) == 1
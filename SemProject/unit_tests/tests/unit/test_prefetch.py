@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import prefetch
+from prefetch import PrefetchCache, Prefetcher, call_key, estimate_size
+
+
+class CountingDB:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _record(self, name, *args):
+        self.release.wait(5)
+        self.calls.append((name,) + args)
+        return [{"name": name, "args": args}]
+
+    def get_owner_stats(self, owner_id):
+        return {"owner_id": owner_id, "calls": len(self.calls)}
+
+    def __getattr__(self, name):
+        if name.startswith("get_"):
+            return lambda *args, **kwargs: self._record(name, *args)
+        raise AttributeError(name)
+
+
+def _done(value):
+    f = Future()
+    f.set_result(value)
+    return f
+
+
+def test_cache_keeps_results_within_budget():
+    small = ["x" * 10]
+    cache = PrefetchCache(budget_bytes=estimate_size(small) * 2 + 1)
+
+    for key in ("a", "b", "c"):
+        cache.add(key, _done(small))
+
+    assert cache.used_bytes <= cache.budget_bytes
+    assert cache.take("a") is None              # oldest was evicted
+    assert cache.take("c").result() == small
+    assert cache.take("c") is None              # taken once only
+
+
+def test_prefetcher_queues_the_role_plan_and_windows_take_results(monkeypatch):
+    db = CountingDB()
+    cache = PrefetchCache(budget_bytes=1 << 20)
+    monkeypatch.setattr(prefetch, "prefetch_cache", cache)
+
+    with ThreadPoolExecutor(2) as pool:
+        Prefetcher(db, 5, "TENANT", cache=cache, executor=pool).start()
+
+    assert ("get_user_payments", 5) in db.calls
+    before = len(db.calls)
+
+    rows = prefetch.prefetched(db, "get_user_payments", 5)
+
+    assert rows == [{"name": "get_user_payments", "args": (5,)}]
+    assert len(db.calls) == before              # served from the prefetch
+    prefetch.prefetched(db, "get_user_payments", 5)
+    assert len(db.calls) == before + 1          # second read goes to the DB
+
+
+def test_prefetched_does_not_wait_for_a_running_prefetch(monkeypatch):
+    db = CountingDB()
+    cache = PrefetchCache(budget_bytes=1 << 20)
+    monkeypatch.setattr(prefetch, "prefetch_cache", cache)
+    cache.add(call_key("get_user_payments", (5,)), Future())    # never finishes
+
+    rows = prefetch.prefetched(db, "get_user_payments", 5)
+
+    assert rows == [{"name": "get_user_payments", "args": (5,)}]
+    assert db.calls == [("get_user_payments", 5)]
+
+
+def test_logout_cancels_queued_calls_and_drops_results(monkeypatch):
+    db = CountingDB()
+    db.release.clear()                          # hold the first calls on the worker
+    cache = PrefetchCache(budget_bytes=1 << 20)
+    monkeypatch.setattr(prefetch, "prefetch_cache", cache)
+
+    with ThreadPoolExecutor(1) as pool:
+        prefetcher = Prefetcher(db, 9, "OWNER", cache=cache, executor=pool).start()
+        prefetcher.cancel()
+        db.release.set()
+
+    assert len(cache) == 0
+    assert len(db.calls) <= 1                   # only the call already running
+    assert cache.take(call_key("get_pending_requests", (9,))) is None
+
+
+@pytest.mark.parametrize("role", ["ADMIN", None])
+def test_unknown_role_prefetches_nothing(role):
+    cache = PrefetchCache()
+    Prefetcher(CountingDB(), 1, role, cache=cache, executor=ThreadPoolExecutor(1)).start()
+    assert len(cache) == 0
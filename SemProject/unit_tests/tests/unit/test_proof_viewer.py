@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def _pump(app, viewer, until, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not until() and time.monotonic() < deadline:
+        app.processEvents()
+        viewer.loader.pool.waitForDone(10)
+
+
+def _proof(tmp_path, name):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    img = QImage(1080, 2400, QImage.Format_RGB32)
+    img.fill(Qt.white)
+    path = tmp_path / name
+    img.save(str(path), "JPG")
+    return str(path)
+
+
+def test_viewer_fits_prefetches_and_zooms_on_demand(qt_app, tmp_path):
+    from proof_viewer import ProofViewer
+
+    first, second = _proof(tmp_path, "a.jpg"), _proof(tmp_path, "b.jpg")
+    viewer = ProofViewer()
+    viewer.resize(420, 520)
+    viewer.show()
+    qt_app.processEvents()
+
+    viewer.show_proof(first)
+    viewer.prefetch([second])
+    # wait for the first proof on screen as well as the second in the cache
+    _pump(qt_app, viewer, lambda: viewer.shown_path == first
+          and viewer.loader.get(second, viewer.fit_size()) is not None)
+
+    fitted = viewer.image.pixmap().size()
+    box = viewer.fit_size()
+    assert viewer.shown_path == first
+    assert fitted.width() <= box.width() and fitted.height() <= box.height()
+
+    viewer.show_proof(second)                             # prefetched: on screen without waiting
+    assert viewer.shown_path == second and viewer.image.pixmap().size() == fitted
+
+    viewer.btn_zoom.setChecked(True)
+    assert viewer.loader.get(second, None) is None        # full resolution only once asked for
+    _pump(qt_app, viewer, lambda: viewer.image.pixmap().width() == 1080)
+    assert viewer.image.pixmap().height() == 2400
+
+    viewer.show_proof(str(tmp_path / "missing.jpg"))
+    _pump(qt_app, viewer, lambda: viewer.image.text() != "Loading...")
+    assert viewer.image.text() == "Proof image not found"
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class FakeDB:
+    """Answers recommender.FEATURE_SQL from a list of room rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def fetchall(self, sql, params=None):
+        self.queries.append(sql)
+        if "r.room_id IN" in sql:
+            return [dict(r) for r in self.rows if r["room_id"] in params]
+        if "r.dorm_id IN" in sql:
+            return [dict(r) for r in self.rows if r["dorm_id"] in params]
+        return [dict(r) for r in self.rows]
+
+
+def _room(room_id, price, capacity=2, room_type="BED_SPACER", mask=0, dorm_id=1, available=1):
+    return {
+        "room_id": room_id, "dorm_id": dorm_id, "room_no": str(room_id), "price_monthly": price,
+        "capacity": capacity, "room_type": room_type, "amenity_mask": mask, "dorm_name": f"Dorm {dorm_id}",
+        "location_text": "St", "dorm_type": "MIXED", "latitude": 14.65, "longitude": 121.07,
+        "available": available,
+    }
+
+
+def test_feature_rows_are_unit_length():
+    from recommender import N_FEATURES, feature_rows
+
+    X = feature_rows([_room(1, 3000, mask=0b101), _room(2, 12000, capacity=1, room_type="APARTMENT")])
+    assert X.shape == (2, N_FEATURES) and X.dtype == np.float32
+    assert np.allclose(np.linalg.norm(X, axis=1), 1.0)
+
+
+def test_top_k_is_most_similar_first_and_skips_history():
+    from recommender import RoomFeatures
+
+    rows = [_room(1, 3000), _room(2, 3100), _room(3, 14000, capacity=1, room_type="APARTMENT"),
+            _room(4, 3050, available=0)]
+    features = RoomFeatures()
+    found, scores = features.recommend(FakeDB(rows), [(1, 1.0)], 5)
+
+    assert [f[0] for f in found] == [2, 3]
+    assert scores == sorted(scores, reverse=True)
+    assert features.recommend(FakeDB(rows), [(99, 1.0)], 5) == ([], [])
+
+
+def test_dirty_rooms_are_refreshed_without_a_full_rebuild():
+    from recommender import RoomFeatures
+
+    rows = [_room(1, 3000), _room(2, 3100), _room(3, 9000)]
+    db = FakeDB(rows)
+    features = RoomFeatures()
+    features.recommend(db, [(1, 1.0)], 1)
+
+    rows[1]["available"] = 0
+    rows.append(_room(4, 3000, dorm_id=2))
+    features.mark_rooms_dirty([2, 4])
+    db.queries.clear()
+    found, _ = features.recommend(db, [(1, 1.0)], 1)
+
+    assert [f[0] for f in found] == [4]
+    assert len(db.queries) == 1 and "r.room_id IN" in db.queries[0]
+    assert len(features) == 3
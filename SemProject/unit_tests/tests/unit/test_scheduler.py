@@ -0,0 +1,210 @@
+from datetime import date
+
+from helpers import FakeCursor, FakeConnection
+
+
+def test_mark_overdue_payments_runs_in_batches():
+    from database import DatabaseManager
+    db = DatabaseManager()
+
+    counts = [500, 500, 120]
+    calls = []
+
+    def fake_execute_count(sql, params=None):
+        calls.append((sql, params))
+        return counts.pop(0)
+
+    db.execute_count = fake_execute_count
+
+    total, batches = db.mark_overdue_payments(batch_size=500)
+
+    assert total == 1120
+    assert batches == 3
+    assert all("LIMIT" in sql for sql, _ in calls)
+    assert calls[0][1] == (500,)
+
+
+def test_check_overdue_delegates_to_mark_overdue():
+    from database import DatabaseManager
+    db = DatabaseManager()
+    db.mark_overdue_payments = lambda: (4, 1)
+
+    assert db.check_overdue() == (4, 1)
+
+
+def test_generate_monthly_payments_skips_past_end_date(monkeypatch):
+    cur = FakeCursor()
+    cur.queue_fetchall([
+        {"rental_id": 1, "end_date": None, "price_monthly": 3000,
+         "last_due": date(2026, 1, 1)},
+        {"rental_id": 2, "end_date": date(2026, 1, 15), "price_monthly": 2500,
+         "last_due": date(2026, 1, 1)},
+    ])
+    conn = FakeConnection(cur)
+
+    import mysql.connector
+    monkeypatch.setattr(mysql.connector, "connect", lambda **kwargs: conn)
+
+    from database import DatabaseManager
+    db = DatabaseManager()
+
+    total, batches = db.generate_monthly_payments(batch_size=10)
+
+    inserts = [p for sql, p in cur.executed if "INSERT INTO payments" in sql]
+    assert total == 1
+    assert batches == 1
+    assert inserts == [(1, date(2026, 1, 31), 3000)]
+    assert [p for sql, p in cur.executed if "UPDATE rentals SET" in sql] == [(1,)]
+
+
+def test_scheduler_runs_due_jobs_and_records_metrics():
+    from scheduler import JobScheduler
+
+    now = [0.0]
+    recorded = []
+
+    class FakeDB:
+        def acquire_job_lease(self, name, holder, seconds):
+            return True
+
+        def record_job_run(self, *args):
+            recorded.append(args)
+
+    sched = JobScheduler(db=FakeDB(), clock=lambda: now[0])
+    sched.add_job("fast", lambda db: (3, 1), interval=10)
+    sched.add_job("slow", lambda db: (0, 1), interval=100)
+
+    assert sched.run_pending() == ["fast", "slow"]
+    now[0] = 20.0
+    assert sched.run_pending() == ["fast"]
+
+    fast = sched.jobs["fast"].metrics()
+    assert fast["runs"] == 2
+    assert fast["last_rows"] == 3
+    assert fast["last_status"] == "OK"
+    assert len(recorded) == 3
+
+
+def test_scheduler_skips_jobs_leased_by_another_client():
+    from scheduler import JobScheduler
+
+    now = [0.0]
+    ran = []
+    released = []
+
+    class FakeDB:
+        def acquire_job_lease(self, name, holder, seconds):
+            return name != "billing"
+
+        def release_job_lease(self, name, holder):
+            released.append((name, holder))
+
+    def boom(db):
+        raise RuntimeError("db down")
+
+    sched = JobScheduler(db=FakeDB(), clock=lambda: now[0], record_runs=False, holder="pc-1:42")
+    sched.add_job("billing", lambda db: ran.append("billing"), interval=60)
+    sched.add_job("overdue", boom, interval=60)
+
+    assert sched.run_pending() == ["overdue"]
+    assert ran == [] and sched.jobs["billing"].runs == 0
+    assert sched.jobs["billing"].next_run == 60
+    assert released == [("overdue", "pc-1:42")]
+
+    now[0] = 30.0
+    assert sched.run_pending() == []
+
+    sched.run_job("billing")            # a manual run ignores the lease
+    assert ran == ["billing"]
+
+
+def test_gui_driver_runs_ticks_off_the_gui_thread():
+    import os
+    import threading
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from scheduler import QtSchedulerDriver
+
+    app = QApplication.instance() or QApplication([])
+    calls = []
+
+    class FakeScheduler:
+        def run_pending(self):
+            calls.append(threading.current_thread())
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return []
+
+    driver = QtSchedulerDriver(FakeScheduler(), tick_ms=60000)
+    assert driver.tick()
+    driver.pool.waitForDone(5000)
+    assert driver.tick()                # a failed tick does not stop the driver
+    driver.pool.waitForDone(5000)
+    driver.stop()
+
+    assert len(calls) == 2
+    assert all(t is not threading.main_thread() for t in calls)
+
+
+def test_scheduler_isolates_failing_job():
+    from scheduler import JobScheduler
+
+    def boom(db):
+        raise RuntimeError("db down")
+
+    sched = JobScheduler(db=object(), clock=lambda: 0.0, record_runs=False)
+    sched.add_job("broken", boom, interval=60)
+
+    metrics = sched.run_job("broken")
+
+    assert metrics["last_status"] == "FAILED"
+    assert metrics["failures"] == 1
+    assert "db down" in metrics["last_error"]
+
+
+def test_apply_migrations_skips_already_applied():
+    from migrations import apply_migrations
+
+    executed = []
+
+    class FakeDB:
+        def execute(self, sql, params=None):
+            executed.append((sql, params))
+
+        def fetchall(self, sql, params=None):
+            return [{"name": "001_first"}]
+
+    ran = apply_migrations(FakeDB(), [
+        ("001_first", ["CREATE INDEX a ON t(x)"]),
+        ("002_second", ["CREATE INDEX b ON t(y)"]),
+    ])
+
+    assert ran == ["002_second"]
+    sqls = [sql for sql, _ in executed]
+    assert "CREATE INDEX b ON t(y)" in sqls
+    assert "CREATE INDEX a ON t(x)" not in sqls
+
+
+def test_default_jobs_include_the_hold_sweeper():
+    from scheduler import default_scheduler
+
+    class FakeDB:
+        def expire_holds(self, batch_size):
+            return (7, 1)
+
+        def record_job_run(self, *args):
+            pass
+
+    sched = default_scheduler(db=FakeDB())
+    assert sched.run_job("expire_holds")["last_rows"] == 7
+
+
+def test_format_hold_left():
+    from datetime import datetime
+    from holds import format_hold_left
+
+    now = datetime(2024, 5, 1, 12, 0)
+    assert format_hold_left(datetime(2024, 5, 3, 16, 30), now) == "2d 4h left"
+    assert format_hold_left("2024-05-01 12:35:00", now) == "35m left"
+    assert format_hold_left(datetime(2024, 5, 1, 11, 0), now) == "Expired"
+    assert format_hold_left(None, now) == "—"
@@ -0,0 +1,638 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    from backends import SQLiteBackend
+    from database import DatabaseManager
+    from migrations import apply_migrations
+    from recommender import room_features
+    from availability import occupancy_index
+
+    backend = SQLiteBackend(str(tmp_path / "staysmart.db"))
+    db = DatabaseManager(backend)
+    db.cache.clear()
+    room_features.invalidate()
+    occupancy_index.invalidate()
+    apply_migrations(db)
+    yield db
+    db.cache.clear()
+    backend.close()
+
+
+def _seed_owner_with_rental(db, start_date):
+    owner_id = db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    db.create_owner_profile(owner_id, "Olga")
+    tenant_id = db.create_user("TENANT", "Tina Tenant", "tina", "tina@x.test", "0911", "h")
+    dorm_id = db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,%s,%s,%s)",
+        (dorm_id, "101", "BED_SPACER", 2, 3000)
+    )
+    rental_id = db.execute(
+        "INSERT INTO rentals(tenant_id, room_id, start_date, status) VALUES (%s,%s,%s,'ACTIVE')",
+        (tenant_id, room_id, start_date)
+    )
+    return owner_id, tenant_id, room_id, rental_id
+
+
+def test_translate_rewrites_mysql_functions():
+    from dialect import mysql_to_sqlite
+
+    sql = mysql_to_sqlite("SELECT DAYNAME(d) FROM t WHERE d >= DATE_SUB(CURDATE(), INTERVAL %s DAY)")
+    assert "%s" not in sql and "?" in sql
+    assert "date(date('now','localtime'), '-' || (?) || ' day')" in sql
+    assert "strftime('%w', d)" in sql
+
+    upsert = mysql_to_sqlite("INSERT INTO t(a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b=VALUES(b)")
+    assert upsert.endswith("ON CONFLICT DO UPDATE SET b=excluded.b")
+
+    limited = mysql_to_sqlite("DELETE FROM job_runs WHERE started_at < %s ORDER BY run_id LIMIT %s")
+    assert limited == ("DELETE FROM job_runs WHERE rowid IN (SELECT rowid FROM job_runs "
+                       "WHERE started_at < ? ORDER BY run_id LIMIT ?)")
+
+
+def test_sqlite_backend_returns_mysql_shaped_rows(sqlite_db):
+    start = date.today() - timedelta(days=2)
+    owner_id, tenant_id, room_id, _ = _seed_owner_with_rental(sqlite_db, start)
+
+    rooms = sqlite_db.get_all_rooms()
+    assert rooms[0]["room_id"] == room_id
+    assert rooms[0]["host_name"] == "Olga Owner"
+
+    row = sqlite_db.fetchone("SELECT start_date FROM rentals WHERE tenant_id=%s", (tenant_id,))
+    assert row["start_date"] == start
+
+    weekly = sqlite_db.get_owner_occupancy_weekly(owner_id)
+    assert sum(weekly) == 1
+    assert weekly[start.weekday()] == 1
+
+
+def test_sqlite_upsert_and_batched_update(sqlite_db):
+    _, tenant_id, _, rental_id = _seed_owner_with_rental(sqlite_db, date.today() - timedelta(days=60))
+
+    for first in ("Tina", "Tin"):
+        sqlite_db.save_tenant_profile(tenant_id, first, "T", "Female", "G", "0", "g@x.test", None, 1)
+    assert sqlite_db.get_tenant_profile(tenant_id)["first_name"] == "Tin"
+
+    for days in (40, 20, 10):
+        sqlite_db.create_monthly_payment(rental_id, date.today() - timedelta(days=days), 3000)
+
+    total, batches = sqlite_db.mark_overdue_payments(batch_size=2)
+    assert total == 3
+    assert batches == 2
+    overdue = sqlite_db.fetchall("SELECT status FROM payments WHERE status='OVERDUE'")
+    assert len(overdue) == 3
+
+
+def test_student_snapshot_matches_the_per_panel_queries(sqlite_db):
+    _, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date.today() - timedelta(days=5))
+    sqlite_db.create_monthly_payment(rental_id, date.today() + timedelta(days=3), 3000)
+    sqlite_db.execute("INSERT INTO recently_viewed(user_id, room_id) VALUES (%s,%s)", (tenant_id, room_id))
+    # reserve_room refuses tenants with an ongoing rental, so add the application directly
+    app_id = sqlite_db.execute(
+        "INSERT INTO rental_applications(tenant_id, dorm_id, room_id) VALUES (%s,1,%s)", (tenant_id, room_id))
+
+    snap = sqlite_db.get_student_dashboard_snapshot(tenant_id)
+
+    assert snap["stats"] == sqlite_db.get_dashboard_stats(tenant_id)
+    assert snap["reservations"] == sqlite_db.get_user_reservations(tenant_id)
+    assert snap["reservations"][0]["application_id"] == app_id
+    assert [r["room_id"] for r in snap["recently_viewed"]] == [room_id]
+    assert snap["recommended"][0]["name"] == "Green Dorm - 101"
+
+
+def test_student_snapshot_is_cached_until_the_tenant_changes_something(sqlite_db):
+    _, tenant_id, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+
+    sqlite_db.stats.reset()
+    first = sqlite_db.get_student_dashboard_snapshot(tenant_id)
+    assert sqlite_db.stats.snapshot()["connections"]["count"] == 1     # one round trip
+    sqlite_db.execute("UPDATE rentals SET status='ENDED' WHERE tenant_id=%s", (tenant_id,))
+
+    assert sqlite_db.get_student_dashboard_snapshot(tenant_id)["stats"]["active_res"] == 1
+    sqlite_db.cancel_reservation(0)             # any tenant write drops the snapshot
+    assert sqlite_db.get_student_dashboard_snapshot(tenant_id)["stats"]["active_res"] == 0
+    assert first["stats"]["active_res"] == 1
+
+
+def test_nearest_rooms_are_exact_and_pageable(sqlite_db):
+    import geo
+
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    lat0, lon0 = 14.65, 121.07
+    # dorm i sits i*300 m north of the point; dorm 9 has no coordinates
+    for i in range(10):
+        dorm_id = sqlite_db.add_property(owner_id, f"Dorm {i}", "St")
+        lat = None if i == 9 else lat0 + (i * 300) / 111195.0
+        sqlite_db.execute("UPDATE dorms SET latitude=%s, longitude=%s WHERE dorm_id=%s", (lat, lon0, dorm_id))
+        sqlite_db.execute(
+            "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,%s,%s,%s)",
+            (dorm_id, "1", "SOLO", 1 + i % 2, 3000)
+        )
+
+    first = sqlite_db.get_nearest_rooms(lat0, lon0, limit=3)
+    second = sqlite_db.get_nearest_rooms(lat0, lon0, limit=3, offset=3)
+
+    assert [r["property_name"] for r in first + second] == [f"Dorm {i}" for i in range(6)]
+    assert [r["distance"] for r in first] == [0, 300, 600]
+    assert len(sqlite_db.get_nearest_rooms(lat0, lon0, limit=50)) == 9
+    assert all(r["capacity"] == 2 for r in sqlite_db.get_nearest_rooms(lat0, lon0, capacity_filter="2"))
+
+    rooms = {r["property_name"]: r for r in sqlite_db.get_all_rooms()}
+    assert rooms["Dorm 9"]["distance"] is None
+    assert rooms["Dorm 2"]["distance"] == round(geo.haversine_m(
+        geo.CAMPUS_LAT, geo.CAMPUS_LON, [rooms["Dorm 2"]["latitude"]], [lon0])[0])
+
+
+def test_nearest_order_matches_full_sort():
+    import numpy as np
+    import geo
+
+    rng = np.random.default_rng(3)
+    dist = rng.random(500)
+    assert list(geo.nearest_order(dist, 7)) == list(np.argsort(dist)[:7])
+    assert geo.bounding_box(14.65, 121.07, 1000)[0] < 14.65 < geo.bounding_box(14.65, 121.07, 1000)[1]
+
+
+def test_amenity_masks_follow_room_amenities(sqlite_db):
+    _, _, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    for label in ("WiFi", "Aircon", "Private CR"):
+        sqlite_db.execute("INSERT INTO amenities(label) VALUES (%s)", (label,))
+    sqlite_db.invalidate_amenities()
+
+    sqlite_db.set_room_amenities(room_id, [1, 3])
+    rooms = sqlite_db.get_all_rooms(amenity_ids=[1, 3])
+    assert [r["room_id"] for r in rooms] == [room_id]
+    assert rooms[0]["amenities"] == ["Private CR", "WiFi"]
+    assert sqlite_db.get_all_rooms(amenity_ids=[1, 2]) == []
+
+    sqlite_db.execute("INSERT INTO room_amenities(room_id, amenity_id) VALUES (%s, 2)", (room_id,))
+    sqlite_db.rebuild_amenity_masks(room_id)
+    assert sqlite_db.get_all_rooms(amenity_ids=[1, 2])[0]["amenities"] == ["Aircon", "Private CR", "WiFi"]
+
+
+def test_amenity_ids_past_the_bitmask_never_reach_a_mask(sqlite_db):
+    from amenity_index import amenity_mask
+    from migrations import MIGRATIONS
+
+    _, _, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    for amenity_id in (1, 2, 63, 64):
+        sqlite_db.execute("INSERT INTO amenities(amenity_id, label) VALUES (%s, %s)", (amenity_id, f"A{amenity_id}"))
+    sqlite_db.set_room_amenities(room_id, [1, 63])
+    with pytest.raises(ValueError):
+        sqlite_db.set_room_amenities(room_id, [2, 64])
+    rows = sqlite_db.fetchall("SELECT amenity_id FROM room_amenities WHERE room_id=%s ORDER BY amenity_id", (room_id,))
+    assert [r["amenity_id"] for r in rows] == [1, 63]
+
+    # a row written some other way is left out of the rebuilt mask and of migration 004's backfill
+    sqlite_db.execute("INSERT INTO room_amenities(room_id, amenity_id) VALUES (%s, 64)", (room_id,))
+    expected = amenity_mask([1, 63])
+    sqlite_db.rebuild_amenity_masks()
+    assert sqlite_db.fetchone("SELECT amenity_mask FROM rooms WHERE room_id=%s", (room_id,))["amenity_mask"] == expected
+    backfill = dict(MIGRATIONS)["004_rooms_amenity_mask"][1]
+    sqlite_db.execute(backfill)
+    assert sqlite_db.fetchone("SELECT amenity_mask FROM rooms WHERE room_id=%s", (room_id,))["amenity_mask"] == expected
+
+
+def test_room_facets_query_once_per_search_text(sqlite_db):
+    _, _, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    sqlite_db.execute("INSERT INTO amenities(label) VALUES ('WiFi')")
+    sqlite_db.invalidate_amenities()
+    sqlite_db.set_room_amenities(room_id, [1])
+
+    queries = []
+    real_fetchall = sqlite_db.fetchall
+    sqlite_db.fetchall = lambda sql, params=None: queries.append(sql) or real_fetchall(sql, params)
+
+    facets = sqlite_db.get_room_facets("Green")
+    assert facets["total"] == 1
+    assert facets["capacity"]["2"] == 1
+    assert facets["amenities"] == {1: 1}
+
+    sqlite_db.get_room_facets("Green", "1", [1])
+    assert len([q for q in queries if "dorm_type" in q]) == 1
+    assert sqlite_db.get_room_facets("Green", "1", [1])["total"] == 0
+
+
+def test_recommendations_follow_the_tenant_history(sqlite_db):
+    owner_id, tenant_id, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    dorm_id = sqlite_db.add_property(owner_id, "Blue Dorm", "Katipunan")
+    rooms = {}
+    for room_no, room_type, capacity, price in (("cheap", "BED_SPACER", 2, 3200),
+                                                ("pricey", "APARTMENT", 1, 15000),
+                                                ("taken", "BED_SPACER", 2, 3000)):
+        rooms[room_no] = sqlite_db.execute(
+            "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,%s,%s,%s)",
+            (dorm_id, room_no, room_type, capacity, price)
+        )
+    sqlite_db.execute("UPDATE rooms SET is_available=0 WHERE room_id=%s", (rooms["taken"],))
+    sqlite_db.execute("INSERT INTO recently_viewed(user_id, room_id) VALUES (%s,%s)", (tenant_id, room_id))
+
+    recommended = sqlite_db.get_recommended_rooms(limit=5, tenant_id=tenant_id)
+    assert [r["room_name"] for r in recommended] == ["cheap", "pricey"]   # viewed and taken rooms left out
+    assert recommended[0]["score"] > recommended[1]["score"]
+
+    # a room that becomes free is picked up by the incremental refresh
+    sqlite_db.execute("UPDATE rooms SET is_available=1 WHERE room_id=%s", (rooms["taken"],))
+    sqlite_db.invalidate_room_amenities(rooms["taken"])
+    assert sqlite_db.get_recommended_rooms(limit=1, tenant_id=tenant_id)[0]["room_name"] == "taken"
+
+    # no history: random available rooms
+    stranger = sqlite_db.create_user("TENANT", "New Kid", "kid", "kid@x.test", "0922", "h")
+    assert len(sqlite_db.get_recommended_rooms(limit=2, tenant_id=stranger)) == 2
+
+
+def test_record_room_views_upserts_and_keeps_the_newest(sqlite_db):
+    from datetime import datetime
+
+    owner_id, tenant_id, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    dorm_id = sqlite_db.add_property(owner_id, "Blue Dorm", "Katipunan")
+    rooms = [room_id] + [sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,'SOLO',1,4000)",
+        (dorm_id, str(n))
+    ) for n in range(3)]
+
+    sqlite_db.record_room_views([(tenant_id, r, datetime(2024, 5, 1, 9, n)) for n, r in enumerate(rooms)], keep=3)
+    sqlite_db.record_room_views([(tenant_id, rooms[0], datetime(2024, 5, 1, 10, 0))], keep=3)
+
+    assert [r["room_id"] for r in sqlite_db.get_recently_viewed(tenant_id)] == [rooms[0], rooms[3], rooms[2]]
+
+
+def test_reserve_room_never_overbooks_under_concurrency(sqlite_db):
+    from concurrent.futures import ThreadPoolExecutor
+    from database import BOOKED, ROOM_FULL
+
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    dorm_id = sqlite_db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,'1','BED_SPACER',3,3000)",
+        (dorm_id,)
+    )
+    tenants = [sqlite_db.create_user("TENANT", f"T{n}", f"t{n}", f"t{n}@x.test", "0900", "h") for n in range(120)]
+
+    with ThreadPoolExecutor(max_workers=24) as pool:
+        results = list(pool.map(lambda t: sqlite_db.reserve_room(t, dorm_id, room_id)["status"], tenants))
+
+    assert results.count(BOOKED) == 3 and results.count(ROOM_FULL) == 117
+    room = sqlite_db.fetchone("SELECT occupied_beds, is_available FROM rooms WHERE room_id=%s", (room_id,))
+    assert room == {"occupied_beds": 3, "is_available": 0}
+    assert len(sqlite_db.fetchall("SELECT 1 FROM rental_applications WHERE room_id=%s", (room_id,))) == 3
+
+
+def test_beds_come_back_on_cancel_and_rental_end(sqlite_db):
+    from database import ALREADY_RESERVED, BOOKED, ROOM_FULL
+
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date.today())
+    other = sqlite_db.create_user("TENANT", "Otto", "otto", "otto@x.test", "0900", "h")
+    sqlite_db.recount_occupied_beds()               # the seeded rental holds one of two beds
+
+    assert sqlite_db.reserve_room(tenant_id, 1, room_id)["status"] == ALREADY_RESERVED
+    booked = sqlite_db.reserve_room(other, 1, room_id)
+    assert booked["status"] == BOOKED
+    third = sqlite_db.create_user("TENANT", "Tess", "tess", "tess@x.test", "0900", "h")
+    assert sqlite_db.reserve_room(third, 1, room_id)["status"] == ROOM_FULL
+
+    sqlite_db.cancel_reservation(booked["application_id"])
+    sqlite_db.cancel_reservation(booked["application_id"])     # only the first one frees a bed
+    sqlite_db.end_rental_contract(rental_id)
+    sqlite_db.end_rental_contract(rental_id)
+    room = sqlite_db.fetchone("SELECT occupied_beds, is_available FROM rooms WHERE room_id=%s", (room_id,))
+    assert room == {"occupied_beds": 0, "is_available": 1}
+
+
+def test_expired_holds_are_swept_in_batches_and_free_beds(sqlite_db):
+    from database import BOOKED
+
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    dorm_id = sqlite_db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,'1','BED_SPACER',5,3000)",
+        (dorm_id,)
+    )
+    tenants = [sqlite_db.create_user("TENANT", f"T{n}", f"t{n}", f"t{n}@x.test", "0900", "h") for n in range(5)]
+    apps = [sqlite_db.reserve_room(t, dorm_id, room_id) for t in tenants]
+    assert all(a["status"] == BOOKED for a in apps)
+    assert sqlite_db.user_has_active_reservation(tenants[0])
+
+    stale = [a["application_id"] for a in apps[:3]]
+    sqlite_db.execute_many(
+        "UPDATE rental_applications SET expires_at = DATE_SUB(NOW(), INTERVAL 1 HOUR) WHERE application_id=%s",
+        [(a,) for a in stale]
+    )
+    assert not sqlite_db.user_has_active_reservation(tenants[0])   # lapsed even before the sweep
+
+    assert sqlite_db.expire_holds(batch_size=2) == (3, 2)
+    assert sqlite_db.expire_holds(batch_size=2) == (0, 1)
+    statuses = [r["action_status"] for r in sqlite_db.fetchall(
+        "SELECT action_status FROM rental_applications ORDER BY application_id")]
+    assert statuses == ["EXPIRED"] * 3 + ["WAITING"] * 2
+    room = sqlite_db.fetchone("SELECT occupied_beds, is_available FROM rooms WHERE room_id=%s", (room_id,))
+    assert room == {"occupied_beds": 2, "is_available": 1}
+    assert sqlite_db.reserve_room(tenants[0], dorm_id, room_id)["status"] == BOOKED
+
+
+def test_only_waiting_unexpired_requests_can_be_approved(sqlite_db):
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    dorm_id = sqlite_db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,'1','BED_SPACER',2,3000)",
+        (dorm_id,)
+    )
+    fresh, stale = [sqlite_db.reserve_room(
+        sqlite_db.create_user("TENANT", n, n, f"{n}@x.test", "0900", "h"), dorm_id, room_id)["application_id"]
+        for n in ("fresh", "stale")]
+    sqlite_db.execute(
+        "UPDATE rental_applications SET expires_at = DATE_SUB(NOW(), INTERVAL 1 HOUR) WHERE application_id=%s",
+        (stale,)
+    )
+
+    assert not sqlite_db.approve_request(stale)
+    assert sqlite_db.approve_request(fresh)
+    assert not sqlite_db.approve_request(fresh)         # already approved
+    statuses = {r["application_id"]: r["action_status"] for r in sqlite_db.fetchall(
+        "SELECT application_id, action_status FROM rental_applications")}
+    assert statuses == {fresh: "APPROVED", stale: "WAITING"}
+
+
+def test_waitlist_promotes_first_in_line_when_a_bed_frees_up(sqlite_db):
+    from database import ALREADY_RESERVED, ALREADY_WAITLISTED, ROOM_HAS_BEDS, WAITLISTED
+
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date.today())
+    sqlite_db.execute("UPDATE rooms SET capacity=1 WHERE room_id=%s", (room_id,))
+    sqlite_db.recount_occupied_beds()
+    first, second, busy = [sqlite_db.create_user("TENANT", n, n, f"{n}@x.test", "0900", "h")
+                           for n in ("first", "second", "busy")]
+    other_room = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (1,'102','SOLO',1,3000)")
+
+    assert sqlite_db.join_waitlist(busy, room_id)["position"] == 1
+    assert sqlite_db.join_waitlist(first, room_id) == {"status": WAITLISTED, "position": 2}
+    assert sqlite_db.join_waitlist(second, room_id)["position"] == 3
+    assert sqlite_db.join_waitlist(first, room_id)["status"] == ALREADY_WAITLISTED
+    assert sqlite_db.join_waitlist(first, other_room)["status"] == ROOM_HAS_BEDS
+    # the tenant renting the room already holds a bed, like reserve_room() says
+    assert sqlite_db.join_waitlist(tenant_id, room_id) == {"status": ALREADY_RESERVED, "position": None}
+    sqlite_db.reserve_room(busy, 1, other_room)     # busy books elsewhere meanwhile
+
+    sqlite_db.end_rental_contract(rental_id)
+
+    apps = sqlite_db.fetchall("SELECT tenant_id, room_id FROM rental_applications WHERE room_id=%s", (room_id,))
+    assert apps == [{"tenant_id": first, "room_id": room_id}]
+    waiters = {r["tenant_id"]: r["status"] for r in sqlite_db.fetchall("SELECT tenant_id, status FROM room_waitlist")}
+    assert waiters == {busy: "SKIPPED", first: "PROMOTED", second: "WAITING"}
+    assert sqlite_db.get_waitlist_position(second, room_id) == 1
+    assert sqlite_db.fetchone("SELECT occupied_beds FROM rooms WHERE room_id=%s", (room_id,))["occupied_beds"] == 1
+
+    # first cancels: the bed passes straight to second
+    first_app = sqlite_db.get_user_reservations(first)[0]["application_id"]
+    sqlite_db.cancel_reservation(first_app)
+    assert sqlite_db.get_user_reservations(second)[0]["status"] == "WAITING"
+    assert sqlite_db.get_waitlist_position(second, room_id) is None
+
+
+def test_rejecting_a_request_frees_the_bed_for_the_first_waiter(sqlite_db):
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    dorm_id = sqlite_db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,'1','SOLO',1,3000)",
+        (dorm_id,)
+    )
+    booked, first, second = [sqlite_db.create_user("TENANT", n, n, f"{n}@x.test", "0900", "h")
+                             for n in ("booked", "first", "second")]
+    app_id = sqlite_db.reserve_room(booked, dorm_id, room_id)["application_id"]
+    sqlite_db.join_waitlist(first, room_id)
+    sqlite_db.join_waitlist(second, room_id)
+
+    assert sqlite_db.reject_request(app_id, "No pets allowed")
+    assert not sqlite_db.reject_request(app_id, "again")     # already rejected: no second bed freed
+
+    rejected = sqlite_db.fetchone(
+        "SELECT action_status, review_note FROM rental_applications WHERE application_id=%s", (app_id,))
+    assert rejected == {"action_status": "REJECTED", "review_note": "No pets allowed"}
+    assert sqlite_db.get_user_reservations(first)[0]["status"] == "WAITING"
+    assert sqlite_db.get_waitlist_position(second, room_id) == 1
+    assert sqlite_db.fetchone("SELECT occupied_beds FROM rooms WHERE room_id=%s", (room_id,))["occupied_beds"] == 1
+
+
+def test_concurrent_rental_endings_promote_distinct_waiters(sqlite_db):
+    from concurrent.futures import ThreadPoolExecutor
+
+    owner_id = sqlite_db.create_user("OWNER", "Olga Owner", "olga", "olga@x.test", "0900", "h")
+    dorm_id = sqlite_db.add_property(owner_id, "Green Dorm", "Rizal St")
+    room_id = sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,'1','BED_SPACER',4,3000)",
+        (dorm_id,)
+    )
+    renters = [sqlite_db.create_user("TENANT", f"R{n}", f"r{n}", f"r{n}@x.test", "0900", "h") for n in range(4)]
+    rentals = [sqlite_db.execute(
+        "INSERT INTO rentals(tenant_id, room_id, start_date, status) VALUES (%s,%s,%s,'ACTIVE')",
+        (t, room_id, date.today())) for t in renters]
+    sqlite_db.recount_occupied_beds()
+    waiters = [sqlite_db.create_user("TENANT", f"W{n}", f"w{n}", f"w{n}@x.test", "0900", "h") for n in range(6)]
+    for w in waiters:
+        sqlite_db.join_waitlist(w, room_id)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(sqlite_db.end_rental_contract, rentals))
+
+    promoted = sorted(r["tenant_id"] for r in sqlite_db.fetchall(
+        "SELECT tenant_id FROM room_waitlist WHERE status='PROMOTED'"))
+    assert promoted == waiters[:4]
+    assert sqlite_db.fetchone("SELECT occupied_beds FROM rooms WHERE room_id=%s", (room_id,))["occupied_beds"] == 4
+
+
+def test_rooms_free_between_counts_rentals_and_holds(sqlite_db):
+    from database import BOOKED
+
+    today = date.today()
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, today)
+    sqlite_db.execute("UPDATE rentals SET end_date=%s WHERE rental_id=%s", (today + timedelta(days=30), rental_id))
+    other = sqlite_db.create_user("TENANT", "Otto", "otto", "otto@x.test", "0900", "h")
+    sqlite_db.recount_occupied_beds()
+
+    def free(days_from, days_to):
+        rooms = sqlite_db.get_rooms_free_between(today + timedelta(days=days_from), today + timedelta(days=days_to))
+        return [r["room_id"] for r in rooms]
+
+    assert free(0, 60) == [room_id]                 # one of two beds rented
+    assert sqlite_db.reserve_room(other, 1, room_id)["status"] == BOOKED
+    assert free(0, 60) == []                        # the hold takes the other bed
+    assert free(0, 10) == []
+
+    sqlite_db.cancel_reservation(
+        sqlite_db.fetchone("SELECT application_id FROM rental_applications WHERE tenant_id=%s", (other,))["application_id"])
+    assert free(0, 60) == [room_id]
+
+    sqlite_db.execute("UPDATE rooms SET capacity=1 WHERE room_id=%s", (room_id,))
+    sqlite_db.recount_occupied_beds()               # full today, free once the rental ends
+    assert sqlite_db.get_all_rooms() == []
+    assert free(0, 60) == []
+    assert free(31, 60) == [room_id]
+    assert sqlite_db.get_rooms_free_between(today + timedelta(days=31), today + timedelta(days=60), "Nowhere") == []
+
+    assert sqlite_db.get_room_facets()["total"] == 0
+    stay = {"date_from": today + timedelta(days=31), "date_to": today + timedelta(days=60)}
+    facets = sqlite_db.get_room_facets(**stay)
+    assert facets["total"] == 1 and facets["capacity"]["1"] == 1
+    assert sqlite_db.get_room_facets("", "2", **stay)["capacity"] == {"Any": 1, "1": 1, "2": 0, "3": 0, "4+": 0}
+    assert sqlite_db.get_room_facets(date_from=today, date_to=stay["date_to"])["total"] == 0
+
+
+def test_rental_dues_follow_the_payments_ledger(sqlite_db):
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date(2026, 1, 1))
+    assert sqlite_db.get_tenant_due(tenant_id) == {
+        "rental_id": rental_id, "amount": 0, "due_date": None, "last_paid_at": None, "last_paid_amount": None}
+
+    first = sqlite_db.create_monthly_payment(rental_id, date(2026, 1, 31), 3000)
+    sqlite_db.create_monthly_payment(rental_id, date(2026, 3, 2), 3000)
+    due = sqlite_db.get_tenant_due(tenant_id)
+    assert (due["amount"], due["due_date"]) == (6000, date(2026, 1, 31))
+    assert sqlite_db.get_dashboard_stats(tenant_id)["next_payment"] == "₱6,000.00 — Due January 31, 2026"
+
+    sqlite_db.mark_overdue_payments()
+    sqlite_db.mark_payment_paid(first)
+    due = sqlite_db.get_tenant_due(tenant_id)
+    assert (due["amount"], due["due_date"]) == (3000, date(2026, 3, 2))
+    assert due["last_paid_at"] is not None and due["last_paid_amount"] == 3000
+    assert sqlite_db.get_student_dashboard_snapshot(tenant_id)["stats"]["next_payment"] == \
+        sqlite_db.get_dashboard_stats(tenant_id)["next_payment"]
+
+    assert sqlite_db.reconcile_rental_balances() == (0, 1)
+    sqlite_db.execute("UPDATE payments SET amount_due=3500 WHERE rental_id=%s AND status<>'PAID'", (rental_id,))
+    assert sqlite_db.reconcile_rental_balances(fix=False) == (1, 1)
+    assert sqlite_db.reconcile_rental_balances() == (1, 1)
+    assert sqlite_db.get_tenant_due(tenant_id)["amount"] == 3500
+    assert sqlite_db.reconcile_rental_balances() == (0, 1)
+
+    # a bulk load that bypasses DatabaseManager is squared up in one statement
+    sqlite_db.execute("UPDATE payments SET amount_due=4000 WHERE rental_id=%s AND status<>'PAID'", (rental_id,))
+    assert sqlite_db.rebuild_rental_dues() == 1
+    assert sqlite_db.reconcile_rental_balances(fix=False) == (0, 1)
+
+
+def test_approving_payment_requests_posts_them_once(sqlite_db):
+    from datetime import datetime
+
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date(2026, 1, 1))
+    first = sqlite_db.create_monthly_payment(rental_id, date(2026, 1, 31), 3000)
+    second = sqlite_db.create_monthly_payment(rental_id, date(2026, 3, 2), 3000)
+    for n, amount in enumerate((3000, 1500, 700)):
+        sqlite_db.submit_payment_request(tenant_id, rental_id, amount, "uploads/payment_proofs/p.png",
+                                         period=date(2026, 1 + n, 1))
+    requests = [r["request_id"] for r in sqlite_db.get_pending_payment_requests(owner_id)]
+
+    assert sqlite_db.review_payment_request(requests[2], approve=False, remarks="Blurry")
+    assert sqlite_db.get_last_payment_rejection(tenant_id, rental_id) == "Blurry"
+    assert sqlite_db.post_payment_requests(requests) == 2
+    assert sqlite_db.post_payment_requests(requests) == 0
+    assert not sqlite_db.review_payment_request(requests[0])
+
+    payments = {p["payment_id"]: p for p in sqlite_db.fetchall(
+        "SELECT payment_id, amount_paid, status FROM payments WHERE rental_id=%s", (rental_id,))}
+    assert (payments[first]["amount_paid"], payments[first]["status"]) == (3000, "PAID")
+    assert (payments[second]["amount_paid"], payments[second]["status"]) == (1500, "PENDING")
+    assert sqlite_db.get_tenant_due(tenant_id)["amount"] == 1500
+
+    tx = sqlite_db.fetchall("SELECT owner_id, tenant_id, amount, payment_id FROM transactions ORDER BY request_id")
+    assert tx == [{"owner_id": owner_id, "tenant_id": tenant_id, "amount": 3000, "payment_id": first},
+                  {"owner_id": owner_id, "tenant_id": tenant_id, "amount": 1500, "payment_id": second}]
+
+    now = datetime.now()
+    assert sqlite_db.get_monthly_revenue_series(owner_id, now.year) == {now.month: 4500.0}
+    assert sqlite_db.get_monthly_earnings_summary(owner_id, now.year, now.month)["paid"] == 4500.0
+    assert sqlite_db.get_owner_transaction_years(owner_id) == [now.year]
+    assert len(sqlite_db.get_recent_transactions(owner_id, now.year)) == 2
+    assert sqlite_db.rebuild_owner_revenue() == 1
+    assert sqlite_db.get_monthly_revenue_series(owner_id, now.year) == {now.month: 4500.0}
+    assert sqlite_db.reconcile_rental_balances() == (0, 1)
+
+
+def test_resubmitting_a_payment_proof_is_a_no_op_until_reviewed(sqlite_db):
+    from concurrent.futures import ThreadPoolExecutor
+    from database import PAYMENT_ALREADY_SUBMITTED, PAYMENT_NO_RENTAL, PAYMENT_SUBMITTED
+
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date(2026, 1, 1))
+    sqlite_db.create_monthly_payment(rental_id, date(2026, 1, 31), 3000)
+
+    def submit(_):
+        return sqlite_db.submit_payment_request(tenant_id, rental_id, 3000, "uploads/payment_proofs/p.png")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(submit, range(16)))
+    assert [r["status"] for r in results].count(PAYMENT_SUBMITTED) == 1
+    assert {r["request_id"] for r in results} == {results[0]["request_id"]}
+    assert len(sqlite_db.get_pending_payment_requests(owner_id)) == 1
+
+    assert sqlite_db.review_payment_request(results[0]["request_id"], approve=False, remarks="Blurry")
+    again = submit(0)
+    assert again["status"] == PAYMENT_SUBMITTED and again["request_id"] != results[0]["request_id"]
+    assert submit(0)["status"] == PAYMENT_ALREADY_SUBMITTED
+    assert sqlite_db.submit_payment_request(tenant_id, 999, 10, "x.png")["status"] == PAYMENT_NO_RENTAL
+
+
+def test_upload_references_cover_images_proofs_and_photos(sqlite_db):
+    owner_id, tenant_id, room_id, rental_id = _seed_owner_with_rental(sqlite_db, date(2026, 1, 1))
+    sqlite_db.execute("INSERT INTO dorm_images (dorm_id, file_path) VALUES (1, 'uploads/store/aa/bb/x.png')")
+    sqlite_db.execute("INSERT INTO dorm_images (dorm_id, file_path) VALUES (1, 'uploads/dorm_images/old.png')")
+    sqlite_db.submit_payment_request(tenant_id, rental_id, 10, "uploads/store/cc/dd/y.jpg")
+    sqlite_db.save_tenant_profile(tenant_id, "Tina", "T", "F", "G", "0900", "g@x.test",
+                                  "uploads/store/aa/bb/x.png", 1)
+
+    assert sqlite_db.get_upload_references() == {"uploads/store/aa/bb/x.png", "uploads/store/cc/dd/y.jpg"}
+
+
+def test_one_client_at_a_time_holds_a_job_lease(sqlite_db):
+    assert sqlite_db.acquire_job_lease("billing", "pc-1:10", 3600)
+    assert sqlite_db.acquire_job_lease("billing", "pc-1:10", 3600)      # renewing its own lease
+    assert not sqlite_db.acquire_job_lease("billing", "pc-2:20", 3600)
+    assert sqlite_db.acquire_job_lease("cleanup", "pc-2:20", 3600)
+
+    sqlite_db.release_job_lease("billing", "pc-2:20")                    # not the holder: no effect
+    assert not sqlite_db.acquire_job_lease("billing", "pc-2:20", 3600)
+    sqlite_db.release_job_lease("billing", "pc-1:10")
+    assert sqlite_db.acquire_job_lease("billing", "pc-2:20", 3600)
+
+    sqlite_db.execute("UPDATE job_leases SET lease_until = DATE_SUB(NOW(), INTERVAL 1 SECOND)")
+    assert sqlite_db.acquire_job_lease("billing", "pc-1:10", 3600)      # expired leases are up for grabs
+
+
+def test_date_arithmetic_keeps_the_time_part(sqlite_db):
+    from datetime import datetime
+
+    row = sqlite_db.fetchone("""
+        SELECT DATE_ADD(%s, INTERVAL 72 HOUR) AS hours,
+               DATE_ADD(stamp, INTERVAL 72 HOUR) AS col_hours,
+               DATE_ADD(stamp, INTERVAL 2 DAY) AS col_days,
+               DATE_SUB(day, INTERVAL 1 MONTH) AS date_col,
+               DATE_ADD(CURDATE(), INTERVAL 1 DAY) AS tomorrow
+        FROM (SELECT '2026-01-01 10:30:00' AS stamp, '2026-03-15' AS day)
+    """, (datetime(2026, 1, 1, 10, 30),))
+
+    assert str(row["hours"]) == "2026-01-04 10:30:00"
+    assert str(row["col_hours"]) == "2026-01-04 10:30:00"
+    assert str(row["col_days"]) == "2026-01-03 10:30:00"
+    assert str(row["date_col"]) == "2026-02-15"
+    assert str(row["tomorrow"]) == str(date.today() + timedelta(days=1))
+
+
+def test_snapshot_recommendations_use_the_full_view_history(sqlite_db):
+    from datetime import datetime
+    from database import RECENT_VIEWS_SHOWN
+
+    owner_id, tenant_id, room_id, _ = _seed_owner_with_rental(sqlite_db, date.today())
+    dorm_id = sqlite_db.add_property(owner_id, "Blue Dorm", "Katipunan")
+    rooms = [sqlite_db.execute(
+        "INSERT INTO rooms(dorm_id, room_no, room_type, capacity, price_monthly) VALUES (%s,%s,%s,%s,%s)",
+        (dorm_id, str(n), "APARTMENT" if n < 6 else "BED_SPACER", 1 if n < 6 else 4, 15000 if n < 6 else 2500)
+    ) for n in range(10)]
+    # the newest views are pricey apartments, the older ones cheap bed spaces
+    views = [(tenant_id, r, datetime(2024, 5, 1, 9, n)) for n, r in enumerate(rooms[6:] + rooms[:4])]
+    sqlite_db.record_room_views(views)
+
+    snap = sqlite_db.get_student_dashboard_snapshot(tenant_id, recommended_limit=2)
+    assert len(snap["recently_viewed"]) == RECENT_VIEWS_SHOWN
+    expected = sqlite_db.get_recommended_rooms(limit=2, tenant_id=tenant_id)
+    assert [r["room_id"] for r in snap["recommended"]] == [r["room_id"] for r in expected]
@@ -0,0 +1,65 @@
+import os
+
+
+def _store(tmp_path, now=1_000_000.0):
+    from upload_store import UploadStore
+    return UploadStore(base_dir=str(tmp_path), chunk_size=7, clock=lambda: now)
+
+
+def _file(tmp_path, name, data):
+    path = tmp_path / "src" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_same_bytes_are_stored_once_under_their_hash(tmp_path):
+    import hashlib
+
+    store = _store(tmp_path)
+    data = b"proof of payment " * 100
+    digest = hashlib.sha256(data).hexdigest()
+
+    first = store.put_file(_file(tmp_path, "receipt.JPEG", data))
+    second = store.put_file(_file(tmp_path, "receipt (1).jpg", data))
+    other = store.put_file(_file(tmp_path, "receipt.jpg", data + b"!"))
+
+    assert first == second == f"uploads/store/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+    assert other != first
+    with open(store.resolve(first), "rb") as f:
+        assert f.read() == data
+    assert sorted(rel for rel, _ in store.iter_blobs()) == sorted([first, other])
+    assert os.listdir(os.path.join(store.root, "tmp")) == []
+
+
+def test_gc_removes_old_unreferenced_blobs_only(tmp_path):
+    store = _store(tmp_path)
+    kept = store.put_file(_file(tmp_path, "a.png", b"a"))
+    dropped = store.put_file(_file(tmp_path, "b.png", b"b"))
+    fresh = store.put_file(_file(tmp_path, "c.png", b"c"))
+    leftover = os.path.join(store.root, "tmp", "partial")
+    open(leftover, "wb").close()
+    for rel in (kept, dropped):
+        os.utime(store.resolve(rel), (0, 0))
+    os.utime(leftover, (0, 0))
+    store.clock = lambda: os.stat(store.resolve(fresh)).st_mtime + 60
+
+    assert store.gc([kept], min_age_s=3600, dry_run=True) == (2, 1)
+    assert store.gc([kept], min_age_s=3600) == (2, 1)
+
+    assert os.path.exists(store.resolve(kept)) and os.path.exists(store.resolve(fresh))
+    assert not os.path.exists(store.resolve(dropped)) and not os.path.exists(leftover)
+    assert not os.path.isdir(os.path.dirname(store.resolve(dropped)))     # empty shard pruned
+
+
+def test_renditions_live_and_die_with_their_blob(tmp_path):
+    store = _store(tmp_path)
+    kept = store.put_bytes(b"kept image", ".JPEG")
+    dropped = store.put_bytes(b"dropped image", ".jpg")
+    thumbs = [store.put_rendition(rel, "thumb", b"small") for rel in (kept, dropped)]
+    assert thumbs[0] == kept[:-len(".jpg")] + ".thumb.jpg"
+    for rel, _ in store.iter_blobs():
+        os.utime(store.resolve(rel), (0, 0))
+
+    assert store.gc([kept], min_age_s=3600) == (2, len(b"dropped image") + len(b"small"))
+    assert sorted(rel for rel, _ in store.iter_blobs()) == sorted([kept, thumbs[0]])
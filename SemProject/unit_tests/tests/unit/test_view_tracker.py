@@ -0,0 +1,50 @@
+from datetime import datetime
+
+
+class FakeDB:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def record_room_views(self, views, keep=20):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append((sorted(views), keep))
+        return len(views)
+
+
+def _tracker(db, **kwargs):
+    from view_tracker import ViewTracker
+
+    times = iter(datetime(2024, 5, 1, 9, 0, s) for s in range(60))
+    return ViewTracker(db=db, interval=60, clock=lambda: next(times), **kwargs)
+
+
+def test_views_are_buffered_and_deduplicated_until_flush():
+    db = FakeDB()
+    tracker = _tracker(db, keep=3)
+    tracker.record(7, 1)
+    tracker.record(7, 2)
+    tracker.record(7, 1)            # reopened: one row, newest time
+    tracker.record(None, 5)         # not logged in: ignored
+
+    assert db.batches == []
+    assert tracker.pending() == 2
+    assert tracker.flush() == 2
+    assert db.batches == [([(7, 1, datetime(2024, 5, 1, 9, 0, 2)), (7, 2, datetime(2024, 5, 1, 9, 0, 1))], 3)]
+    assert tracker.flush() == 0
+    tracker.stop()
+
+
+def test_failed_flush_keeps_views_and_stop_writes_them():
+    db = FakeDB(fail=True)
+    tracker = _tracker(db)
+    tracker.record(7, 1)
+
+    assert tracker.flush() == 0
+    assert tracker.pending() == 1 and tracker.failures == 1
+
+    db.fail = False
+    tracker.stop()
+    assert tracker.pending() == 0
+    assert [v for batch, _ in db.batches for v in batch] == [(7, 1, datetime(2024, 5, 1, 9, 0, 0))]
@@ -0,0 +1,188 @@
+# upload_store.py
+"""
+Content-addressed storage for uploaded files (dorm images, payment
+proofs, tenant photos).
+
+put_file() streams the source in CHUNK_SIZE pieces into a temp file while
+hashing it, then moves it to
+
+    uploads/store/<h[0:2]>/<h[2:4]>/<sha256><ext>
+
+Uploading the same bytes twice is one file and one path, whatever the
+source was called. Nothing is overwritten, so a stored path stays valid
+for as long as something references it. The returned path is relative to
+the app directory, which is how the database stores it.
+
+put_rendition() stores a derived file (a downscaled copy, see images.py)
+next to a blob, as <sha256>.<name><ext>. A rendition belongs to its blob:
+gc() keeps it while the blob is referenced and deletes it with the blob.
+
+gc() deletes blobs that no database row references (see
+DatabaseManager.get_upload_references). It spares anything newer than
+GC_MIN_AGE_S, because a form may have uploaded a file it has not saved
+yet. The upload_gc job in scheduler.py runs it daily.
+
+    STAYSMART_UPLOAD_GC_MIN_AGE_H=24
+"""
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STORE_PREFIX = "uploads/store"
+CHUNK_SIZE = 1 << 20
+GC_MIN_AGE_S = float(os.environ.get("STAYSMART_UPLOAD_GC_MIN_AGE_H", "24")) * 3600
+
+# one spelling per format, so the same image gets the same path
+_EXTENSIONS = {".jpeg": ".jpg"}
+
+
+def _digest(rel_path):
+    """The hash a stored path (blob or rendition) is named after."""
+    return os.path.basename(rel_path).split(".", 1)[0]
+
+
+class UploadStore:
+    def __init__(self, base_dir=BASE_DIR, prefix=STORE_PREFIX, chunk_size=CHUNK_SIZE, clock=time.time):
+        self.base_dir = base_dir
+        self.prefix = prefix
+        self.root = os.path.join(base_dir, *prefix.split("/"))
+        self.chunk_size = chunk_size
+        self.clock = clock
+
+    def resolve(self, rel_path):
+        """Absolute path for a stored (or legacy app-relative) path."""
+        if not rel_path:
+            return None
+        if os.path.isabs(rel_path):
+            return rel_path
+        return os.path.join(self.base_dir, *rel_path.split("/"))
+
+    def path_for(self, digest, ext=""):
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def rendition_path(self, rel_path, name):
+        root, ext = os.path.splitext(rel_path)
+        return f"{root}.{name}{ext}"
+
+    def put_file(self, src_path):
+        """Stores a copy of src_path. Returns its relative path."""
+        ext = os.path.splitext(src_path)[1].lower()
+        with open(src_path, "rb") as src:
+            return self._put(iter(lambda: src.read(self.chunk_size), b""), _EXTENSIONS.get(ext, ext))
+
+    def put_bytes(self, data, ext):
+        """Stores an in-memory file (e.g. a re-encoded image). Returns its relative path."""
+        ext = ext.lower()
+        return self._put([data], _EXTENSIONS.get(ext, ext))
+
+    def put_rendition(self, rel_path, name, data):
+        """Stores `data` as rendition `name` of a stored blob, unless it exists already."""
+        rendition = self.rendition_path(rel_path, name)
+        final_path = self.resolve(rendition)
+        if not os.path.exists(final_path):
+            with self._staged() as (dst, tmp_path):
+                dst.write(data)
+                dst.close()
+                os.replace(tmp_path, final_path)
+        return rendition
+
+    def _put(self, chunks, ext):
+        digest = hashlib.sha256()
+        with self._staged() as (dst, tmp_path):
+            for chunk in chunks:
+                digest.update(chunk)
+                dst.write(chunk)
+            dst.close()
+
+            rel_path = self.path_for(digest.hexdigest(), ext)
+            final_path = self.resolve(rel_path)
+            try:
+                os.utime(final_path)        # already stored; fresh again for gc's grace period
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return rel_path
+
+    @contextmanager
+    def _staged(self):
+        """A temp file in the store; removed afterwards unless it was moved into place."""
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                yield dst, tmp_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def iter_blobs(self):
+        """(relative path, absolute path) of every stored blob."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            if len(shard) != 2:
+                continue
+            for sub in sorted(os.listdir(os.path.join(self.root, shard))):
+                folder = os.path.join(self.root, shard, sub)
+                for name in sorted(os.listdir(folder)):
+                    yield f"{self.prefix}/{shard}/{sub}/{name}", os.path.join(folder, name)
+
+    def gc(self, referenced, min_age_s=GC_MIN_AGE_S, dry_run=False):
+        """
+        Deletes blobs not in `referenced` (relative paths), with their
+        renditions, once older than min_age_s, plus temp files left by
+        interrupted uploads. Returns (files_removed, bytes_freed).
+        """
+        referenced = {_digest(rel_path) for rel_path in referenced if rel_path}
+        cutoff = self.clock() - min_age_s
+        removed = 0
+        freed = 0
+
+        stale = []
+        for rel_path, abs_path in self.iter_blobs():
+            if _digest(rel_path) not in referenced:
+                stale.append(abs_path)
+        tmp_dir = os.path.join(self.root, "tmp")
+        if os.path.isdir(tmp_dir):
+            stale += [os.path.join(tmp_dir, name) for name in os.listdir(tmp_dir)]
+
+        for abs_path in stale:
+            try:
+                info = os.stat(abs_path)
+                if info.st_mtime > cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(abs_path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += info.st_size
+
+        if not dry_run:
+            self._prune_empty_shards()
+        return removed, freed
+
+    def _prune_empty_shards(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.listdir(self.root):
+            path = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(path):
+                continue
+            for sub in os.listdir(path):
+                try:
+                    os.rmdir(os.path.join(path, sub))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+
+
+upload_store = UploadStore()
@@ -0,0 +1,108 @@
+# view_tracker.py
+"""
+Write-behind tracking of the rooms a student opens.
+
+Opening a room only calls `view_tracker.record(user_id, room_id)`, which
+updates an in-memory dict; nothing touches the database on the GUI thread.
+A daemon thread flushes the buffer every FLUSH_INTERVAL_S seconds with
+DatabaseManager.record_room_views: one batched upsert into recently_viewed,
+then a trim that keeps each user's KEEP_PER_USER newest views.
+
+Opening the same room twice before a flush is one row. A failed flush puts
+its views back for the next attempt. Shutdown (atexit, and aboutToQuit in
+main.py) calls stop(), which flushes whatever is still buffered.
+
+    STAYSMART_VIEW_FLUSH_S=5
+    STAYSMART_RECENT_VIEWS_KEEP=20
+"""
+import atexit
+import os
+import threading
+from datetime import datetime
+
+from database import DatabaseManager
+from instrumentation import logger
+
+FLUSH_INTERVAL_S = float(os.environ.get("STAYSMART_VIEW_FLUSH_S", "5"))
+KEEP_PER_USER = int(os.environ.get("STAYSMART_RECENT_VIEWS_KEEP", "20"))
+
+
+class ViewTracker:
+    def __init__(self, db=None, interval=FLUSH_INTERVAL_S, keep=KEEP_PER_USER, clock=datetime.now):
+        self._db = db
+        self.interval = interval
+        self.keep = keep
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}              # (user_id, room_id) -> viewed_at
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushed = 0
+        self.failures = 0
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = DatabaseManager()
+        return self._db
+
+    def record(self, user_id, room_id):
+        """Buffers one view; starts the flusher thread on first use."""
+        if user_id is None or room_id is None:
+            return
+        with self._lock:
+            self._pending[(int(user_id), int(room_id))] = self.clock().replace(microsecond=0)
+            if self._thread is None:
+                self._start()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Writes the buffered views. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            views = [(user_id, room_id, at) for (user_id, room_id), at in batch.items()]
+            try:
+                self.db.record_room_views(views, keep=self.keep)
+            except Exception as e:
+                self.failures += 1
+                logger.error("Could not write %d room views: %s", len(views), e)
+                with self._lock:
+                    for key, at in batch.items():
+                        if key not in self._pending:        # keep newer views
+                            self._pending[key] = at
+                return 0
+
+            self.flushed += len(views)
+            return len(views)
+
+    # ----- flusher thread -----
+
+    def _start(self):
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="view-tracker", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        """Stops the flusher thread and flushes what is left."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._wake.set()
+            thread.join(timeout=self.interval + 5)
+        self.flush()
+
+
+view_tracker = ViewTracker()
+atexit.register(view_tracker.stop)